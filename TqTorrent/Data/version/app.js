@@ -1,322 +1,901 @@
-// --- КРИТИЧЕСКИ ВАЖНО: ДАННЫЕ ИНИЦИАЛИЗИРУЮТСЯ PYTHON'ОМ ---
-let CNF_DATA = {};
-let GAME_DATA = [];
-
-// DOM ELEMENTS for the Modal and Panels
-const detailModal = document.getElementById('game-detail-modal');
-const closeModalBtn = document.getElementById('close-modal-btn');
-const detailLaunchBtn = document.getElementById('detail-launch-btn');
-const downloadStatusPanel = document.getElementById('download-status-panel');
-const gameGrid = document.getElementById('game-grid'); 
-
-// КРИТИЧЕСКАЯ ГЛОБАЛЬНАЯ ФУНКЦИЯ: вызывается Python'ом для передачи данных
-window.setConfigData = function(data) {
-    if (data && data.CNF_DATA && data.GAME_DATA) {
-        CNF_DATA = data.CNF_DATA;
-        GAME_DATA = data.GAME_DATA;
-        console.log('JavaScript: Конфигурация получена от Python, загружаем UI.');
-        
-        loadGameData();
-        updateDownloadStatusPanel(); 
-        setInitialView(CNF_DATA.initial_view); 
-        
-    } else {
-        console.error('JavaScript: Получены неполные или некорректные данные от Python.');
-        loadGameData();
-    }
-}
-
-function updateDownloadStatusPanel() {
-    const statusTextElement = document.getElementById('download-status-text');
-    const progressBarElement = document.getElementById('download-progress');
-
-    if (CNF_DATA.download_status && CNF_DATA.download_status !== "") {
-        downloadStatusPanel.classList.add('is-visible');
-        downloadStatusPanel.classList.remove('stack-back');
-        
-        statusTextElement.textContent = CNF_DATA.download_status;
-        
-        // Попытка извлечь процент для прогресс-бара
-        const match = CNF_DATA.download_status.match(/\((\d+)%\)/);
-        const percent = match ? parseInt(match[1]) : 0;
-        progressBarElement.style.width = `${percent}%`;
-
-    } else {
-        // Задержка исчезновения панели, чтобы избежать мерцания при быстром обновлении
-        downloadStatusPanel.classList.add('stack-back'); 
-        setTimeout(() => {
-            if (!CNF_DATA.download_status) {
-                downloadStatusPanel.classList.remove('is-visible');
-            }
-        }, 500); 
-    }
-}
-
-function setInitialView(viewName) {
-    const defaultView = 'catalog';
-    const targetView = viewName || defaultView;
-
-    // Снимаем активность со всех вкладок
-    document.querySelectorAll('.nav-item').forEach(nav => nav.classList.remove('active'));
-    document.querySelectorAll('.view-section').forEach(section => section.classList.remove('active'));
-
-    // Активируем нужную вкладку и секцию
-    const navItem = document.querySelector(`.nav-item[data-view="${targetView}"]`);
-    const viewSection = document.getElementById(targetView + '-view');
-
-    if (navItem) navItem.classList.add('active');
-    if (viewSection) viewSection.classList.add('active');
-}
-
-
-function getButtonStatus(game) {
-    let buttonText = "Установить";
-    let buttonClass = "btn-install";
-    let statusTag = "НЕ СКАЧЕНО";
-    
-    // Логика статусов на основе поля 'action' из cache.txt (deisvie)
-    switch (game.action) {
-        case "установлено":
-            buttonText = "Запустить";
-            buttonClass = "btn-launch";
-            statusTag = "УСТАНОВЛЕНО";
-            break;
-        case "запущена": 
-            buttonText = "Игра Запущена";
-            buttonClass = "btn-running"; 
-            statusTag = "ЗАПУЩЕНА";
-            break;
-        case "установка":
-            buttonText = "Установка (0%)";
-            buttonClass = "btn-launching"; 
-            statusTag = "УСТАНОВКА";
-            break;
-        case "установка_регистрация":
-            buttonText = "Регистрация...";
-            buttonClass = "btn-launching"; 
-            statusTag = "РЕГИСТРАЦИЯ";
-            break;
-        case "ошибка":
-            buttonText = "Ошибка (Журнал)";
-            buttonClass = "btn-error";
-            statusTag = "ОШИБКА";
-            break;
-        case "не скачено": 
-        default:
-            buttonText = "Установить";
-            buttonClass = "btn-install";
-            statusTag = "НЕ СКАЧЕНО";
-    }
-    
-    return { text: buttonText, class: buttonClass, statusTag: statusTag };
-}
-
-
-function loadGameData() {
-    const grid = document.getElementById('game-grid');
-    grid.innerHTML = '';
-    
-    document.getElementById('app-title').textContent = CNF_DATA.progr_name || "TqG"; 
-    document.querySelector('.nickname').textContent = CNF_DATA.steam_nickname || "Пользователь";
-
-    // ПРОВЕРКА НА ПУСТОЙ КЭШ: Если нет игр, показываем "Загрузка..."
-    if (GAME_DATA.length === 0) {
-        gameGrid.innerHTML = `
-            <div class="empty-placeholder">
-                <h1>Загрузка...</h1>
-                <p>Ожидание данных из файла cache.txt. Если это занимает много времени, убедитесь, что файл не пуст или не поврежден.</p>
-            </div>
-        `;
-        return; 
-    }
-
-
-    GAME_DATA.forEach((game, index) => {
-        const { text: buttonText, class: buttonClass, statusTag } = getButtonStatus(game);
-
-        const card = document.createElement('div');
-        card.className = 'game-card';
-        card.setAttribute('data-game-id', game.id);
-        
-        card.style.animation = `fadeIn 0.5s ease-out ${index * 0.05}s forwards`; 
-        
-        const statusClass = statusTag.toLowerCase().replace(/\s/g, '-').replace('(', '').replace(')', '');
-
-        card.innerHTML = `
-            <img src="${game.image}" alt="Обложка ${game.title}">
-            <span class="game-status status-${statusClass}" data-status-tag="${statusTag}">
-                ${statusTag}
-            </span>
-            <div class="card-info">
-                <h3>${game.title}</h3>
-                <p>${game.description}</p>
-            </div>
-            <button class="action-btn ${buttonClass}" data-path="${game.launch_path}" data-status="${buttonClass}" data-game-id="${game.id}">
-                ${buttonText}
-            </button>
-        `;
-        grid.appendChild(card);
-    });
-    
-    addLaunchListeners();
-    addDetailViewListeners(); 
-    addViewSwitchListeners(); 
-}
-
-
-// Единый обработчик для всех кнопок запуска/установки
-function handleLaunchClick(event) {
-    const launchPath = event.target.getAttribute('data-path');
-    let status = event.target.getAttribute('data-status');
-    const gameId = parseInt(event.target.getAttribute('data-game-id'));
-    
-    const button = event.target.closest('.action-btn');
-    const container = event.target.closest('.game-card') || detailModal;
-    const statusElement = container.querySelector('.game-status') || container.querySelector('.detail-status');
-
-    if (status === 'btn-launch') {
-        if (window.qt_bridge) {
-            button.disabled = true;
-            
-            // Визуальный статус: Запускается
-            if (statusElement) {
-                statusElement.textContent = "ЗАПУСКАЕТСЯ";
-                statusElement.className = statusElement.className.replace(/status-\S+/, 'status-запускается');
-            }
-            
-            // Вызов Python-функции launchGame
-            window.qt_bridge.launchGame(launchPath, function(result) {
-                
-                if (result === "SUCCESS") {
-                    // В случае успеха, статус меняется на "Игра Запущена"
-                    button.textContent = "Игра Запущена";
-                    button.className = button.className.replace(/btn-\S+/, 'btn-running');
-                    button.setAttribute('data-status', 'btn-running');
-                    
-                    if (statusElement) {
-                        statusElement.textContent = 'ЗАПУЩЕНА';
-                        statusElement.className = statusElement.className.replace(/status-\S+/, 'status-запущена');
-                    }
-                    detailModal.classList.remove('is-visible');
-                    
-                } else {
-                     // В случае ошибки
-                    button.textContent = "Ошибка (Журнал)";
-                    button.className = button.className.replace(/btn-\S+/, 'btn-error');
-                    button.setAttribute('data-status', 'btn-error');
-                    
-                    if (statusElement) {
-                        statusElement.textContent = 'ОШИБКА';
-                        statusElement.className = statusElement.className.replace(/status-\S+/, 'status-ошибка');
-                    }
-                    alert("Ошибка запуска: " + result);
-                }
-                button.disabled = false;
-            });
-        }
-    } else if (status === 'btn-install') {
-        console.log(`Попытка установки игры ID: ${gameId}`);
-        const gameTitle = container.querySelector('h3') ? container.querySelector('h3').textContent : 'Игра';
-        
-        // Имитация статуса скачивания
-        CNF_DATA.download_status = `Скачивание: ${gameTitle} (10%)`;
-        updateDownloadStatusPanel();
-        
-    } else if (status === 'btn-running') {
-        // Ничего не делать
-        console.log("Игра уже запущена. Отслеживание процесса...");
-    } else if (status === 'btn-error') {
-         alert('Проверьте журнал ошибок для этой игры.');
-    } 
-}
-
-function showGameDetail(gameId) {
-    const game = GAME_DATA.find(g => g.id === gameId);
-    if (!game) return;
-    
-    const { text: buttonText, class: buttonClass, statusTag } = getButtonStatus(game);
-    const statusClass = statusTag.toLowerCase().replace(/\s/g, '-').replace('(', '').replace(')', '');
-
-    // Заполнение модального окна данными
-    document.getElementById('detail-image').src = game.image;
-    document.getElementById('detail-title').textContent = game.title;
-    document.getElementById('detail-description').textContent = game.description;
-    
-    // Детальный статус
-    document.getElementById('detail-game-status').textContent = statusTag;
-    document.getElementById('detail-game-status').className = `detail-status status-${statusClass}`;
-
-    document.getElementById('detail-steam-id').textContent = game.steam_app_id || 'N/A';
-    document.getElementById('detail-path').textContent = game.launch_path;
-    
-    // Обновление кнопки запуска в деталях
-    detailLaunchBtn.textContent = buttonText;
-    detailLaunchBtn.className = `action-btn ${buttonClass}`;
-    detailLaunchBtn.setAttribute('data-path', game.launch_path);
-    detailLaunchBtn.setAttribute('data-status', buttonClass);
-    detailLaunchBtn.setAttribute('data-game-id', game.id); 
-
-    detailModal.classList.add('is-visible');
-}
-
-function handleCardClick(event) {
-    const card = event.target.closest('.game-card');
-    // Проверяем, что клик не был по кнопке
-    if (card && !event.target.classList.contains('action-btn')) {
-        const gameId = parseInt(card.getAttribute('data-game-id'));
-        showGameDetail(gameId);
-    }
-}
-
-function addLaunchListeners() {
-    document.querySelectorAll('.game-grid .action-btn').forEach(button => {
-        button.removeEventListener('click', handleLaunchClick);
-        button.addEventListener('click', handleLaunchClick);
-    });
-}
-
-function addDetailViewListeners() {
-    const grid = document.getElementById('game-grid');
-    grid.removeEventListener('click', handleCardClick);
-    grid.addEventListener('click', handleCardClick);
-
-    closeModalBtn.removeEventListener('click', closeModal);
-    closeModalBtn.addEventListener('click', closeModal);
-    document.removeEventListener('keydown', handleEscapeKey);
-    document.addEventListener('keydown', handleEscapeKey);
-
-    detailLaunchBtn.removeEventListener('click', handleLaunchClick); 
-    detailLaunchBtn.addEventListener('click', handleLaunchClick);
-}
-
-function closeModal() {
-    detailModal.classList.remove('is-visible');
-}
-function handleEscapeKey(event) {
-    if (event.key === "Escape") {
-        closeModal();
-    }
-}
-
-function addViewSwitchListeners() {
-    document.querySelectorAll('.nav-item').forEach(item => {
-        item.removeEventListener('click', handleViewSwitch);
-        item.addEventListener('click', handleViewSwitch);
-    });
-}
-
-function handleViewSwitch(e) {
-    e.preventDefault();
-    const targetView = this.getAttribute('data-view');
-    
-    document.querySelectorAll('.nav-item').forEach(nav => nav.classList.remove('active'));
-    this.classList.add('active');
-    
-    document.querySelectorAll('.view-section').forEach(section => {
-        section.classList.remove('active');
-    });
-    const section = document.getElementById(targetView + '-view');
-    if (section) {
-        section.classList.add('active');
-    }
+// --- КРИТИЧЕСКИ ВАЖНО: ДАННЫЕ ИНИЦИАЛИЗИРУЮТСЯ PYTHON'ОМ ---
+let CNF_DATA = {};
+let GAME_DATA = [];
+let GAME_BY_ID = new Map(); // id -> игра (поиск карточки за O(1))
+let SEARCH_IDS = null;      // Результат поиска (id по релевантности) или null - весь каталог
+let VIEW_GAMES = [];        // Что показывает сетка: GAME_DATA или найденные игры
+let LAUNCH_BROKEN = new Map(); // id -> { status, message }: путь запуска недоступен (проверка Python)
+
+// DOM ELEMENTS for the Modal and Panels
+const detailModal = document.getElementById('game-detail-modal');
+const closeModalBtn = document.getElementById('close-modal-btn');
+const detailLaunchBtn = document.getElementById('detail-launch-btn');
+const detailVerifyBtn = document.getElementById('detail-verify-btn');
+const downloadStatusPanel = document.getElementById('download-status-panel');
+const gameGrid = document.getElementById('game-grid'); 
+const downloadList = document.getElementById('download-list');
+
+// КРИТИЧЕСКАЯ ГЛОБАЛЬНАЯ ФУНКЦИЯ: вызывается Python'ом для передачи данных
+window.setConfigData = function(data) {
+    if (data && data.CNF_DATA && data.GAME_DATA) {
+        CNF_DATA = data.CNF_DATA;
+        GAME_DATA = data.GAME_DATA;
+        GAME_BY_ID = new Map(GAME_DATA.map(g => [g.id, g]));
+        console.log('JavaScript: Конфигурация получена от Python, загружаем UI.');
+        
+        loadGameData();
+        updateDownloadStatusPanel(); 
+        setInitialView(CNF_DATA.initial_view); 
+        
+    } else {
+        console.error('JavaScript: Получены неполные или некорректные данные от Python.');
+        loadGameData();
+    }
+}
+
+function updateDownloadStatusPanel() {
+    const statusTextElement = document.getElementById('download-status-text');
+    const progressBarElement = document.getElementById('download-progress');
+
+    if (CNF_DATA.download_status && CNF_DATA.download_status !== "") {
+        downloadStatusPanel.classList.add('is-visible');
+        downloadStatusPanel.classList.remove('stack-back');
+        
+        statusTextElement.textContent = CNF_DATA.download_status;
+        
+        // Попытка извлечь процент для прогресс-бара
+        const match = CNF_DATA.download_status.match(/\((\d+)%\)/);
+        const percent = match ? parseInt(match[1]) : 0;
+        progressBarElement.style.width = `${percent}%`;
+
+    } else {
+        // Задержка исчезновения панели, чтобы избежать мерцания при быстром обновлении
+        downloadStatusPanel.classList.add('stack-back'); 
+        setTimeout(() => {
+            if (!CNF_DATA.download_status) {
+                downloadStatusPanel.classList.remove('is-visible');
+            }
+        }, 500); 
+    }
+}
+
+// ГЛОБАЛЬНАЯ ФУНКЦИЯ: вызывается Python'ом с прогрессом загрузки ("" - загрузка завершена)
+window.setDownloadStatus = function(statusText) {
+    CNF_DATA.download_status = statusText;
+    updateDownloadStatusPanel();
+}
+
+// --- ВКЛАДКА ЗАГРУЗОК: очередь DownloadScheduler ---
+const DOWNLOAD_STATE_TEXT = {
+    active: 'Загружается',
+    queued: 'В очереди',
+    paused: 'Пауза',
+    failed: 'Ошибка',
+    done: 'Готово'
+};
+
+function formatBytes(bytes) {
+    if (!bytes) return '0 МБ';
+    if (bytes >= 1073741824) return `${(bytes / 1073741824).toFixed(2)} ГБ`;
+    return `${(bytes / 1048576).toFixed(1)} МБ`;
+}
+
+function formatEta(seconds) {
+    if (seconds === null || seconds === undefined) return '—';
+    const s = Math.round(seconds);
+    if (s >= 3600) return `${Math.floor(s / 3600)} ч ${Math.floor((s % 3600) / 60)} мин`;
+    if (s >= 60) return `${Math.floor(s / 60)} мин ${s % 60} с`;
+    return `${s} с`;
+}
+
+// ГЛОБАЛЬНАЯ ФУНКЦИЯ: вызывается Python'ом со снимком очереди загрузок
+window.setDownloadQueue = function(queue) {
+    document.getElementById('downloads-empty').style.display = queue.length ? 'none' : '';
+    downloadList.innerHTML = '';
+    queue.forEach(job => {
+        const percent = job.total ? Math.floor(job.downloaded * 100 / job.total) : 0;
+        const rateText = job.state === 'active' ? `${(job.rate / 1048576).toFixed(1)} МБ/с` : '';
+        const limitText = job.rate_limit ? ` (предел ${Math.round(job.rate_limit / 1024)} КБ/с)` : '';
+        const toggleAction = (job.state === 'active' || job.state === 'queued') ? 'pause' : 'resume';
+        const toggleText = toggleAction === 'pause' ? 'Пауза' : 'Продолжить';
+
+        const row = document.createElement('div');
+        row.className = `download-item download-${job.state}`;
+        row.setAttribute('data-game-id', job.game_id);
+        row.innerHTML = `
+            <div class="download-info">
+                <span class="download-position">#${job.position + 1}</span>
+                <strong class="download-title"></strong>
+                <span class="download-state">${DOWNLOAD_STATE_TEXT[job.state] || job.state}</span>
+            </div>
+            <div class="download-progress-track"><div class="download-progress-fill" style="width: ${percent}%"></div></div>
+            <div class="download-meta">
+                ${percent}% · ${formatBytes(job.downloaded)} из ${formatBytes(job.total)} · ${rateText}${limitText} · осталось ${formatEta(job.eta)}
+            </div>
+            <div class="download-controls">
+                <button data-action="${toggleAction}">${toggleText}</button>
+                <button data-action="up" ${job.position === 0 ? 'disabled' : ''}>▲</button>
+                <button data-action="down" ${job.position === queue.length - 1 ? 'disabled' : ''}>▼</button>
+                <button data-action="remove">Убрать</button>
+            </div>
+        `;
+        // Название - через textContent (в cache.txt может быть что угодно)
+        row.querySelector('.download-title').textContent = job.title;
+        if (job.error) {
+            row.querySelector('.download-meta').title = job.error;
+        }
+        downloadList.appendChild(row);
+    });
+}
+
+// Один делегированный обработчик на весь список загрузок
+function handleDownloadControl(event) {
+    const button = event.target.closest('button[data-action]');
+    if (!button || !window.qt_bridge) return;
+    const row = button.closest('.download-item');
+    const gameId = parseInt(row.getAttribute('data-game-id'));
+    const position = Array.from(downloadList.children).indexOf(row);
+    const onResult = result => {
+        if (result !== "SUCCESS") console.error(result);
+    };
+
+    switch (button.getAttribute('data-action')) {
+        case 'pause': window.qt_bridge.cancelDownload(gameId, onResult); break;
+        case 'resume': window.qt_bridge.resumeDownload(gameId, onResult); break;
+        case 'up': window.qt_bridge.moveDownload(gameId, position - 1, onResult); break;
+        case 'down': window.qt_bridge.moveDownload(gameId, position + 1, onResult); break;
+        case 'remove': window.qt_bridge.removeDownload(gameId, onResult); break;
+    }
+}
+downloadList.addEventListener('click', handleDownloadControl);
+
+// --- ВКЛАДКА УСТАНОВЛЕННЫХ: место на диске (qt_bridge.diskUsage; сортировка и фильтр - в Python) ---
+const USAGE_LIMIT = 1000;
+const USAGE_SEARCH_DEBOUNCE_MS = 120;
+const usageList = document.getElementById('usage-list');
+const usageSearch = document.getElementById('usage-search');
+const usageSort = document.getElementById('usage-sort');
+const usageMin = document.getElementById('usage-min');
+const usageSummary = document.getElementById('usage-summary');
+const usageRefreshBtn = document.getElementById('usage-refresh-btn');
+let usageTimer = null;
+let usageSeq = 0; // Ответ на устаревший запрос игнорируется
+
+function loadDiskUsage() {
+    if (!window.qt_bridge) return;
+    const [sort, order] = usageSort.value.split(':');
+    const filters = { sort, order, query: usageSearch.value.trim(), min_mb: parseInt(usageMin.value), limit: USAGE_LIMIT };
+    const seq = ++usageSeq;
+    window.qt_bridge.diskUsage(filters, function(result) {
+        if (seq !== usageSeq) return;
+        renderDiskUsage(JSON.parse(result));
+    });
+}
+
+function renderDiskUsage(result) {
+    document.getElementById('usage-empty').style.display = result.total ? 'none' : '';
+    usageSummary.textContent = `${result.total} игр · ${formatBytes(result.total_bytes)}${result.scanning ? ' · подсчет...' : ''}`;
+    usageRefreshBtn.disabled = result.scanning;
+    const fragment = document.createDocumentFragment();
+    result.games.forEach(row => {
+        const item = document.createElement('div');
+        item.className = 'usage-item';
+        item.setAttribute('data-game-id', row.id);
+        item.innerHTML = `
+            <strong class="usage-title"></strong>
+            <span class="usage-path"></span>
+            <span class="usage-files">${row.files} файлов</span>
+            <span class="usage-size">${formatBytes(row.bytes)}</span>
+        `;
+        // Название и путь - через textContent (в cache.txt может быть что угодно)
+        item.querySelector('.usage-title').textContent = row.title;
+        item.querySelector('.usage-path').textContent = row.path;
+        fragment.appendChild(item);
+    });
+    usageList.replaceChildren(fragment);
+}
+
+// ГЛОБАЛЬНАЯ ФУНКЦИЯ: вызывается Python'ом, когда подсчет места дал новые итоги
+window.onDiskUsageChanged = function(finished) {
+    if (document.getElementById('installed-view').classList.contains('active')) loadDiskUsage();
+}
+
+usageSearch.addEventListener('input', () => {
+    clearTimeout(usageTimer);
+    usageTimer = setTimeout(loadDiskUsage, USAGE_SEARCH_DEBOUNCE_MS);
+});
+usageSort.addEventListener('change', loadDiskUsage);
+usageMin.addEventListener('change', loadDiskUsage);
+usageRefreshBtn.addEventListener('click', () => {
+    if (!window.qt_bridge) return;
+    window.qt_bridge.refreshDiskUsage(() => loadDiskUsage());
+});
+usageList.addEventListener('click', event => {
+    const item = event.target.closest('.usage-item');
+    if (item) showGameDetail(parseInt(item.getAttribute('data-game-id')));
+});
+
+function setInitialView(viewName) {
+    const defaultView = 'catalog';
+    const targetView = viewName || defaultView;
+
+    // Снимаем активность со всех вкладок
+    document.querySelectorAll('.nav-item').forEach(nav => nav.classList.remove('active'));
+    document.querySelectorAll('.view-section').forEach(section => section.classList.remove('active'));
+
+    // Активируем нужную вкладку и секцию
+    const navItem = document.querySelector(`.nav-item[data-view="${targetView}"]`);
+    const viewSection = document.getElementById(targetView + '-view');
+
+    if (navItem) navItem.classList.add('active');
+    if (viewSection) viewSection.classList.add('active');
+}
+
+// ГЛОБАЛЬНАЯ ФУНКЦИЯ: вызывается Python'ом по команде второго запуска (main_app.py --view ...)
+window.openView = function(viewName) {
+    setInitialView(viewName);
+    if ((viewName || 'catalog') === 'catalog') {
+        // Пока вкладка была скрыта, ширина сетки была неизвестна
+        renderGrid({ layoutChanged: true });
+    } else if (viewName === 'installed') {
+        loadDiskUsage();
+    }
+}
+
+
+// Запущенные игры (running_game_ids) ведет Python и обновляют onGameLaunched/onGameExited
+function isGameRunning(gameId) {
+    return (CNF_DATA.running_game_ids || []).includes(gameId);
+}
+
+function setGameRunning(gameId, running) {
+    const ids = (CNF_DATA.running_game_ids || []).filter(id => id !== gameId);
+    if (running) ids.push(gameId);
+    CNF_DATA.running_game_ids = ids;
+}
+
+function getButtonStatus(game) {
+    let buttonText = "Установить";
+    let buttonClass = "btn-install";
+    let statusTag = "НЕ СКАЧЕНО";
+    
+    // Логика статусов на основе поля 'action' из cache.txt (deisvie);
+    // запущенная игра остается запущенной и в переиспользованной карточке виртуальной сетки
+    const action = isGameRunning(game.id) ? "запущена" : game.action;
+    switch (action) {
+        case "установлено":
+            buttonText = "Запустить";
+            buttonClass = "btn-launch";
+            statusTag = "УСТАНОВЛЕНО";
+            break;
+        case "запущена": 
+            buttonText = "Игра Запущена";
+            buttonClass = "btn-running"; 
+            statusTag = "ЗАПУЩЕНА";
+            break;
+        case "установка":
+            buttonText = "Установка (0%)";
+            buttonClass = "btn-launching"; 
+            statusTag = "УСТАНОВКА";
+            break;
+        case "установка_регистрация":
+            buttonText = "Регистрация...";
+            buttonClass = "btn-launching"; 
+            statusTag = "РЕГИСТРАЦИЯ";
+            break;
+        case "ошибка":
+            buttonText = "Ошибка (Журнал)";
+            buttonClass = "btn-error";
+            statusTag = "ОШИБКА";
+            break;
+        case "не скачено": 
+        default:
+            buttonText = "Установить";
+            buttonClass = "btn-install";
+            statusTag = "НЕ СКАЧЕНО";
+    }
+    
+    return { text: buttonText, class: buttonClass, statusTag: statusTag };
+}
+
+
+function loadGameData() {
+    document.getElementById('app-title').textContent = CNF_DATA.progr_name || "TqG"; 
+    document.querySelector('.nickname').textContent = CNF_DATA.steam_nickname || "Пользователь";
+
+    // ПРОВЕРКА НА ПУСТОЙ КЭШ: Если нет игр, показываем "Загрузка..."
+    if (GAME_DATA.length === 0) {
+        resetVirtualGrid();
+        gameGrid.style.height = '';
+        gameGrid.classList.remove('virtual-grid');
+        gameGrid.innerHTML = `
+            <div class="empty-placeholder">
+                <h1>Загрузка...</h1>
+                <p>Ожидание данных из файла cache.txt. Если это занимает много времени, убедитесь, что файл не пуст или не поврежден.</p>
+            </div>
+        `;
+        return; 
+    }
+
+    gameGrid.classList.add('virtual-grid');
+    const placeholder = gameGrid.querySelector('.empty-placeholder');
+    if (placeholder) placeholder.remove();
+    refreshViewGames();
+    renderGrid({ reset: true, animate: true });
+    if (SEARCH_IDS !== null) runSearch({ keepScroll: true }); // Каталог заменен целиком - повторяем активный поиск
+
+    addDetailViewListeners(); 
+    addViewSwitchListeners(); 
+}
+
+
+// --- ВИРТУАЛЬНАЯ СЕТКА: в DOM только видимые ряды + OVERSCAN_ROWS, карточки переиспользуются ---
+const GRID_GAP = 30;           // Совпадает с gap в .game-grid
+const CARD_MIN_WIDTH = 300;    // Совпадает с minmax(300px, 1fr)
+const OVERSCAN_ROWS = 2;       // Запас рядов сверху и снизу от видимой области
+const MAX_ANIMATED_CARDS = 24; // Анимируются только карточки первого экрана
+const scrollContainer = document.querySelector('.main-content');
+
+const virtualGrid = {
+    columns: 1,
+    cardWidth: CARD_MIN_WIDTH,
+    rowHeight: 0,
+    first: 0,          // Индексы VIEW_GAMES, отрисованные сейчас: [first, last)
+    last: 0,
+    cards: new Map(),  // индекс в VIEW_GAMES -> элемент карточки
+    pool: [],          // Свободные (скрытые) карточки для повторного использования
+    frame: null,
+    layoutPending: false
+};
+
+function cardHeight() {
+    return parseFloat(getComputedStyle(document.documentElement).getPropertyValue('--card-height')) || 360;
+}
+
+function resetVirtualGrid() {
+    virtualGrid.cards.forEach(card => releaseCard(card));
+    virtualGrid.cards.clear();
+    virtualGrid.first = virtualGrid.last = 0;
+}
+
+function releaseCard(card) {
+    card.style.display = 'none';
+    card.style.animation = 'none';
+    virtualGrid.pool.push(card);
+}
+
+// Пересчитывает колонки и высоту сетки (при загрузке, изменении размера и данных)
+function layoutGrid() {
+    const width = gameGrid.clientWidth;
+    if (width === 0) return false; // Вкладка каталога скрыта - отрисуем при переключении
+    virtualGrid.columns = Math.max(1, Math.floor((width + GRID_GAP) / (CARD_MIN_WIDTH + GRID_GAP)));
+    virtualGrid.cardWidth = (width - GRID_GAP * (virtualGrid.columns - 1)) / virtualGrid.columns;
+    virtualGrid.rowHeight = cardHeight() + GRID_GAP;
+    const rows = Math.ceil(VIEW_GAMES.length / virtualGrid.columns);
+    gameGrid.style.height = `${Math.max(0, rows * virtualGrid.rowHeight - GRID_GAP)}px`;
+    return true;
+}
+
+// options.reset - данные изменились, перезаполнить все видимые карточки;
+// options.animate - плавное появление карточек на экране (только при первой отрисовке)
+// options.layoutChanged - изменилась ширина (resize, переключение вкладки)
+function renderGrid(options = {}) {
+    if (GAME_DATA.length === 0) return;
+    if (options.reset) resetVirtualGrid();
+    if (VIEW_GAMES.length === 0) {
+        gameGrid.style.height = '0px';
+        return;
+    }
+    // При обычной прокрутке геометрия не меняется - пересчет колонок не нужен
+    const needsLayout = options.reset || options.layoutChanged || virtualGrid.rowHeight === 0;
+    if (needsLayout && !layoutGrid()) return;
+
+    const { columns, rowHeight, cardWidth } = virtualGrid;
+    const gridTop = gameGrid.getBoundingClientRect().top - scrollContainer.getBoundingClientRect().top + scrollContainer.scrollTop;
+    const viewTop = scrollContainer.scrollTop - gridTop;
+    const viewBottom = viewTop + scrollContainer.clientHeight;
+
+    const firstVisibleRow = Math.max(0, Math.floor(viewTop / rowHeight));
+    const lastVisibleRow = Math.max(0, Math.floor(viewBottom / rowHeight));
+    const first = Math.max(0, (firstVisibleRow - OVERSCAN_ROWS) * columns);
+    const last = Math.min(VIEW_GAMES.length, (lastVisibleRow + OVERSCAN_ROWS + 1) * columns);
+
+    // Карточки, ушедшие за пределы окна, возвращаются в пул
+    virtualGrid.cards.forEach((card, index) => {
+        if (index < first || index >= last) {
+            releaseCard(card);
+            virtualGrid.cards.delete(index);
+        }
+    });
+
+    const firstOnScreen = firstVisibleRow * columns;
+    const lastOnScreen = (lastVisibleRow + 1) * columns;
+    let animated = 0;
+    for (let index = first; index < last; index++) {
+        let card = virtualGrid.cards.get(index);
+        if (!card || options.layoutChanged) {
+            if (!card) {
+                card = virtualGrid.pool.pop() || createGameCard();
+                if (!card.parentNode) gameGrid.appendChild(card);
+                fillGameCard(card, VIEW_GAMES[index]);
+                virtualGrid.cards.set(index, card);
+            }
+            const row = Math.floor(index / columns);
+            const column = index % columns;
+            card.style.top = `${row * rowHeight}px`;
+            card.style.left = `${column * (cardWidth + GRID_GAP)}px`;
+            card.style.width = `${cardWidth}px`;
+            card.style.display = '';
+        }
+        const onScreen = index >= firstOnScreen && index < lastOnScreen;
+        if (options.animate && onScreen && animated < MAX_ANIMATED_CARDS) {
+            card.style.animation = `fadeIn 0.4s ease-out ${animated * 0.03}s both`;
+            animated++;
+        }
+    }
+    virtualGrid.first = first;
+    virtualGrid.last = last;
+}
+
+// Прокрутка и изменение размера окна перерисовывают сетку не чаще раза за кадр
+function scheduleGridRender(layoutChanged) {
+    if (layoutChanged) virtualGrid.layoutPending = true;
+    if (virtualGrid.frame !== null) return;
+    virtualGrid.frame = requestAnimationFrame(() => {
+        virtualGrid.frame = null;
+        const changed = virtualGrid.layoutPending;
+        virtualGrid.layoutPending = false;
+        renderGrid({ layoutChanged: changed });
+    });
+}
+scrollContainer.addEventListener('scroll', () => scheduleGridRender(false), { passive: true });
+window.addEventListener('resize', () => scheduleGridRender(true));
+
+
+// --- ПОИСК: индекс на стороне Python (qt_bridge.search), без моста - простой поиск подстроки ---
+const SEARCH_DEBOUNCE_MS = 120;
+const SEARCH_LIMIT = 5000;
+const searchInput = document.getElementById('search-input');
+const statusFilter = document.getElementById('status-filter');
+const searchCount = document.getElementById('search-count');
+let searchTimer = null;
+let searchSeq = 0; // Ответ на устаревший запрос игнорируется
+
+function refreshViewGames() {
+    VIEW_GAMES = SEARCH_IDS === null ? GAME_DATA : SEARCH_IDS.map(id => GAME_BY_ID.get(id)).filter(Boolean);
+}
+
+function runSearch(options = {}) {
+    const query = searchInput.value.trim();
+    const filters = { limit: SEARCH_LIMIT };
+    if (statusFilter.value) filters.status = [statusFilter.value];
+    const seq = ++searchSeq;
+
+    if (!query && !filters.status) {
+        applySearchResult(null, GAME_DATA.length, options);
+        return;
+    }
+    if (window.qt_bridge) {
+        window.qt_bridge.search(query, filters, function(result) {
+            if (seq !== searchSeq) return;
+            const { ids, total } = JSON.parse(result);
+            applySearchResult(ids, total, options);
+        });
+    } else {
+        const needle = query.toLowerCase();
+        const ids = GAME_DATA.filter(g =>
+            (!filters.status || filters.status.includes(g.action)) &&
+            (!needle || g.title.toLowerCase().includes(needle) || (g.description || '').toLowerCase().includes(needle))
+        ).map(g => g.id);
+        applySearchResult(ids.slice(0, SEARCH_LIMIT), ids.length, options);
+    }
+}
+
+function applySearchResult(ids, total, { keepScroll = false } = {}) {
+    SEARCH_IDS = ids;
+    refreshViewGames();
+    if (ids === null) {
+        searchCount.textContent = '';
+    } else {
+        searchCount.textContent = total ? `Найдено: ${total}` : 'Ничего не найдено';
+    }
+    if (!keepScroll) scrollContainer.scrollTop = 0;
+    renderGrid({ reset: true });
+}
+
+searchInput.addEventListener('input', () => {
+    clearTimeout(searchTimer);
+    searchTimer = setTimeout(runSearch, SEARCH_DEBOUNCE_MS);
+});
+statusFilter.addEventListener('change', () => runSearch());
+
+
+// Создает пустую DOM-карточку; данные игры заполняет fillGameCard
+// Ссылка на обложку через локальный кэш Python (tqimg:), если он есть; иначе - исходная ссылка
+function coverUrl(imageUrl, kind) {
+    if (!CNF_DATA.image_scheme || !imageUrl) return imageUrl;
+    return `${CNF_DATA.image_scheme}:${kind}?u=${encodeURIComponent(imageUrl)}`;
+}
+
+function createGameCard() {
+    const card = document.createElement('div');
+    card.className = 'game-card';
+    card.innerHTML = `
+        <img alt="" loading="lazy" decoding="async">
+        <span class="game-status"></span>
+        <div class="card-info">
+            <h3></h3>
+            <p></p>
+        </div>
+        <button class="action-btn"></button>
+    `;
+    return card;
+}
+
+// Заполняет (в том числе переиспользованную) карточку данными игры
+function fillGameCard(card, game) {
+    const { text: buttonText, class: buttonClass, statusTag } = getButtonStatus(game);
+    const statusClass = statusTag.toLowerCase().replace(/\s/g, '-').replace('(', '').replace(')', '');
+
+    card.setAttribute('data-game-id', game.id);
+
+    const img = card.querySelector('img');
+    const src = coverUrl(game.image, 'thumb');
+    // Та же обложка не перезагружается при повторном заполнении
+    if (img.getAttribute('src') !== src) img.setAttribute('src', src);
+    img.alt = `Обложка ${game.title}`;
+
+    const status = card.querySelector('.game-status');
+    status.className = `game-status status-${statusClass}`;
+    status.setAttribute('data-status-tag', statusTag);
+    status.textContent = statusTag;
+
+    card.querySelector('h3').textContent = game.title;
+    card.querySelector('p').textContent = game.description;
+
+    const button = card.querySelector('.action-btn');
+    button.className = `action-btn ${buttonClass}`;
+    button.setAttribute('data-path', game.launch_path);
+    button.setAttribute('data-status', buttonClass);
+    button.setAttribute('data-game-id', game.id);
+    button.disabled = false;
+    button.title = '';
+    button.textContent = buttonText;
+    markLaunchTarget(card, game);
+}
+
+// Недоступный путь запуска виден на карточке сразу, а не после нажатия "Запустить"
+function markLaunchTarget(card, game) {
+    const button = card.querySelector('.action-btn');
+    const broken = button.getAttribute('data-status') === 'btn-launch' ? LAUNCH_BROKEN.get(game.id) : null;
+    card.classList.toggle('launch-broken', !!broken);
+    if (broken) {
+        button.title = `Путь запуска: ${broken.message}`;
+    } else if (button.title.startsWith('Путь запуска: ')) {
+        button.title = '';
+    }
+}
+
+// ГЛОБАЛЬНАЯ ФУНКЦИЯ: вызывается Python'ом после фоновой проверки путей запуска
+// result = { broken: { id: { status, message } }, checked: [id] или null (проверен весь каталог) }
+window.setLaunchTargets = function(result) {
+    if (!result) return;
+    if (result.checked === null) {
+        LAUNCH_BROKEN = new Map();
+    } else {
+        result.checked.forEach(id => LAUNCH_BROKEN.delete(id));
+    }
+    Object.entries(result.broken).forEach(([id, info]) => LAUNCH_BROKEN.set(parseInt(id), info));
+    // Отметки обновляются только у видимых карточек (остальные получат их в fillGameCard)
+    virtualGrid.cards.forEach((card, index) => {
+        if (VIEW_GAMES[index]) markLaunchTarget(card, VIEW_GAMES[index]);
+    });
+    console.log(`JavaScript: Недоступных путей запуска: ${LAUNCH_BROKEN.size}.`);
+}
+
+// ГЛОБАЛЬНАЯ ФУНКЦИЯ: вызывается Python'ом для передачи только изменений каталога
+// delta = { cnf: {...}, added: [game], changed: [game], removed: [id] }
+window.applyConfigDelta = function(delta) {
+    if (!delta) return;
+
+    if (delta.cnf) {
+        CNF_DATA = delta.cnf;
+        document.getElementById('app-title').textContent = CNF_DATA.progr_name || "TqG"; 
+        document.querySelector('.nickname').textContent = CNF_DATA.steam_nickname || "Пользователь";
+        updateDownloadStatusPanel();
+    }
+
+    const removed = new Set(delta.removed || []);
+    if (removed.size > 0) {
+        GAME_DATA = GAME_DATA.filter(g => !removed.has(g.id));
+        removed.forEach(id => GAME_BY_ID.delete(id));
+    }
+
+    const changed = delta.changed || [];
+    if (changed.length > 0) {
+        const positions = new Map();
+        GAME_DATA.forEach((g, position) => positions.set(g.id, position));
+        changed.forEach(game => {
+            if (positions.has(game.id)) GAME_DATA[positions.get(game.id)] = game;
+            GAME_BY_ID.set(game.id, game);
+        });
+    }
+
+    const added = delta.added || [];
+    const wasEmpty = GAME_DATA.length === 0;
+    added.forEach(game => {
+        GAME_DATA.push(game);
+        GAME_BY_ID.set(game.id, game);
+    });
+
+    if (wasEmpty || GAME_DATA.length === 0) {
+        // Сетка показывала "Загрузка..." (или каталог опустел) - строим ее целиком
+        loadGameData();
+    } else if (removed.size > 0 || changed.length > 0 || added.length > 0) {
+        // Индексы сдвинулись: видимое окно перезаполняется из GAME_DATA без анимации
+        refreshViewGames();
+        renderGrid({ reset: true });
+        // Найденные игры могли измениться - поиск повторяется в индексе Python
+        if (SEARCH_IDS !== null) runSearch({ keepScroll: true });
+    }
+    console.log('JavaScript: Применена дельта каталога от Python.');
+}
+
+
+// ГЛОБАЛЬНАЯ ФУНКЦИЯ: вызывается Python'ом, когда процесс запущенной игры завершился
+window.onGameExited = function(gameId, playSeconds) {
+    const game = GAME_BY_ID.get(gameId);
+    setGameRunning(gameId, false);
+    if (!game) return;
+    game.last_session_seconds = playSeconds;
+
+    const minutes = Math.round(playSeconds / 60);
+    const sessionText = `Последняя сессия: ${minutes} мин.`;
+    const { text: buttonText, class: buttonClass, statusTag } = getButtonStatus(game);
+    const statusClass = statusTag.toLowerCase().replace(/\s/g, '-').replace('(', '').replace(')', '');
+
+    // Возвращаем кнопку и статус карточки (и открытой детальной карточки) в исходное состояние
+    const buttons = document.querySelectorAll(`.action-btn[data-game-id="${gameId}"]`);
+    buttons.forEach(button => {
+        button.textContent = buttonText;
+        button.className = button.className.replace(/btn-\S+/, buttonClass);
+        button.setAttribute('data-status', buttonClass);
+        button.title = sessionText;
+
+        const container = button.closest('.game-card') || detailModal;
+        const statusElement = container.querySelector('.game-status') || container.querySelector('.detail-status');
+        if (statusElement) {
+            statusElement.textContent = statusTag;
+            statusElement.className = statusElement.className.replace(/status-\S+/, `status-${statusClass}`);
+        }
+    });
+    console.log(`JavaScript: Игра ${game.title} завершена. ${sessionText}`);
+}
+
+
+// ГЛОБАЛЬНАЯ ФУНКЦИЯ: вызывается Python'ом, когда игра запущена не кнопкой (main_app.py --launch N)
+window.onGameLaunched = function(gameId) {
+    setGameRunning(gameId, true);
+
+    document.querySelectorAll(`.action-btn[data-game-id="${gameId}"]`).forEach(button => {
+        button.textContent = "Игра Запущена";
+        button.className = button.className.replace(/btn-\S+/, 'btn-running');
+        button.setAttribute('data-status', 'btn-running');
+
+        const container = button.closest('.game-card') || detailModal;
+        const statusElement = container.querySelector('.game-status') || container.querySelector('.detail-status');
+        if (statusElement) {
+            statusElement.textContent = 'ЗАПУЩЕНА';
+            statusElement.className = statusElement.className.replace(/status-\S+/, 'status-запущена');
+        }
+    });
+}
+
+
+// Единый обработчик для всех кнопок запуска/установки
+function handleLaunchClick(event) {
+    const launchPath = event.target.getAttribute('data-path');
+    let status = event.target.getAttribute('data-status');
+    const gameId = parseInt(event.target.getAttribute('data-game-id'));
+    
+    const button = event.target.closest('.action-btn');
+    const container = event.target.closest('.game-card') || detailModal;
+    const statusElement = container.querySelector('.game-status') || container.querySelector('.detail-status');
+
+    if (status === 'btn-launch') {
+        if (window.qt_bridge) {
+            button.disabled = true;
+            
+            // Визуальный статус: Запускается
+            if (statusElement) {
+                statusElement.textContent = "ЗАПУСКАЕТСЯ";
+                statusElement.className = statusElement.className.replace(/status-\S+/, 'status-запускается');
+            }
+            
+            // Вызов Python-функции launchGame
+            window.qt_bridge.launchGame(launchPath, gameId, function(result) {
+                
+                if (result === "SUCCESS") {
+                    // В случае успеха, статус меняется на "Игра Запущена"
+                    setGameRunning(gameId, true);
+                    button.textContent = "Игра Запущена";
+                    button.className = button.className.replace(/btn-\S+/, 'btn-running');
+                    button.setAttribute('data-status', 'btn-running');
+                    
+                    if (statusElement) {
+                        statusElement.textContent = 'ЗАПУЩЕНА';
+                        statusElement.className = statusElement.className.replace(/status-\S+/, 'status-запущена');
+                    }
+                    detailModal.classList.remove('is-visible');
+                    
+                } else {
+                     // В случае ошибки
+                    button.textContent = "Ошибка (Журнал)";
+                    button.className = button.className.replace(/btn-\S+/, 'btn-error');
+                    button.setAttribute('data-status', 'btn-error');
+                    
+                    if (statusElement) {
+                        statusElement.textContent = 'ОШИБКА';
+                        statusElement.className = statusElement.className.replace(/status-\S+/, 'status-ошибка');
+                    }
+                    alert("Ошибка запуска: " + result);
+                }
+                button.disabled = false;
+            });
+        }
+    } else if (status === 'btn-install') {
+        console.log(`Попытка установки игры ID: ${gameId}`);
+        const gameTitle = container.querySelector('h3') ? container.querySelector('h3').textContent : 'Игра';
+        
+        if (window.qt_bridge) {
+            // Загрузка выполняется Python'ом, прогресс приходит через setDownloadStatus
+            window.qt_bridge.startDownload(gameId, function(result) {
+                if (result !== "SUCCESS") {
+                    alert("Ошибка загрузки: " + result);
+                }
+            });
+            CNF_DATA.download_status = `Скачивание: ${gameTitle} (0%)`;
+        } else {
+            // Имитация статуса скачивания
+            CNF_DATA.download_status = `Скачивание: ${gameTitle} (10%)`;
+        }
+        updateDownloadStatusPanel();
+        
+    } else if (status === 'btn-running') {
+        // Ничего не делать
+        console.log("Игра уже запущена. Отслеживание процесса...");
+    } else if (status === 'btn-error') {
+         alert('Проверьте журнал ошибок для этой игры.');
+    } 
+}
+
+function showGameDetail(gameId) {
+    const game = GAME_BY_ID.get(gameId);
+    if (!game) return;
+    
+    const { text: buttonText, class: buttonClass, statusTag } = getButtonStatus(game);
+    const statusClass = statusTag.toLowerCase().replace(/\s/g, '-').replace('(', '').replace(')', '');
+
+    // Заполнение модального окна данными
+    document.getElementById('detail-image').src = coverUrl(game.image, 'full');
+    document.getElementById('detail-title').textContent = game.title;
+    document.getElementById('detail-description').textContent = game.description;
+    
+    // Детальный статус
+    document.getElementById('detail-game-status').textContent = statusTag;
+    document.getElementById('detail-game-status').className = `detail-status status-${statusClass}`;
+
+    document.getElementById('detail-steam-id').textContent = game.steam_app_id || 'N/A';
+    const broken = LAUNCH_BROKEN.get(game.id);
+    document.getElementById('detail-path').textContent = broken ? `${game.launch_path} (${broken.message})` : game.launch_path;
+    
+    // Обновление кнопки запуска в деталях
+    detailLaunchBtn.textContent = buttonText;
+    detailLaunchBtn.className = `action-btn ${buttonClass}`;
+    detailLaunchBtn.setAttribute('data-path', game.launch_path);
+    detailLaunchBtn.setAttribute('data-status', buttonClass);
+    detailLaunchBtn.setAttribute('data-game-id', game.id); 
+
+    // Проверка файлов доступна только для установленной игры
+    detailVerifyBtn.setAttribute('data-game-id', game.id);
+    detailVerifyBtn.className = 'action-btn btn-verify';
+    detailVerifyBtn.style.display = (buttonClass === 'btn-install') ? 'none' : '';
+
+    detailModal.classList.add('is-visible');
+}
+
+// Один делегированный обработчик на всю сетку: кнопка карточки или сама карточка
+function handleCardClick(event) {
+    const button = event.target.closest('.action-btn');
+    if (button) {
+        handleLaunchClick({ target: button });
+        return;
+    }
+    const card = event.target.closest('.game-card');
+    if (card) {
+        const gameId = parseInt(card.getAttribute('data-game-id'));
+        showGameDetail(gameId);
+    }
+}
+
+function addDetailViewListeners() {
+    gameGrid.removeEventListener('click', handleCardClick);
+    gameGrid.addEventListener('click', handleCardClick);
+
+    closeModalBtn.removeEventListener('click', closeModal);
+    closeModalBtn.addEventListener('click', closeModal);
+    document.removeEventListener('keydown', handleEscapeKey);
+    document.addEventListener('keydown', handleEscapeKey);
+
+    detailLaunchBtn.removeEventListener('click', handleLaunchClick); 
+    detailLaunchBtn.addEventListener('click', handleLaunchClick);
+
+    detailVerifyBtn.removeEventListener('click', handleVerifyClick);
+    detailVerifyBtn.addEventListener('click', handleVerifyClick);
+}
+
+// Проверка целостности файлов игры (выполняется Python'ом в фоне, итог приходит в onVerifyResult)
+function handleVerifyClick(event) {
+    const gameId = parseInt(event.target.getAttribute('data-game-id'));
+    if (!window.qt_bridge) return;
+    window.qt_bridge.verifyGame(gameId, function(result) {
+        if (result === "SUCCESS") {
+            detailVerifyBtn.disabled = true;
+            detailVerifyBtn.textContent = 'Проверка...';
+        } else {
+            alert("Ошибка проверки: " + result);
+        }
+    });
+}
+
+// ГЛОБАЛЬНАЯ ФУНКЦИЯ: вызывается Python'ом по окончании проверки файлов игры
+window.onVerifyResult = function(gameId, ok, reportText) {
+    if (parseInt(detailVerifyBtn.getAttribute('data-game-id')) === gameId) {
+        detailVerifyBtn.disabled = false;
+        detailVerifyBtn.textContent = 'Проверить файлы';
+        detailVerifyBtn.className = `action-btn ${ok ? 'btn-verify' : 'btn-error'}`;
+    }
+    const game = GAME_BY_ID.get(gameId);
+    console.log(`JavaScript: Проверка файлов ${game ? game.title : gameId}: ${ok ? 'OK' : 'повреждения'}`);
+    if (!ok) {
+        alert(reportText);
+    }
+}
+
+function closeModal() {
+    detailModal.classList.remove('is-visible');
+}
+function handleEscapeKey(event) {
+    if (event.key === "Escape") {
+        closeModal();
+    }
+}
+
+function addViewSwitchListeners() {
+    document.querySelectorAll('.nav-item').forEach(item => {
+        item.removeEventListener('click', handleViewSwitch);
+        item.addEventListener('click', handleViewSwitch);
+    });
+}
+
+function handleViewSwitch(e) {
+    e.preventDefault();
+    const targetView = this.getAttribute('data-view');
+    
+    document.querySelectorAll('.nav-item').forEach(nav => nav.classList.remove('active'));
+    this.classList.add('active');
+    
+    document.querySelectorAll('.view-section').forEach(section => {
+        section.classList.remove('active');
+    });
+    const section = document.getElementById(targetView + '-view');
+    if (section) {
+        section.classList.add('active');
+    }
+    if (targetView === 'catalog') {
+        // Пока вкладка была скрыта, ширина сетки была неизвестна
+        renderGrid({ layoutChanged: true });
+    } else if (targetView === 'installed') {
+        loadDiskUsage();
+    }
 }
\ No newline at end of file
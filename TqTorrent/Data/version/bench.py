@@ -0,0 +1,856 @@
+import os # Стандартная библиотека
+import sys # Стандартная библиотека
+import time # Стандартная библиотека
+import tempfile # Стандартная библиотека
+import json # Стандартная библиотека
+import asyncio # Стандартная библиотека
+import multiprocessing # Стандартная библиотека
+import random # Стандартная библиотека
+import shutil # Стандартная библиотека
+import threading # Стандартная библиотека
+import statistics # Стандартная библиотека
+import subprocess # Стандартная библиотека
+
+from cache_parser import iter_games_from_file
+from catalog_cache import load_or_build
+from process_scan import ProcessSnapshot
+from search_index import SearchIndex
+from metrics import Metrics, MetricsFlusher
+from bench_fixtures import write_steam_fixture, write_mod_fixture, write_game_dirs, serve_directory
+from tqtorrent.steam import SteamLibraryScanner
+from startup_timeline import BENCH_LINE_PREFIX, PHASE_ORDER
+
+# --- НАСТРОЙКИ БЕНЧМАРКА ---
+PARSE_SIZES = [1000, 10000, 100000]
+STARTUP_SIZE = 100000
+SCAN_SIZES = [10, 100, 500, 1000]
+TORRENT_SIZE_MB = 256
+TORRENT_PEERS = [1, 2, 4]
+VERIFY_SIZE_MB = 2048 # Общий объем синтетической игры для проверки файлов
+VERIFY_WORKERS = [1, 2, 4, None] # None - по числу ядер
+SCHEDULER_FILE_MB = 24 # Размер каждой загрузки в проверке планировщика
+SCHEDULER_RATE_MB = 8 # Общий предел скорости, МБ/с
+SCHEDULER_JOB_RATE_MB = 3 # Предел одной загрузки, МБ/с
+SEARCH_SIZE = 100000
+SEARCH_REPEATS = 50
+COLD_START_SIZE = 100000 # Игр в каталоге для замера запуска приложения
+COLD_START_RUNS = 3 # Запусков на режим (берется медиана)
+COLD_START_TIMEOUT = 120
+METRICS_CALLS = 200000 # Замеров для оценки накладных расходов metrics.timer
+FLUSH_SPANS = 10000 # Замеров в одном окне записи журнала
+STEAM_APPS = 6000 # appmanifest в синтетических библиотеках Steam
+STEAM_LIBRARIES = 4
+DELTA_TREE_MB = 64 # Объем синтетического дерева Data/version для дельта-обновления
+DELTA_EDITS = 20 # Правок (вставка/замена/удаление байт) между двумя версиями
+SAVES_LARGE_MB = 16 # Размер каждого из крупных файлов сохранений
+SAVES_SMALL_FILES = 300 # Мелких файлов сохранений (настройки, профили, слоты)
+MOD_COUNT = 100 # Модов в списке для раскладки
+MOD_FILES = 1000 # Файлов в каждом моде
+LAUNCH_TARGETS = 20000 # Игр в каталоге для проверки путей запуска
+USAGE_GAMES = 20 # Установленных игр для подсчета места
+USAGE_DIRS = 400 # Каталогов в каждой игре
+USAGE_FILES = 25 # Файлов в каждом каталоге
+# --------------------
+
+
+def write_synthetic_cache(path, count):
+    """Генерирует cache.txt с count записями в формате g# = name(...), ..."""
+    statuses = ["УСТАНОВЛЕНО", "НЕ СКАЧЕНО", "ЗАПУЩЕНА", "ОШИБКА"]
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(1, count + 1):
+            f.write(
+                f'g{i} = name(Игра {i}), '
+                f'priwie(https://via.placeholder.com/300x180?text=G{i}), '
+                f'opisan(Описание игры номер {i} (издание {i % 7})), '
+                f'url_ins(ссылка_на_скачивание_{i}), '
+                f'dowanloadin(game{i}.exe), '
+                f'starting("C:\\Program Files (x86)\\Games\\Игра {i}\\game{i}.exe"), '
+                f'status({statuses[i % len(statuses)]})\n\n'
+            )
+
+
+def bench_parse(sizes=PARSE_SIZES):
+    """Замеряет время разбора cache.txt и показывает рост на одну запись."""
+    print("\n[PARSE] Разбор cache.txt (cache_parser.iter_games_from_file)")
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in sizes:
+            path = os.path.join(tmp, f"cache_{count}.txt")
+            write_synthetic_cache(path, count)
+
+            start = time.perf_counter()
+            parsed = sum(1 for _ in iter_games_from_file(path))
+            elapsed = time.perf_counter() - start
+
+            if parsed != count:
+                print(f"ОШИБКА: разобрано {parsed} записей вместо {count}")
+            per_entry_us = elapsed / count * 1e6
+            results.append((count, elapsed, per_entry_us))
+            print(f"  {count:>8} игр: {elapsed * 1000:9.1f} мс  ({per_entry_us:.2f} мкс/игра)")
+
+    # Линейный рост: время на одну запись не должно заметно увеличиваться
+    base = results[0][2]
+    for count, _, per_entry_us in results[1:]:
+        print(f"  x{count // results[0][0]:<6} записей -> x{per_entry_us / base:.2f} время на запись")
+    return results
+
+
+def write_synthetic_data_json(path, count):
+    """Генерирует data.json с каждой третьей игрой в installed_game_ids."""
+    data = {"CNF_DATA": {"progr_name": "TqTorrent", "steam_nickname": "bench",
+                         "installed_game_ids": list(range(1, count + 1, 3)), "running_game_ids": []}}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+def bench_startup(count=STARTUP_SIZE):
+    """Сравнивает загрузку каталога при старте без снимка и со снимком catalog_cache."""
+    print(f"\n[STARTUP] Загрузка каталога ({count} игр) с/без снимка catalog_cache")
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, "cache.txt")
+        data_path = os.path.join(tmp, "data.json")
+        snapshot_path = os.path.join(tmp, "catalog_cache.bin")
+        write_synthetic_cache(cache_path, count)
+        write_synthetic_data_json(data_path, count)
+
+        def build():
+            with open(data_path, 'r', encoding='utf-8') as f:
+                cnf_data = json.load(f)["CNF_DATA"]
+            return {"CNF_DATA": cnf_data, "GAME_DATA": list(iter_games_from_file(cache_path))}
+
+        start = time.perf_counter()
+        build()
+        no_cache = time.perf_counter() - start
+
+        start = time.perf_counter()
+        load_or_build(snapshot_path, [data_path, cache_path], build)
+        first_run = time.perf_counter() - start
+
+        start = time.perf_counter()
+        data = load_or_build(snapshot_path, [data_path, cache_path], build)
+        warm = time.perf_counter() - start
+
+        if len(data["GAME_DATA"]) != count:
+            print("ОШИБКА: снимок вернул неполный каталог")
+        print(f"  без снимка:             {no_cache * 1000:9.1f} мс")
+        print(f"  первый запуск (+запись): {first_run * 1000:9.1f} мс")
+        print(f"  со снимком:             {warm * 1000:9.1f} мс  (x{no_cache / warm:.1f} быстрее)")
+    return no_cache, warm
+
+
+def bench_scan(sizes=SCAN_SIZES, repeats=5):
+    """Скан запущенных игр: один снимок процессов + поиск по словарю на игру."""
+    print("\n[SCAN] Проверка запущенных игр (process_scan.ProcessSnapshot)")
+    results = []
+    for count in sizes:
+        games = [{"id": i, "process_name": f"game{i}.exe"} for i in range(1, count + 1)]
+        games[-1]["process_name"] = "python"
+        installed_ids = {g["id"] for g in games}
+
+        best = None
+        for _ in range(repeats):
+            start = time.perf_counter()
+            running = ProcessSnapshot.take().running_game_ids(games, installed_ids)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        results.append((count, best))
+        print(f"  {count:>6} игр: {best * 1000:7.2f} мс  (найдено запущенных: {len(running)})")
+    return results
+
+
+def _seed_process(torrent_bytes, root_dir, ports):
+    """Отдельный процесс-сид: слушает порт и раздает до завершения родителя."""
+    from torrent import TorrentSession, parse_metainfo
+
+    async def serve():
+        session = TorrentSession(parse_metainfo(torrent_bytes), root_dir)
+        ports.put(await session.listen())
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+def bench_torrent(size_mb=TORRENT_SIZE_MB, peer_counts=TORRENT_PEERS):
+    """Пропускная способность загрузки торрента с нескольких локальных сидов (отдельные процессы)."""
+    from torrent import TorrentSession, parse_metainfo, build_metainfo
+
+    print(f"\n[TORRENT] Загрузка {size_mb} МБ с локальных сидов (torrent.TorrentSession)")
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        source_dir = os.path.join(tmp, "seed")
+        payload_dir = os.path.join(source_dir, "payload")
+        os.makedirs(payload_dir)
+        with open(os.path.join(payload_dir, "data.bin"), 'wb') as f:
+            for _ in range(size_mb):
+                f.write(os.urandom(1024 * 1024))
+        torrent_bytes = build_metainfo(payload_dir)
+
+        for peers in peer_counts:
+            ports = multiprocessing.Queue()
+            seeds = [multiprocessing.Process(target=_seed_process, args=(torrent_bytes, source_dir, ports), daemon=True)
+                     for _ in range(peers)]
+            for seed in seeds:
+                seed.start()
+            addresses = [("127.0.0.1", ports.get(timeout=120)) for _ in seeds]
+
+            dest_dir = os.path.join(tmp, f"leech_{peers}")
+            session = TorrentSession(parse_metainfo(torrent_bytes), dest_dir)
+
+            async def download():
+                try:
+                    await session.download(addresses, use_tracker=False)
+                finally:
+                    await session.close()
+
+            start = time.perf_counter()
+            asyncio.run(download())
+            elapsed = time.perf_counter() - start
+            for seed in seeds:
+                seed.terminate()
+                seed.join()
+
+            rate = size_mb / elapsed
+            results.append((peers, rate))
+            print(f"  {peers} сид(ов): {elapsed:6.2f} с  ({rate:7.1f} МБ/с)")
+    return results
+
+
+def bench_verify(size_mb=VERIFY_SIZE_MB, worker_counts=VERIFY_WORKERS):
+    """Проверка файлов игры (verify_files): холодная полная сверка при разном числе
+    процессов и повторная сверка, в которой неизмененные файлы пропускаются по size+mtime."""
+    import verify_files
+
+    print(f"\n[VERIFY] Проверка {size_mb} МБ файлов игры (verify_files)")
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        # Пара больших архивов и россыпь мелких файлов, как в типичной установленной игре
+        big_mb = size_mb // 4
+        for i in range(2):
+            with open(os.path.join(tmp, f"data{i}.pak"), 'wb') as f:
+                for _ in range(big_mb):
+                    f.write(os.urandom(1024 * 1024))
+        small_dir = os.path.join(tmp, "assets")
+        os.makedirs(small_dir)
+        for i in range((size_mb - 2 * big_mb) * 4):
+            with open(os.path.join(small_dir, f"asset_{i}.bin"), 'wb') as f:
+                f.write(os.urandom(256 * 1024))
+
+        start = time.perf_counter()
+        manifest = verify_files.build_manifest(tmp)
+        elapsed = time.perf_counter() - start
+        print(f"  манифест: {len(manifest['files'])} файлов за {elapsed:6.2f} с ({size_mb / elapsed:7.1f} МБ/с)")
+
+        for workers in worker_counts:
+            start = time.perf_counter()
+            report, state = verify_files.verify_tree(tmp, manifest, workers=workers)
+            elapsed = time.perf_counter() - start
+            results.append((workers, elapsed))
+            label = workers or os.cpu_count()
+            print(f"  полная проверка, {label} процесс(ов): {elapsed:6.2f} с ({size_mb / elapsed:7.1f} МБ/с)")
+
+        start = time.perf_counter()
+        report, _ = verify_files.verify_tree(tmp, manifest, state)
+        elapsed = time.perf_counter() - start
+        print(f"  повторная проверка: {elapsed * 1000:8.1f} мс (пропущено {report['skipped']} файлов)")
+    return results
+
+
+def _run_scheduled(scheduler_args, urls, dest_dir, job_rates=None):
+    """Прогоняет загрузки через DownloadScheduler до конца.
+    Возвращает (время, байт всего, максимум одновременно активных)."""
+    from download_scheduler import DownloadScheduler, DONE
+    from downloader import SegmentedDownload
+
+    finished = threading.Semaphore(0)
+    peak = [0]
+
+    def on_status(status):
+        peak[0] = max(peak[0], sum(1 for job in status if job["state"] == "active"))
+
+    def on_finished(game_id, state, result):
+        if state != DONE:
+            print(f"  ОШИБКА: загрузка {game_id} завершилась состоянием {state}: {result}")
+        finished.release()
+
+    scheduler = DownloadScheduler(on_status=on_status, on_finished=on_finished, **scheduler_args)
+    start = time.perf_counter()
+    for game_id, url in enumerate(urls):
+        dest = os.path.join(dest_dir, f"game_{game_id}.bin")
+        factory = (lambda url, dest: lambda on_progress, limiter:
+                   SegmentedDownload(url, dest, on_progress=on_progress, throttle=limiter))(url, dest)
+        rate = job_rates[game_id] if job_rates else None
+        scheduler.enqueue(game_id, f"Игра {game_id}", factory, rate_limit=rate)
+    for _ in urls:
+        finished.acquire()
+    elapsed = time.perf_counter() - start
+    total = sum(os.path.getsize(os.path.join(dest_dir, f"game_{game_id}.bin")) for game_id in range(len(urls)))
+    return elapsed, total, peak[0]
+
+
+def bench_scheduler(file_mb=SCHEDULER_FILE_MB, rate_mb=SCHEDULER_RATE_MB, job_rate_mb=SCHEDULER_JOB_RATE_MB):
+    """Планировщик загрузок с локальным HTTP-сервером: соблюдаются ли общий предел
+    скорости, предел одной загрузки и число одновременных загрузок."""
+    print(f"\n[SCHEDULER] Пределы скорости DownloadScheduler (локальный HTTP, файлы по {file_mb} МБ)")
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        serve_dir = os.path.join(tmp, "mirror")
+        os.makedirs(serve_dir)
+        for i in range(3):
+            with open(os.path.join(serve_dir, f"game_{i}.bin"), 'wb') as f:
+                f.write(os.urandom(file_mb * 1024 * 1024))
+        server = serve_directory(serve_dir)
+        base_url = server.base_url
+        urls = [f"{base_url}/game_{i}.bin" for i in range(3)]
+
+        try:
+            scenarios = [
+                ("общий предел, 3 загрузки, по 2 одновременно",
+                 {"max_active": 2, "global_rate": rate_mb * 1048576}, urls, None, rate_mb, 2),
+                ("предел одной загрузки",
+                 {"max_active": 1}, urls[:1], [job_rate_mb * 1048576], job_rate_mb, 1),
+            ]
+            for index, (label, args, scenario_urls, job_rates, cap_mb, cap_active) in enumerate(scenarios):
+                dest_dir = os.path.join(tmp, f"dest_{index}")
+                elapsed, total, peak = _run_scheduled(args, scenario_urls, dest_dir, job_rates)
+                rate = total / 1048576 / elapsed
+                deviation = (rate - cap_mb) * 100 / cap_mb
+                results.append((label, rate, deviation, peak))
+                print(f"  {label}: {rate:6.2f} МБ/с при пределе {cap_mb} МБ/с ({deviation:+.1f}%), "
+                      f"одновременно не больше {peak} (предел {cap_active})")
+        finally:
+            server.shutdown()
+    return results
+
+
+def bench_search(count=SEARCH_SIZE, repeats=SEARCH_REPEATS):
+    """Поисковый индекс: построение, обновление дельтой и задержка запросов разных видов."""
+    print(f"\n[SEARCH] Поиск по каталогу (search_index.SearchIndex, {count} игр)")
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, "cache.txt")
+        write_synthetic_cache(cache_path, count)
+        games = list(iter_games_from_file(cache_path))
+
+    start = time.perf_counter()
+    index = SearchIndex(games)
+    build = time.perf_counter() - start
+    print(f"  построение:        {build * 1000:9.1f} мс  ({len(index.tokens)} слов в словаре)")
+
+    changed = [dict(game, title=game["title"] + " Remastered") for game in games[:100]]
+    delta = {"added": [], "changed": changed, "removed": [game["id"] for game in games[-100:]]}
+    start = time.perf_counter()
+    index.apply_delta(delta)
+    print(f"  дельта (200 игр):  {(time.perf_counter() - start) * 1000:9.1f} мс")
+
+    queries = [
+        ("точное слово", "remastered", None),
+        ("начало слова", "remas", None),
+        ("опечатка", "remastred", None),
+        ("два слова", f"игра {count // 2}", None),
+        ("частое слово", "описание", None),
+        ("фильтр статуса", "издание", {"status": "установлено"}),
+        ("пустой + фильтр", "", {"status": "ошибка"}),
+    ]
+    results = []
+    for label, query, filters in queries:
+        start = time.perf_counter()
+        for _ in range(repeats):
+            ids, total = index.search(query, filters)
+        elapsed = (time.perf_counter() - start) / repeats
+        results.append((label, elapsed, total))
+        print(f"  {label:<16} {elapsed * 1000:9.2f} мс  (найдено {total})")
+    return build, results
+
+
+def bench_metrics(calls=METRICS_CALLS):
+    """Накладные расходы замеров на горячем пути: пустой блок с metrics.timer,
+    счетчик и запись окна в JSONL."""
+    print(f"\n[METRICS] Накладные расходы metrics ({calls} замеров)")
+    enabled = Metrics()
+    disabled = Metrics(enabled=False)
+    results = {}
+    for label, metrics in (("timer (вкл.)", enabled), ("timer (выкл.)", disabled)):
+        start = time.perf_counter()
+        for _ in range(calls):
+            with metrics.timer("bench.empty"):
+                pass
+        results[label] = (time.perf_counter() - start) / calls
+        metrics.drain()
+    start = time.perf_counter()
+    for _ in range(calls):
+        enabled.count("bench.counter")
+    results["count"] = (time.perf_counter() - start) / calls
+    for label, elapsed in results.items():
+        print(f"  {label:<14} {elapsed * 1e6:7.2f} мкс на вызов")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        flusher = MetricsFlusher(tmp, "bench", metrics=enabled)
+        for i in range(FLUSH_SPANS):
+            enabled.observe("bench.span", i % 100, games=i)
+        start = time.perf_counter()
+        flusher.flush()
+        elapsed = time.perf_counter() - start
+        size = os.path.getsize(flusher.path)
+    print(f"  запись окна:   {elapsed * 1000:7.1f} мс  ({FLUSH_SPANS} замеров, {size / 1024:.0f} КБ)")
+    return results
+
+
+def bench_steam(apps=STEAM_APPS, libraries=STEAM_LIBRARIES):
+    """Поиск игр в библиотеках Steam: первый обход, повторный без изменений (кэш mtime
+    каталогов steamapps) и повторный после изменения одной библиотеки."""
+    print(f"\n[STEAM] Библиотеки Steam ({apps} appmanifest в {libraries} библиотеках)")
+    with tempfile.TemporaryDirectory() as tmp:
+        steam_root = os.path.join(tmp, "Steam")
+        write_steam_fixture(steam_root, [(str(10 + i), f"Игра {i}", f"Game {i}") for i in range(apps)], libraries)
+        cache_path = os.path.join(tmp, "steam_libraries.bin")
+
+        results = {}
+        start = time.perf_counter()
+        found = SteamLibraryScanner(cache_path).scan([steam_root])
+        results["первый обход"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        SteamLibraryScanner(cache_path).scan([steam_root]) # новый процесс: кэш из файла
+        results["без изменений"] = time.perf_counter() - start
+
+        with open(os.path.join(steam_root, "steamapps", "appmanifest_1.acf"), 'w', encoding='utf-8') as f:
+            f.write('"AppState"\n{\n\t"appid"\t\t"1"\n\t"StateFlags"\t\t"4"\n\t"installdir"\t\t"New"\n}\n')
+        start = time.perf_counter()
+        rescan = SteamLibraryScanner(cache_path).scan([steam_root])
+        results["1 библиотека"] = time.perf_counter() - start
+
+    if len(rescan["apps"]) != len(found["apps"]) + 1 or len(rescan["rescanned"]) != 1:
+        print("ОШИБКА: повторный обход не увидел новый appmanifest")
+    for label, elapsed in results.items():
+        print(f"  {label:<16} {elapsed * 1000:9.1f} мс")
+    print(f"  установлено игр: {len(found['apps'])}; без изменений x{results['первый обход'] / results['без изменений']:.0f} быстрее")
+    return results
+
+
+def _write_delta_versions(v1, v2, size_mb, edits):
+    """Две версии дерева: исходники каталога, пара архивов и россыпь мелких файлов в v1;
+    в v2 - точечные правки внутри файлов, удаленный и новый файл."""
+    import delta_update
+
+    rng = random.Random(size_mb)
+    source_dir = os.path.dirname(os.path.abspath(__file__))
+    os.makedirs(os.path.join(v1, "assets"))
+    for rel_path in delta_update.iter_tree(source_dir):
+        dest = os.path.join(v1, "src", rel_path)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        with open(os.path.join(source_dir, rel_path), 'rb') as f, open(dest, 'wb') as out:
+            out.write(f.read())
+    for i in range(2):
+        with open(os.path.join(v1, f"data{i}.pak"), 'wb') as f:
+            f.write(rng.randbytes(size_mb // 4 << 20))
+    for i in range(size_mb * 2):
+        with open(os.path.join(v1, "assets", f"asset_{i}.bin"), 'wb') as f:
+            f.write(rng.randbytes(256 * 1024))
+
+    shutil.copytree(v1, v2)
+    files = sorted(delta_update.iter_tree(v2))
+    for _ in range(edits):
+        path = os.path.join(v2, rng.choice(files))
+        with open(path, 'rb') as f:
+            data = bytearray(f.read())
+        at = rng.randrange(len(data) + 1)
+        kind = rng.random()
+        if kind < 0.4:
+            data[at:at] = rng.randbytes(rng.randint(1, 300)) # вставка сдвигает весь хвост файла
+        elif kind < 0.8:
+            data[at:at + 100] = rng.randbytes(100)
+        else:
+            del data[at:at + rng.randint(1, 300)]
+        with open(path, 'wb') as f:
+            f.write(data)
+    os.remove(os.path.join(v2, "assets", "asset_0.bin"))
+    with open(os.path.join(v2, "assets", "asset_new.bin"), 'wb') as f:
+        f.write(rng.randbytes(256 * 1024))
+
+
+def bench_delta_update(size_mb=DELTA_TREE_MB, edits=DELTA_EDITS):
+    """Дельта-обновление дерева (delta_update): нарезка на чанки с холодного и теплого кэша
+    size+mtime и обновление v1 -> v2 из каталога и по HTTP: время и объем переданного
+    против полного размера."""
+    import delta_update
+
+    print(f"\n[DELTA UPDATE] Обновление дерева {size_mb} МБ ({edits} правок между версиями)")
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        v1, v2, published = (os.path.join(tmp, name) for name in ("v1", "v2", "published"))
+        _write_delta_versions(v1, v2, size_mb, edits)
+        delta_update.publish(v1, published, "v1")
+
+        start = time.perf_counter()
+        stats = delta_update.publish(v2, published, "v2")
+        elapsed = time.perf_counter() - start
+        print(f"  публикация v2: {elapsed:6.2f} с ({stats['bytes'] / 1048576 / elapsed:7.1f} МБ/с), "
+              f"новых чанков {stats['new_chunks']} из {stats['chunks']}")
+
+        for workers in (1, None):
+            start = time.perf_counter()
+            delta_update.build_manifest(v1, workers=workers)
+            elapsed = time.perf_counter() - start
+            label = workers or os.cpu_count()
+            results[f"нарезка x{label}"] = elapsed
+            print(f"  нарезка, {label} процесс(ов): {elapsed:6.2f} с ({size_mb / elapsed:7.1f} МБ/с)")
+
+        server = serve_directory(published)
+        try:
+            sources = (("каталог", delta_update.DirectorySource(published)),
+                       ("HTTP", delta_update.HttpSource(server.base_url)))
+            for label, source in sources:
+                target = os.path.join(tmp, f"installed_{label}")
+                shutil.copytree(v1, target)
+                start = time.perf_counter()
+                report = delta_update.update_tree(target, source)
+                elapsed = time.perf_counter() - start
+                results[label] = elapsed
+                share = report["fetched_bytes"] * 100 / report["total_bytes"]
+                print(f"  обновление ({label}, холодный кэш): {elapsed:6.2f} с; передано "
+                      f"{report['fetched_bytes'] / 1024:.0f} КБ из {report['total_bytes'] / 1048576:.1f} МБ "
+                      f"({share:.2f}%), изменено файлов {report['changed_files']}")
+
+                # Повторная проверка: дерево уже v2, нарезка берется из кэша size+mtime
+                start = time.perf_counter()
+                delta_update.update_tree(target, source)
+                results[f"{label} без изменений"] = time.perf_counter() - start
+                print(f"  повторно без изменений: {results[f'{label} без изменений'] * 1000:8.1f} мс")
+
+                if delta_update.build_manifest(target)[0]["files"] != delta_update.build_manifest(v2)[0]["files"]:
+                    print(f"ОШИБКА: дерево после обновления ({label}) не совпало с v2")
+        finally:
+            server.shutdown()
+    return results
+
+
+def _write_saves(root, large_mb, small_files, rng):
+    """Каталог сохранений: пара крупных слотов (полусжимаемые данные) и россыпь мелких файлов."""
+    for i in range(2):
+        path = os.path.join(root, "slots", f"slot{i}.sav")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            for block in range(large_mb * 8):
+                # 128 КБ: половина случайных байт, половина записей сущностей (id, нули, hp)
+                records = b"".join((block * 4096 + n).to_bytes(4, "little") + bytes(10) + b"hp\x64\x00"
+                                   for n in range(3277))
+                f.write(rng.randbytes(64 * 1024) + records[:64 * 1024])
+    for i in range(small_files):
+        path = os.path.join(root, f"profile{i % 10}", f"settings{i}.ini")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"[game]\nvolume={rng.randint(0, 100)}\nname=Игрок{i}\n" * rng.randint(1, 40))
+
+
+def bench_saves(large_mb=SAVES_LARGE_MB, small_files=SAVES_SMALL_FILES):
+    """Снимки сохранений (tqtorrent.saves): первый снимок, снимок без изменений (size+mtime),
+    снимок после правки одного крупного слота, объем хранилища против копий папки
+    и восстановление одного файла; zlib против lzma."""
+    from tqtorrent.saves import SnapshotStore
+
+    print(f"\n[SAVES] Снимки сохранений (2 слота по {large_mb} МБ + {small_files} мелких файлов)")
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        saves_dir = os.path.join(tmp, "saves")
+        _write_saves(saves_dir, large_mb, small_files, random.Random(large_mb))
+        slot = os.path.join(saves_dir, "slots", "slot0.sav")
+        with open(slot, 'rb') as f:
+            original_slot = f.read()
+        for codec in ("zlib", "lzma"):
+            with open(slot, 'wb') as f:
+                f.write(original_slot)
+            store = SnapshotStore(os.path.join(tmp, f"store_{codec}"), codec)
+            timings = {}
+            start = time.perf_counter()
+            first = store.snapshot("saves", saves_dir)
+            timings["первый"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            store.snapshot("saves", saves_dir)
+            timings["без изменений"] = time.perf_counter() - start
+
+            data = bytearray(original_slot)
+            data[len(data) // 3:len(data) // 3] = b"quicksave" # вставка сдвигает хвост файла
+            with open(slot, 'wb') as f:
+                f.write(data)
+            start = time.perf_counter()
+            edited = store.snapshot("saves", saves_dir)
+            timings["правка слота"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            store.restore_file("saves", edited["id"], "profile3/settings3.ini", os.path.join(tmp, "restored.ini"))
+            timings["восстановление файла"] = time.perf_counter() - start
+
+            usage = store.usage()
+            copies = first["bytes"] + edited["bytes"]
+            results[codec] = dict(timings, store_bytes=usage["bytes"])
+            print(f"  {codec}: хранилище {usage['bytes'] / 1048576:.1f} МБ против {copies / 1048576:.1f} МБ "
+                  f"двух копий папки (x{copies / usage['bytes']:.1f}); после правки записано {edited['written'] / 1024:.0f} КБ")
+            for label, elapsed in timings.items():
+                print(f"    {label:<22} {elapsed * 1000:9.1f} мс")
+    return results
+
+
+def bench_mods(mod_count=MOD_COUNT, files_per_mod=MOD_FILES):
+    """Раскладка модов (tqtorrent.mods): полная раскладка жесткими ссылками и копиями,
+    повторная без изменений, выключение и включение одного мода, смена порядка загрузки."""
+    from tqtorrent.mods import ModManager
+
+    print(f"\n[MODS] Раскладка {mod_count} модов по {files_per_mod} файлов")
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        mods_root = os.path.join(tmp, "mods")
+        names = write_mod_fixture(os.path.join(mods_root, "1"), os.path.join(tmp, "game_source"), mod_count, files_per_mod)
+        for method in ("hardlink", "copy"):
+            game_dir = os.path.join(tmp, f"game_{method}")
+            shutil.copytree(os.path.join(tmp, "game_source"), game_dir)
+            for name in ("tq_mods.json", "tq_deployed.json", "tq_mods_index.bin"):
+                path = os.path.join(mods_root, "1", name)
+                if os.path.exists(path):
+                    os.remove(path)
+            manager = ModManager(mods_root, 1, game_dir, (method,))
+            manager.state["enabled"] = list(names)
+            manager.save_state()
+
+            steps = {}
+            start = time.perf_counter()
+            report = manager.deploy()
+            steps["полная раскладка"] = time.perf_counter() - start
+            placed = report[method]
+
+            start = time.perf_counter()
+            ModManager(mods_root, 1, game_dir, (method,)).deploy() # новый процесс: индекс из кэша
+            steps["без изменений"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            manager.set_enabled(names[mod_count // 2], False)
+            off = manager.deploy()
+            steps["выключить 1 мод"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            manager.set_enabled(names[mod_count // 2], True)
+            manager.deploy()
+            steps["включить 1 мод"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            manager.set_order(list(reversed(names)))
+            reordered = manager.deploy()
+            steps["обратный порядок"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            undeploy = manager.undeploy()
+            steps["убрать все"] = time.perf_counter() - start
+
+            results[method] = steps
+            print(f"  {method}: файлов {placed}, конфликтов {report['conflicts']}, заменено файлов игры {report['backed_up']}; "
+                  f"выключение тронуло {off['removed'] + off[method]}, смена порядка {reordered[method]}, "
+                  f"возвращено файлов игры {undeploy['restored']}")
+            for label, elapsed in steps.items():
+                print(f"    {label:<18} {elapsed * 1000:9.1f} мс")
+    return results
+
+
+def _write_launch_targets(root, steam_root, count):
+    """Каталог со смешанными путями запуска: exe (каждый пятый отсутствует), steam://rungameid/N
+    и ярлыки .url на steam:// - на игры, установленные в синтетическую библиотеку Steam."""
+    steam_count = count // 5
+    apps = [(str(100 + i), f"Игра {i}", f"Game {i}") for i in range(steam_count)]
+    write_steam_fixture(steam_root, apps, libraries=2, installed_share=1.0)
+    for appid, _, installdir in apps:
+        for library in (steam_root, os.path.join(os.path.dirname(steam_root), "SteamLibrary1")):
+            if os.path.exists(os.path.join(library, "steamapps", f"appmanifest_{appid}.acf")):
+                exe_dir = os.path.join(library, "steamapps", "common", installdir, "bin", "win64")
+                os.makedirs(exe_dir)
+                for name in ("unins000.exe", f"game{appid}.exe"):
+                    with open(os.path.join(exe_dir, name), 'wb') as f:
+                        f.write(b"MZ")
+    os.makedirs(os.path.join(root, "games"))
+    games = []
+    for i in range(count):
+        kind = i % 5
+        if kind == 0:
+            launch_path = f"steam://rungameid/{apps[(i // 5) % steam_count][0]}"
+        elif kind == 1:
+            launch_path = os.path.join(root, "games", f"steam_{i}.url")
+            with open(launch_path, 'w', encoding='utf-8') as f:
+                f.write(f"[InternetShortcut]\nURL=steam://rungameid/{apps[(i // 5) % steam_count][0]}\nIconIndex=0\n")
+        else:
+            launch_path = os.path.join(root, "games", f"game_{i}.exe")
+            if kind != 4:
+                with open(launch_path, 'wb') as f:
+                    f.write(b"MZ")
+        games.append({"id": i + 1, "launch_path": f'"{launch_path}"', "process_name": ""})
+    return games
+
+
+def bench_launch_targets(count=LAUNCH_TARGETS):
+    """Проверка путей запуска каталога (tqtorrent.targets): первая проверка в пуле потоков
+    и в одном потоке, повторная с кэшем (новый процесс) и запуск одной игры из кэша."""
+    from tqtorrent.targets import LaunchResolver, broken_targets
+
+    print(f"\n[LAUNCH] Проверка {count} путей запуска (exe, steam://, .url)")
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        steam_root = os.path.join(tmp, "Steam")
+        games = _write_launch_targets(tmp, steam_root, count)
+        cache_path = os.path.join(tmp, "launch_targets.bin")
+        steam_cache = os.path.join(tmp, "steam_libraries.bin")
+
+        start = time.perf_counter()
+        LaunchResolver(None, SteamLibraryScanner(steam_cache), [steam_root], workers=1).resolve_all(games)
+        results["первая, 1 поток"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        checked = LaunchResolver(cache_path, SteamLibraryScanner(steam_cache), [steam_root]).resolve_all(games)
+        results["первая, пул"] = time.perf_counter() - start
+
+        resolver = LaunchResolver(cache_path, SteamLibraryScanner(steam_cache), [steam_root]) # новый процесс
+        start = time.perf_counter()
+        rechecked = resolver.resolve_all(games)
+        results["повторная (кэш)"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        resolver.launch_target(games[1]["launch_path"])
+        results["запуск .url"] = time.perf_counter() - start
+
+    broken = broken_targets(checked)
+    if len(broken) != count // 5 or broken_targets(rechecked) != broken:
+        print(f"ОШИБКА: недоступных путей {len(broken)}, ожидалось {count // 5}")
+    for label, elapsed in results.items():
+        print(f"  {label:<18} {elapsed * 1000:9.1f} мс")
+    print(f"  недоступных: {len(broken)}; повторная x{results['первая, пул'] / results['повторная (кэш)']:.1f} быстрее первой")
+    return results
+
+
+def bench_disk_usage(games=USAGE_GAMES, dirs_per_game=USAGE_DIRS, files_per_dir=USAGE_FILES):
+    """Место, занятое играми (tqtorrent.usage): os.walk для сравнения, первый подсчет в одном
+    потоке и в пуле, повторный без изменений (кэш по mtime каталогов, новый процесс)
+    и повторный после изменения одного каталога."""
+    from tqtorrent.usage import DiskUsage
+
+    print(f"\n[USAGE] Место на диске: {games} игр по {dirs_per_game} каталогов и {dirs_per_game * files_per_dir} файлов")
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        exe_paths = write_game_dirs(os.path.join(tmp, "Games"), games, dirs_per_game, files_per_dir)
+        catalog = [{"id": i + 1, "launch_path": f'"{path}"'} for i, path in enumerate(exe_paths)]
+        cache_path = os.path.join(tmp, "disk_usage.bin")
+
+        start = time.perf_counter()
+        walked = 0
+        for path in exe_paths:
+            for directory, _, files in os.walk(os.path.dirname(os.path.dirname(os.path.dirname(path)))):
+                walked += sum(os.path.getsize(os.path.join(directory, name)) for name in files)
+        results["os.walk"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        DiskUsage(None, workers=1).scan_games(catalog)
+        results["первый, 1 поток"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cold = DiskUsage(cache_path).scan_games(catalog)
+        results["первый, пул"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        warm = DiskUsage(cache_path).scan_games(catalog) # новый процесс: кэш из файла
+        results["без изменений"] = time.perf_counter() - start
+
+        changed_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(exe_paths[0]))), "data", "patch")
+        os.makedirs(changed_dir)
+        with open(os.path.join(changed_dir, "patch.bin"), 'wb') as f:
+            f.truncate(1 << 20)
+        start = time.perf_counter()
+        patched = DiskUsage(cache_path).scan_games(catalog)
+        results["1 каталог изменен"] = time.perf_counter() - start
+
+    total = sum(info["bytes"] for info in cold.values())
+    if total != walked or warm != {k: dict(v, scanned_at=warm[k]["scanned_at"]) for k, v in cold.items()} \
+            or patched[1]["bytes"] != cold[1]["bytes"] + (1 << 20):
+        print(f"ОШИБКА: размеры не совпали (os.walk {walked}, DiskUsage {total})")
+    for label, elapsed in results.items():
+        print(f"  {label:<18} {elapsed * 1000:9.1f} мс")
+    print(f"  всего {total / 1073741824:.1f} ГБ; без изменений {results['без изменений'] / results['первый, пул'] * 100:.0f}% "
+          f"от первого подсчета")
+    return results
+
+
+def _run_app_once(config_dir, serial):
+    """Запускает main_app.py на наборе файлов config_dir до первой отрисовки.
+    Возвращает замеры StartupTimeline (dict) или None, если приложение не запустилось."""
+    # Отдельное имя канала: иначе запуск передался бы уже открытому окну каталога
+    env = dict(os.environ, TQ_CONFIG_PATH=config_dir, TQ_STARTUP_BENCH="1", PYTHONIOENCODING="utf-8",
+               TQ_INSTANCE_NAME=f"TqTorrent-bench-{os.getpid()}", TQ_METRICS="0")
+    env.pop("TQ_STARTUP_SERIAL", None)
+    if serial:
+        env["TQ_STARTUP_SERIAL"] = "1"
+    app_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main_app.py")
+    try:
+        completed = subprocess.run([sys.executable, app_path], env=env, capture_output=True,
+                                   encoding="utf-8", errors="replace", timeout=COLD_START_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        print(f"ОШИБКА: main_app.py не отрисовал каталог за {COLD_START_TIMEOUT} с")
+        return None
+    for line in completed.stdout.splitlines():
+        if line.startswith(BENCH_LINE_PREFIX):
+            return json.loads(line[len(BENCH_LINE_PREFIX):])
+    print(f"ОШИБКА: main_app.py завершился без замеров (код {completed.returncode})")
+    if completed.stderr.strip():
+        print("  " + completed.stderr.strip().splitlines()[-1])
+    return None
+
+
+def bench_cold_start(count=COLD_START_SIZE, runs=COLD_START_RUNS):
+    """Время до готовности интерфейса: каталог в фоне параллельно со стартом Chromium
+    против прежней схемы (чтение после loadFinished). Печатает медианы фаз StartupTimeline."""
+    print(f"\n[COLD START] Запуск main_app.py до первой отрисовки ({count} игр, {runs} запуска на режим)")
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        config_dir = os.path.join(tmp, "config")
+        os.makedirs(config_dir)
+        write_synthetic_cache(os.path.join(config_dir, "cache.txt"), count)
+        write_synthetic_data_json(os.path.join(config_dir, "data.json"), count)
+
+        # Первый запуск пишет снимок catalog_cache.bin - дальше оба режима читают его
+        if _run_app_once(config_dir, serial=False) is None:
+            return None
+
+        for label, serial in (("последовательно", True), ("параллельно", False)):
+            timelines = [_run_app_once(config_dir, serial) for _ in range(runs)]
+            timelines = [t for t in timelines if t is not None]
+            if not timelines:
+                return None
+            phases = {}
+            for phase in PHASE_ORDER:
+                spans = [t["phases"][phase] for t in timelines if phase in t["phases"]]
+                if spans:
+                    phases[phase] = (statistics.median(s["start_ms"] for s in spans),
+                                     statistics.median(s["end_ms"] for s in spans))
+            interactive = statistics.median(t["interactive_ms"] for t in timelines)
+            results[label] = interactive
+            print(f"  {label}: интерфейс готов через {interactive:.0f} мс")
+            for phase, (start, end) in phases.items():
+                print(f"    {phase:<13} {start:8.1f} -> {end:8.1f} мс  ({end - start:.1f})")
+
+    serial_ms, parallel_ms = results["последовательно"], results["параллельно"]
+    print(f"  выигрыш: {serial_ms - parallel_ms:.0f} мс (x{serial_ms / parallel_ms:.2f})")
+    return results
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        bench_parse([int(arg) for arg in sys.argv[1:]])
+    else:
+        bench_parse()
+        bench_startup()
+        bench_scan()
+        bench_torrent()
+        bench_verify()
+        bench_scheduler()
+        bench_search()
+        bench_metrics()
+        bench_steam()
+        bench_delta_update()
+        bench_saves()
+        bench_mods()
+        bench_launch_targets()
+        bench_disk_usage()
+        bench_cold_start()
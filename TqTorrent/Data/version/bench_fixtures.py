@@ -0,0 +1,345 @@
+import os # Стандартная библиотека
+import re # Стандартная библиотека
+import sys # Стандартная библиотека
+import json # Стандартная библиотека
+import random # Стандартная библиотека
+import argparse # Стандартная библиотека
+import threading # Стандартная библиотека
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler # Стандартная библиотека
+
+# --- НАСТРОЙКИ НАБОРОВ ---
+FIXTURE_SIZES = [10, 1000, 100000, 1000000] # Размеры каталога для bench_pipeline.py
+FIXTURE_SEED = 2024 # Одинаковый seed - одинаковые файлы на любой машине
+INSTALLED_SHARE = 0.3 # Доля игр со статусом УСТАНОВЛЕНО / ЗАПУЩЕНА
+RUNNING_SHARE = 0.01
+STEAM_SHARE = 0.4 # Доля игр с steam_app_id в config_gm.json
+WRITE_BUFFER = 1 << 20
+FIXTURE_MARKER = "fixture.json" # Параметры набора; пишется последним (набор дописан целиком)
+# --------------------
+
+# Слова для названий и описаний: кириллица вперемешку с латиницей, как в реальном cache.txt
+TITLE_WORDS = ["Хроники", "Сталкер", "Тени", "Империя", "Симулятор", "Легенда", "Война", "Дальнобойщики",
+               "Князь", "Метро", "Ведьмак", "Космос", "Пустошь", "Север", "Ночь", "Гонки",
+               "Empire", "Dark", "Souls", "Truck", "Simulator", "Strike", "Quest", "Online"]
+EDITIONS = ["", "", "", " (издание 2)", " (Remastered)", " (GOTY)", " (с дополнениями (DLC))"]
+DESCRIPTION_WORDS = ["приключение", "открытый", "мир", "сюжет", "кооператив", "выживание", "стратегия",
+                     "шутер", "гонки", "симулятор", "экономика", "строительство", "исследование", "RPG",
+                     "PvP", "головоломки", "атмосферный", "хоррор", "песочница", "Европа"]
+# Статусы cache.txt в разном регистре (парсер приводит к нижнему) и редкие статусы установки
+STATUSES = ["НЕ СКАЧЕНО", "не скачено", "Не скачено", "ОШИБКА", "установка", "установка_регистрация"]
+INSTALLED_STATUSES = ["УСТАНОВЛЕНО", "Установлено", "установлено"]
+USER_NAMES = ["Игрок", "drswa", "Пользователь"]
+
+
+def fixture_dir(root, count):
+    """Каталог конфигурации набора: <root>/<count>/TqTorrent/Data/config
+    (log/ и downloads/ ConfigPaths ложатся рядом, внутри <root>/<count>/TqTorrent)."""
+    return os.path.join(root, str(count), "TqTorrent", "Data", "config")
+
+
+def make_game(rng, game_id):
+    """Одна синтетическая игра со всеми полями cache.txt и config_gm.json."""
+    words = rng.sample(TITLE_WORDS, rng.randint(1, 3))
+    title = f"{' '.join(words)} {game_id}{rng.choice(EDITIONS)}"
+    description = " ".join(rng.choice(DESCRIPTION_WORDS) for _ in range(rng.randint(6, 24))).capitalize() + "."
+
+    roll = rng.random()
+    if roll < RUNNING_SHARE:
+        status = "ЗАПУЩЕНА"
+    elif roll < INSTALLED_SHARE:
+        status = rng.choice(INSTALLED_STATUSES)
+    else:
+        status = rng.choice(STATUSES)
+
+    steam_app_id = str(rng.randint(10, 2999999)) if rng.random() < STEAM_SHARE else None
+    folder = " ".join(words) + f" {game_id}"
+    exe = f"game{game_id}.exe"
+    kind = rng.random()
+    if kind < 0.45:
+        launch_path = f'"C:\\Program Files (x86)\\Steam\\steamapps\\common\\{folder}\\bin\\win_x64\\{exe}"'
+    elif kind < 0.7:
+        launch_path = f'"D:\\Игры\\{folder}\\{exe}"'
+    elif kind < 0.85:
+        launch_path = f"C:\\Games\\Game{game_id}\\{exe}"
+    elif kind < 0.95:
+        launch_path = f'"C:\\Users\\{rng.choice(USER_NAMES)}\\OneDrive\\Рабочий стол\\{folder}.url"'
+    else:
+        launch_path = f"steam://rungameid/{steam_app_id or game_id}"
+
+    return {
+        "id": game_id,
+        "title": title,
+        "description": description,
+        "image": f"https://via.placeholder.com/300x180?text=G{game_id}",
+        "steam_app_id": steam_app_id,
+        "process_name": exe,
+        "launch_path": launch_path,
+        "status": status,
+        # Каждая сотая запись - многострочное описание и поле deisvie вместо status
+        "multiline": game_id % 100 == 0,
+        "deisvie": game_id % 100 == 50
+    }
+
+
+def cache_entry(game):
+    description = game["description"]
+    if game["multiline"]:
+        description = description.replace(" ", "\n", 1)
+    status_field = "deisvie" if game["deisvie"] else "status"
+    return (f"g{game['id']} = name({game['title']}), priwie({game['image']}), opisan({description}), "
+            f"url_ins(https://example.com/download/{game['id']}), dowanloadin({game['process_name']}), "
+            f"starting({game['launch_path']}), {status_field}({game['status']})\n\n")
+
+
+def config_gm_entry(game):
+    """Объект в стиле config_gm.json: ключи без кавычек, JS-строки."""
+    steam_app_id = json.dumps(game["steam_app_id"])
+    return ("    {\n"
+            f"        id: {game['id']},\n"
+            f"        title: {json.dumps(game['title'], ensure_ascii=False)},\n"
+            f"        description: {json.dumps(game['description'], ensure_ascii=False)},\n"
+            f"        image: {json.dumps(game['image'])},\n"
+            f"        steam_app_id: {steam_app_id},\n"
+            f"        launch_path: {json.dumps(game['launch_path'].strip(chr(34)), ensure_ascii=False)}\n"
+            "    }")
+
+
+def generate_fixture(config_dir, count, seed=FIXTURE_SEED):
+    """Пишет cache.txt, config_gm.json, data.json и plus_file.txt на count игр.
+    Файлы пишутся потоково: 1M игр не держится в памяти целиком.
+    Возвращает {"games", "installed", "running", "bytes": {файл: размер}}."""
+    os.makedirs(config_dir, exist_ok=True)
+    marker = os.path.join(config_dir, FIXTURE_MARKER)
+    if os.path.exists(marker):
+        os.remove(marker) # Набор, прерванный на середине, не должен считаться готовым
+    rng = random.Random(seed)
+    installed_ids = []
+    running_ids = []
+    cache_path = os.path.join(config_dir, "cache.txt")
+    config_gm_path = os.path.join(config_dir, "config_gm.json")
+
+    with open(cache_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER) as cache_file, \
+         open(config_gm_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER) as gm_file:
+        gm_file.write("// Синтетический каталог (bench_fixtures.py)\nconst GAME_DATA = [\n")
+        for game_id in range(1, count + 1):
+            game = make_game(rng, game_id)
+            status = game["status"].lower()
+            if status in ("установлено", "запущена"):
+                installed_ids.append(game_id)
+            if status == "запущена":
+                running_ids.append(game_id)
+            cache_file.write(cache_entry(game))
+            gm_file.write(config_gm_entry(game))
+            gm_file.write(",\n" if game_id < count else "\n")
+        gm_file.write("];\n")
+
+    data = {"CNF_DATA": {
+        "progr_name": "TqTorrent",
+        "steam_nickname": "Игрок_bench",
+        "installed_game_ids": installed_ids,
+        "running_game_ids": running_ids,
+        "download_status": ""
+    }}
+    with open(os.path.join(config_dir, "data.json"), 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=4, ensure_ascii=False)
+    with open(os.path.join(config_dir, "plus_file.txt"), 'w', encoding='utf-8') as f:
+        f.write("каталог\n")
+
+    sizes = {name: os.path.getsize(os.path.join(config_dir, name))
+             for name in ("cache.txt", "config_gm.json", "data.json", "plus_file.txt")}
+    info = {"games": count, "installed": len(installed_ids), "running": len(running_ids), "bytes": sizes}
+    with open(marker, 'w', encoding='utf-8') as f:
+        json.dump({"seed": seed, **info}, f, ensure_ascii=False, indent=1)
+    return info
+
+
+def ensure_fixture(root, count, seed=FIXTURE_SEED):
+    """Каталог набора на count игр; генерирует его, если готового набора с этим seed еще нет
+    (наборы на 100k и 1M игр дорого пересоздавать при каждом прогоне)."""
+    config_dir = fixture_dir(root, count)
+    try:
+        with open(os.path.join(config_dir, FIXTURE_MARKER), 'r', encoding='utf-8') as f:
+            if json.load(f).get("seed") == seed:
+                return config_dir
+    except (OSError, ValueError):
+        pass
+    generate_fixture(config_dir, count, seed)
+    return config_dir
+
+
+def write_steam_fixture(steam_root, apps, libraries=3, installed_share=0.9, seed=FIXTURE_SEED):
+    """Дерево Steam для проверок tqtorrent.steam: steam_root/steamapps/libraryfolders.vdf
+    и библиотеки steam_root/../SteamLibrary<N>, между которыми поровну раскладываются
+    appmanifest_<appid>.acf. apps - [(appid, name, installdir)]. Доля installed_share
+    полностью установлена (StateFlags 4), остальные ждут обновления (StateFlags 6) или
+    не докачаны (StateFlags 1026). Возвращает список корней библиотек."""
+    rng = random.Random(seed)
+    parent = os.path.dirname(os.path.abspath(steam_root))
+    roots = [steam_root] + [os.path.join(parent, f"SteamLibrary{n}") for n in range(1, libraries)]
+    for root in roots:
+        os.makedirs(os.path.join(root, "steamapps", "common"), exist_ok=True)
+
+    folders = "".join(
+        f'\t"{n}"\n\t{{\n\t\t"path"\t\t"{root.replace(chr(92), chr(92) * 2)}"\n\t\t"label"\t\t""\n\t}}\n'
+        for n, root in enumerate(roots)
+    )
+    with open(os.path.join(steam_root, "steamapps", "libraryfolders.vdf"), 'w', encoding='utf-8') as f:
+        f.write(f'"libraryfolders"\n{{\n\t"contentstatsid"\t\t"-{rng.randint(1, 1 << 62)}"\n{folders}}}\n')
+
+    for index, (appid, name, installdir) in enumerate(apps):
+        roll = rng.random()
+        state_flags = 4 if roll < installed_share else rng.choice([6, 1026])
+        steamapps = os.path.join(roots[index % len(roots)], "steamapps")
+        with open(os.path.join(steamapps, f"appmanifest_{appid}.acf"), 'w', encoding='utf-8') as f:
+            f.write(
+                '"AppState"\n{\n'
+                f'\t"appid"\t\t"{appid}"\n'
+                '\t"Universe"\t\t"1"\n'
+                f'\t"name"\t\t"{name}"\n'
+                f'\t"StateFlags"\t\t"{state_flags}"\n'
+                f'\t"installdir"\t\t"{installdir}"\n'
+                f'\t"LastUpdated"\t\t"{1700000000 + index}"\n'
+                f'\t"SizeOnDisk"\t\t"{rng.randint(1, 80) << 28}"\n'
+                '\t"InstalledDepots"\n\t{\n'
+                f'\t\t"{int(appid) + 1}"\n\t\t{{\n\t\t\t"manifest"\t\t"{rng.randint(1, 1 << 62)}"\n\t\t}}\n'
+                '\t}\n}\n'
+            )
+    return roots
+
+
+def write_mod_fixture(mods_dir, game_dir, mods, files_per_mod, overlap=0.2, file_size=4096, seed=FIXTURE_SEED):
+    """Моды для проверок tqtorrent.mods: mods_dir/mod_NNN/... и каталог игры game_dir.
+    Доля overlap файлов каждого мода - общие пути (textures/shared_N.dds), за которые моды
+    конфликтуют; часть из них есть и в самой игре (будут перенесены в .tq_backup).
+    Остальные файлы уникальны. Возвращает список имен модов."""
+    rng = random.Random(seed)
+    shared = max(1, int(files_per_mod * overlap))
+    payload = rng.randbytes(file_size)
+    for n in range(shared * 2):
+        path = os.path.join(game_dir, "textures", f"shared_{n}.dds")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if n % 4 == 0:
+            with open(path, 'wb') as f:
+                f.write(b"original" + payload[8:])
+    os.makedirs(game_dir, exist_ok=True)
+    names = []
+    for m in range(mods):
+        name = f"mod_{m:03d}"
+        names.append(name)
+        rel_paths = [f"textures/shared_{n}.dds" for n in rng.sample(range(shared * 2), shared)]
+        rel_paths += [f"{name}/data/{n // 100}/file_{n}.bin" for n in range(files_per_mod - shared)]
+        for rel_path in rel_paths:
+            path = os.path.join(mods_dir, name, *rel_path.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(name.encode() + payload[len(name):])
+    return names
+
+
+
+def write_game_dirs(root, games, dirs_per_game, files_per_dir, seed=FIXTURE_SEED):
+    """Каталоги установленных игр для проверок tqtorrent.usage: root/Game N/bin/win64/gameN.exe
+    и дерево data/<a>/<b> из dirs_per_game каталогов по files_per_dir файлов. Файлы пустые,
+    но с размером (truncate): место на диске не тратится, а st_size как у настоящих.
+    Возвращает список путей exe (как в starting(...))."""
+    rng = random.Random(seed)
+    fanout = max(1, int(dirs_per_game ** 0.5))
+    exe_paths = []
+    for g in range(games):
+        game_dir = os.path.join(root, f"Game {g}")
+        exe_dir = os.path.join(game_dir, "bin", "win64")
+        os.makedirs(exe_dir)
+        exe_path = os.path.join(exe_dir, f"game{g}.exe")
+        with open(exe_path, 'wb') as f:
+            f.truncate(rng.randint(1, 64) << 20)
+        exe_paths.append(exe_path)
+        for d in range(dirs_per_game):
+            directory = os.path.join(game_dir, "data", f"pak{d // fanout:03d}", f"dir{d % fanout:03d}")
+            os.makedirs(directory, exist_ok=True)
+            for n in range(files_per_dir):
+                with open(os.path.join(directory, f"asset_{n}.bin"), 'wb') as f:
+                    f.truncate(rng.randint(1, 1 << 24))
+    return exe_paths
+
+
+class RangeHandler(SimpleHTTPRequestHandler):
+    """Локальное зеркало с поддержкой Range (заменитель url_ins(...)) для bench.py и тестов загрузчика.
+    Запросы записываются в server.requests [(имя файла, заголовок Range)], заголовки
+    If-Range - в server.if_ranges [(имя файла, If-Range)]; файлы из server.broken
+    обрываются на середине ответа. ETag файла - размер и mtime_ns: замена файла
+    меняет ETag, и If-Range со старым значением получает файл целиком (200)."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return
+        st = os.stat(path)
+        size = st.st_size
+        etag = f'"{size:x}-{st.st_mtime_ns:x}"'
+        last_modified = self.date_time_string(int(st.st_mtime))
+        start, end = 0, size - 1
+        header = self.headers.get("Range", "")
+        condition = self.headers.get("If-Range")
+        match = re.match(r"bytes=(\d+)-(\d*)", header)
+        if match and condition is not None and condition not in (etag, last_modified):
+            match = None # Версия изменилась: Range не применяется
+        if match:
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else size - 1
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        self.end_headers()
+        name = os.path.basename(path)
+        with self.server.log_lock:
+            self.server.requests.append((name, header))
+            if condition is not None:
+                self.server.if_ranges.append((name, condition))
+        left = end - start + 1
+        if name in self.server.broken and left > 1:
+            left //= 2
+        with open(path, 'rb') as f:
+            f.seek(start)
+            while left > 0:
+                data = f.read(min(65536, left))
+                try:
+                    self.wfile.write(data)
+                except OSError:
+                    return
+                left -= len(data)
+
+
+def serve_directory(directory, broken=()):
+    """Запускает RangeHandler на 127.0.0.1 в фоновом потоке; server.base_url - адрес каталога.
+    Остановка - server.shutdown() и server.server_close()."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), lambda *args, **kwargs: RangeHandler(*args, directory=directory, **kwargs))
+    server.requests = []
+    server.if_ranges = []
+    server.log_lock = threading.Lock()
+    server.broken = set(broken)
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    # python bench_fixtures.py КАТАЛОГ [--sizes 10 1000 ...] [--seed N]
+    parser = argparse.ArgumentParser(description="Генерация синтетических наборов cache.txt/data.json/config_gm.json.")
+    parser.add_argument("root", help="куда класть наборы (<root>/<число игр>/TqTorrent/Data/config)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=FIXTURE_SIZES)
+    parser.add_argument("--seed", type=int, default=FIXTURE_SEED)
+    args = parser.parse_args()
+    for count in args.sizes:
+        config_dir = fixture_dir(args.root, count)
+        info = generate_fixture(config_dir, count, args.seed)
+        total_mb = sum(info["bytes"].values()) / 1048576
+        print(f"{count:>8} игр -> {config_dir} ({total_mb:.1f} МБ, установлено {info['installed']}, запущено {info['running']})")
+    sys.exit(0)
@@ -0,0 +1,283 @@
+import os # Стандартная библиотека
+import io # Стандартная библиотека
+import sys # Стандартная библиотека
+import json # Стандартная библиотека
+import time # Стандартная библиотека
+import argparse # Стандартная библиотека
+import platform # Стандартная библиотека
+import statistics # Стандартная библиотека
+import tempfile # Стандартная библиотека
+import tracemalloc # Стандартная библиотека
+from contextlib import contextmanager, redirect_stdout # Стандартная библиотека
+
+from bench_fixtures import FIXTURE_SIZES, FIXTURE_SEED, ensure_fixture
+from catalog_db import parse_config_gm
+from catalog_delta import index_games, diff_catalog
+from search_index import SearchIndex
+from tqtorrent import ConfigPaths, CatalogStore, scan_running
+
+# --- НАСТРОЙКИ ПРОГОНА ---
+DEFAULT_SIZES = [10, 1000, 100000] # 1M игр - только с --sizes 1000000 или --all (~0.6 ГБ файлов)
+FIXTURES_DIR = os.path.join(tempfile.gettempdir(), "tq_bench_fixtures") # Наборы переиспользуются между прогонами
+MIN_STAGE_SECONDS = 1.0 # Повторять этап, пока суммарное время не наберет столько
+MIN_RUNS = 3
+MAX_RUNS = 20
+DELTA_SHARE = 0.01 # Доля измененных игр в этапе delta
+REGRESSION_THRESHOLD = 0.25 # +25% к времени (или пику памяти) базового прогона - регрессия
+MIN_REGRESSION_SECONDS = 0.010 # Разница лучших прогонов меньше этой считается шумом
+MIN_REGRESSION_MB = 1.0
+# --------------------
+
+
+class Context:
+    """Набор файлов одного размера и общее для этапов состояние (загруженный каталог)."""
+
+    def __init__(self, config_dir, count):
+        self.count = count
+        self.config_dir = config_dir
+        self.paths = ConfigPaths(config_dir)
+        self.store = CatalogStore(self.paths)
+        with open(self.paths.data, 'rb') as f:
+            self.data_json = f.read() # Исходный data.json: этап scan его перезаписывает
+        self.config_gm = os.path.join(config_dir, "config_gm.json")
+        # Пустой каталог Steam для check_install: библиотеки машины не попадают в замер
+        self.steam_dir = os.path.join(self.paths.base_dir, "steam_empty")
+        self.data = None
+
+    def file_bytes(self, *paths):
+        return sum(os.path.getsize(path) for path in paths if os.path.exists(path))
+
+    def restore_data_json(self):
+        with open(self.paths.data, 'wb') as f:
+            f.write(self.data_json)
+
+    def reset(self):
+        """Возвращает набор в исходное состояние (для следующего прогона)."""
+        self.restore_data_json()
+        for path in (self.paths.snapshot, self.paths.snapshot + ".tmp"):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+# ----------------- ЭТАПЫ -----------------
+# prepare(ctx) - подготовка без замера (перед каждым запуском), run(ctx, state) - замеряемая часть,
+# input_bytes(ctx) - объем входа для МБ/с (None - не считать)
+
+def prepare_cold(ctx):
+    for path in (ctx.paths.snapshot, ctx.paths.snapshot + ".tmp"):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def prepare_warm(ctx):
+    ctx.data = ctx.store.load_config_data() # Снимок catalog_cache.bin гарантированно свежий
+
+
+def prepare_delta(ctx):
+    """Старый снимок + каталог, в котором DELTA_SHARE игр сменили статус."""
+    games = ctx.data["GAME_DATA"]
+    step = max(1, int(1 / DELTA_SHARE))
+    changed = [dict(game, action="установлено") if i % step == 0 else game for i, game in enumerate(games)]
+    snapshot = {"CNF_DATA": ctx.data["CNF_DATA"], "GAMES": index_games(games)}
+    return snapshot, {"CNF_DATA": ctx.data["CNF_DATA"], "GAME_DATA": changed}
+
+
+def run_delta(ctx, state):
+    snapshot, new_config = state
+    delta, _ = diff_catalog(snapshot, new_config)
+    json.dumps(delta, ensure_ascii=False)
+
+
+def run_config_gm(ctx, state):
+    with open(ctx.config_gm, 'r', encoding='utf-8') as f:
+        return parse_config_gm(f.read())
+
+
+@contextmanager
+def environ(**values):
+    """Временно задает переменные окружения и возвращает прежние значения."""
+    saved = {key: os.environ.get(key) for key in values}
+    os.environ.update(values)
+    try:
+        yield
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def prepare_check_install(ctx):
+    """check_install дописывает installed_game_ids (merge=True): каждый запуск - с исходного data.json."""
+    ctx.restore_data_json()
+    os.makedirs(ctx.steam_dir, exist_ok=True)
+
+
+def run_check_install(ctx, state):
+    # check_install читает каталог по TQ_CONFIG_PATH, Steam - по TQ_STEAM_PATH; вывод не нужен
+    import check_install
+    with environ(TQ_CONFIG_PATH=ctx.config_dir, TQ_STEAM_PATH=ctx.steam_dir), redirect_stdout(io.StringIO()):
+        check_install.check_and_install_missing_games()
+
+
+STAGES = [
+    # cache.txt -> GAME_DATA (CatalogStore.parse_cache_txt, то же, что parse_cache_txt окна)
+    ("parse", None, lambda ctx, state: ctx.store.parse_cache_txt(),
+     lambda ctx: ctx.file_bytes(ctx.paths.cache)),
+    # load_config_data без снимка: разбор + слияние с data.json + запись catalog_cache.bin
+    ("load_cold", prepare_cold, lambda ctx, state: ctx.store.load_config_data(),
+     lambda ctx: ctx.file_bytes(*ctx.paths.sources())),
+    # load_config_data со свежим снимком (обычный запуск окна и CLI)
+    ("load_warm", prepare_warm, lambda ctx, state: ctx.store.load_config_data(),
+     lambda ctx: ctx.file_bytes(ctx.paths.snapshot)),
+    # config_gm.json (JS-массив) -> список игр (catalog_db.parse_config_gm)
+    ("config_gm", None, run_config_gm, lambda ctx: ctx.file_bytes(ctx.config_gm)),
+    # JSON для setConfigData (send_data_to_js / prepare_catalog)
+    ("serialize", None, lambda ctx, state: json.dumps(ctx.data, ensure_ascii=False), None),
+    # Снимок для дельт и поисковый индекс (prepare_catalog)
+    ("index", None, lambda ctx, state: (index_games(ctx.data["GAME_DATA"]), SearchIndex(ctx.data["GAME_DATA"])), None),
+    # Дельта каталога и ее JSON для applyConfigDelta
+    ("delta", prepare_delta, run_delta, None),
+    # Снимок процессов + сверка с установленными играми + запись running_game_ids
+    ("scan", None, lambda ctx, state: scan_running(ctx.store, data=ctx.data), None),
+    # check_install целиком (включая заглушку проверки Steam - 0.5 с ожидания)
+    ("check_install", prepare_check_install, run_check_install, None),
+]
+STAGE_NAMES = [stage[0] for stage in STAGES]
+
+
+def measure_stage(ctx, prepare, run, with_memory):
+    """Медиана времени нескольких запусков и пик памяти Python (tracemalloc) в отдельном запуске:
+    под tracemalloc код медленнее в разы, поэтому время и память не меряются вместе."""
+    times = []
+    while len(times) < MIN_RUNS or (sum(times) < MIN_STAGE_SECONDS and len(times) < MAX_RUNS):
+        state = prepare(ctx) if prepare else None
+        start = time.perf_counter()
+        run(ctx, state)
+        times.append(time.perf_counter() - start)
+
+    peak_mb = None
+    if with_memory:
+        state = prepare(ctx) if prepare else None
+        tracemalloc.start()
+        try:
+            base = tracemalloc.get_traced_memory()[0]
+            result = run(ctx, state)
+            peak_mb = (tracemalloc.get_traced_memory()[1] - base) / 1048576
+            del result
+        finally:
+            tracemalloc.stop()
+    return {"seconds": statistics.median(times), "min_seconds": min(times), "runs": len(times), "peak_mb": peak_mb}
+
+
+def run_size(fixtures_dir, count, stages, with_memory, seed=FIXTURE_SEED):
+    start = time.perf_counter()
+    config_dir = ensure_fixture(fixtures_dir, count, seed)
+    print(f"\n[PIPELINE] {count} игр ({config_dir}, набор готов за {time.perf_counter() - start:.1f} с)")
+    ctx = Context(config_dir, count)
+    ctx.reset()
+    ctx.data = ctx.store.load_config_data()
+    results = {}
+    try:
+        for name, prepare, run, input_bytes in STAGES:
+            if name not in stages:
+                continue
+            result = measure_stage(ctx, prepare, run, with_memory)
+            result["games_per_s"] = count / result["seconds"] if result["seconds"] else None
+            if input_bytes is not None:
+                result["mb_per_s"] = input_bytes(ctx) / 1048576 / result["seconds"] if result["seconds"] else None
+            results[name] = result
+            memory = f"{result['peak_mb']:9.1f} МБ" if result["peak_mb"] is not None else ""
+            speed = f"{result['mb_per_s']:8.1f} МБ/с" if result.get("mb_per_s") else " " * 13
+            print(f"  {name:<14}{result['seconds'] * 1000:11.2f} мс  {result['games_per_s']:13,.0f} игр/с  {speed}{memory}"
+                  f"  (x{result['runs']})")
+    finally:
+        ctx.reset()
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Сравнивает с базовым прогоном: список строк-регрессий (пустой - все в пределах порога).
+    Время сравнивается по лучшему прогону (min_seconds): медиана нескольких прогонов скачет
+    от фоновой нагрузки машины, а минимум - нижняя граница, которую шум не сдвигает вниз."""
+    regressions = []
+    print(f"\n[СРАВНЕНИЕ] с базовым прогоном, порог +{threshold * 100:.0f}%")
+    for size, stages in results.items():
+        for name, result in stages.items():
+            old = baseline.get("results", {}).get(size, {}).get(name)
+            if old is None:
+                continue
+            # Базовый прогон старого формата без min_seconds сравнивается по медиане
+            old_seconds = old.get("min_seconds", old["seconds"])
+            new_seconds = result.get("min_seconds", result["seconds"])
+            ratio = new_seconds / old_seconds if old_seconds else 1.0
+            line = f"  {size:>8} {name:<14} {old_seconds * 1000:10.2f} -> {new_seconds * 1000:10.2f} мс (лучший)  x{ratio:.2f}"
+            slower = ratio > 1 + threshold and new_seconds - old_seconds > MIN_REGRESSION_SECONDS
+            if slower:
+                regressions.append(f"{size} игр, {name}: время x{ratio:.2f}")
+            if result.get("peak_mb") is not None and old.get("peak_mb"):
+                line += f"  {old['peak_mb']:.1f} -> {result['peak_mb']:.1f} МБ"
+                if (result["peak_mb"] > old["peak_mb"] * (1 + threshold)
+                        and result["peak_mb"] - old["peak_mb"] > MIN_REGRESSION_MB):
+                    regressions.append(f"{size} игр, {name}: память {old['peak_mb']:.1f} -> {result['peak_mb']:.1f} МБ")
+                    slower = True
+            print(line + ("  <- РЕГРЕССИЯ" if slower else ""))
+    return regressions
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Замеры конвейера каталога (разбор, слияние, сериализация, сканы) на синтетических наборах."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help=f"число игр (по умолчанию {DEFAULT_SIZES})")
+    parser.add_argument("--all", action="store_true", help=f"все размеры {FIXTURE_SIZES}")
+    parser.add_argument("--stages", nargs="+", choices=STAGE_NAMES, default=STAGE_NAMES)
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="каталог наборов (создаются при первом прогоне)")
+    parser.add_argument("--seed", type=int, default=FIXTURE_SEED)
+    parser.add_argument("--no-memory", action="store_true", help="не замерять пик памяти (прогон вдвое быстрее)")
+    parser.add_argument("--output", help="записать результаты в JSON")
+    parser.add_argument("--baseline", help="JSON прошлого прогона: при регрессии код выхода 1")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help="допустимое замедление (0.25 = +25%%)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    sizes = FIXTURE_SIZES if args.all else args.sizes
+    baseline = None
+    if args.baseline:
+        # Читается до прогона: ошибка в пути не должна выясняться через полчаса замеров
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    run = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "seed": args.seed,
+            "memory": not args.no_memory
+        },
+        "results": {}
+    }
+    for count in sizes:
+        run["results"][str(count)] = run_size(args.fixtures, count, args.stages, not args.no_memory, args.seed)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(run, f, ensure_ascii=False, indent=1)
+        print(f"\nРезультаты записаны в {args.output}")
+
+    if baseline is not None:
+        regressions = compare(run["results"], baseline, args.threshold)
+        if regressions:
+            print("ОШИБКА: регрессия производительности:\n  " + "\n  ".join(regressions))
+            return 1
+        print("Регрессий нет.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+import re # Стандартная библиотека
+
+# Начало записи: g# = ...
+_BLOCK_START_RE = re.compile(r'\s*g(\d+)\s*=\s*')
+# Начало поля: имя(
+_FIELD_RE = re.compile(r'[\s,]*(\w+)\(')
+
+
+def iter_cache_fields(lines):
+    """Однопроходный построчный токенизатор cache.txt.
+
+    Лениво отдает словарь сырых полей для каждой записи g# = ...
+    Значения в кавычках ("C:\\Program Files (x86)\\...") читаются до закрывающей
+    кавычки, значения без кавычек - до парной скобки. Значение может
+    продолжаться на следующих строках.
+    """
+    fields = None
+    key = None
+    buf = []
+    quoted = False
+    depth = 0
+
+    for line in lines:
+        line = line.rstrip('\r\n')
+        pos = 0
+        n = len(line)
+
+        if key is None:
+            match = _BLOCK_START_RE.match(line)
+            if match:
+                if fields is not None:
+                    yield fields
+                fields = {}
+                pos = match.end()
+        elif fields is not None:
+            # Многострочное значение: сохраняем перевод строки
+            buf.append('\n')
+
+        if fields is None:
+            continue
+
+        while pos < n:
+            if key is None:
+                match = _FIELD_RE.match(line, pos)
+                if not match:
+                    break
+                key = match.group(1)
+                pos = match.end()
+                buf = []
+                depth = 0
+                stripped = pos
+                while stripped < n and line[stripped] == ' ':
+                    stripped += 1
+                quoted = stripped < n and line[stripped] == '"'
+                if quoted:
+                    pos = stripped + 1
+
+            if quoted:
+                end = line.find('"', pos)
+                if end < 0:
+                    buf.append(line[pos:])
+                    pos = n
+                    break
+                buf.append(line[pos:end])
+                close = line.find(')', end + 1)
+                pos = close + 1 if close >= 0 else n
+                fields[key] = ''.join(buf)
+                key = None
+                continue
+
+            # Значение без кавычек: ищем парную закрывающую скобку
+            while True:
+                close = line.find(')', pos)
+                opening = line.find('(', pos)
+                if opening >= 0 and (close < 0 or opening < close):
+                    depth += 1
+                    buf.append(line[pos:opening + 1])
+                    pos = opening + 1
+                    continue
+                if close < 0:
+                    buf.append(line[pos:])
+                    pos = n
+                    break
+                if depth:
+                    depth -= 1
+                    buf.append(line[pos:close + 1])
+                    pos = close + 1
+                    continue
+                buf.append(line[pos:close])
+                pos = close + 1
+                fields[key] = ''.join(buf)
+                key = None
+                break
+
+    if fields is not None:
+        if key is not None:
+            # Незакрытое значение в конце файла - берем что есть
+            fields[key] = ''.join(buf)
+        yield fields
+
+
+def build_game(fields, game_id):
+    """Преобразует сырые поля записи в объект игры для GAME_DATA."""
+    action = fields.get("deisvie")
+    if action is None:
+        action = fields.get("status")
+
+    return {
+        "id": game_id,
+        "title": fields.get("name", "").strip() or "Без названия",
+        "description": fields.get("opisan", "").strip(),
+        "image": fields.get("priwie", "").strip(),
+        "steam_app_id": None,
+        "process_name": fields.get("dowanloadin", "").strip(),
+        "launch_path": fields.get("starting", "").strip(),
+        "url_install": fields.get("url_ins", "").strip(),
+        "action": action.strip().lower() if action is not None else "не скачено"
+    }
+
+
+def iter_games(lines):
+    """Лениво отдает объекты игр в порядке следования записей (id с 1)."""
+    game_id = 1
+    for fields in iter_cache_fields(lines):
+        yield build_game(fields, game_id)
+        game_id += 1
+
+
+def iter_games_from_file(path):
+    """Читает cache.txt построчно и лениво отдает объекты игр."""
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from iter_games(f)
@@ -0,0 +1,105 @@
+import os # Стандартная библиотека
+import pickle # Стандартная библиотека
+import hashlib # Стандартная библиотека
+
+import metrics
+
+# Версия формата снимка: при изменении структуры CNF_DATA/GAME_DATA увеличить
+SNAPSHOT_VERSION = 1
+
+
+def source_stat(path):
+    """Возвращает (size, mtime_ns) файла или None, если файла нет."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns)
+
+
+def content_hash(path):
+    """SHA-256 содержимого файла или None, если файла нет."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def fingerprint_sources(paths):
+    """Снимает отпечаток (размер, mtime, хеш) каждого исходного файла."""
+    return {path: {"stat": source_stat(path), "sha256": content_hash(path)} for path in paths}
+
+
+def read_snapshot(cache_path):
+    """Читает снимок одним чтением; None, если его нет или он поврежден."""
+    try:
+        with open(cache_path, 'rb') as f:
+            snapshot = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"ОШИБКА при чтении снимка каталога: {e}")
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
+        return None
+    return snapshot
+
+
+def write_snapshot(cache_path, sources, data):
+    """Атомарно записывает снимок (через временный файл и os.replace)."""
+    tmp_path = cache_path + ".tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({"version": SNAPSHOT_VERSION, "sources": sources, "data": data},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        print(f"ОШИБКА при записи снимка каталога: {e}")
+
+
+def snapshot_is_fresh(snapshot, paths):
+    """Проверяет, что исходные файлы не менялись с момента записи снимка.
+
+    Сначала сравниваются размер и mtime. Если они отличаются, сравнивается хеш
+    содержимого: файл могли «тронуть» без изменения (копирование, git checkout).
+    Возвращает (fresh, stat_updated).
+    """
+    sources = snapshot.get("sources", {})
+    if set(sources) != set(paths):
+        return False, False
+
+    stat_updated = False
+    for path in paths:
+        stored = sources[path]
+        current_stat = source_stat(path)
+        if current_stat == stored["stat"]:
+            continue
+        if current_stat is None or content_hash(path) != stored["sha256"]:
+            return False, False
+        stored["stat"] = current_stat
+        stat_updated = True
+    return True, stat_updated
+
+
+def load_or_build(cache_path, paths, build):
+    """Отдает данные из снимка или пересобирает их вызовом build() и сохраняет снимок."""
+    snapshot = read_snapshot(cache_path)
+    if snapshot is not None:
+        fresh, stat_updated = snapshot_is_fresh(snapshot, paths)
+        if fresh:
+            if stat_updated:
+                write_snapshot(cache_path, snapshot["sources"], snapshot["data"])
+            metrics.count("catalog_cache.hit")
+            return snapshot["data"]
+    metrics.count("catalog_cache.miss")
+
+    # Отпечаток снимается ДО разбора: если файл изменится во время разбора,
+    # хеш не совпадет и при следующей загрузке снимок будет пересобран.
+    sources = fingerprint_sources(paths)
+    data = build()
+    write_snapshot(cache_path, sources, data)
+    return data
@@ -0,0 +1,341 @@
+import os # Стандартная библиотека
+import re # Стандартная библиотека
+import sys # Стандартная библиотека
+import json # Стандартная библиотека
+import time # Стандартная библиотека
+import sqlite3 # Стандартная библиотека
+
+from cache_parser import iter_games_from_file
+
+# --- КОНФИГУРАЦИЯ ---
+BASE_CONFIG_PATH = r"C:\Users\drswa\OneDrive\Documents\TqTorrent\Data\config"
+DB_FILE_NAME = "catalog.db"
+SCHEMA_VERSION = 1 # PRAGMA user_version; поднимать при изменении SCHEMA
+# --------------------
+
+# Скалярные поля CNF_DATA, которые хранятся в таблице settings
+SETTINGS_KEYS = ("progr_name", "steam_nickname", "download_status")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    image TEXT NOT NULL DEFAULT '',
+    steam_app_id TEXT,
+    process_name TEXT NOT NULL DEFAULT '',
+    launch_path TEXT NOT NULL DEFAULT '',
+    url_install TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT 'не скачено'
+);
+CREATE INDEX IF NOT EXISTS idx_games_status ON games(status);
+CREATE INDEX IF NOT EXISTS idx_games_title ON games(title COLLATE NOCASE);
+
+CREATE TABLE IF NOT EXISTS install_state (
+    game_id INTEGER PRIMARY KEY,
+    installed_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS run_state (
+    game_id INTEGER PRIMARY KEY,
+    pid INTEGER,
+    started_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+GAME_COLUMNS = ("id", "title", "description", "image", "steam_app_id",
+                "process_name", "launch_path", "url_install", "status")
+
+
+def db_path_for(config_dir):
+    return os.path.join(config_dir, DB_FILE_NAME)
+
+
+def connect(db_path):
+    """Открывает хранилище в режиме WAL: читатели не блокируют писателя и наоборот.
+    Схема создается один раз на файл (по PRAGMA user_version), а не при каждом подключении."""
+    conn = sqlite3.connect(db_path, timeout=5.0)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+        conn.executescript(SCHEMA + f"PRAGMA user_version = {SCHEMA_VERSION};")
+    return conn
+
+
+# ----------------- ЧТЕНИЕ -----------------
+
+def game_from_row(row):
+    """Строка таблицы games -> объект игры в формате GAME_DATA."""
+    game_id, title, description, image, steam_app_id, process_name, launch_path, url_install, status = row
+    return {
+        "id": game_id,
+        "title": title,
+        "description": description,
+        "image": image,
+        "steam_app_id": steam_app_id,
+        "process_name": process_name,
+        "launch_path": launch_path,
+        "url_install": url_install,
+        "action": status
+    }
+
+
+def read_games(conn, status=None):
+    """Игры каталога по id; с status - только игры с этим статусом (по индексу)."""
+    sql = f"SELECT {', '.join(GAME_COLUMNS)} FROM games"
+    if status is not None:
+        rows = conn.execute(sql + " WHERE status = ? ORDER BY id", (status,))
+    else:
+        rows = conn.execute(sql + " ORDER BY id")
+    return [game_from_row(row) for row in rows]
+
+
+def read_installed_ids(conn):
+    return [row[0] for row in conn.execute("SELECT game_id FROM install_state ORDER BY game_id")]
+
+
+def read_running_ids(conn):
+    return [row[0] for row in conn.execute("SELECT game_id FROM run_state ORDER BY game_id")]
+
+
+def read_settings(conn):
+    return {key: json.loads(value) for key, value in conn.execute("SELECT key, value FROM settings")}
+
+
+def read_config_data(conn, cnf_defaults):
+    """Собирает {"CNF_DATA", "GAME_DATA"} одним снимком чтения (одна транзакция)."""
+    with conn:
+        conn.execute("BEGIN")
+        cnf_data = dict(cnf_defaults)
+        cnf_data.update(read_settings(conn))
+        cnf_data["installed_game_ids"] = read_installed_ids(conn)
+        cnf_data["running_game_ids"] = read_running_ids(conn)
+        game_data = read_games(conn)
+    return {"CNF_DATA": cnf_data, "GAME_DATA": game_data}
+
+
+# ----------------- ЗАПИСЬ -----------------
+
+def replace_id_set(conn, table, ids):
+    """Приводит таблицу состояния к набору ids, трогая только отличающиеся строки."""
+    ids = set(ids)
+    current = {row[0] for row in conn.execute(f"SELECT game_id FROM {table}")}
+    removed = current - ids
+    added = ids - current
+    if removed:
+        conn.executemany(f"DELETE FROM {table} WHERE game_id = ?", [(i,) for i in removed])
+    if added:
+        now = time.time()
+        if table == "install_state":
+            conn.executemany("INSERT INTO install_state (game_id, installed_at) VALUES (?, ?)",
+                             [(i, now) for i in added])
+        else:
+            conn.executemany("INSERT INTO run_state (game_id, pid, started_at) VALUES (?, NULL, ?)",
+                             [(i, now) for i in added])
+    return added, removed
+
+
+def set_installed_ids(conn, ids):
+    with conn:
+        return replace_id_set(conn, "install_state", ids)
+
+
+def set_running_ids(conn, ids):
+    with conn:
+        return replace_id_set(conn, "run_state", ids)
+
+
+def set_game_running(conn, game_id, pid=None):
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO run_state (game_id, pid, started_at) VALUES (?, ?, ?)",
+                     (game_id, pid, time.time()))
+
+
+def clear_game_running(conn, game_id):
+    with conn:
+        conn.execute("DELETE FROM run_state WHERE game_id = ?", (game_id,))
+
+
+def set_game_status(conn, game_id, status):
+    with conn:
+        conn.execute("UPDATE games SET status = ? WHERE id = ?", (status, game_id))
+
+
+def set_setting(conn, key, value):
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                     (key, json.dumps(value, ensure_ascii=False)))
+
+
+# ----------------- ИМПОРТ СТАРЫХ ФОРМАТОВ -----------------
+
+def upsert_games(conn, games):
+    """Вставляет или полностью обновляет игры из cache.txt."""
+    conn.executemany(
+        f"INSERT OR REPLACE INTO games ({', '.join(GAME_COLUMNS)}) VALUES ({', '.join('?' * len(GAME_COLUMNS))})",
+        ((g["id"], g["title"], g["description"], g["image"], g["steam_app_id"],
+          g["process_name"], g["launch_path"], g["url_install"], g["action"]) for g in games)
+    )
+
+
+def import_cache_txt(conn, path):
+    """cache.txt -> таблица games (каталог целиком заменяется)."""
+    with conn:
+        conn.execute("DELETE FROM games")
+        upsert_games(conn, iter_games_from_file(path))
+
+
+def import_data_json(conn, path):
+    """data.json -> install_state, run_state и settings."""
+    with open(path, 'r', encoding='utf-8') as f:
+        cnf_data = json.load(f).get("CNF_DATA", {})
+    with conn:
+        replace_id_set(conn, "install_state", cnf_data.get("installed_game_ids", []))
+        replace_id_set(conn, "run_state", cnf_data.get("running_game_ids", []))
+        for key in SETTINGS_KEYS:
+            if key in cnf_data:
+                conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                             (key, json.dumps(cnf_data[key], ensure_ascii=False)))
+
+
+# Токены JS-литерала: строка | комментарий | ключ без кавычек | висячая запятая
+_JS_TOKEN_RE = re.compile(r'("(?:\\.|[^"\\])*")|(//[^\n]*|/\*.*?\*/)|([A-Za-z_]\w*)(?=\s*:)|,(?=\s*[\]}])', re.DOTALL)
+
+
+def parse_config_gm(text):
+    """Разбирает config_gm.json (JS-массив `const GAME_DATA = [...]`) в список игр."""
+    def convert(match):
+        if match.group(1):
+            return match.group(1)
+        if match.group(2):
+            return ""
+        if match.group(3):
+            return f'"{match.group(3)}"'
+        return ""
+
+    start = text.index('[')
+    end = text.rindex(']') + 1
+    return json.loads(_JS_TOKEN_RE.sub(convert, text[start:end]))
+
+
+def import_config_gm(conn, path):
+    """config_gm.json -> games: новые игры добавляются, у существующих
+    заполняются только отсутствующие steam_app_id и launch_path."""
+    with open(path, 'r', encoding='utf-8') as f:
+        games = parse_config_gm(f.read())
+    with conn:
+        for game in games:
+            steam_app_id = game.get("steam_app_id")
+            conn.execute(
+                """INSERT INTO games (id, title, description, image, steam_app_id, launch_path)
+                   VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(id) DO UPDATE SET
+                       steam_app_id = COALESCE(games.steam_app_id, excluded.steam_app_id),
+                       launch_path = CASE WHEN games.launch_path = '' THEN excluded.launch_path ELSE games.launch_path END""",
+                (game["id"], game.get("title", "Без названия"), game.get("description", ""),
+                 game.get("image", ""), str(steam_app_id) if steam_app_id is not None else None,
+                 game.get("launch_path", ""))
+            )
+
+
+def import_legacy(conn, config_dir):
+    """Импортирует cache.txt, config_gm.json и data.json из каталога конфигурации."""
+    cache_path = os.path.join(config_dir, "cache.txt")
+    config_gm_path = os.path.join(config_dir, "config_gm.json")
+    data_path = os.path.join(config_dir, "data.json")
+
+    if os.path.exists(cache_path):
+        import_cache_txt(conn, cache_path)
+    if os.path.exists(config_gm_path):
+        import_config_gm(conn, config_gm_path)
+    if os.path.exists(data_path):
+        import_data_json(conn, data_path)
+
+
+# ----------------- ЭКСПОРТ ДЛЯ СОВМЕСТИМОСТИ -----------------
+
+def _write_atomic(path, text):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def cache_value(value):
+    """Значение поля cache.txt. Без кавычек cache_parser читает значение до парной
+    скобки, поэтому значение с непарной скобкой (или начинающееся с кавычки) пишется
+    в кавычках. Непарную скобку вместе с кавычкой записать без потерь нельзя."""
+    depth = 0
+    for char in value:
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+            if depth < 0:
+                break
+    if (depth == 0 and not value.lstrip(' ').startswith('"')) or '"' in value:
+        return value
+    return f'"{value}"'
+
+
+def format_cache_entry(game):
+    """Объект игры -> строка cache.txt (g# = name(...), ...)."""
+    return (f'g{game["id"]} = name({cache_value(game["title"])}), priwie({cache_value(game["image"])}), '
+            f'opisan({cache_value(game["description"])}), url_ins({cache_value(game["url_install"])}), '
+            f'dowanloadin({cache_value(game["process_name"])}), starting("{game["launch_path"]}"), '
+            f'status({cache_value(game["action"].upper())})')
+
+
+def export_cache_txt(conn, path):
+    _write_atomic(path, "".join(format_cache_entry(g) + "\n\n" for g in read_games(conn)))
+
+
+def export_data_json(conn, path):
+    cnf_data = read_settings(conn)
+    cnf_data["installed_game_ids"] = read_installed_ids(conn)
+    cnf_data["running_game_ids"] = read_running_ids(conn)
+    _write_atomic(path, json.dumps({"CNF_DATA": cnf_data}, indent=4, ensure_ascii=False))
+
+
+def export_config_gm(conn, path):
+    games = [{
+        "id": g["id"],
+        "title": g["title"],
+        "description": g["description"],
+        "image": g["image"],
+        "steam_app_id": g["steam_app_id"],
+        "launch_path": g["launch_path"]
+    } for g in read_games(conn)]
+    _write_atomic(path, "const GAME_DATA = " + json.dumps(games, indent=4, ensure_ascii=False) + ";\n")
+
+
+def export_legacy(conn, config_dir):
+    """Выгружает хранилище обратно в cache.txt, config_gm.json и data.json."""
+    export_cache_txt(conn, os.path.join(config_dir, "cache.txt"))
+    export_config_gm(conn, os.path.join(config_dir, "config_gm.json"))
+    export_data_json(conn, os.path.join(config_dir, "data.json"))
+
+
+if __name__ == "__main__":
+    # python catalog_db.py import|export [каталог_конфигурации]
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    config_dir = sys.argv[2] if len(sys.argv) > 2 else BASE_CONFIG_PATH
+    if command not in ("import", "export"):
+        print("Использование: python catalog_db.py import|export [каталог_конфигурации]")
+        sys.exit(1)
+
+    conn = connect(db_path_for(config_dir))
+    try:
+        if command == "import":
+            import_legacy(conn, config_dir)
+            print(f"[ИМПОРТ] В {DB_FILE_NAME} {len(read_games(conn))} игр.")
+        else:
+            export_legacy(conn, config_dir)
+            print(f"[ЭКСПОРТ] cache.txt, config_gm.json и data.json обновлены из {DB_FILE_NAME}.")
+    finally:
+        conn.close()
@@ -0,0 +1,38 @@
+def index_games(game_data):
+    """Строит снимок каталога: id -> объект игры."""
+    return {game["id"]: game for game in game_data}
+
+
+def diff_catalog(old_snapshot, new_config):
+    """Сравнивает последний переданный в JS снимок с новыми данными.
+
+    old_snapshot - {"CNF_DATA": dict, "GAMES": {id: game}}.
+    Возвращает (delta, new_snapshot). delta равна None, если ничего не изменилось,
+    иначе содержит только измененные части:
+    {"cnf": {...}, "added": [...], "changed": [...], "removed": [id, ...]}
+    """
+    new_games = index_games(new_config["GAME_DATA"])
+    new_snapshot = {"CNF_DATA": new_config["CNF_DATA"], "GAMES": new_games}
+
+    old_games = old_snapshot["GAMES"]
+    added = []
+    changed = []
+    for game_id, game in new_games.items():
+        old_game = old_games.get(game_id)
+        if old_game is None:
+            added.append(game)
+        elif old_game != game:
+            changed.append(game)
+    removed = [game_id for game_id in old_games if game_id not in new_games]
+
+    delta = {}
+    if new_config["CNF_DATA"] != old_snapshot["CNF_DATA"]:
+        delta["cnf"] = new_config["CNF_DATA"]
+    if added:
+        delta["added"] = added
+    if changed:
+        delta["changed"] = changed
+    if removed:
+        delta["removed"] = removed
+
+    return (delta or None), new_snapshot
@@ -0,0 +1,538 @@
+import os # Стандартная библиотека
+import sys # Стандартная библиотека
+import json # Стандартная библиотека
+import mmap # Стандартная библиотека
+import zlib # Стандартная библиотека
+import pickle # Стандартная библиотека
+import shutil # Стандартная библиотека
+import ntpath # Стандартная библиотека
+import hashlib # Стандартная библиотека
+import argparse # Стандартная библиотека
+import urllib.request # Стандартная библиотека
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import metrics
+
+# --- НАСТРОЙКИ ОБНОВЛЕНИЯ ---
+MIN_CHUNK = 2 * 1024 # Границы чанков ближе этого к началу чанка не ищутся
+AVG_CHUNK = 8 * 1024 # До этой длины граница ставится реже (MASK_STRICT), после - чаще (MASK_LOOSE)
+MAX_CHUNK = 64 * 1024 # Принудительная граница (длинные участки без переводов строки, нули)
+WINDOW = 48 # Окно хеша перед точкой-кандидатом, байт
+MASK_STRICT = 0x3F
+MASK_LOOSE = 0x0F
+POOL_MIN_BYTES = 16 * 1024 * 1024 # Меньше этого дерево режется в текущем процессе (запуск пула дороже)
+FETCH_WORKERS = 4 # Параллельных запросов чанков (как DEFAULT_WORKERS загрузчика)
+REQUEST_TIMEOUT = 30
+MANIFEST_FILE_NAME = "tq_update.json"
+CHUNKS_DIR = "chunks"
+SKIP_NAMES = ("__pycache__",)
+STAGING_SUFFIX = ".tqstaging" # Новое дерево собирается рядом с установленным
+BACKUP_SUFFIX = ".tqold" # Установленное дерево на время замены
+CHUNK_CACHE_SUFFIX = ".tqchunks" # Скачанные чанки (переживают обрыв обновления)
+STATE_SUFFIX = ".tqchunks.bin" # Чанки установленных файлов по size+mtime
+# --------------------
+
+CHUNKING = {"min": MIN_CHUNK, "avg": AVG_CHUNK, "max": MAX_CHUNK, "window": WINDOW,
+            "strict": MASK_STRICT, "loose": MASK_LOOSE}
+
+
+class UpdateError(Exception):
+    pass
+
+
+# ----------------- НАРЕЗКА НА ЧАНКИ -----------------
+
+def chunk_boundaries(data, min_size=MIN_CHUNK, avg_size=AVG_CHUNK, max_size=MAX_CHUNK, window=WINDOW):
+    """Концы чанков data (bytes или mmap), нарезка по содержимому.
+
+    Кандидаты в границы - позиции сразу после перевода строки; граница ставится, если
+    CRC32 последних window байт перед ней проходит маску. Решение зависит только от
+    содержимого окна, поэтому вставка или удаление байт сдвигает лишь соседние чанки.
+    Побайтовый скользящий хеш на чистом Python режет ~5 МБ/с; поиск кандидатов через
+    find и хеш окна в C дают сотни МБ/с на бинарных файлах и ~100 МБ/с на тексте.
+    """
+    size = len(data)
+    ends = []
+    start = 0
+    find = data.find
+    crc32 = zlib.crc32
+    while start < size:
+        limit = min(size, start + max_size)
+        normal = min(limit, start + avg_size)
+        cut = 0
+        # Кандидаты не ближе min_size к началу чанка, поэтому окно целиком после 0
+        pos = find(b"\n", start + max(min_size, window) - 1, normal)
+        while pos >= 0:
+            if not crc32(data[pos + 1 - window:pos + 1]) & MASK_STRICT:
+                cut = pos + 1
+                break
+            pos = find(b"\n", pos + 1, normal)
+        if not cut:
+            pos = find(b"\n", max(normal - 1, start + max(min_size, window) - 1), limit)
+            while pos >= 0:
+                if not crc32(data[pos + 1 - window:pos + 1]) & MASK_LOOSE:
+                    cut = pos + 1
+                    break
+                pos = find(b"\n", pos + 1, limit)
+        if not cut:
+            cut = limit
+        ends.append(cut)
+        start = cut
+    return ends
+
+
+def chunk_file(path):
+    """[(sha256, размер)] чанков файла (чтение через mmap)."""
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            chunks = []
+            start = 0
+            with memoryview(mapped) as view:
+                for end in chunk_boundaries(mapped):
+                    chunks.append((hashlib.sha256(view[start:end]).hexdigest(), end - start))
+                    start = end
+            return chunks
+
+
+def _chunk_task(path):
+    try:
+        return chunk_file(path), None
+    except OSError as e:
+        return None, str(e)
+
+
+def chunk_files(root, rel_paths, workers=None):
+    """Нарезает файлы; при объеме больше POOL_MIN_BYTES - в пуле процессов (файл на задачу).
+    Возвращает {rel_path: (чанки или None, ошибка)}."""
+    paths = [os.path.join(root, rel_path) for rel_path in rel_paths]
+    total = 0
+    for path in paths:
+        try:
+            total += os.path.getsize(path)
+        except OSError:
+            pass
+    if total < POOL_MIN_BYTES or (workers or os.cpu_count() or 1) == 1 or len(paths) < 2:
+        return dict(zip(rel_paths, map(_chunk_task, paths)))
+    # Крупные файлы первыми: они не должны достаться последнему свободному процессу
+    order = sorted(range(len(paths)), key=lambda i: -os.path.getsize(paths[i]) if os.path.exists(paths[i]) else 0)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(_chunk_task, [paths[i] for i in order])
+        return {rel_paths[i]: result for i, result in zip(order, results)}
+
+
+def iter_tree(root, skip=SKIP_NAMES):
+    """Относительные пути (через "/") всех файлов дерева, кроме каталогов из skip."""
+    stack = [""]
+    while stack:
+        rel_dir = stack.pop()
+        with os.scandir(os.path.join(root, rel_dir)) as entries:
+            for entry in entries:
+                if entry.name in skip:
+                    continue
+                rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(rel_path)
+                elif entry.is_file(follow_symlinks=False) and not (rel_dir == "" and entry.name == MANIFEST_FILE_NAME):
+                    yield rel_path
+
+
+def build_manifest(root, version=None, state=None, workers=None):
+    """Манифест дерева: {"version", "chunking", "files": {путь: {"size", "chunks": [[sha256, размер]]}}}.
+
+    state - {путь: (size, mtime_ns, чанки)} прошлой нарезки этого дерева: файлы с теми же
+    size+mtime не перечитываются. Возвращает (manifest, new_state)."""
+    state = state or {}
+    new_state = {}
+    files = {}
+    to_chunk = []
+    for rel_path in sorted(iter_tree(root)):
+        st = os.stat(os.path.join(root, rel_path))
+        known = state.get(rel_path)
+        if known and known[0] == st.st_size and known[1] == st.st_mtime_ns:
+            new_state[rel_path] = known
+        else:
+            to_chunk.append((rel_path, st))
+
+    chunked = chunk_files(root, [rel_path for rel_path, _ in to_chunk], workers)
+    for rel_path, st in to_chunk:
+        chunks, error = chunked[rel_path]
+        if error:
+            raise OSError(f"Не удалось прочитать {rel_path}: {error}")
+        new_state[rel_path] = (st.st_size, st.st_mtime_ns, chunks)
+
+    for rel_path in sorted(new_state):
+        size, _, chunks = new_state[rel_path]
+        files[rel_path] = {"size": size, "chunks": [list(chunk) for chunk in chunks]}
+    manifest = {"version": version, "chunking": CHUNKING, "files": files}
+    return manifest, new_state
+
+
+def manifest_size(manifest):
+    return sum(entry["size"] for entry in manifest["files"].values())
+
+
+def save_json(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def load_state(path):
+    """Кэш нарезки установленного дерева; при других параметрах нарезки - пустой."""
+    try:
+        with open(path, 'rb') as f:
+            chunking, state = pickle.load(f)
+    except (OSError, EOFError, pickle.PickleError, ValueError, TypeError):
+        return {}
+    return state if chunking == CHUNKING else {}
+
+
+def save_state(path, state):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump((CHUNKING, state), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def chunk_rel_path(digest):
+    return f"{CHUNKS_DIR}/{digest[:2]}/{digest}"
+
+
+def tree_path(root, rel_path):
+    """Путь файла манифеста внутри root. Манифест приходит извне, поэтому абсолютные
+    пути, буквы дисков (и потоки NTFS "файл:поток"), "..", ".", пустые части и обратная
+    косая черта отклоняются, как и путь, который через ссылки выводит за пределы root."""
+    if not isinstance(rel_path, str) or not rel_path or "\\" in rel_path:
+        raise UpdateError(f"Недопустимый путь в манифесте: {rel_path!r}")
+    parts = rel_path.split("/")
+    if (os.path.isabs(rel_path) or ntpath.isabs(rel_path) or ntpath.splitdrive(rel_path)[0]
+            or any(part in ("", ".", "..") or ":" in part for part in parts)):
+        raise UpdateError(f"Недопустимый путь в манифесте: {rel_path!r}")
+    path = os.path.join(root, *parts)
+    real_root = os.path.realpath(root)
+    if os.path.commonpath([real_root, os.path.realpath(path)]) != real_root:
+        raise UpdateError(f"Путь из манифеста выходит за пределы дерева: {rel_path!r}")
+    return path
+
+
+def is_digest(digest):
+    return isinstance(digest, str) and len(digest) == 64 and all(c in "0123456789abcdef" for c in digest)
+
+
+def check_manifest(manifest, root):
+    """Проверяет пути и чанки манифеста до скачивания: чанк - [sha256, размер], его
+    хеш становится именем файла в кэше и путем в источнике."""
+    files = manifest.get("files")
+    if not isinstance(files, dict):
+        raise UpdateError("В манифесте нет списка файлов")
+    for rel_path, entry in files.items():
+        tree_path(root, rel_path)
+        if rel_path == MANIFEST_FILE_NAME:
+            raise UpdateError(f"Недопустимый путь в манифесте: {rel_path!r}")
+        chunks = entry.get("chunks") if isinstance(entry, dict) else None
+        if not isinstance(chunks, list) or not isinstance(entry.get("size"), int) or not all(
+                isinstance(chunk, list) and len(chunk) == 2 and is_digest(chunk[0])
+                and isinstance(chunk[1], int) and chunk[1] >= 0 for chunk in chunks):
+            raise UpdateError(f"Недопустимые чанки в манифесте: {rel_path!r}")
+
+
+# ----------------- ПУБЛИКАЦИЯ -----------------
+
+def publish(src_dir, out_dir, version=None, workers=None):
+    """Выкладывает версию src_dir в out_dir: чанки chunks/<xx>/<sha256> (общие для всех
+    версий, уже лежащие не перезаписываются) и манифест tq_update.json последним.
+    Возвращает {"files", "chunks", "new_chunks", "bytes", "new_bytes"}."""
+    manifest, _ = build_manifest(src_dir, version, workers=workers)
+    stats = {"files": len(manifest["files"]), "chunks": 0, "new_chunks": 0,
+             "bytes": manifest_size(manifest), "new_bytes": 0}
+    written = set()
+    for rel_path, entry in manifest["files"].items():
+        if not entry["chunks"]:
+            continue
+        with open(os.path.join(src_dir, rel_path), 'rb') as f:
+            for digest, size in entry["chunks"]:
+                data = f.read(size)
+                stats["chunks"] += 1
+                if digest in written:
+                    continue
+                written.add(digest)
+                path = os.path.join(out_dir, chunk_rel_path(digest))
+                if os.path.exists(path):
+                    continue
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path + ".tmp", 'wb') as out:
+                    out.write(data)
+                os.replace(path + ".tmp", path)
+                stats["new_chunks"] += 1
+                stats["new_bytes"] += size
+    save_json(os.path.join(out_dir, MANIFEST_FILE_NAME), manifest)
+    return stats
+
+
+# ----------------- ИСТОЧНИКИ -----------------
+
+class DirectorySource:
+    """Опубликованная версия в локальном каталоге (или на сетевом диске)."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def read(self, rel_path):
+        with open(os.path.join(self.root, *rel_path.split("/")), 'rb') as f:
+            return f.read()
+
+
+class HttpSource:
+    """Опубликованная версия на HTTP-зеркале: <url>/tq_update.json и <url>/chunks/..."""
+
+    def __init__(self, url):
+        self.url = url.rstrip("/")
+
+    def read(self, rel_path):
+        with urllib.request.urlopen(f"{self.url}/{rel_path}", timeout=REQUEST_TIMEOUT) as response:
+            return response.read()
+
+
+def open_source(location):
+    if location.startswith(("http://", "https://")):
+        return HttpSource(location)
+    return DirectorySource(location)
+
+
+# ----------------- ОБНОВЛЕНИЕ -----------------
+
+def recover(target):
+    """Доводит до конца или откатывает прерванную замену дерева target.
+
+    Замена - два переименования: target -> target.tqold, target.tqstaging -> target.
+    Если target нет, то собранное дерево (в нем есть манифест, он пишется последним)
+    ставится на место, иначе возвращается прежнее. Остатки прошлой попытки удаляются."""
+    staging, backup = target + STAGING_SUFFIX, target + BACKUP_SUFFIX
+    if not os.path.isdir(target):
+        if os.path.isfile(os.path.join(staging, MANIFEST_FILE_NAME)):
+            os.replace(staging, target)
+        elif os.path.isdir(backup):
+            os.replace(backup, target)
+    for leftover in (staging, backup):
+        if os.path.isdir(leftover):
+            shutil.rmtree(leftover, ignore_errors=True)
+
+
+def plan_update(new_manifest, local_manifest):
+    """Что брать из установленного дерева, а что скачивать.
+    Возвращает (local_chunks {sha256: (путь, смещение, размер)}, missing {sha256: размер})."""
+    local_chunks = {}
+    for rel_path, entry in local_manifest["files"].items():
+        offset = 0
+        for digest, size in entry["chunks"]:
+            local_chunks.setdefault(digest, (rel_path, offset, size))
+            offset += size
+    missing = {}
+    for entry in new_manifest["files"].values():
+        for digest, size in entry["chunks"]:
+            if digest not in local_chunks:
+                missing[digest] = size
+    return local_chunks, missing
+
+
+def fetch_chunks(source, missing, cache_dir, workers=FETCH_WORKERS):
+    """Скачивает недостающие чанки в cache_dir (уже скачанные в прошлой попытке не
+    запрашиваются). Каждый чанк сверяется с SHA-256. Возвращает число скачанных байт."""
+    os.makedirs(cache_dir, exist_ok=True)
+    todo = [digest for digest in missing if not os.path.exists(os.path.join(cache_dir, digest))]
+
+    def fetch(digest):
+        data = source.read(chunk_rel_path(digest))
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise UpdateError(f"Чанк {digest} поврежден при передаче")
+        path = os.path.join(cache_dir, digest)
+        with open(path + ".tmp", 'wb') as f:
+            f.write(data)
+        os.replace(path + ".tmp", path)
+        return len(data)
+
+    if not todo:
+        return 0
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(todo)))) as pool:
+        return sum(pool.map(fetch, todo))
+
+
+def assemble_file(dest, entry, target, local_chunks, cache_dir, handles):
+    """Собирает файл из чанков установленного дерева и скачанных; каждый чанк сверяется
+    с SHA-256 (установленный файл мог измениться после нарезки)."""
+    with open(dest, 'wb') as out:
+        for digest, size in entry["chunks"]:
+            local = local_chunks.get(digest)
+            if local is not None:
+                rel_path, offset, _ = local
+                f = handles.get(rel_path)
+                if f is None:
+                    f = handles[rel_path] = open(os.path.join(target, rel_path), 'rb')
+                f.seek(offset)
+                data = f.read(size)
+            else:
+                with open(os.path.join(cache_dir, digest), 'rb') as f:
+                    data = f.read()
+            if hashlib.sha256(data).hexdigest() != digest:
+                raise UpdateError(f"Чанк {digest} ({dest}) не совпал с манифестом")
+            out.write(data)
+
+
+def build_staging(target, staging, new_manifest, local_manifest, local_chunks, cache_dir):
+    """Собирает новое дерево в staging. Неизмененные файлы - жесткие ссылки на
+    установленные (копия, если ссылки не поддерживаются), остальные - из чанков.
+    Манифест пишется последним: он - признак полностью собранного дерева."""
+    if os.path.isdir(staging):
+        shutil.rmtree(staging)
+    os.makedirs(staging)
+    handles = {}
+    try:
+        for rel_path, entry in new_manifest["files"].items():
+            dest = tree_path(staging, rel_path)
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            local = local_manifest["files"].get(rel_path)
+            if local is not None and local["chunks"] == entry["chunks"]:
+                src = os.path.join(target, *rel_path.split("/"))
+                try:
+                    os.link(src, dest)
+                except OSError:
+                    shutil.copyfile(src, dest)
+                continue
+            assemble_file(dest, entry, target, local_chunks, cache_dir, handles)
+    finally:
+        for f in handles.values():
+            f.close()
+    save_json(os.path.join(staging, MANIFEST_FILE_NAME), new_manifest)
+
+
+def swap_tree(target, staging):
+    """Ставит собранное дерево на место установленного. Между двумя переименованиями
+    target отсутствует; если процесс прервется здесь, recover() закончит замену."""
+    backup = target + BACKUP_SUFFIX
+    if os.path.isdir(backup):
+        shutil.rmtree(backup)
+    os.replace(target, backup)
+    try:
+        os.replace(staging, target)
+    except OSError:
+        os.replace(backup, target)
+        raise
+    shutil.rmtree(backup, ignore_errors=True)
+
+
+def update_tree(target, source, workers=None, dry_run=False):
+    """Обновляет дерево target до версии из source (DirectorySource/HttpSource).
+
+    Установленное дерево нарезается (по кэшу size+mtime - только измененные файлы),
+    со скачиванием только чанков, которых в нем нет. Новое дерево собирается рядом
+    и ставится на место переименованием. Возвращает отчет:
+    {"version", "files", "changed_files", "total_bytes", "reused_bytes", "fetch_bytes",
+     "fetched_bytes", "chunks", "missing_chunks"}."""
+    target = os.path.abspath(target)
+    recover(target)
+    staging = target + STAGING_SUFFIX
+    cache_dir = target + CHUNK_CACHE_SUFFIX
+    state_path = target + STATE_SUFFIX
+
+    with metrics.timer("update.manifest"):
+        new_manifest = json.loads(source.read(MANIFEST_FILE_NAME))
+    if new_manifest.get("chunking") != CHUNKING:
+        raise UpdateError(f"Манифест нарезан с другими параметрами: {new_manifest.get('chunking')}")
+    check_manifest(new_manifest, staging)
+    with metrics.timer("update.chunk_local") as fields:
+        local_manifest, state = build_manifest(target, state=load_state(state_path), workers=workers)
+        fields["files"] = len(local_manifest["files"])
+    save_state(state_path, state)
+
+    local_chunks, missing = plan_update(new_manifest, local_manifest)
+    total = manifest_size(new_manifest)
+    fetch_bytes = sum(missing.values())
+    changed = [rel_path for rel_path, entry in new_manifest["files"].items()
+               if local_manifest["files"].get(rel_path, {}).get("chunks") != entry["chunks"]]
+    removed = [rel_path for rel_path in local_manifest["files"] if rel_path not in new_manifest["files"]]
+    report = {
+        "version": new_manifest.get("version"),
+        "files": len(new_manifest["files"]),
+        "changed_files": len(changed),
+        "removed_files": len(removed),
+        "total_bytes": total,
+        "reused_bytes": total - sum(size for entry in new_manifest["files"].values()
+                                    for digest, size in entry["chunks"] if digest in missing),
+        "fetch_bytes": fetch_bytes,
+        "fetched_bytes": 0,
+        "chunks": sum(len(entry["chunks"]) for entry in new_manifest["files"].values()),
+        "missing_chunks": len(missing)
+    }
+    if dry_run:
+        return report
+    if not (changed or removed):
+        shutil.rmtree(cache_dir, ignore_errors=True) # Остаток обновления, законченного recover()
+        return report
+
+    with metrics.timer("update.fetch") as fields:
+        report["fetched_bytes"] = fetch_chunks(source, missing, cache_dir)
+        fields["bytes"] = report["fetched_bytes"]
+    with metrics.timer("update.stage"):
+        build_staging(target, staging, new_manifest, local_manifest, local_chunks, cache_dir)
+    with metrics.timer("update.swap"):
+        swap_tree(target, staging)
+
+    # Нарезка нового дерева уже известна: size+mtime собранных файлов + чанки манифеста
+    new_state = {}
+    for rel_path, entry in new_manifest["files"].items():
+        st = os.stat(os.path.join(target, *rel_path.split("/")))
+        new_state[rel_path] = (st.st_size, st.st_mtime_ns, [tuple(chunk) for chunk in entry["chunks"]])
+    save_state(state_path, new_state)
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    return report
+
+
+def format_report(report):
+    total = report["total_bytes"] or 1
+    return (f"версия {report['version']}: {report['files']} файлов, изменено {report['changed_files']}, "
+            f"удалено {report['removed_files']}; передано {report['fetched_bytes'] / 1048576:.2f} МБ "
+            f"из {report['total_bytes'] / 1048576:.2f} МБ ({report['fetched_bytes'] * 100 / total:.1f}%), "
+            f"к скачиванию {report['fetch_bytes'] / 1048576:.2f} МБ в {report['missing_chunks']} чанках")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Дельта-обновление каталога Data/version по чанкам.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    publish_parser = commands.add_parser("publish", help="выложить версию дерева в каталог обновлений")
+    publish_parser.add_argument("src", help="дерево новой версии")
+    publish_parser.add_argument("out", help="каталог обновлений (его можно раздавать по HTTP)")
+    publish_parser.add_argument("--version")
+    update_parser = commands.add_parser("update", help="обновить установленное дерево")
+    update_parser.add_argument("source", help="каталог обновлений или http(s)://-адрес")
+    update_parser.add_argument("--target", default=os.path.dirname(os.path.abspath(__file__)),
+                               help="установленное дерево (по умолчанию - каталог этого файла)")
+    update_parser.add_argument("--dry-run", action="store_true", help="только посчитать, что будет скачано")
+    for sub in (publish_parser, update_parser):
+        sub.add_argument("--workers", type=int, help="процессов для нарезки (по умолчанию - по числу ядер)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "publish":
+        stats = publish(args.src, args.out, args.version, args.workers)
+        print(f"[ПУБЛИКАЦИЯ] {stats['files']} файлов, {stats['chunks']} чанков; новых {stats['new_chunks']} "
+              f"({stats['new_bytes'] / 1048576:.2f} из {stats['bytes'] / 1048576:.2f} МБ)")
+        return 0
+    # Каталог процесса не должен лежать внутри заменяемого дерева (Windows не даст его переименовать)
+    os.chdir(os.path.dirname(os.path.abspath(args.target)))
+    try:
+        report = update_tree(args.target, open_source(args.source), args.workers, args.dry_run)
+    except (OSError, UpdateError, ValueError) as e:
+        print(f"ОШИБКА обновления: {e}")
+        return 2
+    print(f"[ОБНОВЛЕНИЕ] {format_report(report)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
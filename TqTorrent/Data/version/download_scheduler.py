@@ -0,0 +1,399 @@
+import time # Стандартная библиотека
+import threading # Стандартная библиотека
+import itertools # Стандартная библиотека
+
+from downloader import DownloadCancelled
+
+# --- НАСТРОЙКИ ПЛАНИРОВЩИКА ---
+DEFAULT_MAX_ACTIVE = 2 # Сколько загрузок идут одновременно
+PLAYING_RATE_LIMIT = 2 * 1024 * 1024 # Общий предел (байт/с), пока запущена игра
+BURST_SECONDS = 0.25 # Емкость корзины токенов в секундах трафика
+MIN_BURST = 256 * 1024 # Не меньше одного куска SegmentedDownload
+STATUS_INTERVAL = 0.5 # Не чаще одного события статуса за столько секунд
+# --------------------
+
+# Состояния задания
+QUEUED = "queued"
+ACTIVE = "active"
+PAUSED = "paused"
+DONE = "done"
+FAILED = "failed"
+
+
+class TokenBucket:
+    """Корзина токенов с долгом: reserve(n) сразу списывает n байт и возвращает,
+    сколько секунд нужно подождать, чтобы уложиться в rate. rate=None - без ограничения."""
+
+    def __init__(self, rate=None):
+        self.lock = threading.Lock()
+        self.rate = None
+        self.burst = MIN_BURST
+        self.tokens = 0.0
+        self.stamp = time.monotonic()
+        self.set_rate(rate)
+
+    def set_rate(self, rate):
+        with self.lock:
+            self._refill()
+            self.rate = rate if rate and rate > 0 else None
+            if self.rate is not None:
+                self.burst = max(MIN_BURST, self.rate * BURST_SECONDS)
+                self.tokens = min(self.tokens, self.burst)
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.rate is not None:
+            self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def reserve(self, nbytes):
+        with self.lock:
+            if self.rate is None:
+                return 0.0
+            self._refill()
+            self.tokens -= nbytes
+            return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+
+class JobLimiter:
+    """Ограничитель одного задания: собственная корзина плюс общая.
+
+    Вызов limiter(nbytes) блокирует поток (throttle для SegmentedDownload),
+    reserve(nbytes) отдает задержку без ожидания (для asyncio в TorrentSession).
+    Ожидание прерывается stop_event, чтобы пауза не ждала конца окна.
+    """
+
+    def __init__(self, job_bucket, global_bucket, stop_event):
+        self.buckets = (job_bucket, global_bucket)
+        self.stop_event = stop_event
+
+    def reserve(self, nbytes):
+        return max(bucket.reserve(nbytes) for bucket in self.buckets)
+
+    def __call__(self, nbytes):
+        delay = self.reserve(nbytes)
+        if delay > 0:
+            self.stop_event.wait(delay)
+
+
+class ScheduledJob:
+    """Запись очереди. factory(on_progress, limiter) создает задание с run()/cancel()
+    (SegmentedDownload или TorrentJob) - новое при каждом (пере)запуске."""
+
+    def __init__(self, game_id, title, factory, priority, seq, rate_limit=None):
+        self.game_id = game_id
+        self.title = title
+        self.factory = factory
+        self.priority = priority
+        self.seq = seq
+        self.state = QUEUED
+        self.bucket = TokenBucket(rate_limit)
+        self.stop_event = threading.Event()
+        self.job = None
+        self.downloaded = 0
+        self.total = None
+        self.speed = 0.0
+        self.error = None
+        self.result = None
+        # Убрано из очереди, но поток еще пишет файл: запись живет в jobs до конца потока
+        self.removed = False
+
+    @property
+    def sort_key(self):
+        return (self.priority, self.seq)
+
+    @property
+    def eta(self):
+        if not self.total or self.speed <= 0:
+            return None
+        return max(0.0, (self.total - self.downloaded) / self.speed)
+
+    def status(self, position):
+        return {
+            "game_id": self.game_id,
+            "title": self.title,
+            "state": self.state,
+            "position": position,
+            "priority": self.priority,
+            "downloaded": self.downloaded,
+            "total": self.total,
+            "rate": self.speed if self.state == ACTIVE else 0.0,
+            "eta": self.eta if self.state == ACTIVE else None,
+            "rate_limit": self.bucket.rate,
+            "error": self.error
+        }
+
+
+class DownloadScheduler:
+    """Единая очередь всех загрузок: приоритеты, пауза/продолжение/перестановка,
+    общий и пер-задание пределы скорости, ограничение числа одновременных загрузок.
+
+    Очередь упорядочена по (priority, порядок добавления); меньшее значение раньше.
+    Запускается не больше max_active заданий, каждое в своем потоке.
+    on_status(list) получает снимок status() при изменениях (из рабочих потоков,
+    не чаще STATUS_INTERVAL для прогресса); on_finished(game_id, state, result_or_error)
+    вызывается по окончании задания.
+    """
+
+    def __init__(self, max_active=DEFAULT_MAX_ACTIVE, global_rate=None, on_status=None, on_finished=None):
+        self.lock = threading.RLock()
+        self.jobs = {} # game_id -> ScheduledJob
+        self.seq = itertools.count()
+        self.max_active = max_active
+        self.global_rate = global_rate
+        self.game_running = False
+        self.global_bucket = TokenBucket(self.effective_global_rate())
+        self.on_status = on_status
+        self.on_finished = on_finished
+        self.last_status = 0.0
+
+    # ----------------- НАСТРОЙКИ -----------------
+
+    def effective_global_rate(self):
+        if not self.game_running:
+            return self.global_rate
+        if self.global_rate:
+            return min(self.global_rate, PLAYING_RATE_LIMIT)
+        return PLAYING_RATE_LIMIT
+
+    def set_global_rate(self, rate):
+        with self.lock:
+            self.global_rate = rate or None
+            self.global_bucket.set_rate(self.effective_global_rate())
+        self.notify()
+
+    def set_game_running(self, running):
+        """Пока идет игра, общий предел опускается до PLAYING_RATE_LIMIT."""
+        with self.lock:
+            self.game_running = bool(running)
+            self.global_bucket.set_rate(self.effective_global_rate())
+        self.notify()
+
+    def set_job_rate(self, game_id, rate):
+        with self.lock:
+            scheduled = self.find(game_id)
+            if scheduled is None:
+                return False
+            scheduled.bucket.set_rate(rate)
+        self.notify()
+        return True
+
+    def set_max_active(self, max_active):
+        """Уменьшение предела не прерывает уже идущие загрузки, новые ждут очереди."""
+        with self.lock:
+            self.max_active = max(1, int(max_active))
+        self.dispatch()
+
+    # ----------------- ОЧЕРЕДЬ -----------------
+
+    def ordered(self):
+        """Задания очереди по порядку, без убранных (removed)."""
+        with self.lock:
+            return sorted((scheduled for scheduled in self.jobs.values() if not scheduled.removed),
+                          key=lambda scheduled: scheduled.sort_key)
+
+    def find(self, game_id):
+        """Задание игры или None; убранное, чей поток еще не завершился, не находится."""
+        with self.lock:
+            scheduled = self.jobs.get(game_id)
+            return None if scheduled is None or scheduled.removed else scheduled
+
+    def enqueue(self, game_id, title, factory, priority=0, rate_limit=None):
+        """Добавляет загрузку в очередь (или возобновляет приостановленную)."""
+        with self.lock:
+            scheduled = self.jobs.get(game_id)
+            if scheduled is not None and scheduled.removed:
+                # Поток убранного задания еще пишет тот же файл: второй писатель не создается,
+                # задание возвращается в конец очереди и стартует заново после выхода потока
+                scheduled.removed = False
+                scheduled.state = QUEUED
+                scheduled.title = title
+                scheduled.factory = factory
+                scheduled.priority = priority
+                scheduled.seq = next(self.seq)
+                scheduled.bucket.set_rate(rate_limit)
+                scheduled.error = None
+            elif scheduled is not None and scheduled.state in (QUEUED, ACTIVE):
+                return scheduled
+            elif scheduled is not None and scheduled.state == PAUSED:
+                scheduled.state = QUEUED
+            else:
+                scheduled = ScheduledJob(game_id, title, factory, priority, next(self.seq), rate_limit)
+                self.jobs[game_id] = scheduled
+        self.dispatch()
+        return scheduled
+
+    def pause(self, game_id):
+        with self.lock:
+            scheduled = self.find(game_id)
+            if scheduled is None or scheduled.state not in (QUEUED, ACTIVE):
+                return False
+            was_active = scheduled.state == ACTIVE
+            scheduled.state = PAUSED
+            if was_active:
+                scheduled.stop_event.set()
+                scheduled.job.cancel()
+        self.dispatch()
+        return True
+
+    def resume(self, game_id):
+        with self.lock:
+            scheduled = self.find(game_id)
+            if scheduled is None or scheduled.state not in (PAUSED, FAILED):
+                return False
+            scheduled.state = QUEUED
+            scheduled.error = None
+        self.dispatch()
+        return True
+
+    def remove(self, game_id):
+        """Убирает задание из очереди; активное останавливается (файлы докачки остаются).
+        Пока поток задания не завершился, запись остается в jobs с пометкой removed:
+        она занимает слот (active_count) и не дает enqueue запустить второй поток
+        с тем же файлом; run_job удаляет ее по выходе потока."""
+        with self.lock:
+            scheduled = self.find(game_id)
+            if scheduled is None:
+                return False
+            if scheduled.job is None:
+                del self.jobs[game_id]
+            else:
+                scheduled.removed = True
+                if scheduled.state == ACTIVE:
+                    scheduled.stop_event.set()
+                    scheduled.job.cancel()
+                scheduled.state = PAUSED
+        self.dispatch()
+        return True
+
+    def move(self, game_id, position):
+        """Ставит задание на позицию position (0 - первое) внутри его приоритета.
+        Порядковые номера перенумеровываются, так что порядок остается стабильным."""
+        with self.lock:
+            scheduled = self.find(game_id)
+            if scheduled is None:
+                return False
+            order = [j for j in self.ordered() if j is not scheduled]
+            position = max(0, min(int(position), len(order)))
+            order.insert(position, scheduled)
+            # Соседи по новой позиции задают приоритет, чтобы перенос был виден в общем порядке
+            neighbour = order[position + 1] if position + 1 < len(order) else (order[position - 1] if position else None)
+            if neighbour is not None:
+                scheduled.priority = neighbour.priority
+            for job in order:
+                job.seq = next(self.seq)
+        self.dispatch()
+        return True
+
+    def set_priority(self, game_id, priority):
+        with self.lock:
+            scheduled = self.find(game_id)
+            if scheduled is None:
+                return False
+            scheduled.priority = priority
+        self.dispatch()
+        return True
+
+    def status(self):
+        """Снимок очереди для вкладки загрузок: позиция, состояние, скорость, ETA."""
+        with self.lock:
+            return [scheduled.status(position) for position, scheduled in enumerate(self.ordered())]
+
+    def active_count(self):
+        """Занятые слоты: идущие задания и приостановленные, чей поток еще не завершился."""
+        with self.lock:
+            return sum(1 for scheduled in self.jobs.values() if scheduled.job is not None)
+
+    # ----------------- ЗАПУСК -----------------
+
+    def dispatch(self):
+        """Запускает задания из головы очереди, пока есть свободные слоты."""
+        failed = []
+        with self.lock:
+            free = self.max_active - self.active_count()
+            for scheduled in self.ordered():
+                if free <= 0:
+                    break
+                if scheduled.state != QUEUED or scheduled.job is not None:
+                    continue
+                error = self.start(scheduled)
+                if error is None:
+                    free -= 1
+                else:
+                    failed.append((scheduled.game_id, error))
+        self.notify(force=True)
+        # Задание, которое не удалось создать, завершается сразу - потока для него нет
+        if self.on_finished is not None:
+            for game_id, error in failed:
+                self.on_finished(game_id, FAILED, error)
+
+    def start(self, scheduled):
+        """Создает задание и запускает его поток. Возвращает исключение, если задание не создалось."""
+        scheduled.state = ACTIVE
+        scheduled.speed = 0.0
+        scheduled.stop_event = threading.Event()
+        limiter = JobLimiter(scheduled.bucket, self.global_bucket, scheduled.stop_event)
+
+        def on_progress(downloaded, total, speed):
+            scheduled.downloaded = downloaded
+            scheduled.total = total
+            scheduled.speed = speed
+            self.notify()
+
+        try:
+            scheduled.job = scheduled.factory(on_progress, limiter)
+        except Exception as e:
+            scheduled.state = FAILED
+            scheduled.error = str(e)
+            print(f"ОШИБКА загрузки '{scheduled.title}': {e}")
+            return e
+        threading.Thread(target=self.run_job, args=(scheduled, scheduled.job),
+                         name=f"download-{scheduled.game_id}", daemon=True).start()
+        return None
+
+    def run_job(self, scheduled, job):
+        result = None
+        try:
+            result = job.run()
+            state = DONE
+        except DownloadCancelled:
+            state = PAUSED
+        except Exception as e:
+            state = FAILED
+            result = e
+            print(f"ОШИБКА загрузки '{scheduled.title}': {e}")
+
+        with self.lock:
+            if scheduled.job is job:
+                scheduled.job = None
+                if scheduled.state == ACTIVE or state != PAUSED:
+                    scheduled.state = state
+                if state == FAILED:
+                    scheduled.error = str(result)
+                if state == DONE:
+                    scheduled.result = result
+                if state == DONE or scheduled.removed:
+                    self.jobs.pop(scheduled.game_id, None)
+        if self.on_finished is not None:
+            self.on_finished(scheduled.game_id, state, result)
+        self.dispatch()
+
+    def notify(self, force=False):
+        if self.on_status is None:
+            return
+        now = time.monotonic()
+        with self.lock:
+            if not force and now - self.last_status < STATUS_INTERVAL:
+                return
+            self.last_status = now
+            snapshot = self.status()
+        self.on_status(snapshot)
+
+    def shutdown(self):
+        """Останавливает все активные загрузки (журналы докачки сохраняются)."""
+        with self.lock:
+            for scheduled in self.jobs.values():
+                if scheduled.state == ACTIVE:
+                    scheduled.state = PAUSED
+                    scheduled.stop_event.set()
+                    scheduled.job.cancel()
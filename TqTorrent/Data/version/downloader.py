@@ -0,0 +1,291 @@
+import os # Стандартная библиотека
+import json # Стандартная библиотека
+import time # Стандартная библиотека
+import threading # Стандартная библиотека
+import urllib.request # Стандартная библиотека
+import urllib.parse # Стандартная библиотека
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# --- НАСТРОЙКИ ЗАГРУЗКИ ---
+DEFAULT_SEGMENTS = 4
+DEFAULT_WORKERS = 4
+CHUNK_SIZE = 256 * 1024
+PROGRESS_INTERVAL = 0.2 # Не чаще одного события прогресса за столько секунд
+JOURNAL_INTERVAL = 1.0 # Как часто сохранять журнал докачки
+REQUEST_TIMEOUT = 30
+PART_SUFFIX = ".part"
+JOURNAL_SUFFIX = ".tqjournal"
+# --------------------
+
+
+class DownloadCancelled(Exception):
+    pass
+
+
+def filename_from_url(url, fallback):
+    name = os.path.basename(urllib.parse.unquote(urllib.parse.urlparse(url).path))
+    return name or fallback
+
+
+def probe(url):
+    """Узнает размер файла, поддержку Range и версию файла на сервере запросом bytes=0-0.
+    Возвращает (размер, Range поддерживается, {"etag", "last_modified"})."""
+    request = urllib.request.Request(url, headers={"Range": "bytes=0-0"})
+    with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT) as response:
+        validators = {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+        if response.status == 206:
+            content_range = response.headers.get("Content-Range", "")
+            total = content_range.rsplit("/", 1)[-1]
+            if total.isdigit():
+                return int(total), True, validators
+        length = response.headers.get("Content-Length")
+        return (int(length) if length and length.isdigit() else None), False, validators
+
+
+def if_range(validators):
+    """Значение If-Range: сильный ETag, иначе Last-Modified (слабый ETag в If-Range не допускается)."""
+    etag = validators.get("etag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return validators.get("last_modified")
+
+
+def split_segments(size, count):
+    """Делит [0, size) на count смежных диапазонов."""
+    count = max(1, min(count, size // CHUNK_SIZE or 1))
+    step = size // count
+    segments = []
+    for i in range(count):
+        start = i * step
+        end = size - 1 if i == count - 1 else start + step - 1
+        segments.append({"start": start, "end": end, "done": 0})
+    return segments
+
+
+if hasattr(os, "pwrite"):
+    def pwrite(fd, data, offset, lock):
+        os.pwrite(fd, data, offset)
+else:
+    def pwrite(fd, data, offset, lock):
+        # Windows: нет pwrite, позиционируем и пишем под блокировкой
+        with lock:
+            os.lseek(fd, offset, os.SEEK_SET)
+            os.write(fd, data)
+
+
+def preallocate(fd, size):
+    if hasattr(os, "posix_fallocate") and size > 0:
+        try:
+            os.posix_fallocate(fd, 0, size)
+            return
+        except OSError:
+            pass
+    os.ftruncate(fd, size)
+
+
+class SegmentedDownload:
+    """Многопоточная загрузка файла HTTP Range-сегментами с докачкой.
+
+    Сегменты пишутся в заранее выделенный файл <dest>.part через pwrite.
+    Журнал <dest>.tqjournal хранит, сколько байт каждого сегмента уже записано,
+    и ETag/Last-Modified файла, поэтому прерванная загрузка продолжается с места
+    остановки, а файл, измененный на сервере, скачивается заново. Запросы
+    диапазонов идут с If-Range: части другой версии файла не смешиваются.
+    on_progress(downloaded, total, bytes_per_sec) вызывается из рабочих потоков
+    не чаще PROGRESS_INTERVAL и еще раз по окончании (в том числе при ошибке).
+    on_finished(path, error) вызывается по окончании run() в том же потоке:
+    error - None при успехе, DownloadCancelled при отмене, иначе исключение
+    (его же бросает run()). Ошибка сегмента в рабочем потоке останавливает
+    остальные сегменты и сохраняется в self.error.
+    """
+
+    def __init__(self, url, dest_path, segments=DEFAULT_SEGMENTS, workers=DEFAULT_WORKERS,
+                 on_progress=None, throttle=None, on_finished=None):
+        self.url = url
+        self.dest_path = dest_path
+        self.part_path = dest_path + PART_SUFFIX
+        self.journal_path = dest_path + JOURNAL_SUFFIX
+        self.segment_count = segments
+        self.workers = workers
+        self.on_progress = on_progress
+        self.on_finished = on_finished
+        # throttle(nbytes) блокирует поток, пока не разрешено передать nbytes (ограничение скорости)
+        self.throttle = throttle
+
+        self.cancel_event = threading.Event()
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.journal_lock = threading.Lock()
+        self.total = None
+        self.validators = {"etag": None, "last_modified": None}
+        self.segments = []
+        self.last_progress = 0.0
+        self.last_journal = 0.0
+        self.speed_mark = (time.monotonic(), 0)
+        self.speed = 0.0
+        self.error = None
+
+    # ----------------- СОСТОЯНИЕ -----------------
+
+    @property
+    def downloaded(self):
+        with self.lock:
+            return sum(s["done"] for s in self.segments)
+
+    def cancel(self):
+        """Останавливает загрузку; журнал сохраняется для докачки."""
+        self.cancel_event.set()
+
+    def load_journal(self):
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                journal = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if journal.get("url") != self.url or not os.path.exists(self.part_path):
+            return None
+        return journal
+
+    def save_journal(self):
+        with self.lock:
+            journal = {"url": self.url, "total": self.total, **self.validators,
+                       "segments": [dict(s) for s in self.segments]}
+        tmp_path = self.journal_path + ".tmp"
+        with self.journal_lock:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(journal, f)
+            os.replace(tmp_path, self.journal_path)
+
+    # ----------------- ЗАГРУЗКА -----------------
+
+    def run(self):
+        """Выполняет загрузку целиком. Возвращает путь к готовому файлу.
+        При отмене бросает DownloadCancelled (журнал остается). Исход передается
+        и в on_finished."""
+        try:
+            path = self.download()
+        except Exception as e:
+            self.error = e
+            # Последний прогресс - сколько успело записаться (журнал уже сохранен в download)
+            if self.on_progress is not None and self.segments:
+                self.on_progress(self.downloaded, self.total, self.speed)
+            if self.on_finished is not None:
+                self.on_finished(None, e)
+            raise
+        if self.on_finished is not None:
+            self.on_finished(path, None)
+        return path
+
+    def download(self):
+        """Сама загрузка для run(): проба, разбиение или журнал, сегменты в пуле потоков."""
+        total, ranges, self.validators = probe(self.url)
+        journal = self.load_journal()
+
+        resumed = bool(journal) and journal.get("total") == total and ranges
+        if resumed and any(journal.get(key) != value for key, value in self.validators.items()):
+            # Файл на сервере заменен: записанные куски от другой версии
+            print(f"Python: {os.path.basename(self.dest_path)} изменился на сервере, загрузка заново.")
+            resumed = False
+        if resumed:
+            self.total = total
+            self.segments = journal["segments"]
+            print(f"Python: Докачка {os.path.basename(self.dest_path)} с {self.downloaded} из {total} байт.")
+        elif total is not None and ranges:
+            self.total = total
+            self.segments = split_segments(total, self.segment_count)
+        else:
+            # Сервер не умеет Range: один поток, без докачки
+            self.total = total
+            self.segments = [{"start": 0, "end": (total - 1) if total else None, "done": 0}]
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.dest_path)), exist_ok=True)
+        fd = os.open(self.part_path, os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0))
+        try:
+            if not resumed:
+                os.ftruncate(fd, 0)
+                if self.total is not None:
+                    preallocate(fd, self.total)
+            self.save_journal()
+
+            pending = [s for s in self.segments if s["end"] is None or s["start"] + s["done"] <= s["end"]]
+            with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(pending)))) as pool:
+                futures = [pool.submit(self.fetch_segment, fd, s, ranges) for s in pending]
+                errors = []
+                # По мере завершения: ошибка одного сегмента сразу останавливает остальные
+                for future in as_completed(futures):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        errors.append(e)
+                        self.cancel_event.set()
+        finally:
+            os.close(fd)
+
+        self.save_journal()
+        if errors:
+            if all(isinstance(e, DownloadCancelled) for e in errors):
+                raise DownloadCancelled(self.dest_path)
+            raise next(e for e in errors if not isinstance(e, DownloadCancelled))
+
+        self.report_progress(force=True)
+        os.replace(self.part_path, self.dest_path)
+        os.remove(self.journal_path)
+        return self.dest_path
+
+    def fetch_segment(self, fd, segment, ranges):
+        offset = segment["start"] + segment["done"]
+        headers = {}
+        if ranges:
+            headers["Range"] = f"bytes={offset}-{segment['end']}"
+            validator = if_range(self.validators)
+            if validator:
+                # Файл изменился после пробы - сервер ответит 200 с новой версией вместо диапазона
+                headers["If-Range"] = validator
+        request = urllib.request.Request(self.url, headers=headers)
+
+        with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT) as response:
+            if ranges and response.status != 206:
+                if "If-Range" in headers and response.status == 200:
+                    raise IOError(f"Файл на сервере изменился во время загрузки ({headers['If-Range']})")
+                raise IOError(f"Сервер не вернул диапазон {headers['Range']} (HTTP {response.status})")
+            while True:
+                if self.cancel_event.is_set():
+                    raise DownloadCancelled(self.dest_path)
+                want = CHUNK_SIZE
+                if segment["end"] is not None:
+                    want = min(want, segment["end"] + 1 - offset)
+                    if want <= 0:
+                        break
+                if self.throttle is not None:
+                    self.throttle(want)
+                data = response.read(want)
+                if not data:
+                    break
+                pwrite(fd, data, offset, self.write_lock)
+                offset += len(data)
+                with self.lock:
+                    segment["done"] += len(data)
+                self.report_progress()
+
+        if segment["end"] is not None and offset <= segment["end"]:
+            raise IOError(f"Соединение оборвалось на байте {offset} из {segment['end'] + 1}")
+
+    def report_progress(self, force=False):
+        now = time.monotonic()
+        with self.lock:
+            if not force and now - self.last_progress < PROGRESS_INTERVAL:
+                return
+            self.last_progress = now
+            downloaded = sum(s["done"] for s in self.segments)
+            mark_time, mark_bytes = self.speed_mark
+            if now - mark_time >= PROGRESS_INTERVAL:
+                self.speed = (downloaded - mark_bytes) / (now - mark_time)
+                self.speed_mark = (now, downloaded)
+            save_journal = now - self.last_journal >= JOURNAL_INTERVAL
+            if save_journal:
+                self.last_journal = now
+
+        if save_journal:
+            self.save_journal()
+        if self.on_progress is not None:
+            self.on_progress(downloaded, self.total, self.speed)
@@ -0,0 +1,90 @@
+import os # Стандартная библиотека
+from PyQt6.QtCore import QObject, QTimer, QFileSystemWatcher, pyqtSignal
+
+# --- НАСТРОЙКИ НАБЛЮДЕНИЯ ---
+DEBOUNCE_MS = 150 # Окно склейки серии записей в одно событие
+POLL_INTERVAL_MS = 5000 # Интервал опроса mtime, если QFileSystemWatcher недоступен
+# --------------------
+
+
+def file_fingerprint(path):
+    """Возвращает (mtime_ns, size) файла или None, если файла нет."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class ConfigFileWatcher(QObject):
+    """Событийное наблюдение за файлами конфигурации (cache.txt, data.json, plus_file.txt).
+
+    Использует QFileSystemWatcher (inotify на Linux). Следит и за самими файлами,
+    и за их каталогом, чтобы заново подписаться на файл, который редактор
+    заменил через rename. Серия изменений склеивается таймером DEBOUNCE_MS
+    в один сигнал filesChanged со списком реально изменившихся файлов.
+    Если наблюдатель не смог подписаться, включается опрос mtime раз в POLL_INTERVAL_MS.
+    """
+
+    filesChanged = pyqtSignal(list)
+
+    def __init__(self, paths, parent=None, debounce_ms=DEBOUNCE_MS, poll_interval_ms=POLL_INTERVAL_MS):
+        super().__init__(parent)
+        self.paths = [os.path.abspath(p) for p in paths]
+        self.directories = sorted({os.path.dirname(p) for p in self.paths})
+        self.fingerprints = {p: file_fingerprint(p) for p in self.paths}
+
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(debounce_ms)
+        self.debounce_timer.timeout.connect(self.flush_changes)
+
+        self.poll_timer = QTimer(self)
+        self.poll_timer.setInterval(poll_interval_ms)
+        self.poll_timer.timeout.connect(self.flush_changes)
+
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self.on_path_event)
+        self.watcher.directoryChanged.connect(self.on_path_event)
+
+    def start(self):
+        """Подписывается на файлы и каталоги; при неудаче включает опрос."""
+        failed = self.watcher.addPaths([d for d in self.directories if os.path.isdir(d)])
+        self.rearm_files()
+
+        if failed or not self.watcher.directories():
+            print("Python: QFileSystemWatcher недоступен, включен опрос файлов конфигурации.")
+            self.poll_timer.start()
+        else:
+            print("Python: Запущено наблюдение за файлами конфигурации.")
+
+    def stop(self):
+        self.debounce_timer.stop()
+        self.poll_timer.stop()
+        watched = self.watcher.files() + self.watcher.directories()
+        if watched:
+            self.watcher.removePaths(watched)
+
+    def rearm_files(self):
+        """Заново добавляет в наблюдатель файлы, которые из него выпали (замена через rename)."""
+        watched = set(self.watcher.files())
+        missing = [p for p in self.paths if p not in watched and os.path.exists(p)]
+        if missing:
+            self.watcher.addPaths(missing)
+
+    def on_path_event(self, path):
+        self.rearm_files()
+        # Перезапуск таймера склеивает серию записей в одно событие
+        self.debounce_timer.start()
+
+    def flush_changes(self):
+        """Сравнивает отпечатки файлов и сообщает только о реально изменившихся."""
+        self.rearm_files()
+        changed = []
+        for path in self.paths:
+            current = file_fingerprint(path)
+            if current != self.fingerprints[path]:
+                self.fingerprints[path] = current
+                changed.append(path)
+        if changed:
+            self.filesChanged.emit(changed)
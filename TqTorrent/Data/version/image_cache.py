@@ -0,0 +1,298 @@
+import os # Стандартная библиотека
+import json # Стандартная библиотека
+import hashlib # Стандартная библиотека
+import threading # Стандартная библиотека
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import Qt, QBuffer, QByteArray, QIODevice
+from PyQt6.QtGui import QImage
+
+# --- НАСТРОЙКИ КЭША ОБЛОЖЕК ---
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024 # Предел размера кэша на диске
+THUMB_SIZE = (480, 270) # Миниатюра для сетки (покрывает карточку 180px по высоте на HiDPI)
+THUMB_QUALITY = 85
+FETCH_WORKERS = 4
+FETCH_TIMEOUT = 20
+MAX_IMAGE_BYTES = 20 * 1024 * 1024 # Больше - не картинка обложки
+INDEX_FILE_NAME = "index.json"
+INDEX_VERSION = 1
+# --------------------
+
+FULL = "full"
+THUMB = "thumb"
+
+
+def sniff_mime(data, fallback="application/octet-stream"):
+    """MIME по сигнатуре файла (заголовкам сервера обложек верить нельзя)."""
+    if data.startswith(b"\x89PNG"):
+        return "image/png"
+    if data.startswith(b"\xff\xd8"):
+        return "image/jpeg"
+    if data.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return fallback
+
+
+def make_thumbnail(data, size=THUMB_SIZE):
+    """Уменьшенная копия (JPEG или PNG при прозрачности) или None, если уменьшать нечего."""
+    image = QImage.fromData(data)
+    if image.isNull():
+        return None, None
+    width, height = size
+    if image.width() <= width and image.height() <= height:
+        return None, None
+    scaled = image.scaled(width, height, Qt.AspectRatioMode.KeepAspectRatioByExpanding,
+                          Qt.TransformationMode.SmoothTransformation)
+    image_format, mime = ("PNG", "image/png") if scaled.hasAlphaChannel() else ("JPEG", "image/jpeg")
+    array = QByteArray()
+    buffer = QBuffer(array)
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    scaled.save(buffer, image_format, THUMB_QUALITY)
+    buffer.close()
+    return bytes(array), mime
+
+
+def is_under(path, roots):
+    """Лежит ли path (после разрешения ссылок и "..") внутри одного из каталогов roots."""
+    real = os.path.normcase(os.path.realpath(path))
+    for root in roots:
+        root = os.path.normcase(os.path.realpath(root))
+        try:
+            if os.path.commonpath([real, root]) == root:
+                return True
+        except ValueError: # Разные диски (Windows)
+            continue
+    return False
+
+
+def read_source(url, local_roots=()):
+    """Байты обложки по http(s)-ссылке или из локального файла внутри local_roots.
+
+    Ссылка на обложку приходит из каталога (файлы конфигурации, catalog.db),
+    поэтому читаются только http(s) и файлы в разрешенных каталогах: иначе
+    страница через tqimg: получила бы любой файл с диска. Относительный путь
+    считается от первого из local_roots (каталог конфигурации)."""
+    if url.lower().startswith(("http://", "https://")):
+        import urllib.request # Не при старте: импорт http/ssl заметно удлиняет запуск
+        request = urllib.request.Request(url, headers={"User-Agent": "TqTorrent"})
+        with urllib.request.urlopen(request, timeout=FETCH_TIMEOUT) as response:
+            data = response.read(MAX_IMAGE_BYTES + 1)
+    elif "://" in url or not local_roots:
+        raise IOError(f"Недопустимая ссылка на обложку: {url}")
+    else:
+        path = url if os.path.isabs(url) else os.path.join(local_roots[0], url)
+        if not is_under(path, local_roots):
+            raise IOError(f"Обложка вне каталогов конфигурации и обложек: {url}")
+        with open(path, 'rb') as f:
+            data = f.read(MAX_IMAGE_BYTES + 1)
+    if len(data) > MAX_IMAGE_BYTES:
+        raise IOError(f"Обложка больше {MAX_IMAGE_BYTES} байт: {url}")
+    return data
+
+
+class ImageCache:
+    """Дисковый кэш обложек с адресацией по содержимому и вытеснением LRU.
+
+    Файлы лежат в objects/<ab>/<sha256> (оригинал) и <sha256>.thumb (миниатюра),
+    поэтому одинаковые картинки по разным ссылкам хранятся один раз.
+    index.json хранит ссылки -> хеш и порядок последнего доступа; при превышении
+    max_bytes удаляются давно не показанные картинки. Загрузка идет в пуле потоков.
+    Локальные обложки читаются только из каталогов local_roots (см. read_source).
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES, thumb_size=THUMB_SIZE, workers=FETCH_WORKERS,
+                 local_roots=()):
+        self.cache_dir = cache_dir
+        self.local_roots = tuple(local_roots)
+        self.objects_dir = os.path.join(cache_dir, "objects")
+        self.index_path = os.path.join(cache_dir, INDEX_FILE_NAME)
+        self.max_bytes = max_bytes
+        self.thumb_size = thumb_size
+        self.lock = threading.Lock()
+        self.urls = {} # ссылка -> sha256
+        self.entries = OrderedDict() # sha256 -> {"size", "mime", "thumb_size", "thumb_mime"}; старые первыми
+        self.total = 0
+        self.pending = {} # ссылка -> Future загрузки
+        self.dirty = False
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="image-fetch")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.load_index()
+
+    # ----------------- ИНДЕКС -----------------
+
+    def object_path(self, digest, kind=FULL):
+        name = digest + (".thumb" if kind == THUMB else "")
+        return os.path.join(self.objects_dir, digest[:2], name)
+
+    def load_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return
+        if index.get("version") != INDEX_VERSION:
+            return
+        for digest, entry in index.get("lru", []):
+            # Файл могли удалить руками - такая запись не нужна
+            if os.path.exists(self.object_path(digest)):
+                self.entries[digest] = entry
+                self.total += entry["size"] + entry.get("thumb_size", 0)
+        self.urls = {url: digest for url, digest in index.get("urls", {}).items() if digest in self.entries}
+
+    def flush(self):
+        """Сохраняет индекс (атомарно), если он менялся."""
+        with self.lock:
+            if not self.dirty:
+                return
+            index = {"version": INDEX_VERSION, "urls": dict(self.urls), "lru": list(self.entries.items())}
+            self.dirty = False
+        tmp_path = self.index_path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(index, f, ensure_ascii=False)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"ОШИБКА записи индекса кэша обложек: {e}")
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        self.flush()
+
+    # ----------------- ЧТЕНИЕ -----------------
+
+    def lookup(self, url, kind=FULL):
+        """(путь, mime) закэшированной картинки или None. Отмечает доступ для LRU.
+        Если миниатюры нет (картинка и так маленькая), отдается оригинал."""
+        with self.lock:
+            digest = self.urls.get(url)
+            if digest is None:
+                return None
+            entry = self.entries[digest]
+            self.entries.move_to_end(digest)
+            self.dirty = True
+            if kind == THUMB and entry.get("thumb_size"):
+                return self.object_path(digest, THUMB), entry["thumb_mime"]
+            return self.object_path(digest), entry["mime"]
+
+    def read(self, url, kind=FULL):
+        """(bytes, mime) или None; если файл пропал с диска, запись забывается."""
+        hit = self.lookup(url, kind)
+        if hit is None:
+            return None
+        path, mime = hit
+        try:
+            with open(path, 'rb') as f:
+                return f.read(), mime
+        except OSError:
+            self.forget(url)
+            return None
+
+    def forget(self, url):
+        with self.lock:
+            digest = self.urls.pop(url, None)
+            if digest is not None and digest not in self.urls.values():
+                self._drop(digest)
+            self.dirty = True
+
+    # ----------------- ЗАГРУЗКА -----------------
+
+    def fetch_async(self, url, callback=None):
+        """Ставит загрузку в пул (повторные вызовы для той же ссылки объединяются).
+        callback(ok) вызывается из рабочего потока."""
+        with self.lock:
+            future = self.pending.get(url)
+            if future is None:
+                if url in self.urls:
+                    future = None
+                else:
+                    future = self.pool.submit(self.fetch, url)
+                    self.pending[url] = future
+        if future is None:
+            if callback is not None:
+                callback(True)
+            return None
+        if callback is not None:
+            future.add_done_callback(lambda f: callback(not f.cancelled() and f.exception() is None and f.result()))
+        return future
+
+    def prefetch(self, urls):
+        for url in urls:
+            if url:
+                self.fetch_async(url)
+
+    def fetch(self, url):
+        """Скачивает картинку, сохраняет оригинал и миниатюру. Возвращает True при успехе."""
+        try:
+            data = read_source(url, self.local_roots)
+            digest = hashlib.sha256(data).hexdigest()
+            with self.lock:
+                known = digest in self.entries
+            if not known:
+                self.store(digest, data)
+            with self.lock:
+                if digest in self.entries:
+                    self.urls[url] = digest
+                    self.dirty = True
+            return True
+        except Exception as e:
+            print(f"ОШИБКА загрузки обложки {url}: {e}")
+            return False
+        finally:
+            with self.lock:
+                self.pending.pop(url, None)
+                batch_done = not self.pending
+            # Индекс сохраняется в конце пачки загрузок, а не после каждой картинки
+            if batch_done:
+                self.flush()
+
+    def store(self, digest, data):
+        thumb, thumb_mime = make_thumbnail(data, self.thumb_size)
+        path = self.object_path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._write(path, data)
+        entry = {"size": len(data), "mime": sniff_mime(data)}
+        if thumb is not None:
+            self._write(self.object_path(digest, THUMB), thumb)
+            entry["thumb_size"] = len(thumb)
+            entry["thumb_mime"] = thumb_mime
+
+        with self.lock:
+            self.entries[digest] = entry
+            self.total += entry["size"] + entry.get("thumb_size", 0)
+            self.dirty = True
+            self._evict(keep=digest)
+
+    @staticmethod
+    def _write(path, data):
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    # ----------------- ВЫТЕСНЕНИЕ -----------------
+
+    def _evict(self, keep=None):
+        """Удаляет самые давно использованные картинки, пока кэш больше max_bytes (под self.lock)."""
+        while self.total > self.max_bytes and self.entries:
+            digest = next(iter(self.entries))
+            if digest == keep:
+                if len(self.entries) == 1:
+                    break
+                self.entries.move_to_end(digest)
+                continue
+            self._drop(digest)
+            for url in [u for u, d in self.urls.items() if d == digest]:
+                del self.urls[url]
+
+    def _drop(self, digest):
+        entry = self.entries.pop(digest, None)
+        if entry is None:
+            return
+        self.total -= entry["size"] + entry.get("thumb_size", 0)
+        for kind in (FULL, THUMB):
+            try:
+                os.remove(self.object_path(digest, kind))
+            except OSError:
+                pass
@@ -0,0 +1,75 @@
+from PyQt6.QtCore import QUrl, QUrlQuery, QBuffer, QByteArray, pyqtSignal
+from PyQt6.QtWebEngineCore import QWebEngineUrlScheme, QWebEngineUrlSchemeHandler, QWebEngineUrlRequestJob
+
+from image_cache import FULL, THUMB
+
+SCHEME_NAME = b"tqimg"
+
+
+def register_scheme():
+    """Регистрирует tqimg: до создания QApplication (требование QtWebEngine)."""
+    scheme = QWebEngineUrlScheme(SCHEME_NAME)
+    scheme.setSyntax(QWebEngineUrlScheme.Syntax.Path)
+    scheme.setFlags(QWebEngineUrlScheme.Flag.SecureScheme
+                    | QWebEngineUrlScheme.Flag.LocalScheme
+                    | QWebEngineUrlScheme.Flag.LocalAccessAllowed)
+    QWebEngineUrlScheme.registerScheme(scheme)
+
+
+class ImageSchemeHandler(QWebEngineUrlSchemeHandler):
+    """Отдает обложки из ImageCache по ссылкам tqimg:thumb?u=<url> и tqimg:full?u=<url>.
+
+    Попадание в кэш отвечается сразу с диска. При промахе запрос ждет фоновой
+    загрузки; если она не удалась, http(s)-ссылка перенаправляется на исходный адрес.
+    """
+
+    # исходная ссылка, загрузка которой завершилась (доставляется в GUI-поток)
+    fetched = pyqtSignal(str)
+
+    def __init__(self, cache, parent=None):
+        super().__init__(parent)
+        self.cache = cache
+        self.waiting = {} # исходная ссылка -> [(job, вид)]
+        self.fetched.connect(self.on_fetched)
+
+    def requestStarted(self, job):
+        url = job.requestUrl()
+        kind = THUMB if url.path() == THUMB else FULL
+        source = QUrlQuery(url).queryItemValue("u", QUrl.ComponentFormattingOption.FullyDecoded)
+        if not source:
+            job.fail(QWebEngineUrlRequestJob.Error.UrlInvalid)
+            return
+
+        if self.reply(job, source, kind):
+            return
+        waiters = self.waiting.setdefault(source, [])
+        waiters.append((job, kind))
+        # Страница может отменить запрос, пока картинка качается: Qt удалит job
+        job.destroyed.connect(lambda _=None, source=source, job=job: self.drop_waiter(source, job))
+        if len(waiters) == 1:
+            self.cache.fetch_async(source, lambda ok: self.fetched.emit(source))
+
+    def reply(self, job, source, kind):
+        hit = self.cache.read(source, kind)
+        if hit is None:
+            return False
+        data, mime = hit
+        buffer = QBuffer(job)
+        buffer.setData(QByteArray(data))
+        job.reply(mime.encode("ascii"), buffer)
+        return True
+
+    def drop_waiter(self, source, job):
+        """Отмененный запрос (job.destroyed) больше не ждет загрузки."""
+        waiters = self.waiting.get(source)
+        if waiters:
+            waiters[:] = [(waiting_job, kind) for waiting_job, kind in waiters if waiting_job is not job]
+
+    def on_fetched(self, source):
+        for job, kind in self.waiting.pop(source, []):
+            if self.reply(job, source, kind):
+                continue
+            if source.lower().startswith(("http://", "https://")):
+                job.redirect(QUrl(source))
+            else:
+                job.fail(QWebEngineUrlRequestJob.Error.UrlNotFound)
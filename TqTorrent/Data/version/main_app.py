@@ -1,217 +1,739 @@
-import sys
-import os # Стандартная библиотека
-import json # Стандартная библиотека
-import subprocess # Стандартная библиотека
-import time # Стандартная библиотека
-from PyQt6.QtWidgets import QApplication, QMainWindow
-from PyQt6.QtWebEngineWidgets import QWebEngineView
-from PyQt6.QtCore import QUrl, QObject, pyqtSlot, QTimer 
-from PyQt6.QtWebChannel import QWebChannel 
-import re # Стандартная библиотека
-
-# --- КОНФИГУРАЦИЯ (Проверьте пути!) ---
-BASE_CONFIG_PATH = r"C:\Users\drswa\OneDrive\Documents\TqTorrent\Data\config"
-DATA_FILE_PATH = os.path.join(BASE_CONFIG_PATH, "data.json")
-CACHE_FILE_PATH = os.path.join(BASE_CONFIG_PATH, "cache.txt")
-PLUS_FILE_PATH = os.path.join(BASE_CONFIG_PATH, "plus_file.txt") 
-# --------------------
-
-# ----------------- КЛАСС-МОСТ (PYTHON -> JAVASCRIPT) -----------------
-class GameLauncherBridge(QObject):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.parent = parent 
-        
-    @pyqtSlot(str, result=str)
-    def launchGame(self, launch_path):
-        """Запускает игру, используя Popen с правильным рабочим каталогом."""
-        print(f"Python: Попытка запустить: {launch_path}")
-        try:
-            # Получаем каталог, в котором находится исполняемый файл, для установки как working directory (cwd)
-            working_dir = os.path.dirname(launch_path)
-            
-            # Запуск исполняемого файла напрямую, без shell=True
-            subprocess.Popen([launch_path], cwd=working_dir) 
-            
-            print(f"Python: Успешно запущено. Рабочий каталог: {working_dir}")
-            return "SUCCESS"
-        except Exception as e:
-            error_message = f"ОШИБКА запуска игры: {e}"
-            print(error_message)
-            return error_message
-
-# ---------------------------------------------------------------------
-
-class GameCatalogApp(QMainWindow):
-    def __init__(self):
-        super().__init__()
-        
-        self.setWindowTitle("TqG — Каталог Игр")
-        self.setGeometry(100, 100, 1400, 900) 
-        
-        self.browser = QWebEngineView()
-        self.channel = QWebChannel(self.browser.page())
-        
-        self.bridge = GameLauncherBridge(self) 
-        self.channel.registerObject('qt_bridge', self.bridge)
-        self.browser.page().setWebChannel(self.channel)
-        
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        html_file_path = os.path.join(current_dir, 'index.html')
-        local_url = QUrl.fromLocalFile(html_file_path)
-        self.browser.setUrl(local_url)
-
-        # Передача данных в JS после загрузки страницы
-        self.last_cache_mtime = 0 
-        self.browser.page().loadFinished.connect(self.send_data_to_js)
-        self.browser.page().loadFinished.connect(self.setup_update_timer) 
-        
-        self.setCentralWidget(self.browser)
-        
-    def setup_update_timer(self):
-        """Настраивает таймер для периодической проверки cache.txt."""
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.check_for_updates) 
-        self.timer.start(5000) 
-        print("Python: Запущен таймер проверки обновлений (5 сек).")
-
-    def check_for_updates(self):
-        """Проверяет, был ли изменен файл cache.txt, и обновляет UI, если да."""
-        if not os.path.exists(CACHE_FILE_PATH):
-            return
-
-        try:
-            current_mtime = os.path.getmtime(CACHE_FILE_PATH)
-        except Exception as e:
-            print(f"ОШИБКА при получении mtime: {e}")
-            return
-            
-        if self.last_cache_mtime == 0:
-            # Игнорируем первое сравнение, только устанавливаем начальное время
-            self.last_cache_mtime = current_mtime
-            return
-
-        if current_mtime > self.last_cache_mtime:
-            print("Python: Обнаружено изменение файла cache.txt. Обновление данных...")
-            self.send_data_to_js()
-            self.last_cache_mtime = current_mtime
-
-    def read_plus_file(self):
-        """Читает плюс_file.txt для определения начальной вкладки."""
-        if not os.path.exists(PLUS_FILE_PATH):
-            return "catalog" 
-        try:
-            with open(PLUS_FILE_PATH, 'r', encoding='utf-8') as f:
-                view_name = f.readline().strip().lower()
-                # Маппинг для соответствия data-view атрибутам
-                if view_name == "установленные":
-                    return "installed"
-                elif view_name == "загрузки":
-                    return "downloads"
-                elif view_name == "моды":
-                    return "mods"
-                elif view_name == "настройки":
-                    return "settings"
-                else:
-                    return "catalog"
-        except Exception as e:
-            print(f"ОШИБКА при чтении plus_file.txt: {e}")
-            return "catalog"
-            
-    def parse_cache_txt(self):
-        """Читает и парсит cache.txt, используя поле deisvie (Действие)."""
-        game_data = []
-        if not os.path.exists(CACHE_FILE_PATH):
-            return game_data
-        
-        try:
-            with open(CACHE_FILE_PATH, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except Exception as e:
-            print(f"ОШИБКА при чтении cache.txt: {e}")
-            return game_data
-
-        # Ищет блоки, начинающиеся с g# = ...
-        game_blocks = re.findall(r'(g\d+\s*=\s*.+)', content, re.DOTALL)
-        
-        game_id_counter = 1
-        for block in game_blocks:
-            match_name = re.search(r'name\((.*?)\)', block, re.DOTALL)
-            match_priwie = re.search(r'priwie\((.*?)\)', block, re.DOTALL)
-            match_opisan = re.search(r'opisan\((.*?)\)', block, re.DOTALL)
-            match_url_ins = re.search(r'url_ins\((.*?)\)', block, re.DOTALL)
-            match_dowanloadin = re.search(r'dowanloadin\((.*?)\)', block, re.DOTALL)
-            match_starting = re.search(r'starting\((.*?)\)', block, re.DOTALL)
-            match_deisvie = re.search(r'deisvie\((.*?)\)', block, re.DOTALL)
-            
-            title = match_name.group(1).strip() if match_name else "Без названия"
-            image = match_priwie.group(1).strip() if match_priwie else ""
-            description = match_opisan.group(1).strip() if match_opisan else ""
-            url_install = match_url_ins.group(1).strip() if match_url_ins else "" 
-            process_name = match_dowanloadin.group(1).strip() if match_dowanloadin else ""
-            launch_path = match_starting.group(1).strip() if match_starting else ""
-            initial_action = match_deisvie.group(1).strip().lower() if match_deisvie else "не скачено" 
-
-            game_obj = {
-                "id": game_id_counter,
-                "title": title,
-                "description": description,
-                "image": image,
-                "steam_app_id": None, 
-                "process_name": process_name,
-                "launch_path": launch_path,
-                "url_install": url_install,
-                "action": initial_action
-            }
-            game_data.append(game_obj)
-            game_id_counter += 1
-            
-        return game_data
-
-    def load_config_data(self):
-        """Читает CNF_DATA из data.json и объединяет с GAME_DATA из cache.txt."""
-        cnf_data = {
-            "progr_name": "TqG", 
-            "steam_nickname": "Drswa", 
-            "installed_game_ids": [], 
-            "running_game_ids": [],
-            "download_status": "", 
-            "initial_view": self.read_plus_file()
-        }
-
-        if os.path.exists(DATA_FILE_PATH):
-            try:
-                with open(DATA_FILE_PATH, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    cnf_data.update(data.get("CNF_DATA", {}))
-            except Exception as e:
-                print(f"ОШИБКА при чтении data.json: {e}")
-
-        game_data = self.parse_cache_txt()
-
-        return {
-            "CNF_DATA": cnf_data,
-            "GAME_DATA": game_data
-        }
-
-    def send_data_to_js(self):
-        """Передает данные из Python в JavaScript."""
-        config_data = self.load_config_data()
-        
-        if config_data:
-            json_str = json.dumps(config_data, ensure_ascii=False)
-            
-            js_code = f"if (typeof setConfigData === 'function') {{ setConfigData({json_str}); }} else {{ console.error('JS function setConfigData is not defined.'); }}"
-            self.browser.page().runJavaScript(js_code)
-            print("Python: Конфигурационные данные успешно переданы в JavaScript.")
-        else:
-            print("Python: Не удалось загрузить или передать данные в JavaScript.")
-
-def run_app():
-    app = QApplication(sys.argv)
-    main_window = GameCatalogApp()
-    main_window.show()
-    sys.exit(app.exec())
-
-if __name__ == '__main__':
+import sys
+import os # Стандартная библиотека
+import json # Стандартная библиотека
+import time # Стандартная библиотека
+import threading # Стандартная библиотека
+# Первым из своих модулей: момент его импорта - начало замеров запуска
+from startup_timeline import StartupTimeline, BENCH_LINE_PREFIX, IMPORTS, QT_INIT, WINDOW, DATA_LOAD, PAGE_LOAD, FIRST_RENDER
+from single_instance import (InstanceServer, forward_to_running_instance, acquire_instance_lock, commands_from_args,
+                             build_arg_parser, ACTIVATE, OPEN_VIEW, LAUNCH, REFRESH, STATUS, VIEWS, STARTUP_WAIT_MS)
+INSTANCE_LOCK = None # QLockFile первого экземпляра: держится до выхода процесса
+if __name__ == '__main__':
+    INSTANCE_LOCK = acquire_instance_lock()
+    if INSTANCE_LOCK is None:
+        # Окно уже открыто или еще загружается (канал откроется в GameCatalogApp.__init__):
+        # аргументы передаются ему, второй QtWebEngine не загружается
+        if forward_to_running_instance(sys.argv[1:], wait_ms=STARTUP_WAIT_MS):
+            sys.exit(0)
+        print("ОШИБКА: каталог уже запускается, но не ответил на команды")
+        sys.exit(1)
+from PyQt6.QtWidgets import QApplication, QMainWindow
+from PyQt6.QtWebEngineWidgets import QWebEngineView
+from PyQt6.QtCore import QUrl, QObject, QTimer, pyqtSlot, pyqtSignal 
+from PyQt6.QtWebChannel import QWebChannel 
+from tqtorrent import (ConfigPaths, CatalogStore, SaveBackup, SteamLibraryScanner, LaunchResolver, broken_targets,
+                       DiskUsage, sort_usage, launch_game)
+import metrics
+from metrics import METRICS, MetricsFlusher, Profiler
+from catalog_delta import index_games, diff_catalog
+from search_index import SearchIndex, DEFAULT_LIMIT
+from file_watcher import ConfigFileWatcher
+from process_tracker import ProcessTracker
+from image_cache import ImageCache
+from image_scheme import ImageSchemeHandler, register_scheme, SCHEME_NAME
+# downloader, download_scheduler, torrent и verify_files импортируются при первом
+# использовании: для показа каталога они не нужны, а их импорт заметно удлиняет запуск
+
+# --- КОНФИГУРАЦИЯ ---
+# Пути к файлам каталога - в tqtorrent.config (TQ_CONFIG_PATH или путь по умолчанию)
+CONFIG_PATHS = ConfigPaths()
+IMAGE_CACHE_PATH = os.path.join(CONFIG_PATHS.config_dir, "image_cache") # Кэш обложек (tqimg:)
+PREFETCH_COVERS = 100 # Сколько первых обложек каталога качать заранее
+# Статусы, при которых карточка предлагает "Запустить": только для них окну нужен итог проверки пути
+LAUNCHABLE_ACTIONS = ("установлено", "запущена")
+DOWNLOADS_PATH = CONFIG_PATHS.downloads # Documents\TqTorrent\downloads
+# --------------------
+
+# --- НАСТРОЙКИ ЗАПУСКА ---
+PRELOAD_CATALOG = os.environ.get("TQ_STARTUP_SERIAL") != "1" # Готовить каталог в фоне, пока стартует Chromium
+STARTUP_BENCH = os.environ.get("TQ_STARTUP_BENCH") == "1" # Выйти после первой отрисовки, напечатав замеры
+# --profile (или TQ_PROFILE=1): запуск и обновления каталога под cProfile, файлы в log/profile
+PROFILE = build_arg_parser().parse_known_args(sys.argv[1:])[0].profile or os.environ.get("TQ_PROFILE") == "1"
+PROFILER = Profiler(CONFIG_PATHS.log, PROFILE)
+# --------------------
+
+# ----------------- КЛАСС-МОСТ (PYTHON -> JAVASCRIPT) -----------------
+class GameLauncherBridge(QObject):
+    # game_id, pid, длительность сессии (сек), остались ли другие процессы игры
+    gameExited = pyqtSignal(int, int, float, bool)
+    # JSON-снимок очереди загрузок (DownloadScheduler.status())
+    downloadQueueChanged = pyqtSignal(str)
+    # game_id, файлы целы, текст отчета проверки
+    verifyFinished = pyqtSignal(int, bool, str)
+    # {game_id: {"path", "bytes", "files", ...}} и вид итога: "cached" (прошлый, подсчет идет),
+    # "partial" (только эти игры) или "full" (все установленные игры)
+    diskUsageChanged = pyqtSignal(object, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.parent = parent 
+        self._scheduler = None # Очередь загрузок создается при первом обращении (см. scheduler)
+        self.verifying = set() # game_id игр, файлы которых сейчас проверяются
+        # Сигнал из фонового потока-ожидателя доставляется в GUI-поток очередью Qt
+        self.tracker = ProcessTracker(
+            lambda game_id, pid, returncode, play_seconds, still_running:
+                self.gameExited.emit(game_id, pid, play_seconds, still_running)
+        )
+
+    @property
+    def scheduler(self):
+        """Все загрузки идут через общую очередь с ограничением скорости и числа одновременных.
+        Очередь и модули загрузки поднимаются только при первой загрузке, а не при старте."""
+        if self._scheduler is None:
+            from download_scheduler import DownloadScheduler
+            self._scheduler = DownloadScheduler(
+                on_status=lambda status: self.downloadQueueChanged.emit(json.dumps(status, ensure_ascii=False)),
+                on_finished=self.on_download_finished
+            )
+            self.update_game_running()
+        return self._scheduler
+
+    def update_game_running(self):
+        """Пока идет игра, загрузки не должны забивать канал (если очередь уже создана)."""
+        if self._scheduler is not None:
+            self._scheduler.set_game_running(bool(self.tracker.running_game_ids()))
+        
+    @pyqtSlot(str, int, result=str)
+    def launchGame(self, launch_path, game_id):
+        """Запускает игру (tqtorrent.launch_game, рабочий каталог - каталог exe) и отслеживает процесс.
+        steam:// и ярлыки .url заменяются exe из кэша проверенных путей (LaunchResolver)."""
+        print(f"Python: Попытка запустить: {launch_path}")
+        try:
+            if self.parent is not None:
+                game = self.parent.find_game(game_id) or {}
+                launch_path = self.parent.launch_resolver.launch_target(launch_path, game.get("process_name"))
+            process = launch_game(launch_path)
+            self.tracker.track(game_id, process)
+            self.update_game_running()
+            if self.parent is not None:
+                self.parent.store.set_game_run_state(game_id, True, process.pid)
+            
+            print(f"Python: Успешно запущено (pid {process.pid}). Рабочий каталог: {os.path.dirname(launch_path)}")
+            return "SUCCESS"
+        except Exception as e:
+            error_message = f"ОШИБКА запуска игры: {e}"
+            print(error_message)
+            return error_message
+
+    @pyqtSlot(int, result=str)
+    def startDownload(self, game_id):
+        """Ставит загрузку url_ins(...) игры (HTTP или .torrent) в очередь; приостановленная продолжается."""
+        game = self.parent.find_game(game_id) if self.parent is not None else None
+        if game is None:
+            return f"ОШИБКА: игра {game_id} не найдена в каталоге"
+        url = game.get("url_install", "")
+        is_torrent = url.lower().endswith(".torrent")
+        if not (is_torrent or url.lower().startswith(("http://", "https://"))):
+            return f"ОШИБКА: у игры '{game['title']}' нет ссылки на скачивание"
+
+        from downloader import SegmentedDownload, filename_from_url
+        dest_path = os.path.join(DOWNLOADS_PATH, filename_from_url(url, f"game_{game_id}.bin"))
+
+        def make_job(on_progress, limiter):
+            if is_torrent:
+                # url_ins(...) указывает на .torrent (ссылка или локальный путь)
+                from torrent import TorrentJob
+                return TorrentJob(url, DOWNLOADS_PATH, on_progress=on_progress, rate_limiter=limiter)
+            return SegmentedDownload(url, dest_path, on_progress=on_progress, throttle=limiter)
+
+        self.scheduler.enqueue(game_id, game["title"], make_job)
+        return "SUCCESS"
+
+    def on_download_finished(self, game_id, state, result):
+        from download_scheduler import DONE, FAILED
+        if state == DONE:
+            print(f"Python: Загрузка игры {game_id} завершена: {result}")
+        elif state == FAILED:
+            # Текст ошибки уходит в окно со статусом очереди (поле error задания)
+            print(f"ОШИБКА: загрузка игры {game_id} не удалась: {result}")
+        else:
+            print(f"Python: Загрузка игры {game_id} остановлена ({state}).")
+
+    @pyqtSlot(int, result=str)
+    def cancelDownload(self, game_id):
+        """Приостанавливает загрузку; повторный startDownload продолжит ее с места остановки."""
+        if not self.scheduler.pause(game_id):
+            return f"ОШИБКА: загрузка игры {game_id} не активна"
+        return "SUCCESS"
+
+    @pyqtSlot(int, result=str)
+    def resumeDownload(self, game_id):
+        if not self.scheduler.resume(game_id):
+            return f"ОШИБКА: загрузка игры {game_id} не приостановлена"
+        return "SUCCESS"
+
+    @pyqtSlot(int, result=str)
+    def removeDownload(self, game_id):
+        """Убирает загрузку из очереди (недокачанный файл и журнал остаются для докачки)."""
+        if not self.scheduler.remove(game_id):
+            return f"ОШИБКА: загрузки игры {game_id} нет в очереди"
+        return "SUCCESS"
+
+    @pyqtSlot(int, int, result=str)
+    def moveDownload(self, game_id, position):
+        """Переставляет загрузку на позицию position в очереди (0 - первая)."""
+        if not self.scheduler.move(game_id, position):
+            return f"ОШИБКА: загрузки игры {game_id} нет в очереди"
+        return "SUCCESS"
+
+    @pyqtSlot(int, int, result=str)
+    def setDownloadLimits(self, global_kbps, max_active):
+        """Общий предел скорости (КБ/с, 0 - без предела) и число одновременных загрузок."""
+        self.scheduler.set_global_rate(global_kbps * 1024)
+        self.scheduler.set_max_active(max_active)
+        return "SUCCESS"
+
+    @pyqtSlot(int, int, result=str)
+    def setDownloadRate(self, game_id, kbps):
+        """Предел скорости одной загрузки (КБ/с, 0 - без предела)."""
+        if not self.scheduler.set_job_rate(game_id, kbps * 1024):
+            return f"ОШИБКА: загрузки игры {game_id} нет в очереди"
+        return "SUCCESS"
+
+    @pyqtSlot(result=str)
+    def downloadQueue(self):
+        """JSON-список загрузок: позиция, состояние, скорость (байт/с), ETA (сек), пределы."""
+        return json.dumps(self.scheduler.status(), ensure_ascii=False)
+
+    @pyqtSlot(str, 'QVariantMap', result=str)
+    def search(self, query, filters):
+        """Поиск по названию и описанию с фильтром по статусу.
+        filters: {"status": [статусы], "limit": N}. Возвращает JSON {"ids": [...], "total": N}."""
+        if self.parent is None:
+            return json.dumps({"ids": [], "total": 0})
+        limit = int(filters.get("limit") or DEFAULT_LIMIT)
+        ids, total = self.parent.search_index.search(query, filters, limit)
+        return json.dumps({"ids": ids, "total": total})
+
+    @pyqtSlot(int, result=str)
+    def verifyGame(self, game_id):
+        """Проверяет файлы установленной игры по манифесту (в фоне, пулом процессов)."""
+        game = self.parent.find_game(game_id) if self.parent is not None else None
+        if game is None:
+            return f"ОШИБКА: игра {game_id} не найдена в каталоге"
+        if not game.get("launch_path"):
+            return f"ОШИБКА: у игры '{game['title']}' нет пути запуска"
+        if game_id in self.verifying:
+            return "SUCCESS"
+        self.verifying.add(game_id)
+        launch_path = game["launch_path"]
+
+        def worker():
+            try:
+                import verify_files
+                report = verify_files.verify_game(launch_path)
+                self.verifyFinished.emit(game_id, verify_files.report_ok(report), verify_files.format_report(report))
+            except Exception as e:
+                self.verifyFinished.emit(game_id, False, f"ОШИБКА проверки файлов: {e}")
+            finally:
+                self.verifying.discard(game_id)
+
+        threading.Thread(target=worker, name=f"verify-{game_id}", daemon=True).start()
+        return "SUCCESS"
+
+    @pyqtSlot('QVariantMap', result=str)
+    def diskUsage(self, filters):
+        """Место, занятое установленными играми, для вкладки "Установленные".
+        filters: {"sort": "size" | "files" | "title", "order": "asc" | "desc", "query": строка поиска,
+        "min_mb": N, "limit": N}. Возвращает JSON {"games": [...], "total", "total_bytes", "scanning"}."""
+        if self.parent is None:
+            return json.dumps({"games": [], "total": 0, "total_bytes": 0, "scanning": False})
+        app = self.parent
+        ids = None
+        if filters.get("query"):
+            ids = set(app.search_index.search(filters["query"], None, len(app.search_index.games) or 1)[0])
+        rows = sort_usage(app.usage, app.search_index.games, filters.get("sort") or "size",
+                          filters.get("order") != "asc", int(float(filters.get("min_mb") or 0) * 1048576), ids)
+        limit = int(filters.get("limit") or DEFAULT_LIMIT)
+        return json.dumps({
+            "games": rows[:limit],
+            "total": len(rows),
+            "total_bytes": sum(row["bytes"] for row in rows),
+            "scanning": app.usage_scanning
+        }, ensure_ascii=False)
+
+    @pyqtSlot(result=str)
+    def refreshDiskUsage(self):
+        """Пересчитывает место, занятое установленными играми (в фоне; итог - onDiskUsageChanged)."""
+        if self.parent is not None:
+            self.parent.start_disk_usage()
+        return "SUCCESS"
+
+# ---------------------------------------------------------------------
+
+class GameCatalogApp(QMainWindow):
+    # Каталог, подготовленный фоновым потоком (см. prepare_catalog); доставляется в GUI-поток
+    catalogPrepared = pyqtSignal(object)
+    # Итог фоновой проверки путей запуска: ({game_id: {"status", "message"}}, проверенные id или None - весь каталог)
+    launchTargetsChecked = pyqtSignal(object, object)
+
+    def __init__(self, timeline=None, startup_profile=None):
+        super().__init__()
+        self.timeline = timeline or StartupTimeline()
+        self.startup_profile = startup_profile # токен PROFILER.start("startup"), закрывается первой отрисовкой
+        # Каталог и состояние запуска - общее ядро с CLI (tqtorrent); окну нужна еще схема обложек
+        self.store = CatalogStore(CONFIG_PATHS, cnf_overrides={"image_scheme": SCHEME_NAME.decode()})
+        self.page_ready = False # index.html загружен, JS-функции доступны
+        self.preloading = False # фоновый поток еще готовит каталог
+        self.preloaded = None # готовый каталог, ждущий загрузки страницы
+        self.catalogPrepared.connect(self.on_catalog_prepared)
+        # Снимок сохранений после выхода из игры идет в своем потоке и не задерживает окно
+        self.save_backup = SaveBackup(CONFIG_PATHS, on_done=self.on_save_backup_done)
+        # Пути запуска проверяются в фоне после первой отрисовки; запуск берет готовый exe из кэша
+        self.launch_resolver = LaunchResolver(CONFIG_PATHS.launch_cache, SteamLibraryScanner(CONFIG_PATHS.steam_cache))
+        self.launch_check_lock = threading.Lock() # Проверки идут по очереди (общий кэш)
+        self.pending_launch_check = None # Каталог, ждущий первой отрисовки
+        self.launch_broken = {} # game_id -> {"status", "message"} недоступных путей запуска
+        self.launchTargetsChecked.connect(self.on_launch_targets_checked)
+        # Место, занятое играми: прошлые итоги из кэша сразу, подсчет - в фоне после первой отрисовки
+        self.disk_usage = None # DiskUsage; кэш читается в потоке подсчета, а не при запуске окна
+        self.usage = {} # game_id -> {"path", "bytes", "files", "dirs", "scanned_at"}
+        self.usage_scanning = False
+        self.usage_pending = None # Запрошенный во время подсчета пересчет: None, "all" или [игры]
+        # Команды из своей командной строки выполняются так же, как пришедшие от вторых запусков
+        self.pending_commands = commands_from_args(sys.argv[1:])
+        self.instance_server = InstanceServer(self.handle_command, parent=self)
+        self.instance_server.listen()
+        QApplication.instance().aboutToQuit.connect(self.instance_server.close)
+        if PRELOAD_CATALOG:
+            # Чтение и разбор каталога идут параллельно со стартом Chromium, а не после loadFinished
+            self.start_catalog_preload()
+        
+        self.setWindowTitle("TqG — Каталог Игр")
+        self.setGeometry(100, 100, 1400, 900) 
+        
+        self.browser = QWebEngineView()
+        self.channel = QWebChannel(self.browser.page())
+
+        # Обложки отдаются из локального кэша по ссылкам tqimg:thumb?u=... / tqimg:full?u=...
+        self.image_cache = ImageCache(IMAGE_CACHE_PATH, local_roots=(CONFIG_PATHS.config_dir, CONFIG_PATHS.covers))
+        self.image_handler = ImageSchemeHandler(self.image_cache, self)
+        self.browser.page().profile().installUrlSchemeHandler(SCHEME_NAME, self.image_handler)
+        QApplication.instance().aboutToQuit.connect(self.image_cache.close)
+        
+        self.bridge = GameLauncherBridge(self) 
+        self.bridge.gameExited.connect(self.on_game_exited)
+        self.bridge.downloadQueueChanged.connect(self.on_download_queue_changed)
+        self.bridge.verifyFinished.connect(self.on_verify_finished)
+        self.bridge.diskUsageChanged.connect(self.on_disk_usage_changed)
+        self.channel.registerObject('qt_bridge', self.bridge)
+        self.browser.page().setWebChannel(self.channel)
+        
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        html_file_path = os.path.join(current_dir, 'index.html')
+        local_url = QUrl.fromLocalFile(html_file_path)
+
+        # Передача данных в JS после загрузки страницы
+        self.file_watcher = None
+        self.last_sent_snapshot = None # Последний снимок, переданный в JS (для дельт)
+        self.search_index = SearchIndex() # Индекс поиска по каталогу, переданному в JS
+        self.browser.page().loadFinished.connect(self.on_page_loaded)
+        self.timeline.start(PAGE_LOAD)
+        self.browser.setUrl(local_url)
+        
+        self.setCentralWidget(self.browser)
+
+    # ----------------- ЗАПУСК -----------------
+
+    def start_catalog_preload(self):
+        self.preloading = True
+
+        def worker():
+            try:
+                with PROFILER.section("startup-preload"):
+                    prepared = self.prepare_catalog()
+            except Exception as e:
+                print(f"ОШИБКА фоновой загрузки каталога: {e}")
+                prepared = None
+            self.catalogPrepared.emit(prepared)
+
+        threading.Thread(target=worker, name="catalog-preload", daemon=True).start()
+
+    def prepare_catalog(self):
+        """Загружает каталог и готовит все, что нужно для передачи в JS: JSON для
+        setConfigData, снимок для будущих дельт и индекс поиска. Не трогает Qt,
+        поэтому может работать в фоновом потоке. None - если данных нет."""
+        self.timeline.start(DATA_LOAD)
+        config_data = self.store.load_config_data()
+        if not config_data:
+            return None
+        with metrics.timer("catalog.json"):
+            json_str = json.dumps(config_data, ensure_ascii=False)
+        with metrics.timer("catalog.index"):
+            snapshot = {
+                "CNF_DATA": config_data["CNF_DATA"],
+                "GAMES": index_games(config_data["GAME_DATA"])
+            }
+            search_index = SearchIndex(config_data["GAME_DATA"])
+        prepared = {
+            "config_data": config_data,
+            "json": json_str,
+            "snapshot": snapshot,
+            "search_index": search_index
+        }
+        self.timeline.finish(DATA_LOAD)
+        return prepared
+
+    def on_catalog_prepared(self, prepared):
+        self.preloading = False
+        if self.page_ready:
+            self.deliver_catalog(prepared)
+        else:
+            self.preloaded = prepared
+
+    def on_page_loaded(self, ok):
+        """index.html загружен (первый раз или после перезагрузки страницы)."""
+        self.timeline.finish(PAGE_LOAD)
+        self.page_ready = True
+        if self.preloaded is not None:
+            prepared, self.preloaded = self.preloaded, None
+            self.deliver_catalog(prepared)
+        elif not self.preloading:
+            # Каталог не готовился в фоне (или страницу перезагрузили) - читаем сразу.
+            # Если поток еще работает, каталог передаст on_catalog_prepared
+            self.send_full_data_to_js()
+        # Наблюдатель за файлами не нужен для первой отрисовки - запускается следом
+        QTimer.singleShot(0, self.setup_file_watcher)
+
+    def on_first_render(self, _result=None):
+        """setConfigData отработал: сетка построена, интерфейс готов к работе."""
+        self.timeline.finish(FIRST_RENDER)
+        PROFILER.stop(self.startup_profile)
+        self.startup_profile = None
+        timeline = self.timeline.as_dict()
+        for name, phase in timeline["phases"].items():
+            metrics.observe("startup." + name, phase["ms"])
+        metrics.observe("startup.interactive", timeline["interactive_ms"])
+        print(self.timeline.format())
+        if self.pending_launch_check is not None:
+            games, self.pending_launch_check = self.pending_launch_check, None
+            self.check_launch_targets(games)
+            self.start_disk_usage()
+        if STARTUP_BENCH:
+            print(BENCH_LINE_PREFIX + self.timeline.to_json(), flush=True)
+            QApplication.instance().quit()
+            return
+        pending, self.pending_commands = self.pending_commands, []
+        for command in pending:
+            reply = self.run_command(command)
+            if not reply.get("ok"):
+                print(f"ОШИБКА команды {command['command']}: {reply.get('error')}")
+
+    # ----------------- КОМАНДЫ (single_instance) -----------------
+
+    def handle_command(self, command):
+        """Команда второго запуска или скрипта через локальный канал. Возвращает ответ {"ok": ...}."""
+        name = command["command"]
+        if name == ACTIVATE:
+            self.activate_window()
+            return {"ok": True}
+        if name == STATUS:
+            return {
+                "ok": True,
+                "pid": os.getpid(),
+                "games": len(self.search_index.games),
+                "running_game_ids": self.bridge.tracker.running_game_ids(),
+                "ready": self.timeline.done(FIRST_RENDER),
+                "metrics": METRICS.snapshot()
+            }
+        if name not in (OPEN_VIEW, LAUNCH, REFRESH):
+            return {"ok": False, "error": f"неизвестная команда: {name}"}
+        if not self.timeline.done(FIRST_RENDER):
+            # Каталог еще не показан - команда выполнится после первой отрисовки
+            self.pending_commands.append(command)
+            return {"ok": True, "queued": True}
+        return self.run_command(command)
+
+    def run_command(self, command):
+        name = command["command"]
+        if name == OPEN_VIEW:
+            view = command.get("view")
+            if view not in VIEWS:
+                return {"ok": False, "error": f"неизвестная вкладка: {view}"}
+            self.activate_window()
+            self.run_js("openView", f"if (typeof openView === 'function') {{ openView({json.dumps(view)}); }}")
+            return {"ok": True}
+        if name == REFRESH:
+            self.send_data_to_js()
+            return {"ok": True}
+
+        # LAUNCH
+        try:
+            game_id = int(command.get("game_id"))
+        except (TypeError, ValueError):
+            return {"ok": False, "error": "ожидается числовой game_id"}
+        game = self.find_game(game_id)
+        if game is None:
+            return {"ok": False, "error": f"игра {game_id} не найдена в каталоге"}
+        if not game.get("launch_path"):
+            return {"ok": False, "error": f"у игры '{game['title']}' нет пути запуска"}
+        result = self.bridge.launchGame(game["launch_path"], game_id)
+        if result != "SUCCESS":
+            return {"ok": False, "error": result}
+        self.run_js("onGameLaunched", f"if (typeof onGameLaunched === 'function') {{ onGameLaunched({game_id}); }}")
+        return {"ok": True}
+
+    def activate_window(self):
+        if self.isMinimized():
+            self.showNormal()
+        self.raise_()
+        self.activateWindow()
+        
+    def setup_file_watcher(self):
+        """Запускает событийное наблюдение за cache.txt, data.json, plus_file.txt и catalog.db."""
+        if self.file_watcher is not None:
+            return
+        self.file_watcher = ConfigFileWatcher(self.store.paths.watched(), self)
+        self.file_watcher.filesChanged.connect(self.check_for_updates)
+        self.file_watcher.start()
+
+    def check_for_updates(self, changed_paths):
+        """Вызывается наблюдателем после изменения файлов конфигурации и обновляет UI."""
+        names = ", ".join(os.path.basename(p) for p in changed_paths)
+        print(f"Python: Обнаружено изменение файлов ({names}). Обновление данных...")
+        metrics.count("refresh.file_change")
+        self.send_data_to_js()
+
+    def find_game(self, game_id):
+        """Игра из последнего переданного в JS каталога (O(1) по словарю id -> игра)."""
+        return self.search_index.get(game_id)
+
+    def on_download_queue_changed(self, status_json):
+        """Передает очередь загрузок во вкладку загрузок и строку статуса в нижнюю панель."""
+        queue = json.loads(status_json)
+        active = [job for job in queue if job["state"] == "active"]
+        status_text = ""
+        if active:
+            job = active[0]
+            percent = int(job["downloaded"] * 100 / job["total"]) if job["total"] else 0
+            status_text = f"Скачивание: {job['title']} ({percent}%) {job['rate'] / 1048576:.1f} МБ/с"
+            if len(active) > 1:
+                status_text += f" и еще {len(active) - 1}"
+        self.run_js(
+            "setDownloadQueue",
+            f"if (typeof setDownloadQueue === 'function') {{ setDownloadQueue({status_json}); }}"
+            f"if (typeof setDownloadStatus === 'function') {{ setDownloadStatus({json.dumps(status_text, ensure_ascii=False)}); }}"
+        )
+
+    def on_verify_finished(self, game_id, ok, report_text):
+        """Передает итог проверки файлов игры в детальную карточку."""
+        print(f"Python: Проверка файлов игры {game_id}: {report_text}")
+        self.run_js(
+            "onVerifyResult",
+            f"if (typeof onVerifyResult === 'function') {{ onVerifyResult({game_id}, {json.dumps(ok)}, {json.dumps(report_text, ensure_ascii=False)}); }}"
+        )
+
+    def on_game_exited(self, game_id, pid, play_seconds, still_running):
+        """Процесс отслеживаемой игры завершился: обновляет состояние и UI."""
+        print(f"Python: Процесс игры {game_id} (pid {pid}) завершен, сессия {play_seconds:.0f} сек.")
+        if still_running:
+            return
+        self.store.set_game_run_state(game_id, False)
+        self.bridge.update_game_running()
+        self.save_backup.request(game_id)
+        self.run_js(
+            "onGameExited",
+            f"if (typeof onGameExited === 'function') {{ onGameExited({game_id}, {play_seconds:.1f}); }}"
+        )
+
+    def check_launch_targets(self, games, partial_ids=None):
+        """Проверяет пути запуска игр в фоновом потоке (LaunchResolver, пул потоков и кэш по mtime).
+        partial_ids - id, для которых пересылается итог (дельта каталога); None - весь каталог."""
+        games = list(games)
+
+        def worker():
+            try:
+                with self.launch_check_lock:
+                    results = self.launch_resolver.resolve_all(games, prune=partial_ids is None)
+                # Путь не скачанной игры и не должен существовать - в окно уходят только установленные
+                launchable = {game["id"] for game in games if game.get("action") in LAUNCHABLE_ACTIONS}
+                broken = {game_id: info for game_id, info in broken_targets(results).items() if game_id in launchable}
+                self.launchTargetsChecked.emit(broken, partial_ids)
+            except Exception as e:
+                print(f"ОШИБКА проверки путей запуска: {e}")
+
+        threading.Thread(target=worker, name="launch-check", daemon=True).start()
+
+    def on_launch_targets_checked(self, broken, checked_ids):
+        """Отмечает в сетке игры с недоступным путем запуска (до нажатия "Запустить")."""
+        if checked_ids is None:
+            self.launch_broken = dict(broken)
+        else:
+            for game_id in checked_ids:
+                self.launch_broken.pop(game_id, None)
+            self.launch_broken.update(broken)
+        if broken:
+            print(f"Python: Недоступных путей запуска: {len(self.launch_broken)}.")
+        payload = json.dumps({"broken": broken, "checked": checked_ids}, ensure_ascii=False)
+        self.run_js("setLaunchTargets", f"if (typeof setLaunchTargets === 'function') {{ setLaunchTargets({payload}); }}")
+
+    def start_disk_usage(self, games=None, removed_ids=()):
+        """Считает место, занятое каталогами установленных игр, в фоновом потоке (DiskUsage:
+        пул потоков os.scandir, неизменившиеся каталоги - из кэша). games=None - весь каталог,
+        иначе только эти игры (дельта каталога). Повторный запрос во время подсчета откладывается."""
+        for game_id in removed_ids:
+            self.usage.pop(game_id, None)
+        if games is None:
+            games = list(self.search_index.games.values())
+            full = True
+        else:
+            games = list(games)
+            full = False
+        if self.usage_scanning:
+            if full or self.usage_pending == "all":
+                self.usage_pending = "all"
+            else:
+                self.usage_pending = (self.usage_pending or []) + games
+            return
+        installed = [game for game in games if game.get("action") in LAUNCHABLE_ACTIONS]
+        if not full:
+            # Игра могла перестать быть установленной
+            for game in games:
+                self.usage.pop(game["id"], None)
+            if not installed:
+                self.bridge.diskUsageChanged.emit({}, "partial")
+                return
+        self.usage_scanning = True
+
+        def worker():
+            usage = {}
+            kind = "full" if full else "partial"
+            try:
+                if self.disk_usage is None:
+                    self.disk_usage = DiskUsage(CONFIG_PATHS.usage_cache)
+                if full and not self.usage:
+                    # Прошлые итоги видны сразу, пока идет подсчет
+                    self.bridge.diskUsageChanged.emit(self.disk_usage.cached_games(installed, self.launch_resolver), "cached")
+                usage = self.disk_usage.scan_games(installed, self.launch_resolver, prune=full)
+            except Exception as e:
+                print(f"ОШИБКА подсчета занятого места: {e}")
+                kind = "partial" # Прежние итоги остаются
+            self.bridge.diskUsageChanged.emit(usage, kind)
+
+        threading.Thread(target=worker, name="disk-usage", daemon=True).start()
+
+    def on_disk_usage_changed(self, usage, kind):
+        """Итог (или прошлые итоги из кэша) подсчета места; вкладка "Установленные" перезапрашивает список."""
+        finished = kind != "cached"
+        if kind == "full":
+            self.usage = dict(usage)
+        else:
+            self.usage.update(usage)
+        if finished:
+            self.usage_scanning = False
+            total = sum(info["bytes"] for info in self.usage.values())
+            print(f"Python: Место, занятое играми: {len(self.usage)} игр, {total / 1073741824:.1f} ГБ.")
+        self.run_js("onDiskUsageChanged", f"if (typeof onDiskUsageChanged === 'function') {{ onDiskUsageChanged({json.dumps(finished)}); }}")
+        if finished and self.usage_pending is not None:
+            pending, self.usage_pending = self.usage_pending, None
+            self.start_disk_usage(None if pending == "all" else pending)
+
+    def on_save_backup_done(self, game_id, reports):
+        """Итог фонового снимка сохранений (вызывается из потока SaveBackup - только лог)."""
+        for report in reports or []:
+            if report["id"]:
+                print(f"Python: Снимок сохранений {report['set']}/{report['id']} после игры {game_id}: "
+                      f"изменено {report['changed']} из {report['files']} файлов, записано {report['written'] / 1024:.0f} КБ.")
+            for rel_path, error in report["errors"].items():
+                print(f"ОШИБКА снимка сохранений {report['set']}: {rel_path}: {error}")
+
+    def run_js(self, name, js_code, callback=None):
+        """runJavaScript с замером: время от вызова до ответа JS (очередь страницы +
+        выполнение) пишется в гистограмму js.<name>; затем вызывается callback(result)."""
+        start = time.perf_counter()
+
+        def on_result(result):
+            metrics.observe("js." + name, (time.perf_counter() - start) * 1000, chars=len(js_code))
+            if callback is not None:
+                callback(result)
+
+        self.browser.page().runJavaScript(js_code, on_result)
+
+    def send_full_data_to_js(self):
+        """Передает в JavaScript весь каталог (после (пере)загрузки страницы)."""
+        self.last_sent_snapshot = None
+        self.send_data_to_js()
+
+    def deliver_catalog(self, prepared):
+        """Передает подготовленный prepare_catalog каталог в JS через setConfigData."""
+        if not prepared:
+            print("Python: Не удалось загрузить или передать данные в JavaScript.")
+            return
+        js_code = f"if (typeof setConfigData === 'function') {{ setConfigData({prepared['json']}); }} else {{ console.error('JS function setConfigData is not defined.'); }}"
+        if self.timeline.done(FIRST_RENDER):
+            self.run_js("setConfigData", js_code)
+        else:
+            # Ответ runJavaScript приходит после выполнения setConfigData (сетка уже построена)
+            self.timeline.start(FIRST_RENDER)
+            self.run_js("setConfigData", js_code, self.on_first_render)
+        self.search_index = prepared["search_index"]
+        self.last_sent_snapshot = prepared["snapshot"]
+        self.image_cache.prefetch(game["image"] for game in prepared["config_data"]["GAME_DATA"][:PREFETCH_COVERS])
+        if self.timeline.done(FIRST_RENDER):
+            self.check_launch_targets(prepared["config_data"]["GAME_DATA"])
+            self.start_disk_usage()
+        else:
+            # Проверка путей не отнимает время у первой отрисовки
+            self.pending_launch_check = prepared["config_data"]["GAME_DATA"]
+        print("Python: Конфигурационные данные успешно переданы в JavaScript.")
+
+    def send_data_to_js(self):
+        """Передает данные из Python в JavaScript.
+
+        Первый раз передается весь каталог через setConfigData, далее - только
+        добавленные, удаленные и измененные игры через applyConfigDelta.
+        """
+        with PROFILER.section("refresh"), metrics.timer("refresh") as span:
+            if self.last_sent_snapshot is None:
+                span["mode"] = "full"
+                self.deliver_catalog(self.prepare_catalog())
+                return
+            span["mode"] = "delta"
+            self.send_delta_to_js(span)
+
+    def send_delta_to_js(self, span):
+        config_data = self.store.load_config_data()
+        if not config_data:
+            print("Python: Не удалось загрузить или передать данные в JavaScript.")
+            return
+
+        with metrics.timer("catalog.diff"):
+            delta, self.last_sent_snapshot = diff_catalog(self.last_sent_snapshot, config_data)
+        if delta is None:
+            span["mode"] = "unchanged"
+            print("Python: Изменений в каталоге нет, передача пропущена.")
+            return
+        # Индекс поиска обновляется только по изменившимся играм
+        self.search_index.apply_delta(delta)
+
+        with metrics.timer("delta.json"):
+            json_str = json.dumps(delta, ensure_ascii=False)
+        span["games"] = len(delta.get('added', [])) + len(delta.get('changed', [])) + len(delta.get('removed', []))
+        js_code = f"if (typeof applyConfigDelta === 'function') {{ applyConfigDelta({json_str}); }} else {{ console.error('JS function applyConfigDelta is not defined.'); }}"
+        self.run_js("applyConfigDelta", js_code)
+        changed_games = delta.get('added', []) + delta.get('changed', [])
+        if changed_games or delta.get('removed'):
+            self.check_launch_targets(changed_games, partial_ids=[game["id"] for game in changed_games] + delta.get('removed', []))
+            self.start_disk_usage(changed_games, removed_ids=delta.get('removed', []))
+        print(f"Python: Передана дельта каталога: +{len(delta.get('added', []))} "
+              f"~{len(delta.get('changed', []))} -{len(delta.get('removed', []))}.")
+
+def run_app():
+    timeline = StartupTimeline()
+    timeline.finish(IMPORTS)
+    timeline.start(QT_INIT)
+    startup_profile = PROFILER.start("startup")
+    register_scheme() # Схема tqimg: регистрируется до создания QApplication
+    app = QApplication(sys.argv)
+    # Метрики пишутся в log/metrics.jsonl фоновым потоком; последнее окно - при выходе
+    flusher = MetricsFlusher(CONFIG_PATHS.log, "gui").start()
+    app.aboutToQuit.connect(flusher.stop)
+    timeline.finish(QT_INIT)
+    timeline.start(WINDOW)
+    main_window = GameCatalogApp(timeline, startup_profile)
+    main_window.show()
+    timeline.finish(WINDOW)
+    sys.exit(app.exec())
+
+if __name__ == '__main__':
     run_app()
\ No newline at end of file
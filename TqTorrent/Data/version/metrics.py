@@ -0,0 +1,336 @@
+import os # Стандартная библиотека
+import io # Стандартная библиотека
+import json # Стандартная библиотека
+import time # Стандартная библиотека
+import bisect # Стандартная библиотека
+import threading # Стандартная библиотека
+from collections import deque # Стандартная библиотека
+from contextlib import contextmanager # Стандартная библиотека
+
+# --- НАСТРОЙКИ МЕТРИК ---
+METRICS_ENABLED = os.environ.get("TQ_METRICS") != "0" # TQ_METRICS=0 отключает сбор и запись
+FLUSH_INTERVAL = 30.0 # Секунд между записями в log/metrics.jsonl
+LOG_FILE_NAME = "metrics.jsonl"
+MAX_LOG_BYTES = 5 * 1024 * 1024 # После этого размера файл переименовывается в metrics.1.jsonl
+LOG_BACKUPS = 5 # Сколько старых файлов хранить (metrics.1.jsonl ... metrics.5.jsonl)
+MAX_SPANS = 10000 # Замеров в очереди между записями (старые отбрасываются)
+PROFILE_DIR_NAME = "profile" # log/profile/<раздел>-<время>.prof и .txt
+PROFILE_TOP = 40 # Строк в текстовой сводке профиля
+# --------------------
+
+# Границы корзин гистограммы, мс (последняя корзина - все, что длиннее)
+BUCKETS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+class Histogram:
+    """Распределение длительностей по фиксированным корзинам: запись - O(log корзин),
+    память не растет с числом замеров. Перцентили оцениваются по верхней границе корзины."""
+
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def record(self, value_ms):
+        self.count += 1
+        self.total += value_ms
+        self.min = value_ms if self.min is None else min(self.min, value_ms)
+        self.max = value_ms if self.max is None else max(self.max, value_ms)
+        self.buckets[bisect.bisect_left(BUCKETS_MS, value_ms)] += 1
+
+    def percentile(self, fraction):
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= rank:
+                bound = BUCKETS_MS[index] if index < len(BUCKETS_MS) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    def merge(self, data):
+        """Добавляет сводку as_dict() другой гистограммы (окна из журнала)."""
+        self.count += data["count"]
+        self.total += data["sum_ms"]
+        self.min = data["min_ms"] if self.min is None else min(self.min, data["min_ms"])
+        self.max = data["max_ms"] if self.max is None else max(self.max, data["max_ms"])
+        self.buckets = [a + b for a, b in zip(self.buckets, data["buckets"])]
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "sum_ms": round(self.total, 3),
+            "min_ms": round(self.min, 3),
+            "max_ms": round(self.max, 3),
+            "p50_ms": round(self.percentile(0.5), 3),
+            "p90_ms": round(self.percentile(0.9), 3),
+            "p99_ms": round(self.percentile(0.99), 3),
+            "buckets": self.buckets
+        }
+
+
+class Metrics:
+    """Счетчики, гистограммы длительностей и очередь замеров (span) одного процесса.
+
+    Каждая гистограмма ведется дважды: за все время (snapshot, команда status)
+    и за окно с последней записи в журнал (drain). Методы потокобезопасны:
+    замеры идут из GUI-потока, фоновой загрузки каталога и сканов процессов.
+    """
+
+    def __init__(self, enabled=METRICS_ENABLED):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.counters = {}
+        self.histograms = {}
+        self.window_counters = {}
+        self.window_histograms = {}
+        self.spans = deque(maxlen=MAX_SPANS)
+
+    def count(self, name, value=1):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+            self.window_counters[name] = self.window_counters.get(name, 0) + value
+
+    def observe(self, name, value_ms, **fields):
+        """Записывает длительность в гистограммы name; fields попадают в замер в журнале."""
+        if not self.enabled:
+            return
+        with self.lock:
+            for histograms in (self.histograms, self.window_histograms):
+                histogram = histograms.get(name)
+                if histogram is None:
+                    histogram = histograms[name] = Histogram()
+                histogram.record(value_ms)
+            self.spans.append({"name": name, "ts": round(time.time(), 3), "ms": round(value_ms, 3), **fields})
+
+    @contextmanager
+    def timer(self, name, **fields):
+        """with metrics.timer("catalog.parse"): ... - длительность блока в гистограмму name.
+        Блок, завершившийся исключением, записывается с error=True и считается в name.errors."""
+        start = time.perf_counter()
+        try:
+            yield fields
+        except BaseException:
+            self.count(name + ".errors")
+            fields["error"] = True
+            raise
+        finally:
+            self.observe(name, (time.perf_counter() - start) * 1000, **fields)
+
+    def snapshot(self):
+        """Сводка за все время работы процесса."""
+        with self.lock:
+            return {
+                "uptime_s": round(time.time() - self.started, 1),
+                "counters": dict(self.counters),
+                "timers": {name: h.as_dict() for name, h in self.histograms.items()}
+            }
+
+    def drain(self):
+        """Забирает данные окна с прошлого вызова: (counters, histograms, spans)."""
+        with self.lock:
+            counters, self.window_counters = self.window_counters, {}
+            histograms, self.window_histograms = self.window_histograms, {}
+            spans = list(self.spans)
+            self.spans.clear()
+        return counters, histograms, spans
+
+
+# Общий экземпляр процесса; функции ниже - короткие имена для мест замеров
+METRICS = Metrics()
+
+
+def count(name, value=1):
+    METRICS.count(name, value)
+
+
+def observe(name, value_ms, **fields):
+    METRICS.observe(name, value_ms, **fields)
+
+
+def timer(name, **fields):
+    return METRICS.timer(name, **fields)
+
+
+def rotate_log(path, backups=LOG_BACKUPS):
+    """metrics.jsonl -> metrics.1.jsonl -> ... -> metrics.<backups>.jsonl (самый старый удаляется)."""
+    root, ext = os.path.splitext(path)
+    names = [path] + [f"{root}.{n}{ext}" for n in range(1, backups + 1)]
+    for older, newer in zip(reversed(names[1:]), reversed(names[:-1])):
+        if os.path.exists(newer):
+            os.replace(newer, older)
+
+
+def read_summaries(log_dir, since=None):
+    """Сводки {"type": "summary"} из log/metrics.jsonl (без ротированных файлов), новее since (unix-время)."""
+    path = os.path.join(log_dir, LOG_FILE_NAME)
+    summaries = []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if '"type": "summary"' not in line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue # строка, оборванная при аварийном завершении
+                if since is None or record.get("ts", 0) >= since:
+                    summaries.append(record)
+    except FileNotFoundError:
+        pass
+    return summaries
+
+
+def merge_summaries(summaries):
+    """Складывает окна журнала: {"counters": {...}, "timers": {имя: as_dict()}}."""
+    counters = {}
+    histograms = {}
+    for record in summaries:
+        for name, value in record.get("counters", {}).items():
+            counters[name] = counters.get(name, 0) + value
+        for name, data in record.get("timers", {}).items():
+            histograms.setdefault(name, Histogram()).merge(data)
+    return {"counters": counters, "timers": {name: h.as_dict() for name, h in sorted(histograms.items())}}
+
+
+class MetricsFlusher:
+    """Фоновый поток: раз в interval секунд дописывает в log/metrics.jsonl замеры окна
+    (строки {"type": "span"}) и сводку окна ({"type": "summary"}) одним write.
+    stop() записывает последнее окно - его нужно вызвать при выходе."""
+
+    def __init__(self, log_dir, app, metrics=None, interval=FLUSH_INTERVAL):
+        self.log_dir = log_dir
+        self.path = os.path.join(log_dir, LOG_FILE_NAME)
+        self.app = app # "gui" или "cli": оба процесса пишут в один журнал
+        self.metrics = metrics or METRICS
+        self.interval = interval
+        self.window_start = time.time()
+        self.stopping = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if not self.metrics.enabled or self.thread is not None:
+            return self
+        self.thread = threading.Thread(target=self.run, name="metrics-flush", daemon=True)
+        self.thread.start()
+        return self
+
+    def run(self):
+        while not self.stopping.wait(self.interval):
+            self.flush()
+
+    def stop(self):
+        if self.thread is not None:
+            self.stopping.set()
+            self.thread.join()
+            self.thread = None
+        if self.metrics.enabled:
+            self.flush()
+
+    def flush(self):
+        counters, histograms, spans = self.metrics.drain()
+        now = time.time()
+        window_start, self.window_start = self.window_start, now
+        if not counters and not histograms:
+            return
+        base = {"app": self.app, "pid": os.getpid()}
+        out = io.StringIO()
+        for span in spans:
+            out.write(json.dumps({"type": "span", **base, **span}, ensure_ascii=False) + "\n")
+        summary = {
+            "type": "summary", **base,
+            "ts": round(now, 3),
+            "window_s": round(now - window_start, 3),
+            "counters": counters,
+            "timers": {name: h.as_dict() for name, h in histograms.items()}
+        }
+        out.write(json.dumps(summary, ensure_ascii=False) + "\n")
+        try:
+            os.makedirs(self.log_dir, exist_ok=True)
+            if os.path.exists(self.path) and os.path.getsize(self.path) >= MAX_LOG_BYTES:
+                rotate_log(self.path)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(out.getvalue())
+        except OSError as e:
+            print(f"ОШИБКА записи метрик в {self.path}: {e}")
+
+
+class Profiler:
+    """Режим --profile: разделы (запуск, обновление каталога, команда CLI) выполняются
+    под cProfile, статистика пишется в log/profile/<раздел>-<время>.prof (pstats,
+    snakeviz) и .txt (первые PROFILE_TOP функций по cumulative).
+
+    cProfile профилирует только поток, вызвавший start; вложенный раздел того же
+    потока выполняется без своего профиля (его время уже входит во внешний).
+    """
+
+    def __init__(self, log_dir, enabled=False):
+        self.out_dir = os.path.join(log_dir, PROFILE_DIR_NAME)
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.active = set() # потоки, в которых сейчас идет профиль
+
+    def start(self, name):
+        """Включает профиль раздела; возвращает токен для stop() или None."""
+        if not self.enabled:
+            return None
+        thread_id = threading.get_ident()
+        with self.lock:
+            if thread_id in self.active:
+                return None
+            self.active.add(thread_id)
+        import cProfile # Стандартная библиотека; нужен только в режиме --profile
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:
+            # Python 3.12+: профилировщик один на процесс (раздел в другом потоке)
+            with self.lock:
+                self.active.discard(thread_id)
+            print(f"ОШИБКА профиля '{name}': {e}")
+            return None
+        return (name, profile, time.perf_counter(), thread_id)
+
+    def stop(self, token):
+        """Выключает профиль и пишет файлы; возвращает путь .prof или None."""
+        if token is None:
+            return None
+        name, profile, start, thread_id = token
+        profile.disable()
+        with self.lock:
+            self.active.discard(thread_id)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        base = os.path.join(self.out_dir, f"{name}-{stamp}-{os.getpid()}")
+        try:
+            import pstats # Стандартная библиотека
+            os.makedirs(self.out_dir, exist_ok=True)
+            profile.dump_stats(base + ".prof")
+            text = io.StringIO()
+            stats = pstats.Stats(profile, stream=text)
+            stats.sort_stats("cumulative").print_stats(PROFILE_TOP)
+            with open(base + ".txt", 'w', encoding='utf-8') as f:
+                f.write(f"{name}: {elapsed_ms:.1f} мс\n")
+                f.write(text.getvalue())
+        except OSError as e:
+            print(f"ОШИБКА записи профиля '{name}': {e}")
+            return None
+        print(f"Python: Профиль '{name}' ({elapsed_ms:.0f} мс) записан в {base}.prof")
+        return base + ".prof"
+
+    @contextmanager
+    def section(self, name):
+        token = self.start(name)
+        try:
+            yield
+        finally:
+            self.stop(token)
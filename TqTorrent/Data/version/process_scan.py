@@ -0,0 +1,122 @@
+import os # Стандартная библиотека
+import sys # Стандартная библиотека
+import csv # Стандартная библиотека
+import subprocess # Стандартная библиотека
+
+try:
+    import psutil # Необязательная зависимость
+except ImportError:
+    psutil = None
+
+
+def _add(index, name, pid):
+    if name:
+        index.setdefault(name.lower(), set()).add(pid)
+
+
+def snapshot_proc(proc_root="/proc"):
+    """Linux: один проход по /proc. Имя процесса берется из /proc/<pid>/comm
+    (обрезано ядром до 15 символов) и из имени файла exe/cmdline."""
+    index = {}
+    try:
+        entries = os.listdir(proc_root)
+    except OSError:
+        return index
+
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        pid = int(entry)
+        base = os.path.join(proc_root, entry)
+        try:
+            with open(os.path.join(base, "comm"), 'r', encoding='utf-8', errors='replace') as f:
+                _add(index, f.read().strip(), pid)
+            with open(os.path.join(base, "cmdline"), 'rb') as f:
+                argv0 = f.read().split(b'\0', 1)[0].decode('utf-8', 'replace')
+        except OSError:
+            # Процесс завершился во время обхода или нет прав
+            continue
+        if argv0:
+            # Wine/Proton запускают Windows-игры как C:\...\game.exe
+            _add(index, argv0.replace('\\', '/').rsplit('/', 1)[-1], pid)
+    return index
+
+
+def snapshot_psutil():
+    """Любая ОС с установленным psutil."""
+    index = {}
+    for proc in psutil.process_iter(['pid', 'name']):
+        _add(index, proc.info['name'], proc.info['pid'])
+    return index
+
+
+def snapshot_tasklist():
+    """Windows без psutil: один вызов tasklist на весь скан."""
+    index = {}
+    result = subprocess.run(
+        ['tasklist', '/fo', 'csv', '/nh'],
+        capture_output=True,
+        text=True,
+        check=False
+    )
+    for row in csv.reader(result.stdout.splitlines()):
+        if len(row) >= 2 and row[1].isdigit():
+            _add(index, row[0], int(row[1]))
+    return index
+
+
+def pick_backend():
+    """Выбирает способ перечисления процессов для текущей платформы."""
+    if sys.platform.startswith("linux") and os.path.isdir("/proc/self"):
+        return snapshot_proc
+    if psutil is not None:
+        return snapshot_psutil
+    if sys.platform == "win32":
+        return snapshot_tasklist
+    return None
+
+
+class ProcessSnapshot:
+    """Снимок запущенных процессов: индекс «имя в нижнем регистре -> набор pid».
+
+    Строится один раз на скан, после чего проверка каждой игры - поиск в словаре.
+    """
+
+    def __init__(self, index):
+        self.index = index
+
+    @classmethod
+    def take(cls, backend=None):
+        backend = backend or pick_backend()
+        if backend is None:
+            print("ОШИБКА: нет способа получить список процессов на этой платформе.")
+            return cls({})
+        try:
+            return cls(backend())
+        except Exception as e:
+            print(f"ОШИБКА при получении списка процессов: {e}")
+            return cls({})
+
+    def pids(self, process_name):
+        if not process_name:
+            return set()
+        name = process_name.lower()
+        pids = self.index.get(name)
+        if pids is None and len(name) > 15:
+            # /proc/<pid>/comm обрезан ядром до 15 символов
+            pids = self.index.get(name[:15])
+        return pids or set()
+
+    def is_running(self, process_name):
+        return bool(self.pids(process_name))
+
+    def running_game_ids(self, games, installed_ids=None):
+        """id игр, чей process_name есть в снимке (только среди installed_ids, если задан)."""
+        running = set()
+        for game in games:
+            game_id = game.get("id")
+            if installed_ids is not None and game_id not in installed_ids:
+                continue
+            if self.is_running(game.get("process_name")):
+                running.add(game_id)
+        return running
@@ -0,0 +1,69 @@
+import time # Стандартная библиотека
+import threading # Стандартная библиотека
+
+
+class TrackedProcess:
+    """Запущенный нами процесс игры: Popen-хендл, pid и время старта."""
+
+    def __init__(self, game_id, popen):
+        self.game_id = game_id
+        self.popen = popen
+        self.pid = popen.pid
+        self.started_at = time.time()
+        self.started_monotonic = time.monotonic()
+
+
+class ProcessTracker:
+    """Хранит Popen-хендлы игр, запущенных через GameLauncherBridge.launchGame.
+
+    На каждый процесс заводится фоновый поток, который блокируется в Popen.wait()
+    (waitpid без опроса) и по завершении вызывает on_exit(game_id, pid,
+    returncode, play_seconds, still_running). still_running=True означает, что
+    у игры остались другие запущенные нами процессы.
+    on_exit вызывается из фонового потока - GUI должен передать событие в свой поток
+    (например, через сигнал Qt).
+    """
+
+    def __init__(self, on_exit):
+        self.on_exit = on_exit
+        self.lock = threading.Lock()
+        self.processes = {} # game_id -> {pid: TrackedProcess}
+
+    def track(self, game_id, popen):
+        record = TrackedProcess(game_id, popen)
+        with self.lock:
+            self.processes.setdefault(game_id, {})[record.pid] = record
+        waiter = threading.Thread(
+            target=self._wait, args=(record,), name=f"game-waiter-{game_id}-{record.pid}", daemon=True
+        )
+        waiter.start()
+        return record
+
+    def _wait(self, record):
+        try:
+            returncode = record.popen.wait()
+        except Exception as e:
+            print(f"ОШИБКА ожидания процесса {record.pid}: {e}")
+            returncode = None
+        play_seconds = time.monotonic() - record.started_monotonic
+
+        with self.lock:
+            game_processes = self.processes.get(record.game_id, {})
+            game_processes.pop(record.pid, None)
+            still_running = bool(game_processes)
+            if not still_running:
+                self.processes.pop(record.game_id, None)
+
+        self.on_exit(record.game_id, record.pid, returncode, play_seconds, still_running)
+
+    def is_running(self, game_id):
+        with self.lock:
+            return bool(self.processes.get(game_id))
+
+    def running_game_ids(self):
+        with self.lock:
+            return sorted(self.processes)
+
+    def pids(self, game_id):
+        with self.lock:
+            return sorted(self.processes.get(game_id, {}))
@@ -0,0 +1,333 @@
+import re # Стандартная библиотека
+import heapq # Стандартная библиотека
+from collections import defaultdict
+
+# --- НАСТРОЙКИ ПОИСКА ---
+TITLE_WEIGHT = 3.0 # Вес совпадения в названии относительно описания
+DESCRIPTION_WEIGHT = 1.0
+PREFIX_SCORE = 0.8 # Множитель для совпадения по началу слова ("стал" -> "сталкер")
+FUZZY_SCORE = 0.6 # Множитель для нечеткого совпадения (опечатки)
+FUZZY_THRESHOLD = 0.45 # Минимальный коэффициент Дайса по триграммам
+MIN_FUZZY_LENGTH = 3 # Короче - только точное совпадение или начало слова
+DEFAULT_LIMIT = 200
+EXACT_SCORE_LIMIT = 2000 # Найдено не больше - оценка каждой игры; больше - ленивый обход по весам
+# --------------------
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def normalize(text):
+    return (text or "").lower().replace("ё", "е")
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(normalize(text))
+
+
+def trigrams(token):
+    """Триграммы слова с маркерами границ: "игра" -> {"$иг", "игр", "гра", "ра$"}."""
+    padded = f"${token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """Поисковый индекс каталога.
+
+    tokens: слово -> {id игры: вес} (обратный индекс по названию и описанию);
+    grams: триграмма -> множество слов словаря (для начала слова и опечаток);
+    games: id -> игра (поиск карточки за O(1));
+    by_status: статус (action) -> множество id для фильтров.
+    Обновляется по одной игре (add/remove) или дельтой catalog_delta (apply_delta).
+
+    Частые слова ("описание" есть почти в каждой игре) не оцениваются целиком:
+    число найденных считается пересечением множеств, а первые limit игр
+    выбираются ленивым обходом списков слов по убыванию веса (порог Фейджина),
+    который останавливается, как только оставшиеся игры не могут обогнать
+    уже отобранные. Списки по весам (tiers) и id каждого статуса в порядке
+    каталога (status_lists) строятся при первом запросе и сбрасываются
+    изменением соответствующего слова или статуса.
+    """
+
+    def __init__(self, games=()):
+        self.games = {}
+        self.order = [] # id в порядке каталога (для пустого запроса)
+        self.doc_tokens = {} # id -> {слово: вес}, чтобы удалять игру без перебора индекса
+        self.tokens = defaultdict(dict)
+        self.grams = defaultdict(set)
+        self.by_status = defaultdict(set)
+        self.tiers = {} # слово -> [(вес, [id в порядке добавления])] по убыванию веса
+        self.status_lists = {} # статус -> [id в порядке каталога]
+        self.order_dirty = False
+        self.build(games)
+
+    # ----------------- ПОСТРОЕНИЕ -----------------
+
+    def build(self, games):
+        self.games.clear()
+        self.order = []
+        self.doc_tokens.clear()
+        self.tokens.clear()
+        self.grams.clear()
+        self.by_status.clear()
+        self.tiers.clear()
+        self.status_lists.clear()
+        for game in games:
+            self.add(game)
+
+    def add(self, game):
+        game_id = game["id"]
+        if game_id in self.games:
+            self.remove(game_id)
+        else:
+            self.order.append(game_id)
+        self.games[game_id] = game
+        self.by_status[game.get("action", "")].add(game_id)
+        self.status_lists.pop(game.get("action", ""), None)
+
+        weights = {}
+        for token in tokenize(game.get("description", "")):
+            weights[token] = max(weights.get(token, 0.0), DESCRIPTION_WEIGHT)
+        for token in tokenize(game.get("title", "")):
+            weights[token] = TITLE_WEIGHT
+        self.doc_tokens[game_id] = weights
+        tiers = self.tiers
+        for token, weight in weights.items():
+            if tiers:
+                tiers.pop(token, None)
+            postings = self.tokens[token]
+            if not postings:
+                for gram in trigrams(token):
+                    self.grams[gram].add(token)
+            postings[game_id] = weight
+
+    def remove(self, game_id):
+        game = self.games.pop(game_id, None)
+        if game is None:
+            return
+        self.order_dirty = True
+        self.by_status[game.get("action", "")].discard(game_id)
+        self.status_lists.pop(game.get("action", ""), None)
+        for token in self.doc_tokens.pop(game_id, {}):
+            self.tiers.pop(token, None)
+            postings = self.tokens.get(token)
+            if postings is None:
+                continue
+            postings.pop(game_id, None)
+            if not postings:
+                # Слово больше не встречается - убираем его из словаря триграмм
+                del self.tokens[token]
+                for gram in trigrams(token):
+                    words = self.grams.get(gram)
+                    if words is not None:
+                        words.discard(token)
+                        if not words:
+                            del self.grams[gram]
+
+    def apply_delta(self, delta):
+        """Применяет дельту catalog_delta.diff_catalog: {"added", "changed", "removed"}."""
+        for game_id in delta.get("removed", []):
+            self.remove(game_id)
+        for game in delta.get("changed", []):
+            self.add(game)
+        for game in delta.get("added", []):
+            self.add(game)
+
+    def get(self, game_id):
+        return self.games.get(game_id)
+
+    def catalog_order(self):
+        if self.order_dirty:
+            self.order = [game_id for game_id in self.order if game_id in self.games]
+            self.order_dirty = False
+        return self.order
+
+    # ----------------- ПОИСК -----------------
+
+    def expand(self, query_token):
+        """Слова словаря, подходящие под слово запроса: {слово: множитель}."""
+        matches = {}
+        if query_token in self.tokens:
+            matches[query_token] = 1.0
+
+        # Слова с началом запроса делят с ним триграмму "$..", с опечатками - большинство триграмм
+        query_grams = trigrams(query_token)
+        counts = defaultdict(int)
+        for gram in query_grams:
+            for token in self.grams.get(gram, ()):
+                counts[token] += 1
+
+        for token, common in counts.items():
+            if token in matches:
+                continue
+            if token.startswith(query_token):
+                matches[token] = PREFIX_SCORE
+            elif len(query_token) >= MIN_FUZZY_LENGTH:
+                dice = 2.0 * common / (len(query_grams) + len(token))
+                if dice >= FUZZY_THRESHOLD:
+                    matches[token] = FUZZY_SCORE * dice
+        return matches
+
+    def search(self, query, filters=None, limit=DEFAULT_LIMIT):
+        """Ищет игры. Возвращает (ids по убыванию релевантности, сколько всего найдено).
+
+        Все слова запроса должны найтись (точно, по началу слова или с опечаткой).
+        filters: {"status": "установлено" | [статусы]} - только игры с этими action.
+        """
+        statuses = self.statuses(filters)
+        query_tokens = list(dict.fromkeys(tokenize(query)))
+        if not query_tokens:
+            if statuses is None:
+                ids = self.catalog_order()
+            elif len(statuses) == 1:
+                ids = self.status_list(statuses[0])
+            else:
+                allowed = self.status_filter(filters)
+                ids = [game_id for game_id in self.catalog_order() if game_id in allowed]
+            return ids[:limit], len(ids)
+
+        expansions = [self.expand(token) for token in query_tokens]
+        if any(not matches for matches in expansions):
+            return [], 0
+
+        # Начинаем с самого редкого слова запроса, остальные только сужают множество
+        def postings_size(matches):
+            return sum(len(self.tokens[token]) for token in matches)
+        expansions.sort(key=postings_size)
+
+        matched = self.matching(expansions[0])
+        if statuses is not None:
+            matched = self.intersect(matched, self.status_filter(filters))
+        for matches in expansions[1:]:
+            if not matched:
+                break
+            matched = self.narrow(matched, matches)
+
+        total = len(matched)
+        if total <= EXACT_SCORE_LIMIT or total <= limit:
+            scores = {game_id: self.score(game_id, expansions) for game_id in matched}
+            if total > limit:
+                best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            else:
+                best = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+            return [game_id for game_id, _ in best], total
+        return self.top_scored(expansions, matched, limit), total
+
+    def matching(self, matches):
+        """Игры, в которых есть хотя бы одно из слов matches (словарь postings или множество)."""
+        if len(matches) == 1:
+            return self.tokens[next(iter(matches))]
+        postings = sorted((self.tokens[token] for token in matches), key=len, reverse=True)
+        found = set(postings[0])
+        for other in postings[1:]:
+            found.update(other)
+        return found
+
+    def narrow(self, matched, matches):
+        """Оставляет из matched игры, в которых есть одно из слов matches. Объединение
+        списков слов строится, только если это дешевле проверки каждой найденной игры."""
+        postings = [self.tokens[token] for token in matches]
+        if len(postings) == 1:
+            return self.intersect(matched, postings[0])
+        if len(matched) * len(postings) < sum(len(p) for p in postings):
+            return {game_id for game_id in matched if any(game_id in p for p in postings)}
+        return self.intersect(matched, self.matching(matches))
+
+    @staticmethod
+    def intersect(a, b):
+        # Пересечение множеств и словарей (через keys()) на стороне C: обходится меньшее из двух
+        return (a.keys() if isinstance(a, dict) else a) & (b.keys() if isinstance(b, dict) else b)
+
+    def score(self, game_id, expansions):
+        """Релевантность игры: сумма по словам запроса лучшего совпадения (вес * множитель)."""
+        total = 0.0
+        for matches in expansions:
+            best = 0.0
+            for token, factor in matches.items():
+                weight = self.tokens[token].get(game_id)
+                if weight is not None and weight * factor > best:
+                    best = weight * factor
+            total += best
+        return total
+
+    def tier_list(self, token):
+        tiers = self.tiers.get(token)
+        if tiers is None:
+            postings = self.tokens[token]
+            tiers = [(weight, [game_id for game_id, w in postings.items() if w == weight])
+                     for weight in sorted(set(postings.values()), reverse=True)]
+            self.tiers[token] = tiers
+        return tiers
+
+    def ranked(self, matches):
+        """(оценка, id) по одному слову запроса в порядке убывания оценки; id может повторяться."""
+        tiers = sorted(((weight * factor, ids) for token, factor in matches.items()
+                        for weight, ids in self.tier_list(token)), key=lambda tier: tier[0], reverse=True)
+        for score, ids in tiers:
+            for game_id in ids:
+                yield score, game_id
+
+    def top_scored(self, expansions, matched, limit):
+        """Первые limit игр из matched по релевантности без оценки всех найденных (алгоритм порога).
+
+        Списки слов запроса обходятся параллельно по убыванию оценки; каждая новая
+        игра оценивается целиком. Порог - сумма текущих оценок всех списков: ни
+        одна еще не встреченная игра не наберет больше. Как только худшая из
+        отобранных не ниже порога, обход останавливается. При равной оценке
+        раньше идет встреченная раньше игра."""
+        lists = [self.ranked(matches) for matches in expansions]
+        current = [0.0] * len(lists)
+        best = [] # куча (оценка, -номер встречи, id): сверху худшая из отобранных
+        seen = set()
+        single = len(lists) == 1
+        seq = 0
+        while True:
+            for i, ranked in enumerate(lists):
+                item = next(ranked, None)
+                if item is None:
+                    # Список исчерпан: все найденные игры уже встречены в нем
+                    return [game_id for _, _, game_id in sorted(best, reverse=True)]
+                score, game_id = item
+                current[i] = score
+                if game_id in seen or game_id not in matched:
+                    continue
+                seen.add(game_id)
+                # Одно слово запроса: первая встреча игры - ее лучшая оценка
+                full = score if single else self.score(game_id, expansions)
+                seq += 1
+                entry = (full, -seq, game_id)
+                if len(best) < limit:
+                    heapq.heappush(best, entry)
+                elif entry > best[0]:
+                    heapq.heapreplace(best, entry)
+            if len(best) == limit and best[0][0] >= sum(current):
+                return [game_id for _, _, game_id in sorted(best, reverse=True)]
+
+    def statuses(self, filters):
+        if not filters or not filters.get("status"):
+            return None
+        statuses = filters["status"]
+        if isinstance(statuses, str):
+            statuses = [statuses]
+        return list(dict.fromkeys(normalize(status) for status in statuses))
+
+    def status_list(self, status):
+        """id игр статуса в порядке каталога (для пустого запроса с фильтром)."""
+        ids = self.status_lists.get(status)
+        if ids is None:
+            members = self.by_status.get(status, ())
+            ids = [game_id for game_id in self.catalog_order() if game_id in members] if members else []
+            self.status_lists[status] = ids
+        return ids
+
+    def status_filter(self, filters):
+        """Множество id игр с нужными статусами или None (без фильтра). Только для чтения:
+        при одном статусе это само множество by_status."""
+        statuses = self.statuses(filters)
+        if statuses is None:
+            return None
+        if len(statuses) == 1:
+            return self.by_status.get(statuses[0], set())
+        allowed = set()
+        for status in statuses:
+            allowed |= self.by_status.get(status, set())
+        return allowed
@@ -0,0 +1,204 @@
+import os # Стандартная библиотека
+import re # Стандартная библиотека
+import sys # Стандартная библиотека
+import json # Стандартная библиотека
+import argparse # Стандартная библиотека
+import time # Стандартная библиотека
+import getpass # Стандартная библиотека
+import tempfile # Стандартная библиотека
+from PyQt6.QtCore import QObject, QLockFile
+from PyQt6.QtNetwork import QLocalServer, QLocalSocket
+
+# --- НАСТРОЙКИ ОДНОГО ЭКЗЕМПЛЯРА ---
+SERVER_NAME_PREFIX = "TqTorrent" # Имя канала: TqTorrent-<пользователь>
+CONNECT_TIMEOUT_MS = 200 # Сколько ждать уже запущенное окно
+REPLY_TIMEOUT_MS = 3000 # Сколько ждать ответа на одну команду
+MAX_LINE_BYTES = 64 * 1024 # Длиннее - не команда, соединение закрывается
+# Сколько второй запуск ждет канал первого, который еще загружается (PyQt, WebEngine) и держит блокировку
+STARTUP_WAIT_MS = 30000
+RETRY_INTERVAL_S = 0.1
+# --------------------
+
+# Команды протокола (поле "command" строки JSON)
+ACTIVATE = "activate" # показать и поднять окно
+OPEN_VIEW = "open_view" # {"view": "catalog" | "downloads" | "installed" | "mods" | "settings"}
+LAUNCH = "launch" # {"game_id": N} - запустить установленную игру
+REFRESH = "refresh" # перечитать каталог и передать изменения в окно
+STATUS = "status" # pid, число игр, запущенные игры
+
+VIEWS = ["catalog", "downloads", "installed", "mods", "settings"]
+
+
+def server_name():
+    """Имя локального канала (named pipe в Windows, сокет в каталоге tmp в Linux) для текущего пользователя.
+    TQ_INSTANCE_NAME задает другое имя (отдельный экземпляр, например для bench.py)."""
+    if os.environ.get("TQ_INSTANCE_NAME"):
+        return os.environ["TQ_INSTANCE_NAME"]
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = "user"
+    return f"{SERVER_NAME_PREFIX}-{re.sub(r'[^A-Za-z0-9_.-]', '_', user)}"
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        prog="main_app.py",
+        description="Каталог TqG. Если окно уже открыто, команды передаются ему, а новое окно не создается."
+    )
+    parser.add_argument("--view", choices=VIEWS, help="открыть вкладку")
+    parser.add_argument("--launch", type=int, metavar="GAME_ID", help="запустить установленную игру по id")
+    parser.add_argument("--refresh", action="store_true", help="перечитать каталог")
+    parser.add_argument("--status", action="store_true", help="напечатать состояние запущенного окна (и сводку метрик)")
+    parser.add_argument("--profile", action="store_true",
+                        help="запуск и обновления каталога под cProfile (файлы в log/profile); только для нового окна")
+    return parser
+
+
+def commands_from_args(argv):
+    """Команды протокола из аргументов командной строки (неизвестные аргументы - для Qt)."""
+    args, _ = build_arg_parser().parse_known_args(argv)
+    commands = []
+    if args.refresh:
+        commands.append({"command": REFRESH})
+    if args.view:
+        commands.append({"command": OPEN_VIEW, "view": args.view})
+    if args.launch is not None:
+        commands.append({"command": LAUNCH, "game_id": args.launch})
+    if args.status:
+        commands.append({"command": STATUS})
+    return commands
+
+
+def send_commands(commands, name=None, wait_ms=0):
+    """Отправляет команды запущенному окну, по строке JSON на команду.
+    wait_ms - сколько повторять подключение, пока окно не откроет канал.
+    Возвращает список ответов или None, если окно не запущено."""
+    socket = QLocalSocket()
+    deadline = time.monotonic() + wait_ms / 1000
+    while True:
+        socket.connectToServer(name or server_name())
+        if socket.waitForConnected(CONNECT_TIMEOUT_MS):
+            break
+        socket.abort()
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(RETRY_INTERVAL_S)
+
+    replies = []
+    for command in commands:
+        socket.write(json.dumps(command, ensure_ascii=False).encode("utf-8") + b"\n")
+        socket.waitForBytesWritten(REPLY_TIMEOUT_MS)
+        while not socket.canReadLine():
+            if not socket.waitForReadyRead(REPLY_TIMEOUT_MS):
+                replies.append({"ok": False, "error": "нет ответа от запущенного окна"})
+                break
+        else:
+            try:
+                replies.append(json.loads(bytes(socket.readLine()).decode("utf-8")))
+            except ValueError as e:
+                replies.append({"ok": False, "error": f"некорректный ответ: {e}"})
+    socket.disconnectFromServer()
+    return replies
+
+
+def lock_path(name=None):
+    return os.path.join(tempfile.gettempdir(), f"{name or server_name()}.lock")
+
+
+def acquire_instance_lock(name=None):
+    """Блокировка экземпляра (QLockFile рядом с сокетом канала), которую окно держит все время работы.
+    Возвращает заблокированный QLockFile или None, если его держит другой живой процесс.
+    Блокировку умершего процесса Qt снимает сам (проверка pid), поэтому срок устаревания не нужен."""
+    lock = QLockFile(lock_path(name))
+    lock.setStaleLockTime(0)
+    return lock if lock.tryLock(0) else None
+
+
+def forward_to_running_instance(argv, wait_ms=0, name=None):
+    """Второй запуск: передает команды из argv уже открытому окну.
+    True - окно найдено (процесс можно завершать), False - это первый экземпляр."""
+    commands = commands_from_args(argv)
+    # Просто повторный запуск поднимает уже открытое окно
+    replies = send_commands(commands or [{"command": ACTIVATE}], name, wait_ms)
+    if replies is None:
+        return False
+    for command, reply in zip(commands, replies):
+        if not reply.get("ok"):
+            print(f"ОШИБКА команды {command['command']}: {reply.get('error')}")
+        elif command["command"] == STATUS:
+            print(json.dumps(reply, ensure_ascii=False, indent=1))
+    return True
+
+
+class InstanceServer(QObject):
+    """Локальный сервер первого экземпляра: принимает команды вторых запусков и скриптов.
+
+    Протокол - строки JSON: {"command": ..., параметры} -> {"ok": true/false, ...}.
+    handler(command) вызывается в GUI-потоке и возвращает словарь ответа;
+    исключение превращается в {"ok": false, "error": ...}.
+    """
+
+    def __init__(self, handler, name=None, parent=None):
+        super().__init__(parent)
+        self.handler = handler
+        self.name = name or server_name()
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+        self.server.newConnection.connect(self.on_new_connection)
+
+    def listen(self):
+        """Открывает канал. Имя отбирается только у сокета, который остался после аварийного
+        завершения (Linux) и на подключение не отвечает; канал живого окна не трогается.
+        Проверка - до listen(): с UserAccessOption Qt создает сокет во временном каталоге и
+        переименовывает поверх существующего, то есть listen() молча забрал бы чужое имя."""
+        probe = QLocalSocket()
+        probe.connectToServer(self.name)
+        if probe.waitForConnected(CONNECT_TIMEOUT_MS):
+            probe.disconnectFromServer()
+            print(f"ОШИБКА локального сервера {self.name}: канал уже открыт другим окном")
+            return False
+        QLocalServer.removeServer(self.name)
+        if not self.server.listen(self.name):
+            print(f"ОШИБКА локального сервера {self.name}: {self.server.errorString()}")
+            return False
+        return True
+
+    def close(self):
+        self.server.close()
+
+    def on_new_connection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            socket.readyRead.connect(lambda socket=socket: self.on_ready_read(socket))
+            socket.disconnected.connect(socket.deleteLater)
+
+    def on_ready_read(self, socket):
+        while socket.canReadLine():
+            line = bytes(socket.readLine()).strip()
+            if line:
+                reply = self.dispatch(line)
+                socket.write(json.dumps(reply, ensure_ascii=False).encode("utf-8") + b"\n")
+        if socket.bytesAvailable() > MAX_LINE_BYTES:
+            socket.abort()
+
+    def dispatch(self, line):
+        try:
+            command = json.loads(line.decode("utf-8"))
+            if not isinstance(command, dict) or not isinstance(command.get("command"), str):
+                return {"ok": False, "error": "ожидается объект JSON с полем command"}
+            return self.handler(command)
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+
+
+if __name__ == "__main__":
+    # Локальное API для скриптов: python single_instance.py --view installed | --launch 12 | --refresh | --status
+    commands = commands_from_args(sys.argv[1:]) or [{"command": STATUS}]
+    replies = send_commands(commands)
+    if replies is None:
+        print(f"ОШИБКА: каталог не запущен (канал {server_name()})")
+        sys.exit(1)
+    for reply in replies:
+        print(json.dumps(reply, ensure_ascii=False))
+    sys.exit(0 if all(reply.get("ok") for reply in replies) else 2)
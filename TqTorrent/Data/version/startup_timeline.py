@@ -0,0 +1,81 @@
+import time # Стандартная библиотека
+import json # Стандартная библиотека
+import threading # Стандартная библиотека
+
+# Момент импорта модуля - main_app импортирует его первым, это и есть "начало запуска"
+PROCESS_START = time.perf_counter()
+
+# Фазы запуска (в порядке вывода)
+IMPORTS = "imports" # импорт модулей main_app
+QT_INIT = "qt_init" # создание QApplication
+WINDOW = "window" # окно и QWebEngineView (старт Chromium)
+DATA_LOAD = "data_load" # чтение, разбор и сериализация каталога (фоновый поток)
+PAGE_LOAD = "page_load" # загрузка index.html до loadFinished
+FIRST_RENDER = "first_render" # setConfigData и построение сетки в JS
+PHASE_ORDER = [IMPORTS, QT_INIT, WINDOW, DATA_LOAD, PAGE_LOAD, FIRST_RENDER]
+
+BENCH_LINE_PREFIX = "STARTUP_TIMELINE " # Строка с JSON замеров в выводе main_app (для bench.py)
+
+
+class StartupTimeline:
+    """Замеры фаз запуска: для каждой фазы - начало и конец в секундах от PROCESS_START.
+
+    Фазы могут идти параллельно (DATA_LOAD в фоновом потоке пересекается с
+    WINDOW и PAGE_LOAD), поэтому хранится интервал, а не одна отметка.
+    Время до готовности интерфейса - конец FIRST_RENDER.
+    """
+
+    def __init__(self, origin=PROCESS_START):
+        self.origin = origin
+        self.lock = threading.Lock()
+        self.phases = {} # фаза -> [начало, конец или None]
+
+    def now(self):
+        return time.perf_counter() - self.origin
+
+    def start(self, phase):
+        """Начинает фазу. Замеряется только первый раз (повторная загрузка страницы - уже не запуск)."""
+        with self.lock:
+            self.phases.setdefault(phase, [self.now(), None])
+
+    def finish(self, phase):
+        """Завершает фазу; если start() не вызывался, фаза считается от начала запуска."""
+        with self.lock:
+            entry = self.phases.setdefault(phase, [0.0, None])
+            if entry[1] is None:
+                entry[1] = self.now()
+
+    def done(self, phase):
+        with self.lock:
+            return phase in self.phases and self.phases[phase][1] is not None
+
+    def time_to_interactive(self):
+        with self.lock:
+            entry = self.phases.get(FIRST_RENDER)
+            return entry[1] if entry and entry[1] is not None else None
+
+    def as_dict(self):
+        """{"phases": {фаза: {"start_ms", "end_ms", "ms"}}, "interactive_ms": ...} для JSON."""
+        with self.lock:
+            items = sorted(self.phases.items(),
+                           key=lambda item: PHASE_ORDER.index(item[0]) if item[0] in PHASE_ORDER else len(PHASE_ORDER))
+            phases = {}
+            for phase, (start, end) in items:
+                if end is None:
+                    continue
+                phases[phase] = {"start_ms": round(start * 1000, 1), "end_ms": round(end * 1000, 1),
+                                 "ms": round((end - start) * 1000, 1)}
+        interactive = self.time_to_interactive()
+        return {"phases": phases, "interactive_ms": round(interactive * 1000, 1) if interactive is not None else None}
+
+    def format(self):
+        data = self.as_dict()
+        lines = ["Python: Замеры запуска (мс от старта процесса):"]
+        for phase, entry in data["phases"].items():
+            lines.append(f"  {phase:<13} {entry['start_ms']:8.1f} -> {entry['end_ms']:8.1f}  ({entry['ms']:.1f})")
+        if data["interactive_ms"] is not None:
+            lines.append(f"  интерфейс готов через {data['interactive_ms']:.1f} мс")
+        return "\n".join(lines)
+
+    def to_json(self):
+        return json.dumps(self.as_dict(), ensure_ascii=False)
@@ -0,0 +1,8 @@
+import os # Стандартная библиотека
+import sys # Стандартная библиотека
+
+# Модули приложения лежат плоско в Data/version (как при запуске main_app.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Qt без окна (CI, сервер без дисплея); метрики тестов не пишутся в журнал
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("TQ_METRICS", "0")
@@ -0,0 +1,61 @@
+import os # Стандартная библиотека
+import json # Стандартная библиотека
+
+from bench_fixtures import ensure_fixture, write_steam_fixture
+from bench_pipeline import Context, compare, prepare_check_install, run_check_install
+from tqtorrent import scan_installed
+
+
+def stage(median, best, peak_mb=None):
+    return {"seconds": median, "min_seconds": best, "runs": 5, "peak_mb": peak_mb}
+
+
+def test_noisy_median_is_not_a_regression():
+    baseline = {"results": {"1000": {"parse": stage(0.100, 0.050)}}}
+    # Медиана выросла вдвое от фоновой нагрузки, лучший прогон - нет
+    assert compare({"1000": {"parse": stage(0.200, 0.052)}}, baseline, 0.25) == []
+
+
+def test_slower_best_run_is_a_regression():
+    baseline = {"results": {"1000": {"parse": stage(0.100, 0.050)}}}
+    regressions = compare({"1000": {"parse": stage(0.120, 0.080)}}, baseline, 0.25)
+    assert regressions == ["1000 игр, parse: время x1.60"]
+
+
+def test_small_absolute_difference_is_noise():
+    baseline = {"results": {"1000": {"parse": stage(0.004, 0.002)}}}
+    assert compare({"1000": {"parse": stage(0.012, 0.008)}}, baseline, 0.25) == []
+
+
+def test_old_baseline_without_min_seconds():
+    baseline = {"results": {"1000": {"parse": {"seconds": 0.100, "runs": 3, "peak_mb": None}}}}
+    assert compare({"1000": {"parse": stage(0.150, 0.110)}}, baseline, 0.25) == []
+    assert compare({"1000": {"parse": stage(0.300, 0.200)}}, baseline, 0.25) != []
+
+
+def test_check_install_stage_ignores_machine_steam(tmp_path, monkeypatch):
+    ctx = Context(ensure_fixture(str(tmp_path / "fixtures"), 10), 10)
+    games = ctx.store.load_config_data()["GAME_DATA"]
+    # "Steam машины" со всеми играми набора из steamapps/common и steam://
+    apps = [(url.rsplit("/", 1)[-1], "Game", "Game") for url in (g["launch_path"] for g in games) if url.startswith("steam://")]
+    apps += [("7000" + str(g["id"]), "Game", g["launch_path"].split("\\common\\")[1].split("\\")[0])
+             for g in games if "\\common\\" in g["launch_path"]]
+    machine_steam = str(tmp_path / "Steam")
+    write_steam_fixture(machine_steam, apps, libraries=1, installed_share=1.0)
+    monkeypatch.setenv("TQ_STEAM_PATH", machine_steam)
+    assert scan_installed(ctx.store, data=ctx.store.load_config_data())["steam"]
+
+    with open(ctx.paths.data, 'r', encoding='utf-8') as f:
+        installed = json.load(f)["CNF_DATA"]["installed_game_ids"]
+    for _ in range(2):
+        prepare_check_install(ctx)
+        run_check_install(ctx, None)
+        with open(ctx.paths.data, 'r', encoding='utf-8') as f:
+            assert json.load(f)["CNF_DATA"]["installed_game_ids"] == installed
+    assert os.environ["TQ_STEAM_PATH"] == machine_steam
+
+    # prepare возвращает исходный data.json, что бы ни записал прошлый запуск
+    ctx.store.set_installed_ids([1, 2, 3])
+    prepare_check_install(ctx)
+    with open(ctx.paths.data, 'rb') as f:
+        assert f.read() == ctx.data_json
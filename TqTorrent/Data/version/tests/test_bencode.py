@@ -0,0 +1,19 @@
+import pytest
+
+from torrent import decode, encode, BencodeError
+from torrent.bencode import MAX_DEPTH
+
+
+@pytest.mark.parametrize("data", [b"d-4:0", b"-1:a", b" 1:a", b"1 :a", b"l" * 5000, b"d1:a" * 5000,
+                                  b"i-0e", b"i03e", b"i+1e", b"i 1e", b"i1_0e", b"ie", b"i-e", b"i1",
+                                  b"5:abc", b"d1:ai1e", b"di1ei2ee", b"le1:a"])
+def test_malformed_data_is_a_bencode_error(data):
+    with pytest.raises(BencodeError):
+        decode(data)
+
+
+def test_round_trip_and_depth_limit():
+    value = {b"announce": b"http://127.0.0.1/announce", b"info": {b"length": 0, b"n": [-12, 10, [b""]]}}
+    assert decode(encode(value)) == value
+    nested = b"l" * MAX_DEPTH + b"e" * MAX_DEPTH
+    assert encode(decode(nested)) == nested
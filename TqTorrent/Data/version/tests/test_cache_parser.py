@@ -0,0 +1,94 @@
+import re # Стандартная библиотека
+
+from cache_parser import iter_cache_fields, iter_games, iter_games_from_file
+
+FIELDS = ("name", "priwie", "opisan", "url_ins", "dowanloadin", "starting", "deisvie")
+
+
+def baseline_parse(content):
+    """Прежний GameCatalogApp.parse_cache_txt: findall по блокам и re.search по полям."""
+    games = []
+    for game_id, block in enumerate(re.findall(r'(g\d+\s*=\s*.+)', content, re.DOTALL), 1):
+        found = {field: re.search(field + r'\((.*?)\)', block, re.DOTALL) for field in FIELDS}
+        value = {field: match.group(1).strip() if match else "" for field, match in found.items()}
+        games.append({
+            "id": game_id,
+            "title": value["name"] if found["name"] else "Без названия",
+            "description": value["opisan"],
+            "image": value["priwie"],
+            "steam_app_id": None,
+            "process_name": value["dowanloadin"],
+            "launch_path": value["starting"],
+            "url_install": value["url_ins"],
+            "action": value["deisvie"].lower() if found["deisvie"] else "не скачено"
+        })
+    return games
+
+
+def entry(game_id, title, action="НЕ СКАЧЕНО", description="Описание игры.", starting=None):
+    starting = starting or f"C:\\Games\\Game{game_id}\\game{game_id}.exe"
+    return (f"g{game_id} = name({title}), priwie(https://via.placeholder.com/300x180?text=G{game_id}), "
+            f"opisan({description}), url_ins(https://example.com/download/{game_id}), "
+            f"dowanloadin(game{game_id}.exe), starting({starting}), deisvie({action})\n\n")
+
+
+def parse_one(text):
+    return list(iter_games(text.splitlines(keepends=True)))
+
+
+def test_quoted_starting_path_keeps_parentheses():
+    path = '"C:\\Program Files (x86)\\Steam\\steamapps\\common\\Game (GOTY)\\game.exe"'
+    games = parse_one(entry(1, "Игра", starting=path) + entry(2, "Вторая"))
+    assert games[0]["launch_path"] == path.strip('"')
+    # Поля после пути и следующая запись читаются как обычно
+    assert games[0]["action"] == "не скачено"
+    assert [game["title"] for game in games] == ["Игра", "Вторая"]
+
+
+def test_unquoted_values_keep_nested_parentheses():
+    games = parse_one(entry(1, "Империя (с дополнениями (DLC))"))
+    assert games[0]["title"] == "Империя (с дополнениями (DLC))"
+
+
+def test_multiline_description():
+    games = parse_one(entry(1, "Игра", description="Первая строка\r\nвторая строка\r\n(третья)") + entry(2, "Вторая"))
+    assert games[0]["description"] == "Первая строка\nвторая строка\n(третья)"
+    assert games[0]["process_name"] == "game1.exe"
+    assert games[1]["id"] == 2 and games[1]["title"] == "Вторая"
+
+
+def test_deisvie_and_status_fields():
+    status = entry(2, "Статус").replace("deisvie(", "status(")
+    missing = entry(3, "Без действия").replace(", deisvie(НЕ СКАЧЕНО)", "")
+    both = entry(4, "Оба", action="Установлено").replace("\n\n", ", status(ОШИБКА)\n\n")
+    games = parse_one(entry(1, "Действие", action="ЗАПУЩЕНА") + status + missing + both)
+    assert [game["action"] for game in games] == ["запущена", "не скачено", "не скачено", "установлено"]
+    assert "deisvie" not in list(iter_cache_fields(status.splitlines()))[0]
+
+
+def test_last_entry_without_trailing_newline(tmp_path):
+    path = tmp_path / "cache.txt"
+    path.write_text(entry(1, "Первая") + entry(2, "Последняя", action="ОШИБКА").rstrip("\n"), encoding="utf-8")
+    games = list(iter_games_from_file(str(path)))
+    assert len(games) == 2
+    assert games[1]["title"] == "Последняя" and games[1]["action"] == "ошибка"
+
+    # Незакрытое значение в конце файла берется как есть
+    assert parse_one("g1 = name(Игра), opisan(Обрыв")[0]["description"] == "Обрыв"
+
+
+def test_matches_baseline_parser(tmp_path):
+    entries = [entry(1, "Microsoft Flight Simulator", action="Установлено"),
+               entry(2, "Euro Truck Simulator 2", description="Симулятор\nгрузоперевозок по Европе."),
+               entry(3, "Сталкер Тени", action="ОШИБКА"),
+               entry(4, "Metro", action="не скачено").rstrip("\n")]
+    path = tmp_path / "cache.txt"
+    path.write_text("".join(entries), encoding="utf-8")
+    games = list(iter_games_from_file(str(path)))
+
+    # Прежний findall забирал весь остаток файла одним блоком, поэтому эталон - по одной записи
+    expected = []
+    for game_id, text in enumerate(entries, 1):
+        assert parse_one(text) == baseline_parse(text)
+        expected.append(dict(baseline_parse(text)[0], id=game_id))
+    assert games == expected
@@ -0,0 +1,89 @@
+import os # Стандартная библиотека
+
+import catalog_db
+from bench_fixtures import generate_fixture
+from cache_parser import iter_games_from_file
+
+# Непарные скобки и скобка рядом с кавычкой: без кавычек cache.txt такое значение обрывается
+ODD_TITLES = {"Смайлик :)": 'name("Смайлик :)")', "Глава 1) Начало": 'name("Глава 1) Начало")',
+              "(Незакрытая": 'name("(Незакрытая")', "Обычная (Remastered)": "name(Обычная (Remastered))"}
+
+
+def make_config(config_dir, count=50):
+    generate_fixture(str(config_dir), count)
+    with open(config_dir / "cache.txt", 'a', encoding='utf-8') as f:
+        for game_id, field in enumerate(ODD_TITLES.values(), count + 1):
+            f.write(f"g{game_id} = {field}, opisan(Описание), starting(C:\\Games\\{game_id}\\game.exe), status(НЕ СКАЧЕНО)\n\n")
+    return str(config_dir)
+
+
+def snapshot(conn):
+    return catalog_db.read_config_data(conn, {})
+
+
+def test_schema_is_created_once(tmp_path):
+    db_path = str(tmp_path / catalog_db.DB_FILE_NAME)
+    conn = catalog_db.connect(db_path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == catalog_db.SCHEMA_VERSION
+    conn.execute("DROP INDEX idx_games_title")
+    conn.close()
+
+    # Повторное подключение не прогоняет SCHEMA: удаленный индекс не появляется снова
+    conn = catalog_db.connect(db_path)
+    indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert "idx_games_title" not in indexes and "idx_games_status" in indexes
+    conn.close()
+
+
+def test_import_export_round_trip(tmp_path):
+    source = make_config(tmp_path / "source")
+    conn = catalog_db.connect(str(tmp_path / "first.db"))
+    catalog_db.import_legacy(conn, source)
+    before = snapshot(conn)
+    titles = {game["title"] for game in before["GAME_DATA"]}
+    assert set(ODD_TITLES) <= titles
+    assert before["CNF_DATA"]["installed_game_ids"] and before["CNF_DATA"]["steam_nickname"] == "Игрок_bench"
+
+    exported = tmp_path / "exported"
+    exported.mkdir()
+    catalog_db.export_legacy(conn, str(exported))
+    conn.close()
+    # cache.txt после выгрузки читается парсером без потерь
+    parsed = {game["id"]: game["title"] for game in iter_games_from_file(str(exported / "cache.txt"))}
+    assert parsed == {game["id"]: game["title"] for game in before["GAME_DATA"]}
+
+    conn = catalog_db.connect(str(tmp_path / "second.db"))
+    catalog_db.import_legacy(conn, str(exported))
+    assert snapshot(conn) == before
+    conn.close()
+
+
+def test_reader_is_not_blocked_by_writer(tmp_path):
+    db_path = str(tmp_path / catalog_db.DB_FILE_NAME)
+    writer = catalog_db.connect(db_path)
+    catalog_db.import_legacy(writer, make_config(tmp_path / "config", 20))
+    reader = catalog_db.connect(db_path)
+    reader.execute("PRAGMA busy_timeout = 0") # Блокировка - сразу ошибка, а не ожидание
+    assert writer.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    before = snapshot(reader)
+
+    # Открытая транзакция записи: читатель видит последний зафиксированный снимок
+    writer.execute("BEGIN IMMEDIATE")
+    writer.execute("UPDATE games SET status = 'ошибка'")
+    writer.execute("DELETE FROM install_state")
+    assert snapshot(reader) == before
+    writer.commit()
+    after = snapshot(reader)
+    assert {game["action"] for game in after["GAME_DATA"]} == {"ошибка"}
+    assert after["CNF_DATA"]["installed_game_ids"] == []
+
+    # Открытый снимок чтения не мешает писателю зафиксировать изменения
+    reader.execute("BEGIN")
+    catalog_db.read_games(reader)
+    catalog_db.set_game_status(writer, 1, "установлено")
+    assert catalog_db.read_games(reader)[0]["action"] == "ошибка"
+    reader.commit()
+    assert catalog_db.read_games(reader)[0]["action"] == "установлено"
+    assert os.path.exists(db_path + "-wal")
+    writer.close()
+    reader.close()
@@ -0,0 +1,114 @@
+import os # Стандартная библиотека
+import json # Стандартная библиотека
+import shutil # Стандартная библиотека
+import subprocess # Стандартная библиотека
+
+import pytest
+
+from tqtorrent.cli import main
+
+# Скрипт и копия sleep вместо игр: запуск и поиск процессов без Windows
+posix_only = pytest.mark.skipif(os.name == "nt", reason="исполняемые файлы-заглушки для POSIX")
+PROCESS_NAME = "tqcli-sleeper" # Уникальное имя процесса (короче 15 символов comm)
+
+
+def cache_entry(game_id, title, status, starting, process_name=""):
+    return (f"g{game_id} = name({title}), priwie(), opisan(Описание {title}), url_ins(), "
+            f"dowanloadin({process_name}), starting({starting}), status({status})\n\n")
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    config_dir = tmp_path / "config"
+    config_dir.mkdir()
+    steam = tmp_path / "steam" # Пустой каталог Steam: скан не видит библиотек машины
+    steam.mkdir()
+    monkeypatch.setenv("TQ_STEAM_PATH", str(steam))
+    game = tmp_path / "Game" / "game.sh"
+    game.parent.mkdir()
+    game.write_text("#!/bin/sh\nexit 3\n")
+    game.chmod(0o755)
+    sleeper = tmp_path / "Sleeper" / PROCESS_NAME
+
+    entries = [cache_entry(1, "Скрипт", "УСТАНОВЛЕНО", game),
+               cache_entry(2, "Спящий", "УСТАНОВЛЕНО", sleeper, PROCESS_NAME),
+               cache_entry(3, "Не скачана", "НЕ СКАЧЕНО", tmp_path / "Missing" / "game.exe"),
+               cache_entry(4, "Еще не скачана", "не скачено", "")]
+    (config_dir / "cache.txt").write_text("".join(entries), encoding="utf-8")
+    data = {"CNF_DATA": {"progr_name": "TqTorrent", "installed_game_ids": [1, 2], "running_game_ids": []}}
+    (config_dir / "data.json").write_text(json.dumps(data), encoding="utf-8")
+    return {"dir": str(config_dir), "game": str(game), "sleeper": str(sleeper)}
+
+
+def run(capsys, config, *argv):
+    code = main(["--config", config["dir"], "--json", *argv])
+    lines = capsys.readouterr().out.strip().splitlines()
+    return code, json.loads(lines[-1])
+
+
+def cnf_data(config):
+    with open(os.path.join(config["dir"], "data.json"), 'r', encoding='utf-8') as f:
+        return json.load(f)["CNF_DATA"]
+
+
+def test_status(capsys, config):
+    code, result = run(capsys, config, "status")
+    assert code == 0
+    assert set(result) == {"ok", "games", "installed", "running_game_ids", "source", "config_dir", "elapsed_ms"}
+    assert result["ok"] is True and result["games"] == 4 and result["installed"] == 2
+    assert result["running_game_ids"] == [] and result["config_dir"] == config["dir"]
+    assert isinstance(result["elapsed_ms"], float)
+
+    # Без --json - одна строка сводки и время команды
+    assert main(["--config", config["dir"], "status"]) == 0
+    text = capsys.readouterr().out
+    assert text.startswith("4 игр, установлено 2, запущено 0") and text.rstrip().endswith("мс)")
+
+
+def test_list_by_status(capsys, config):
+    code, result = run(capsys, config, "list", "--status", "не скачено")
+    assert code == 0 and result["total"] == 2
+    assert sorted(game["id"] for game in result["games"]) == [3, 4]
+    assert set(result["games"][0]) >= {"id", "title", "action", "launch_path"}
+
+    code, result = run(capsys, config, "list", "спящий")
+    assert [game["id"] for game in result["games"]] == [2]
+
+
+@posix_only
+def test_scan_finds_running_and_installed_games(capsys, config):
+    os.makedirs(os.path.dirname(config["sleeper"]))
+    shutil.copy(shutil.which("sleep"), config["sleeper"])
+    process = subprocess.Popen([config["sleeper"], "30"])
+    try:
+        code, result = run(capsys, config, "scan", "--installed")
+        assert code == 0
+        assert result["running_game_ids"] == [2] and result["started"] == [2] and result["stopped"] == []
+        assert result["installed"]["found"] == [1, 2] and result["installed"]["steam"] == {}
+        assert result["installed"]["missing"] == [] and result["installed"]["unmarked"] == []
+        assert cnf_data(config)["running_game_ids"] == [2]
+    finally:
+        process.kill()
+        process.wait()
+
+    code, result = run(capsys, config, "scan")
+    assert result["running_game_ids"] == [] and result["stopped"] == [2]
+    assert "installed" not in result
+    assert cnf_data(config)["running_game_ids"] == []
+
+
+@posix_only
+def test_launch_wait(capsys, config):
+    code, result = run(capsys, config, "launch", "1", "--wait")
+    assert code == 0
+    assert set(result) == {"ok", "game_id", "pid", "returncode", "play_seconds", "elapsed_ms"}
+    assert result["game_id"] == 1 and result["returncode"] == 3 and result["pid"] > 0
+    # После выхода из игры отметка запуска снята
+    assert cnf_data(config)["running_game_ids"] == []
+
+
+def test_errors_are_json(capsys, config):
+    code, result = run(capsys, config, "launch", "99")
+    assert code == 1 and result == {"ok": False, "error": "игра 99 не найдена в каталоге"}
+    code, result = run(capsys, config, "launch", "4")
+    assert code == 1 and result["ok"] is False and "нет пути запуска" in result["error"]
@@ -0,0 +1,106 @@
+import os # Стандартная библиотека
+import asyncio # Стандартная библиотека
+
+import pytest
+
+from torrent import TorrentSession, TrackerServer, parse_metainfo, build_metainfo
+from torrent.client import PeerState
+from torrent.peer import PeerError, parse_request, parse_piece, parse_have
+from torrent.picker import BLOCK_SIZE, RECEIVED
+
+PIECE_LENGTH = 2 * BLOCK_SIZE
+
+
+def make_source(root, size):
+    source = os.path.join(root, "Game")
+    os.makedirs(source)
+    with open(os.path.join(source, "game.bin"), 'wb') as f:
+        f.write(os.urandom(size))
+    return source
+
+
+def read_files(root):
+    result = {}
+    for dir_path, _, names in os.walk(root):
+        for name in names:
+            with open(os.path.join(dir_path, name), 'rb') as f:
+                result[os.path.relpath(os.path.join(dir_path, name), root)] = f.read()
+    return result
+
+
+def test_loopback_swarm_with_tracker(tmp_path):
+    seed_dir = str(tmp_path / "seed")
+    source = make_source(seed_dir, 5 * PIECE_LENGTH + 123)
+    os.makedirs(os.path.join(source, "data"))
+    with open(os.path.join(source, "data", "pak0.pak"), 'wb') as f:
+        f.write(os.urandom(PIECE_LENGTH // 3)) # Кусок на границе двух файлов
+
+    async def swarm():
+        tracker = await TrackerServer().start()
+        torrent_bytes = build_metainfo(source, announce=tracker.announce_url, piece_length=PIECE_LENGTH)
+        seeder = TorrentSession(parse_metainfo(torrent_bytes), seed_dir)
+        leechers = [TorrentSession(parse_metainfo(torrent_bytes), str(tmp_path / f"leech_{n}")) for n in range(2)]
+        try:
+            await seeder.listen()
+            await seeder.announce("started")
+            for leecher in leechers:
+                await leecher.listen()
+            await asyncio.wait_for(asyncio.gather(*(leecher.download() for leecher in leechers)), 60)
+            return [leecher.picker.complete for leecher in leechers], list(tracker.swarms.values())[0]
+        finally:
+            for session in [seeder] + leechers:
+                await session.close()
+            await tracker.stop()
+
+    complete, swarm_peers = asyncio.run(swarm())
+    assert complete == [True, True]
+    assert len(swarm_peers) == 3
+    expected = read_files(seed_dir)
+    for n in range(2):
+        assert read_files(str(tmp_path / f"leech_{n}")) == expected
+
+
+class SilentConn:
+    def send_cancel(self, *request):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_unrequested_blocks_drop_the_peer(tmp_path):
+    source = make_source(str(tmp_path), 3 * PIECE_LENGTH)
+    metainfo = parse_metainfo(build_metainfo(source, piece_length=PIECE_LENGTH))
+
+    async def scenario():
+        session = TorrentSession(metainfo, str(tmp_path / "dest"))
+        session.open()
+        state = PeerState(SilentConn())
+        key = id(state)
+        session.picker.add_peer_pieces({1})
+        state.outstanding.update(session.picker.next_requests({1}, 2, key))
+        piece = session.picker.active[1]
+        try:
+            # Смещение не на границе блока и блок длиннее запрошенного (залез бы в кусок 2)
+            for begin, length in ((1, BLOCK_SIZE), (0, BLOCK_SIZE + 1), (BLOCK_SIZE, 3 * BLOCK_SIZE)):
+                with pytest.raises(PeerError):
+                    await session._on_block(state, key, 1, begin, b"x" * length)
+            with pytest.raises(PeerError):
+                await session._on_block(state, key, 7, 0, b"x" * BLOCK_SIZE)
+            assert RECEIVED not in piece.state
+            assert session.storage.read(2, 0, 16) == bytes(16)
+
+            await session._on_block(state, key, 1, BLOCK_SIZE, b"y" * BLOCK_SIZE)
+            assert piece.state[1] == RECEIVED
+            assert session.storage.read(1, BLOCK_SIZE, BLOCK_SIZE) == b"y" * BLOCK_SIZE
+        finally:
+            await session.close()
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("parse, payload", [(parse_request, b"\0" * 11), (parse_request, b"\0" * 13),
+                                            (parse_piece, b"\0" * 7), (parse_have, b""), (parse_have, b"\0" * 3)])
+def test_malformed_message_is_a_peer_error(parse, payload):
+    with pytest.raises(PeerError):
+        parse(payload)
@@ -0,0 +1,39 @@
+import os # Стандартная библиотека
+
+import pytest
+
+from tqtorrent.config import ConfigPaths
+
+
+@pytest.fixture(autouse=True)
+def clean_env(monkeypatch):
+    for name in ("TQ_CONFIG_PATH", "TQ_BASE_PATH", "TQ_LOG_PATH"):
+        monkeypatch.delenv(name, raising=False)
+
+
+def test_standard_layout_keeps_data_two_levels_up(tmp_path):
+    root = tmp_path / "Documents" / "TqTorrent"
+    paths = ConfigPaths(str(root / "Data" / "config"))
+    assert paths.base_dir == str(root)
+    assert paths.log == str(root / "log")
+    assert paths.downloads == str(root / "downloads")
+    assert paths.saves == os.path.join(str(root), "Localsaves_by_TqTorrent", "saves")
+
+
+def test_custom_config_dir_keeps_everything_inside(tmp_path, monkeypatch):
+    config_dir = str(tmp_path / "x")
+    monkeypatch.setenv("TQ_CONFIG_PATH", config_dir)
+    paths = ConfigPaths()
+    # Раньше журнал уходил на два уровня выше: /tmp/x -> /log
+    assert paths.config_dir == config_dir
+    for path in (paths.log, paths.downloads, paths.mods, paths.covers, paths.saves, paths.save_store):
+        assert path.startswith(config_dir + os.sep)
+
+
+def test_explicit_base_and_log(tmp_path, monkeypatch):
+    monkeypatch.setenv("TQ_BASE_PATH", str(tmp_path / "base"))
+    monkeypatch.setenv("TQ_LOG_PATH", str(tmp_path / "logs"))
+    paths = ConfigPaths(str(tmp_path / "config"))
+    assert paths.downloads == str(tmp_path / "base" / "downloads")
+    assert paths.log == str(tmp_path / "logs")
+    assert ConfigPaths(str(tmp_path / "config"), log_dir="L").log == "L"
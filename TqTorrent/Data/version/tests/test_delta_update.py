@@ -0,0 +1,81 @@
+import os # Стандартная библиотека
+import json # Стандартная библиотека
+
+import pytest
+
+from delta_update import (publish, update_tree, DirectorySource, UpdateError, MANIFEST_FILE_NAME,
+                          CHUNK_CACHE_SUFFIX, STAGING_SUFFIX)
+
+
+def write_tree(root, files):
+    for rel_path, data in files.items():
+        path = os.path.join(root, *rel_path.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+
+
+def read_tree(root):
+    result = {}
+    for dir_path, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(dir_path, name)
+            rel_path = os.path.relpath(path, root).replace(os.sep, "/")
+            if rel_path != MANIFEST_FILE_NAME:
+                with open(path, 'rb') as f:
+                    result[rel_path] = f.read()
+    return result
+
+
+@pytest.fixture
+def versions(tmp_path):
+    old = {"main_app.py": b"print('old')\n" * 2000, "assets/logo.png": b"\x89PNG" + b"\0" * 5000}
+    new = {"main_app.py": b"print('old')\n" * 1500 + b"print('new')\n" * 500,
+           "assets/logo.png": old["assets/logo.png"], "app.js": b"console.log(1);\n"}
+    target, src, out = tmp_path / "version", tmp_path / "src", tmp_path / "updates"
+    write_tree(target, old)
+    write_tree(src, new)
+    publish(str(src), str(out))
+    return str(target), str(out), new
+
+
+def test_update_applies_new_version(versions):
+    target, out, new = versions
+    report = update_tree(target, DirectorySource(out))
+    assert read_tree(target) == new
+    assert 0 < report["fetched_bytes"] < report["total_bytes"]
+    assert not os.path.exists(target + CHUNK_CACHE_SUFFIX)
+
+
+@pytest.mark.parametrize("rel_path", ["../evil.py", "/tmp/evil.py", "C:/evil.py", "C:evil.py", "a\\..\\evil.py",
+                                      "a/./evil.py", "a//evil.py", "", "evil.py:stream", MANIFEST_FILE_NAME])
+def test_unsafe_manifest_path_is_rejected_before_fetch(versions, rel_path):
+    target, out, _ = versions
+    manifest_path = os.path.join(out, MANIFEST_FILE_NAME)
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    manifest["files"][rel_path] = manifest["files"].pop("app.js")
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+
+    before = read_tree(target)
+    with pytest.raises(UpdateError):
+        update_tree(target, DirectorySource(out))
+    assert read_tree(target) == before
+    assert not os.path.exists(target + CHUNK_CACHE_SUFFIX)
+    assert not os.path.exists(target + STAGING_SUFFIX)
+    assert not os.path.exists(os.path.join(os.path.dirname(target), "evil.py"))
+
+
+def test_bad_chunk_digest_is_rejected(versions):
+    target, out, _ = versions
+    manifest_path = os.path.join(out, MANIFEST_FILE_NAME)
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    manifest["files"]["app.js"]["chunks"][0][0] = "../../evil"
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+
+    with pytest.raises(UpdateError):
+        update_tree(target, DirectorySource(out))
+    assert not os.path.exists(target + CHUNK_CACHE_SUFFIX)
@@ -0,0 +1,159 @@
+import os # Стандартная библиотека
+import time # Стандартная библиотека
+import threading # Стандартная библиотека
+
+import pytest
+
+from bench_fixtures import serve_directory
+from downloader import DownloadCancelled, SegmentedDownload
+from download_scheduler import DownloadScheduler, DONE, PAUSED
+
+WAIT_S = 5
+MB = 1024 * 1024
+RATE_TOLERANCE = 0.05 # Измеренная скорость - в пределах 5% от предела
+
+
+class SlowJob:
+    """Задание, которое после cancel() еще дописывает файл, пока тест не отпустит release."""
+
+    writers = {} # game_id -> одновременно работающих потоков
+    peak = {}
+    lock = threading.Lock()
+
+    def __init__(self, game_id, release):
+        self.game_id = game_id
+        self.release = release
+        self.cancelled = threading.Event()
+        self.started = threading.Event()
+
+    def run(self):
+        with self.lock:
+            self.writers[self.game_id] = self.writers.get(self.game_id, 0) + 1
+            self.peak[self.game_id] = max(self.peak.get(self.game_id, 0), self.writers[self.game_id])
+        self.started.set()
+        try:
+            self.release.wait(WAIT_S)
+            if self.cancelled.is_set():
+                raise DownloadCancelled(self.game_id)
+            return f"game_{self.game_id}.bin"
+        finally:
+            with self.lock:
+                self.writers[self.game_id] -= 1
+
+    def cancel(self):
+        self.cancelled.set()
+
+
+def make_scheduler(max_active=1):
+    finished = []
+    exited = threading.Semaphore(0)
+
+    def on_finished(game_id, state, result):
+        finished.append((game_id, state))
+        exited.release()
+
+    return DownloadScheduler(max_active=max_active, on_finished=on_finished), finished, exited
+
+
+def enqueue(scheduler, game_id, release, created):
+    def factory(on_progress, limiter):
+        job = SlowJob(game_id, release)
+        created.append(job)
+        return job
+    scheduler.enqueue(game_id, f"Игра {game_id}", factory)
+
+
+def test_removed_active_job_keeps_its_slot_until_thread_exits():
+    scheduler, finished, exited = make_scheduler(max_active=1)
+    release = threading.Event()
+    created = []
+    enqueue(scheduler, 1, release, created)
+    enqueue(scheduler, 2, release, created)
+    assert created[0].started.wait(WAIT_S)
+
+    assert scheduler.remove(1)
+    # Поток задания 1 еще пишет: слот занят, задание 2 не стартует, в статусе задания 1 нет
+    assert scheduler.active_count() == 1
+    assert [job["game_id"] for job in scheduler.status()] == [2]
+    assert len(created) == 1
+    assert not scheduler.remove(1) and not scheduler.pause(1)
+
+    release.set()
+    assert exited.acquire(timeout=WAIT_S)
+    assert finished[0] == (1, PAUSED)
+    assert 1 not in scheduler.jobs
+    assert exited.acquire(timeout=WAIT_S)
+    assert (2, DONE) in finished
+
+
+def test_enqueue_after_remove_waits_for_old_writer():
+    scheduler, finished, exited = make_scheduler(max_active=2)
+    first_release = threading.Event()
+    created = []
+    enqueue(scheduler, 1, first_release, created)
+    assert created[0].started.wait(WAIT_S)
+    assert scheduler.remove(1)
+
+    second_release = threading.Event()
+    second_release.set()
+    enqueue(scheduler, 1, second_release, created)
+    # Второй поток для того же файла не создается, пока жив первый
+    assert len(created) == 1
+    assert [job["state"] for job in scheduler.status()] == ["queued"]
+
+    first_release.set()
+    assert exited.acquire(timeout=WAIT_S)
+    assert exited.acquire(timeout=WAIT_S)
+    assert finished == [(1, PAUSED), (1, DONE)]
+    assert len(created) == 2
+    assert SlowJob.peak[1] == 1
+    assert scheduler.jobs == {}
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    serve_dir = tmp_path / "mirror"
+    serve_dir.mkdir()
+    for n in range(2):
+        (serve_dir / f"game_{n}.bin").write_bytes(os.urandom(4 * MB))
+    httpd = serve_directory(str(serve_dir))
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def run_downloads(mirror, dest_dir, names, job_rate=None, **scheduler_args):
+    """Качает файлы зеркала через планировщик. Возвращает (байт, секунд, итоги)."""
+    finished = []
+    done = threading.Semaphore(0)
+
+    def on_finished(game_id, state, result):
+        finished.append(state)
+        done.release()
+
+    scheduler = DownloadScheduler(on_finished=on_finished, **scheduler_args)
+    start = time.perf_counter()
+    for game_id, name in enumerate(names):
+        dest = os.path.join(dest_dir, name)
+        factory = (lambda url, dest: lambda on_progress, limiter:
+                   SegmentedDownload(url, dest, on_progress=on_progress, throttle=limiter))(f"{mirror.base_url}/{name}", dest)
+        scheduler.enqueue(game_id, name, factory, rate_limit=job_rate)
+    for _ in names:
+        assert done.acquire(timeout=30)
+    elapsed = time.perf_counter() - start
+    return sum(os.path.getsize(os.path.join(dest_dir, name)) for name in names), elapsed, finished
+
+
+def test_global_rate_cap_holds(mirror, tmp_path):
+    cap = 4 * MB
+    total, elapsed, finished = run_downloads(mirror, str(tmp_path), ["game_0.bin", "game_1.bin"],
+                                             max_active=2, global_rate=cap)
+    assert finished == [DONE, DONE]
+    assert abs(total / elapsed - cap) <= cap * RATE_TOLERANCE
+
+
+def test_job_rate_cap_holds(mirror, tmp_path):
+    cap = 2 * MB
+    total, elapsed, finished = run_downloads(mirror, str(tmp_path), ["game_0.bin"], job_rate=cap, max_active=1)
+    assert finished == [DONE]
+    assert abs(total / elapsed - cap) <= cap * RATE_TOLERANCE
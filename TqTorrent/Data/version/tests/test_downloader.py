@@ -0,0 +1,181 @@
+import os # Стандартная библиотека
+import json # Стандартная библиотека
+import threading # Стандартная библиотека
+
+import pytest
+
+import downloader
+from bench_fixtures import serve_directory
+from downloader import SegmentedDownload, DownloadCancelled
+from download_scheduler import DownloadScheduler, FAILED
+
+FILE_SIZE = 3 * 1024 * 1024 + 12345 # Не кратно ни куску, ни числу сегментов
+
+
+@pytest.fixture
+def server(tmp_path):
+    serve_dir = tmp_path / "mirror"
+    serve_dir.mkdir()
+    payload = os.urandom(FILE_SIZE)
+    for name in ("game.bin", "broken.bin"):
+        (serve_dir / name).write_bytes(payload)
+    httpd = serve_directory(str(serve_dir), broken=["broken.bin"])
+    httpd.payload = payload
+    httpd.serve_dir = serve_dir
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def ranges_of(httpd, name):
+    """Запрошенные диапазоны файла без пробы bytes=0-0."""
+    return [header for file, header in httpd.requests if file == name and header != "bytes=0-0"]
+
+
+def test_split_download_matches_source(server, tmp_path):
+    dest = str(tmp_path / "out" / "game.bin")
+    progress = []
+    finished = []
+    download = SegmentedDownload(f"{server.base_url}/game.bin", dest, segments=4,
+                                 on_progress=lambda *args: progress.append(args),
+                                 on_finished=lambda path, error: finished.append((path, error)))
+    assert download.run() == dest
+
+    with open(dest, 'rb') as f:
+        assert f.read() == server.payload
+    assert not os.path.exists(dest + downloader.PART_SUFFIX)
+    assert not os.path.exists(dest + downloader.JOURNAL_SUFFIX)
+    # Четыре смежных диапазона, покрывающих файл целиком
+    spans = sorted(tuple(map(int, header[6:].split("-"))) for header in ranges_of(server, "game.bin"))
+    assert len(spans) == 4
+    assert spans[0][0] == 0 and spans[-1][1] == FILE_SIZE - 1
+    assert all(a[1] + 1 == b[0] for a, b in zip(spans, spans[1:]))
+    assert progress[-1][:2] == (FILE_SIZE, FILE_SIZE)
+    assert finished == [(dest, None)]
+
+
+def fetched_bytes(httpd, name):
+    fetched = 0
+    for header in ranges_of(httpd, name):
+        start, end = map(int, header[6:].split("-"))
+        fetched += end - start + 1
+    return fetched
+
+
+def cancelled_download(url, dest):
+    """Загрузка, отмененная после первого мегабайта: часть сегментов уже записана."""
+    finished = []
+    holder = {}
+
+    def throttle(nbytes):
+        if holder["download"].downloaded >= 1024 * 1024:
+            holder["download"].cancel()
+
+    download = holder["download"] = SegmentedDownload(url, dest, segments=4, workers=1, throttle=throttle,
+                                                      on_finished=lambda path, error: finished.append(error))
+    with pytest.raises(DownloadCancelled):
+        download.run()
+    return download, finished
+
+
+def test_cancel_keeps_journal_and_resume_fetches_only_the_rest(server, tmp_path):
+    dest = str(tmp_path / "game.bin")
+    url = f"{server.base_url}/game.bin"
+    download, finished = cancelled_download(url, dest)
+    assert isinstance(finished[0], DownloadCancelled)
+    assert download.error is finished[0]
+    assert os.path.exists(dest + downloader.PART_SUFFIX)
+    assert os.path.exists(dest + downloader.JOURNAL_SUFFIX)
+    assert not os.path.exists(dest)
+    done_before = download.downloaded
+    assert 0 < done_before < FILE_SIZE
+    with open(dest + downloader.JOURNAL_SUFFIX, 'r', encoding='utf-8') as f:
+        journal = json.load(f)
+    assert journal["etag"] and journal["last_modified"]
+
+    server.requests.clear()
+    server.if_ranges.clear()
+    resumed = SegmentedDownload(url, dest, segments=4)
+    resumed.run()
+    with open(dest, 'rb') as f:
+        assert f.read() == server.payload
+    # Докачка не запрашивает уже записанные байты, и каждый диапазон - с If-Range
+    assert fetched_bytes(server, "game.bin") == FILE_SIZE - done_before
+    assert server.if_ranges == [("game.bin", journal["etag"])] * len(ranges_of(server, "game.bin"))
+
+
+def test_resume_restarts_when_file_changed_on_server(server, tmp_path):
+    dest = str(tmp_path / "game.bin")
+    url = f"{server.base_url}/game.bin"
+    cancelled_download(url, dest)
+
+    # Новая версия того же размера: по размеру подмену не отличить, только по ETag/Last-Modified
+    payload = os.urandom(FILE_SIZE)
+    served = str(server.serve_dir / "game.bin")
+    with open(served, 'wb') as f:
+        f.write(payload)
+    stat = os.stat(served)
+    os.utime(served, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+
+    server.requests.clear()
+    SegmentedDownload(url, dest, segments=4).run()
+    with open(dest, 'rb') as f:
+        assert f.read() == payload
+    assert fetched_bytes(server, "game.bin") == FILE_SIZE
+
+
+def test_errors_reach_callbacks(server, tmp_path):
+    dest = str(tmp_path / "broken.bin")
+    progress = []
+    finished = []
+    download = SegmentedDownload(f"{server.base_url}/broken.bin", dest, segments=2,
+                                 on_progress=lambda *args: progress.append(args),
+                                 on_finished=lambda path, error: finished.append((path, error)))
+    with pytest.raises(IOError):
+        download.run()
+    path, error = finished[0]
+    assert path is None and isinstance(error, IOError) and not isinstance(error, DownloadCancelled)
+    # Последний прогресс - то, что успело записаться до обрыва (журнал для докачки остается)
+    assert progress and 0 < progress[-1][0] < FILE_SIZE
+    assert os.path.exists(dest + downloader.JOURNAL_SUFFIX)
+
+
+def test_scheduler_reports_failures(server, tmp_path):
+    results = {}
+    done = threading.Semaphore(0)
+
+    def on_finished(game_id, state, result):
+        results[game_id] = (state, result)
+        done.release()
+
+    def broken_factory(on_progress, limiter):
+        raise ValueError("нет места на диске")
+
+    scheduler = DownloadScheduler(max_active=2, on_finished=on_finished)
+    scheduler.enqueue(1, "Нет файла", lambda on_progress, limiter:
+                      SegmentedDownload(f"{server.base_url}/missing.bin", str(tmp_path / "missing.bin"),
+                                        on_progress=on_progress, throttle=limiter))
+    scheduler.enqueue(2, "Без задания", broken_factory)
+    for _ in range(2):
+        assert done.acquire(timeout=10)
+
+    assert results[1][0] == FAILED and "404" in str(results[1][1])
+    assert results[2][0] == FAILED and isinstance(results[2][1], ValueError)
+    errors = {job["game_id"]: job["error"] for job in scheduler.status()}
+    assert "404" in errors[1] and errors[2] == "нет места на диске"
+
+
+def test_file_replaced_after_probe_is_an_error(server, tmp_path, monkeypatch):
+    served = str(server.serve_dir / "game.bin")
+    real_probe = downloader.probe
+
+    def probe_then_replace(url):
+        # Файл заменяют между пробой и запросами сегментов
+        result = real_probe(url)
+        stat = os.stat(served)
+        os.utime(served, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+        return result
+
+    monkeypatch.setattr(downloader, "probe", probe_then_replace)
+    with pytest.raises(IOError, match="изменился во время загрузки"):
+        SegmentedDownload(f"{server.base_url}/game.bin", str(tmp_path / "game.bin"), segments=2).run()
@@ -0,0 +1,88 @@
+import os # Стандартная библиотека
+import time # Стандартная библиотека
+
+import pytest
+
+QtCore = pytest.importorskip("PyQt6.QtCore")
+from file_watcher import ConfigFileWatcher, DEBOUNCE_MS
+
+# Изменение должно дойти до окна заметно быстрее секунды
+UI_BUDGET_S = 0.5
+
+
+@pytest.fixture(scope="module")
+def qt_app():
+    app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+    yield app
+
+
+def wait_for_signal(app, received, timeout_s):
+    deadline = time.perf_counter() + timeout_s
+    while not received and time.perf_counter() < deadline:
+        app.processEvents(QtCore.QEventLoop.ProcessEventsFlag.AllEvents, 10)
+        time.sleep(0.002)
+
+
+def make_watcher(tmp_path, names):
+    paths = []
+    for name in names:
+        path = tmp_path / name
+        path.write_text("g1 = name(Игра 1)\n", encoding="utf-8")
+        paths.append(str(path))
+    watcher = ConfigFileWatcher(paths)
+    received = []
+    watcher.filesChanged.connect(lambda changed: received.append((time.perf_counter(), changed)))
+    watcher.start()
+    return watcher, paths, received
+
+
+def test_write_reaches_signal_within_budget(qt_app, tmp_path):
+    watcher, paths, received = make_watcher(tmp_path, ["cache.txt", "data.json"])
+    try:
+        started = time.perf_counter()
+        with open(paths[0], 'a', encoding="utf-8") as f:
+            f.write("g2 = name(Игра 2)\n")
+        wait_for_signal(qt_app, received, 2.0)
+        assert received, "filesChanged не пришел"
+        fired_at, changed = received[0]
+        assert changed == [paths[0]]
+        assert fired_at - started >= DEBOUNCE_MS / 1000 * 0.9
+        assert fired_at - started < UI_BUDGET_S
+    finally:
+        watcher.stop()
+
+
+def test_burst_of_writes_is_one_event(qt_app, tmp_path):
+    watcher, paths, received = make_watcher(tmp_path, ["cache.txt"])
+    try:
+        for i in range(20):
+            with open(paths[0], 'a', encoding="utf-8") as f:
+                f.write(f"g{i} = name(Игра {i})\n")
+        wait_for_signal(qt_app, received, 2.0)
+        # Таймер склейки мог бы выстрелить второй раз - ждем его окно
+        wait_for_signal(qt_app, [], DEBOUNCE_MS / 1000 * 2)
+        assert len(received) == 1
+    finally:
+        watcher.stop()
+
+
+def test_replace_via_rename_is_seen(qt_app, tmp_path):
+    watcher, paths, received = make_watcher(tmp_path, ["data.json"])
+    try:
+        tmp_file = str(tmp_path / "data.json.tmp")
+        with open(tmp_file, 'w', encoding="utf-8") as f:
+            f.write('{"CNF_DATA": {}}')
+        started = time.perf_counter()
+        os.replace(tmp_file, paths[0])
+        wait_for_signal(qt_app, received, 2.0)
+        assert received and received[0][1] == paths[0:1]
+        assert received[0][0] - started < UI_BUDGET_S
+
+        # После замены файл снова под наблюдением: следующая запись тоже видна
+        received.clear()
+        with open(paths[0], 'a', encoding="utf-8") as f:
+            f.write(" ")
+        wait_for_signal(qt_app, received, 2.0)
+        assert received
+    finally:
+        watcher.stop()
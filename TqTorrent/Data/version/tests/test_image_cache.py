@@ -0,0 +1,60 @@
+import os # Стандартная библиотека
+
+import pytest
+
+pytest.importorskip("PyQt6.QtGui")
+
+from image_cache import ImageCache, read_source
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 32
+
+
+@pytest.fixture
+def roots(tmp_path):
+    config_dir = tmp_path / "config"
+    covers = tmp_path / "covers"
+    for directory in (config_dir, covers):
+        directory.mkdir()
+    (config_dir / "cover.png").write_bytes(PNG)
+    (covers / "game.png").write_bytes(PNG)
+    (tmp_path / "secret.txt").write_bytes(b"secret")
+    return str(config_dir), str(covers)
+
+
+def test_local_covers_inside_roots_are_read(roots):
+    config_dir, covers = roots
+    assert read_source(os.path.join(covers, "game.png"), roots) == PNG
+    # Относительный путь - от каталога конфигурации
+    assert read_source("cover.png", roots) == PNG
+
+
+@pytest.mark.parametrize("url", ["../secret.txt", "{config}/../secret.txt", "{tmp}/secret.txt",
+                                 "file:///etc/passwd", "ftp://example.com/a.png"])
+def test_other_sources_are_rejected(roots, url):
+    config_dir, covers = roots
+    url = url.format(config=config_dir, tmp=os.path.dirname(config_dir))
+    with pytest.raises(IOError):
+        read_source(url, roots)
+
+
+def test_symlink_out_of_root_is_rejected(roots, tmp_path):
+    config_dir, covers = roots
+    link = os.path.join(covers, "link.png")
+    try:
+        os.symlink(tmp_path / "secret.txt", link)
+    except (OSError, NotImplementedError):
+        pytest.skip("Нет прав на символические ссылки")
+    with pytest.raises(IOError):
+        read_source(link, roots)
+
+
+def test_cache_fetches_only_allowed_files(roots, tmp_path):
+    config_dir, covers = roots
+    cache = ImageCache(str(tmp_path / "image_cache"), local_roots=roots)
+    try:
+        assert cache.fetch(os.path.join(covers, "game.png"))
+        assert cache.read(os.path.join(covers, "game.png")) == (PNG, "image/png")
+        assert not cache.fetch(str(tmp_path / "secret.txt"))
+        assert cache.read(str(tmp_path / "secret.txt")) is None
+    finally:
+        cache.close()
@@ -0,0 +1,69 @@
+import os # Стандартная библиотека
+import hashlib # Стандартная библиотека
+
+import pytest
+
+from torrent import parse_metainfo, build_metainfo, encode, BencodeError
+
+
+def make_torrent(name, paths=None, length=10):
+    """Минимальный .torrent: один кусок на все файлы."""
+    info = {b"name": name, b"piece length": 1024, b"pieces": hashlib.sha1(b"").digest()}
+    if paths is None:
+        info[b"length"] = length
+    else:
+        info[b"files"] = [{b"length": length, b"path": path} for path in paths]
+    return encode({b"info": info})
+
+
+@pytest.mark.parametrize("name", [b"", b".", b"..", b"/etc", b"a/b", b"..\\evil", b"C:", b"C:game", b"\\\\server"])
+def test_unsafe_name_is_rejected(name):
+    with pytest.raises(BencodeError):
+        parse_metainfo(make_torrent(name))
+    with pytest.raises(BencodeError):
+        parse_metainfo(make_torrent(name, paths=[[b"file.bin"]]))
+
+
+@pytest.mark.parametrize("path", [[], [b""], [b".."], [b"dir", b"."], [b"a/b"], [b"a\\b"], [b"/abs"], [b"D:x"]])
+def test_unsafe_path_is_rejected(path):
+    with pytest.raises(BencodeError):
+        parse_metainfo(make_torrent(b"game", paths=[path]))
+
+
+def test_built_torrent_round_trips(tmp_path):
+    source = tmp_path / "Game 1.0"
+    (source / "data").mkdir(parents=True)
+    (source / "game.exe").write_bytes(b"x" * 3000)
+    (source / "data" / "pak0.pak").write_bytes(b"y" * 500)
+
+    metainfo = parse_metainfo(build_metainfo(str(source), piece_length=1024))
+    assert metainfo.name == "Game 1.0"
+    assert [(entry.path, entry.length, entry.offset) for entry in metainfo.files] == [
+        (os.path.join("Game 1.0", "game.exe"), 3000, 0), (os.path.join("Game 1.0", "data", "pak0.pak"), 500, 3000)]
+    assert metainfo.num_pieces == 4
+
+
+def info_with(**fields):
+    info = {b"name": b"game", b"piece length": 1024, b"pieces": hashlib.sha1(b"").digest(), b"length": 10}
+    for key, value in fields.items():
+        key = key.replace("_", " ").encode()
+        if value is None:
+            info.pop(key)
+        else:
+            info[key] = value
+    return encode({b"info": info})
+
+
+@pytest.mark.parametrize("data", [
+    info_with(piece_length=None), info_with(piece_length=0), info_with(piece_length=-1024),
+    info_with(piece_length=b"1024"), info_with(pieces=None), info_with(pieces=[b"x" * 20]),
+    info_with(pieces=b"x" * 19), info_with(length=None), info_with(length=-10), info_with(length=b"10"),
+    info_with(name=None), info_with(name=[b"game"]),
+    info_with(length=None, files=[{b"path": [b"a"]}]), info_with(length=None, files=[{b"length": -1, b"path": [b"a"]}]),
+    info_with(length=None, files=[{b"length": 10, b"path": b"a"}]), info_with(length=None, files=[b"a"]),
+    info_with(length=None, files={b"a": 10}), info_with(length=None, files=[{b"length": 10, b"path": [1]}]),
+    encode({b"info": [b"x"]}), encode([b"info"]), b"d4:infod4:name", b"d4:infoi-0ee",
+])
+def test_malformed_metainfo_is_rejected(data):
+    with pytest.raises(BencodeError):
+        parse_metainfo(data)
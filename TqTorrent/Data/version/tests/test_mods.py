@@ -0,0 +1,110 @@
+import os # Стандартная библиотека
+
+from bench_fixtures import write_mod_fixture
+from tqtorrent.mods import ModManager, walk_mod, resolve
+
+
+def write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def make_manager(tmp_path, mods, method="copy"):
+    """mods - {мод: {rel_path: содержимое}}, все включены в порядке словаря."""
+    mods_root, game_dir = str(tmp_path / "mods"), str(tmp_path / "game")
+    os.makedirs(game_dir, exist_ok=True)
+    for mod, files in mods.items():
+        for rel_path, data in files.items():
+            write(os.path.join(mods_root, "1", mod, *rel_path.split("/")), data)
+    manager = ModManager(mods_root, 1, game_dir, (method,))
+    manager.state["enabled"] = list(mods)
+    manager.set_order(list(mods))
+    return manager
+
+
+def test_walk_mod_notices_in_place_edit(tmp_path):
+    root = str(tmp_path / "mod")
+    write(os.path.join(root, "data", "a.bin"), b"one")
+    files, dirs, _ = walk_mod(root)
+
+    write(os.path.join(root, "data", "a.bin"), b"edited in place")
+    new_files, _, scanned = walk_mod(root, (files, dirs))
+    assert scanned == 0
+    assert new_files["data/a.bin"][0] == len(b"edited in place")
+
+
+def test_in_place_mod_edit_is_redeployed(tmp_path):
+    manager = make_manager(tmp_path, {"hd": {"textures/a.dds": b"v1"}})
+    manager.deploy()
+    game_file = os.path.join(manager.game_dir, "textures", "a.dds")
+    assert read(game_file) == b"v1"
+
+    write(os.path.join(manager.root, "hd", "textures", "a.dds"), b"v2 longer")
+    report = ModManager(os.path.dirname(manager.root), 1, manager.game_dir, ("copy",)).deploy()
+    assert report["copy"] == 1
+    assert read(game_file) == b"v2 longer"
+
+
+def test_file_changed_in_game_dir_is_kept(tmp_path):
+    manager = make_manager(tmp_path, {"low": {"cfg.ini": b"low"}, "high": {"cfg.ini": b"high"}})
+    manager.deploy()
+    game_file = os.path.join(manager.game_dir, "cfg.ini")
+    assert read(game_file) == b"high"
+
+    write(game_file, b"edited by the game")
+    manager.set_order(["high", "low"])
+    report = manager.deploy()
+    assert report["kept"] == ["cfg.ini"] and report["copy"] == 0
+    assert read(game_file) == b"edited by the game"
+
+
+def test_fixture_mods_deploy_and_undeploy(tmp_path):
+    mods_root, game_dir = str(tmp_path / "mods"), str(tmp_path / "game")
+    names = write_mod_fixture(os.path.join(mods_root, "1"), game_dir, mods=5, files_per_mod=20)
+    originals = {}
+    for dir_path, _, file_names in os.walk(game_dir):
+        for name in file_names:
+            originals[os.path.join(dir_path, name)] = read(os.path.join(dir_path, name))
+
+    manager = ModManager(mods_root, 1, game_dir, ("hardlink", "copy"))
+    manager.state["enabled"] = list(names)
+    manager.save_state()
+    report = manager.deploy()
+    winners, conflicts = resolve(names, manager.index)
+    assert report["conflicts"] == len(conflicts) > 0
+    assert report["hardlink"] + report["copy"] == len(winners)
+    assert report["backed_up"] == len([path for path in winners if os.path.join(game_dir, *path.split("/")) in originals])
+    for rel_path, mod in winners.items():
+        assert read(os.path.join(game_dir, *rel_path.split("/")))[:len(mod)] == mod.encode()
+    assert manager.deploy()["unchanged"] == len(winners)
+
+    manager.set_enabled(names[-1], False)
+    off = manager.deploy()
+    assert off["removed"] == len([path for path, mod in winners.items() if mod == names[-1]
+                                  if path not in resolve(names[:-1], manager.index)[0]])
+    assert not any(file_names for _, _, file_names in os.walk(os.path.join(game_dir, names[-1])))
+
+    manager.undeploy()
+    assert {path: read(path) for path in originals} == originals
+    for dir_path, _, file_names in os.walk(game_dir):
+        for name in file_names:
+            assert os.path.join(dir_path, name) in originals
+
+
+def test_hardlinked_file_edited_in_place_stays_ours(tmp_path):
+    manager = make_manager(tmp_path, {"hd": {"textures/a.dds": b"v1"}}, method="hardlink")
+    assert manager.deploy()["hardlink"] == 1
+    game_file = os.path.join(manager.game_dir, "textures", "a.dds")
+
+    # Запись в жесткую ссылку меняет и файл мода: это все еще разложенный нами файл
+    write(game_file, b"patched by the game")
+    report = manager.deploy()
+    assert report["kept"] == [] and report["hardlink"] == 1
+    assert manager.undeploy()["kept"] == []
+    assert not os.path.exists(game_file)
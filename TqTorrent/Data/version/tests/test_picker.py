@@ -0,0 +1,36 @@
+from torrent import PiecePicker
+from torrent.picker import BLOCK_SIZE
+
+
+def make_picker(num_pieces=4):
+    # Кусок - один блок: полученный блок сразу собирает кусок
+    return PiecePicker(num_pieces, BLOCK_SIZE, num_pieces * BLOCK_SIZE)
+
+
+def test_verify_piece_after_availability_changed_while_active():
+    picker = make_picker()
+    picker.add_peer_pieces({0, 1, 2, 3})
+    assert picker.next_requests({0}, 1, "a") == [(0, 0, BLOCK_SIZE)]
+    # У куска 0 теперь доступность 2, а корзины 2 нет: кусок активен и в корзины не попадал
+    picker.add_peer_pieces({0})
+    assert picker.block_received(0, 0, "a") == (True, True, set())
+    picker.piece_verified(0)
+
+    assert picker.have[0] and picker.remaining == 3
+    assert all(0 not in bucket for bucket in picker.buckets.values())
+
+
+def test_rarest_piece_first_and_completion():
+    picker = make_picker()
+    picker.add_peer_pieces({0, 1, 2, 3})
+    picker.add_peer_pieces({0, 1, 3})
+    # Кусок 2 есть только у одного пира - он самый редкий
+    assert picker.next_requests({0, 1, 2, 3}, 1, "a") == [(2, 0, BLOCK_SIZE)]
+    picker.mark_have(0)
+    picker.mark_have(0)
+    assert picker.remaining == 3
+
+    for index, begin, _ in [(2, 0, None)] + picker.next_requests({1, 3}, 2, "b"):
+        picker.block_received(index, begin, "a")
+        picker.piece_verified(index)
+    assert picker.complete
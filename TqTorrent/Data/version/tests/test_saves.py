@@ -0,0 +1,42 @@
+import os # Стандартная библиотека
+import time # Стандартная библиотека
+import hashlib # Стандартная библиотека
+
+from tqtorrent.saves import SnapshotStore, GC_GRACE
+
+
+def age(path, seconds):
+    old = time.time() - seconds
+    os.utime(path, (old, old))
+
+
+def test_reused_chunk_survives_prune(tmp_path):
+    store = SnapshotStore(str(tmp_path / "store"))
+    data = b"save slot 1" * 100
+    digest = hashlib.sha256(data).hexdigest()
+    assert store.put_chunk(digest, data) > 0
+    age(store.chunk_path(digest), GC_GRACE * 2)
+
+    # Снимок в другом процессе снова ссылается на старый чанк, но еще не записан
+    assert store.put_chunk(digest, data) == 0
+    assert store.prune()["chunks"] == 0
+    assert store.read_chunk(digest) == data
+
+    age(store.chunk_path(digest), GC_GRACE * 2)
+    assert store.prune()["chunks"] == 1
+    assert not os.path.exists(store.chunk_path(digest))
+
+
+def test_snapshot_restores_single_file(tmp_path):
+    saves = tmp_path / "saves"
+    (saves / "slot").mkdir(parents=True)
+    (saves / "slot" / "1.sav").write_bytes(b"level=3\n" * 50000)
+    (saves / "options.ini").write_bytes(b"volume=7\n")
+    store = SnapshotStore(str(tmp_path / "store"))
+    report = store.snapshot("game", str(saves))
+    assert report["id"] and report["files"] == 2
+
+    (saves / "slot" / "1.sav").write_bytes(b"broken")
+    store.restore_file("game", report["id"], "slot/1.sav", str(saves / "slot" / "1.sav"))
+    assert (saves / "slot" / "1.sav").read_bytes() == b"level=3\n" * 50000
+    assert store.snapshot("game", str(saves))["id"] is None
@@ -0,0 +1,61 @@
+import search_index
+from search_index import SearchIndex
+
+STATUSES = ("установлено", "не скачено", "ошибка")
+
+
+def make_games(count):
+    return [{"id": i, "title": f"Игра {i}" + (" Remastered" if i % 7 == 0 else ""),
+             "description": f"Описание игры номер {i} (издание {i % 10})",
+             "action": STATUSES[i % len(STATUSES)]} for i in range(1, count + 1)]
+
+
+def exact_search(index, query, filters, limit):
+    """Эталон: оценка каждой найденной игры."""
+    expansions = [index.expand(token) for token in dict.fromkeys(search_index.tokenize(query))]
+    allowed = index.status_filter(filters)
+    scores = {}
+    for game_id in index.games:
+        if allowed is not None and game_id not in allowed:
+            continue
+        if all(any(game_id in index.tokens[token] for token in matches) for matches in expansions):
+            scores[game_id] = index.score(game_id, expansions)
+    return sorted(scores.values(), reverse=True)[:limit], len(scores)
+
+
+def test_lazy_ranking_matches_exact_scores(monkeypatch):
+    # Ленивый обход включается уже с 50 найденных игр
+    monkeypatch.setattr(search_index, "EXACT_SCORE_LIMIT", 50)
+    index = SearchIndex(make_games(3000))
+    for query in ("описание", "игра remastered", "издание 3", "описа игры", "remastred", "номер 1"):
+        for filters in (None, {"status": "ошибка"}, {"status": ["ошибка", "установлено"]}):
+            for limit in (1, 20, 200):
+                ids, total = index.search(query, filters, limit)
+                expected, expected_total = exact_search(index, query, filters, limit)
+                assert total == expected_total
+                assert len(set(ids)) == len(ids)
+                expansions = [index.expand(token) for token in dict.fromkeys(search_index.tokenize(query))]
+                assert [index.score(game_id, expansions) for game_id in ids] == expected
+
+
+def test_status_lists_follow_delta():
+    games = make_games(30)
+    index = SearchIndex(games)
+    ids, total = index.search("", {"status": "ошибка"})
+    assert ids == [game["id"] for game in games if game["action"] == "ошибка"] and total == 10
+
+    index.apply_delta({"added": [{"id": 100, "title": "Новая", "description": "", "action": "ошибка"}],
+                       "changed": [dict(games[7], action="установлено")], "removed": [5]})
+    ids, total = index.search("", {"status": "ошибка"})
+    assert ids == [2, 11, 14, 17, 20, 23, 26, 29, 100] and total == 9
+    assert 8 in index.search("", {"status": "установлено"})[0]
+
+
+def test_ranking_follows_changed_postings():
+    index = SearchIndex(make_games(300))
+    assert index.search("описание", limit=5)[1] == 300
+    index.apply_delta({"added": [], "changed": [{"id": 5, "title": "Описание", "description": "", "action": ""}],
+                       "removed": []})
+    # Слово в названии весит больше: игра 5 первая
+    ids, total = index.search("описание", limit=5)
+    assert ids[0] == 5 and total == 300
@@ -0,0 +1,113 @@
+import os # Стандартная библиотека
+import sys # Стандартная библиотека
+import time # Стандартная библиотека
+import uuid # Стандартная библиотека
+import socket # Стандартная библиотека
+import tempfile # Стандартная библиотека
+import threading # Стандартная библиотека
+
+import pytest
+
+QtCore = pytest.importorskip("PyQt6.QtCore")
+pytest.importorskip("PyQt6.QtNetwork")
+from single_instance import (InstanceServer, forward_to_running_instance, send_commands, acquire_instance_lock,
+                             OPEN_VIEW, ACTIVATE)
+
+WAIT_S = 5
+
+
+@pytest.fixture(scope="module")
+def qt_app():
+    app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+    yield app
+
+
+@pytest.fixture
+def name():
+    return f"TqTorrentTest-{uuid.uuid4().hex[:12]}"
+
+
+def in_thread(app, func):
+    """Клиент блокируется на waitFor*, поэтому идет в потоке, а сервер обслуживает GUI-поток."""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(func()), daemon=True)
+    thread.start()
+    deadline = time.perf_counter() + WAIT_S
+    while thread.is_alive() and time.perf_counter() < deadline:
+        app.processEvents(QtCore.QEventLoop.ProcessEventsFlag.AllEvents, 10)
+    thread.join(0)
+    assert result, "клиент не завершился"
+    return result[0]
+
+
+def make_server(name, received):
+    def handler(command):
+        received.append(command)
+        return {"ok": True}
+    return InstanceServer(handler, name=name)
+
+
+def test_second_launch_forwards_commands(qt_app, name):
+    received = []
+    server = make_server(name, received)
+    assert server.listen()
+    try:
+        assert in_thread(qt_app, lambda: forward_to_running_instance(["--view", "installed"], name=name))
+        assert in_thread(qt_app, lambda: forward_to_running_instance([], name=name))
+        assert received == [{"command": OPEN_VIEW, "view": "installed"}, {"command": ACTIVATE}]
+    finally:
+        server.close()
+    assert not in_thread(qt_app, lambda: forward_to_running_instance([], name=name))
+
+
+def test_forward_waits_for_instance_that_is_still_starting(qt_app, name):
+    received = []
+    server = make_server(name, received)
+    QtCore.QTimer.singleShot(300, server.listen)
+    try:
+        assert in_thread(qt_app, lambda: send_commands([{"command": ACTIVATE}], name, wait_ms=3000)) == [{"ok": True}]
+    finally:
+        server.close()
+
+
+def test_live_server_name_is_not_taken_over(qt_app, name):
+    received = []
+    first = make_server(name, received)
+    second = make_server(name, [])
+    assert first.listen()
+    try:
+        assert not second.listen()
+        assert in_thread(qt_app, lambda: forward_to_running_instance([], name=name))
+        assert received == [{"command": ACTIVATE}]
+    finally:
+        first.close()
+        second.close()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="файл сокета остается только в Unix")
+def test_stale_socket_is_replaced(qt_app, name):
+    path = os.path.join(QtCore.QDir.tempPath(), name)
+    stale = socket.socket(socket.AF_UNIX)
+    stale.bind(path)
+    stale.close() # Файл сокета остался, но никто не слушает - как после аварийного завершения
+    received = []
+    server = make_server(name, received)
+    try:
+        assert server.listen()
+        assert in_thread(qt_app, lambda: forward_to_running_instance([], name=name))
+        assert received == [{"command": ACTIVATE}]
+    finally:
+        server.close()
+
+
+def test_instance_lock_is_exclusive(name):
+    lock = acquire_instance_lock(name)
+    assert lock is not None
+    try:
+        assert acquire_instance_lock(name) is None
+    finally:
+        lock.unlock()
+    again = acquire_instance_lock(name)
+    assert again is not None
+    again.unlock()
+    assert not os.path.exists(os.path.join(tempfile.gettempdir(), f"{name}.lock"))
@@ -0,0 +1,123 @@
+import os # Стандартная библиотека
+
+import pytest
+
+from bench_fixtures import write_steam_fixture
+from tqtorrent.steam import (SteamLibraryScanner, parse_vdf, read_manifest, library_folders,
+                             match_steam_games)
+
+
+def test_parse_vdf_nesting_case_and_escapes():
+    text = '''
+    "AppState"
+    {
+        "appid"     "570"
+        "Name"      "Dota \\"2\\""   // комментарий
+        "InstallDir"  "dota 2 beta"
+        "Path"      "C:\\\\Games\\\\Steam"
+        "UserConfig" { "language" "russian" }
+        "launch" [$WIN32] "dota2.exe"
+        bare_key    bare_value
+    }
+    '''
+    state = parse_vdf(text)["appstate"]
+    assert state["appid"] == "570"
+    assert state["name"] == 'Dota "2"'
+    assert state["installdir"] == "dota 2 beta"
+    assert state["path"] == "C:\\Games\\Steam"
+    assert state["userconfig"] == {"language": "russian"}
+    assert state["launch"] == "dota2.exe"
+    assert state["bare_key"] == "bare_value"
+
+
+def test_parse_vdf_block_without_key():
+    with pytest.raises(ValueError):
+        parse_vdf("{ }")
+
+
+APPS = [(str(100 + n), f"Game {n}", f"Game Dir {n}") for n in range(12)]
+
+
+@pytest.fixture
+def steam(tmp_path):
+    steam_root = str(tmp_path / "Steam")
+    roots = write_steam_fixture(steam_root, APPS, libraries=3, installed_share=1.0)
+    return steam_root, roots
+
+
+def manifest_path(roots, index):
+    appid = APPS[index][0]
+    return os.path.join(roots[index % len(roots)], "steamapps", f"appmanifest_{appid}.acf")
+
+
+def set_state_flags(path, flags):
+    """Правка manifest на месте, как это делает Steam: mtime каталога не меняется."""
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    old = os.stat(path)
+    with open(path, 'r+', encoding='utf-8') as f:
+        f.write(text.replace('"StateFlags"\t\t"4"', f'"StateFlags"\t\t"{flags}"'))
+        f.truncate()
+    # Файловые системы с грубым временем: mtime файла все равно должен измениться
+    os.utime(path, ns=(old.st_atime_ns, old.st_mtime_ns + 1_000_000_000))
+
+
+def test_library_folders_and_manifest(steam):
+    steam_root, roots = steam
+    assert library_folders(steam_root)[1:] == roots
+    app = read_manifest(manifest_path(roots, 1))
+    assert (app["appid"], app["name"], app["installdir"], app["state_flags"]) == ("101", "Game 1", "Game Dir 1", 4)
+
+
+def test_scan_finds_installed_apps_and_uses_cache(steam, tmp_path):
+    steam_root, roots = steam
+    cache_path = str(tmp_path / "steam_libraries.bin")
+    result = SteamLibraryScanner(cache_path).scan([steam_root])
+    assert set(result["apps"]) == {appid for appid, _, _ in APPS}
+    assert len(result["rescanned"]) == 3
+    app = result["apps"]["100"]
+    assert app["path"] == os.path.join(roots[0], "steamapps", "common", "Game Dir 0")
+
+    # Новый экземпляр читает кэш: ничего не перечитывается
+    again = SteamLibraryScanner(cache_path).scan([steam_root])
+    assert again["rescanned"] == [] and again["apps"] == result["apps"]
+
+
+def test_in_place_manifest_edit_is_seen(steam, tmp_path):
+    steam_root, roots = steam
+    scanner = SteamLibraryScanner(str(tmp_path / "steam_libraries.bin"))
+    scanner.scan([steam_root])
+    steamapps = os.path.join(roots[1], "steamapps")
+    dir_mtime = os.stat(steamapps).st_mtime_ns
+
+    set_state_flags(manifest_path(roots, 1), 1026) # Игра ушла на обновление
+    assert os.stat(steamapps).st_mtime_ns == dir_mtime
+    result = scanner.scan([steam_root])
+    assert "101" not in result["apps"]
+    assert result["rescanned"] == [steamapps]
+    assert SteamLibraryScanner(str(tmp_path / "steam_libraries.bin")).scan([steam_root])["apps"] == result["apps"]
+
+
+def test_added_and_removed_manifests(steam, tmp_path):
+    steam_root, roots = steam
+    scanner = SteamLibraryScanner(str(tmp_path / "steam_libraries.bin"))
+    scanner.scan([steam_root])
+    os.remove(manifest_path(roots, 2))
+    write_steam_fixture(steam_root, APPS + [("999", "New Game", "New Dir")], libraries=3, installed_share=1.0)
+    result = scanner.scan([steam_root])
+    # Фикстура пишет все manifest заново; удаленный (102) появился снова, 999 - новый
+    assert {"102", "999"} <= set(result["apps"])
+    os.remove(manifest_path(roots, 2))
+    assert "102" not in scanner.scan([steam_root])["apps"]
+
+
+def test_match_steam_games(steam):
+    steam_root, roots = steam
+    apps = SteamLibraryScanner().scan([steam_root])["apps"]
+    games = [
+        {"id": 1, "steam_app_id": 100, "launch_path": ""},
+        {"id": 2, "launch_path": "steam://rungameid/101"},
+        {"id": 3, "launch_path": r"D:\SteamLibrary\steamapps\common\game dir 2\bin\game.exe"},
+        {"id": 4, "steam_app_id": 555, "launch_path": ""},
+    ]
+    assert match_steam_games(games, apps) == {1: "100", 2: "101", 3: "102"}
@@ -0,0 +1,69 @@
+import os # Стандартная библиотека
+import threading # Стандартная библиотека
+
+from tqtorrent.targets import LaunchResolver, is_ok
+
+
+def make_games(tmp_path, count):
+    games = []
+    for n in range(count):
+        exe = tmp_path / f"Game {n}" / "game.exe"
+        exe.parent.mkdir()
+        exe.write_bytes(b"MZ")
+        games.append({"id": n, "launch_path": str(exe), "process_name": "game.exe"})
+    return games
+
+
+def test_partial_check_keeps_other_cached_targets(tmp_path):
+    cache_path = str(tmp_path / "targets.bin")
+    resolver = LaunchResolver(cache_path, steam_roots=[])
+    games = make_games(tmp_path, 3)
+    assert all(is_ok(target) for target in resolver.resolve_all(games[:2]).values())
+    assert len(resolver.targets) == 2
+
+    # Дельта каталога: проверяется одна новая игра, кэш остальных остается
+    resolver.resolve_all(games[2:], prune=False)
+    assert len(resolver.targets) == 3
+    reloaded = LaunchResolver(cache_path, steam_roots=[])
+    reloaded.load_cache()
+    assert len(reloaded.targets) == 3
+
+    # Полная проверка удаляет записи игр, которых больше нет в каталоге
+    resolver.resolve_all(games[1:])
+    assert len(resolver.targets) == 2
+    assert os.path.exists(cache_path)
+
+
+def test_concurrent_targets_survive_save(tmp_path):
+    cache_path = str(tmp_path / "targets.bin")
+    resolver = LaunchResolver(cache_path, steam_roots=[])
+    games = make_games(tmp_path, 200)
+    errors = []
+
+    def launch(part):
+        # Как GUI-поток и поток подсчета места: по одной игре
+        try:
+            for game in part:
+                resolver.target(game["launch_path"], game["process_name"])
+        except Exception as e:
+            errors.append(e)
+
+    def save():
+        try:
+            for _ in range(50):
+                resolver.save_cache()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=launch, args=(games[n::4],)) for n in range(4)]
+    threads.append(threading.Thread(target=save))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    resolver.save_cache()
+
+    assert not errors
+    reloaded = LaunchResolver(cache_path, steam_roots=[])
+    assert len(reloaded.targets) == 200
+    assert all(is_ok(target) for target in reloaded.targets.values())
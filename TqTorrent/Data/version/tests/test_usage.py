@@ -0,0 +1,23 @@
+import os # Стандартная библиотека
+
+from tqtorrent.usage import DiskUsage
+
+
+def write(path, size):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(b"x" * size)
+
+
+def test_nested_roots_are_summed_fully(tmp_path):
+    outer = str(tmp_path / "Games")
+    inner = os.path.join(outer, "Pack", "Game B")
+    write(os.path.join(outer, "launcher.exe"), 10)
+    write(os.path.join(outer, "Pack", "readme.txt"), 20)
+    write(os.path.join(inner, "game.exe"), 300)
+    write(os.path.join(inner, "data", "pak0.pak"), 4000)
+
+    # Корень Games/Pack/Game B обходится раньше своего родителя Games/Pack
+    totals = DiskUsage(workers=1).measure([outer, inner])
+    assert totals[inner]["bytes"] == 4300 and totals[inner]["files"] == 2
+    assert totals[outer] == {**totals[outer], "bytes": 4330, "files": 4, "dirs": 3}
@@ -0,0 +1,73 @@
+import os # Стандартная библиотека
+import hashlib # Стандартная библиотека
+
+import pytest
+
+import verify_files
+from verify_files import build_manifest, hash_pieces, verify_tree, report_ok
+
+# Не кратно гранулярности mmap: задачи пула начинаются с невыровненных смещений
+PIECE_SIZE = 1000
+FILE_SIZE = 40 * PIECE_SIZE + 123
+
+
+@pytest.fixture
+def game(tmp_path):
+    root = tmp_path / "Game"
+    (root / "data").mkdir(parents=True)
+    (root / "game.exe").write_bytes(os.urandom(FILE_SIZE))
+    (root / "data" / "level.arc").write_bytes(os.urandom(3 * PIECE_SIZE))
+    (root / "data" / "empty.cfg").write_bytes(b"")
+    return root
+
+
+def test_unaligned_piece_size_hashes_every_piece(game):
+    data = (game / "game.exe").read_bytes()
+    expected = [hashlib.sha256(data[i:i + PIECE_SIZE]).hexdigest() for i in range(0, FILE_SIZE, PIECE_SIZE)]
+    assert hash_pieces(str(game / "game.exe"), 17, 24, PIECE_SIZE) == expected[17:]
+    manifest = build_manifest(str(game), PIECE_SIZE, workers=2)
+    assert manifest["files"]["game.exe"]["pieces"] == expected
+
+
+def test_corrupted_piece_is_reported_by_index(game):
+    manifest = build_manifest(str(game), PIECE_SIZE, workers=2)
+    with open(game / "game.exe", 'r+b') as f:
+        for index in (5, 33):
+            f.seek(index * PIECE_SIZE + 7)
+            byte = f.read(1)
+            f.seek(-1, os.SEEK_CUR)
+            f.write(bytes([byte[0] ^ 0xFF]))
+    report, state = verify_tree(str(game), manifest, workers=2)
+    assert report["bad_pieces"] == {"game.exe": [5, 33]}
+    assert not report["missing"] and not report["size_mismatch"]
+    assert "game.exe" not in state and "data/level.arc" in state
+
+
+def test_missing_file_and_size_mismatch(game):
+    manifest = build_manifest(str(game), PIECE_SIZE, workers=2)
+    os.remove(game / "data" / "level.arc")
+    with open(game / "game.exe", 'ab') as f:
+        f.write(b"x")
+    report, state = verify_tree(str(game), manifest, workers=2)
+    assert report["missing"] == ["data/level.arc"]
+    assert report["size_mismatch"] == ["game.exe"]
+    assert not report_ok(report)
+    assert set(state) == {"data/empty.cfg"}
+
+
+def test_second_run_skips_unchanged_files(game, monkeypatch):
+    manifest = build_manifest(str(game), PIECE_SIZE, workers=2)
+    report, state = verify_tree(str(game), manifest, workers=2)
+    assert report_ok(report) and report["checked"] == 3 and report["skipped"] == 0
+
+    # Без изменений файлы не перечитываются вовсе
+    monkeypatch.setattr(verify_files, "hash_files", lambda root, rel_paths, *args: {path: ([], None) for path in rel_paths})
+    report, state = verify_tree(str(game), manifest, state, workers=2)
+    assert report_ok(report) and report["checked"] == 0 and report["skipped"] == 3
+    monkeypatch.undo()
+
+    # Изменился mtime - файл проверяется снова
+    stat = os.stat(game / "game.exe")
+    os.utime(game / "game.exe", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    report, state = verify_tree(str(game), manifest, state, workers=2)
+    assert report_ok(report) and report["checked"] == 1 and report["skipped"] == 2
@@ -0,0 +1,8 @@
+"""BitTorrent-подсистема TqTorrent: bencode, .torrent, выбор кусков, peer wire и mmap-хранилище."""
+
+from .bencode import decode, encode, BencodeError
+from .metainfo import Metainfo, parse_metainfo, load_metainfo, build_metainfo
+from .picker import PiecePicker
+from .storage import MappedStorage
+from .tracker import TrackerServer, announce
+from .client import TorrentSession, TorrentJob, TorrentError
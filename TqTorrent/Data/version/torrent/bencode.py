@@ -0,0 +1,109 @@
+class BencodeError(ValueError):
+    pass
+
+
+_DIGITS = frozenset(b"0123456789")
+MAX_DEPTH = 64 # Вложенность списков и словарей (в .torrent и ответах трекера - единицы)
+
+
+def _decode(data, pos, spans, depth=0):
+    """Разбирает значение с позиции pos. Возвращает (значение, новая позиция).
+
+    Если spans - словарь, для ключа b"info" верхнего уровня в него
+    записываются границы исходных байт (нужны для info_hash).
+    """
+    lead = data[pos]
+    if lead == 0x69: # i
+        end = data.index(b"e", pos + 1)
+        text = data[pos + 1:end]
+        digits = text[1:] if text[:1] == b"-" else text
+        # Только каноническая запись: без "+", пробелов, "_", ведущих нулей и "-0" (int() их принимает)
+        if not digits or not _DIGITS.issuperset(digits) or (digits[0] == 0x30 and len(text) > 1):
+            raise BencodeError(f"Некорректное число на позиции {pos}")
+        return int(text), end + 1
+    if lead in (0x6C, 0x64) and depth >= MAX_DEPTH:
+        raise BencodeError(f"Вложенность больше {MAX_DEPTH} на позиции {pos}")
+    if lead == 0x6C: # l
+        pos += 1
+        items = []
+        while data[pos] != 0x65: # e
+            value, pos = _decode(data, pos, None, depth + 1)
+            items.append(value)
+        return items, pos + 1
+    if lead == 0x64: # d
+        pos += 1
+        result = {}
+        while data[pos] != 0x65:
+            key, pos = _decode_bytes(data, pos)
+            value_start = pos
+            value, pos = _decode(data, pos, None, depth + 1)
+            result[key] = value
+            if spans is not None and key == b"info":
+                spans["info"] = (value_start, pos)
+        return result, pos + 1
+    if lead in _DIGITS:
+        return _decode_bytes(data, pos)
+    raise BencodeError(f"Неожиданный байт {chr(lead)!r} на позиции {pos}")
+
+
+def _decode_bytes(data, pos):
+    colon = data.index(b":", pos)
+    text = data[pos:colon]
+    # Только цифры: int() принял бы "-4" (строка "назад" и зацикливание) и пробелы
+    if not text or not _DIGITS.issuperset(text):
+        raise BencodeError(f"Некорректная длина строки на позиции {pos}")
+    length = int(text)
+    start = colon + 1
+    end = start + length
+    if end > len(data):
+        raise BencodeError(f"Строка длиной {length} выходит за конец данных")
+    return data[start:end], end
+
+
+def decode(data, spans=None):
+    """Декодирует bencode (bytes). Строки остаются bytes, ключи словарей - bytes."""
+    data = bytes(data)
+    try:
+        value, pos = _decode(data, 0, spans)
+    except (IndexError, ValueError, RecursionError) as e:
+        if isinstance(e, BencodeError):
+            raise
+        raise BencodeError(f"Повреждённые bencode-данные: {e}")
+    if pos != len(data):
+        raise BencodeError(f"Лишние данные после позиции {pos}")
+    return value
+
+
+def _encode(value, out):
+    if isinstance(value, bool):
+        value = int(value)
+    if isinstance(value, int):
+        out += b"i%de" % value
+    elif isinstance(value, (bytes, bytearray)):
+        out += b"%d:" % len(value)
+        out += value
+    elif isinstance(value, str):
+        raw = value.encode("utf-8")
+        out += b"%d:" % len(raw)
+        out += raw
+    elif isinstance(value, (list, tuple)):
+        out += b"l"
+        for item in value:
+            _encode(item, out)
+        out += b"e"
+    elif isinstance(value, dict):
+        out += b"d"
+        items = [((k.encode("utf-8") if isinstance(k, str) else k), v) for k, v in value.items()]
+        for key, item in sorted(items):
+            _encode(key, out)
+            _encode(item, out)
+        out += b"e"
+    else:
+        raise BencodeError(f"Тип {type(value).__name__} нельзя закодировать в bencode")
+
+
+def encode(value):
+    """Кодирует int/bytes/str/list/dict в bencode (ключи словаря сортируются)."""
+    out = bytearray()
+    _encode(value, out)
+    return bytes(out)
@@ -0,0 +1,363 @@
+import os # Стандартная библиотека
+import time # Стандартная библиотека
+import asyncio # Стандартная библиотека
+import threading # Стандартная библиотека
+import urllib.request # Стандартная библиотека
+
+from downloader import DownloadCancelled
+from .metainfo import parse_metainfo
+from .peer import (PeerConnection, PeerError, bitfield_to_set, set_to_bitfield, parse_request,
+                   parse_piece, parse_have, CHOKE, UNCHOKE, INTERESTED, NOT_INTERESTED, HAVE,
+                   BITFIELD, REQUEST, PIECE, CANCEL)
+from .picker import PiecePicker
+from .storage import MappedStorage
+from .tracker import announce
+
+# --- НАСТРОЙКИ ---
+PIPELINE_DEPTH = 64 # Сколько запросов блоков держать «в полете» на одного пира
+MAX_REQUEST_LENGTH = 128 * 1024
+PROGRESS_INTERVAL = 0.2
+CLIENT_PREFIX = b"-TQ0100-"
+# --------------------
+
+
+class TorrentError(Exception):
+    pass
+
+
+def make_peer_id():
+    return CLIENT_PREFIX + os.urandom(20 - len(CLIENT_PREFIX))
+
+
+class PeerState:
+    def __init__(self, conn):
+        self.conn = conn
+        self.pieces = set()
+        self.am_interested = False
+        self.peer_choking = True
+        self.peer_interested = False
+        self.outstanding = set() # (index, begin, length)
+
+
+class TorrentSession:
+    """Загрузка и раздача одного торрента.
+
+    Соединения обслуживаются симметрично: сессия отдает имеющиеся куски
+    любому заинтересованному пиру и качает недостающие у всех, кто их
+    имеет, держа до PIPELINE_DEPTH запросов в полете на пира.
+    on_progress(downloaded, total, bytes_per_sec) - проверенные байты.
+    rate_limiter.reserve(nbytes) - задержка (сек) перед приемом очередного блока.
+    """
+
+    def __init__(self, metainfo, root_dir, peer_id=None, on_progress=None, pipeline=PIPELINE_DEPTH,
+                 rate_limiter=None):
+        self.metainfo = metainfo
+        self.storage = MappedStorage(metainfo, root_dir)
+        self.picker = PiecePicker(metainfo.num_pieces, metainfo.piece_length, metainfo.total_length)
+        self.peer_id = peer_id or make_peer_id()
+        self.on_progress = on_progress
+        self.pipeline = pipeline
+        self.rate_limiter = rate_limiter
+        self.peers = {} # id(state) -> PeerState
+        self.server = None
+        self.port = 0
+        self.done = None
+        self.downloaded = 0
+        self.uploaded = 0
+        self.last_progress = 0.0
+        self.speed_mark = (time.monotonic(), 0)
+        self.speed = 0.0
+        self.opened = False
+
+    # ----------------- ЖИЗНЕННЫЙ ЦИКЛ -----------------
+
+    def open(self):
+        """Открывает хранилище и учитывает уже скачанные куски (докачка/раздача)."""
+        if self.opened:
+            return
+        self.storage.open()
+        if not self.storage.fresh:
+            for index, ok in enumerate(self.storage.verify_all()):
+                if ok:
+                    self.picker.mark_have(index)
+        self.opened = True
+        self.done = asyncio.Event()
+        if self.picker.complete:
+            self.done.set()
+
+    def left(self):
+        return sum(self.metainfo.piece_size(i) for i in range(self.metainfo.num_pieces) if not self.picker.have[i])
+
+    async def listen(self, host="127.0.0.1", port=0):
+        """Принимает входящие соединения пиров."""
+        self.open()
+        self.server = await asyncio.start_server(self._accept, host, port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def announce(self, event=None):
+        if not self.metainfo.announce:
+            return []
+        loop = asyncio.get_running_loop()
+        interval, peers = await loop.run_in_executor(None, lambda: announce(
+            self.metainfo.announce, self.metainfo.info_hash, self.peer_id, self.port,
+            self.uploaded, self.downloaded, self.left(), event))
+        return peers
+
+    async def close(self):
+        for state in list(self.peers.values()):
+            state.conn.close()
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+        if self.opened:
+            self.storage.close()
+            self.opened = False
+
+    async def download(self, peers=(), use_tracker=True):
+        """Качает до полной проверки всех кусков. peers - дополнительные (host, port)."""
+        self.open()
+        if self.picker.complete:
+            return
+        peers = list(peers)
+        if use_tracker:
+            peers += [p for p in await self.announce("started") if p not in peers]
+        if not peers:
+            raise TorrentError("Нет пиров для загрузки")
+
+        tasks = {asyncio.create_task(self._connect(host, port)) for host, port in peers}
+        done_waiter = asyncio.create_task(self.done.wait())
+        try:
+            while not self.done.is_set():
+                finished, _ = await asyncio.wait(tasks | {done_waiter}, return_when=asyncio.FIRST_COMPLETED)
+                tasks -= finished
+                if not tasks and not self.done.is_set():
+                    raise TorrentError("Все пиры отключились до завершения загрузки")
+        finally:
+            done_waiter.cancel()
+            for state in list(self.peers.values()):
+                state.conn.close()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self.report_progress(force=True)
+        if use_tracker and self.metainfo.announce:
+            try:
+                await self.announce("completed")
+            except Exception as e:
+                print(f"ОШИБКА анонса завершения: {e}")
+
+    # ----------------- СОЕДИНЕНИЯ -----------------
+
+    async def _connect(self, host, port):
+        try:
+            conn = await PeerConnection.connect(host, port, self.metainfo.info_hash, self.peer_id)
+        except (OSError, asyncio.TimeoutError) as e:
+            print(f"Python: Пир {host}:{port} недоступен: {e}")
+            return
+        try:
+            await conn.send_handshake()
+            await conn.receive_handshake()
+        except (OSError, asyncio.IncompleteReadError, PeerError) as e:
+            conn.close()
+            print(f"Python: Рукопожатие с {host}:{port} не удалось: {e}")
+            return
+        await self._run_peer(conn)
+
+    async def _accept(self, reader, writer):
+        conn = PeerConnection(reader, writer, self.metainfo.info_hash, self.peer_id)
+        try:
+            await conn.receive_handshake()
+            await conn.send_handshake()
+        except (OSError, asyncio.IncompleteReadError, PeerError):
+            conn.close()
+            return
+        await self._run_peer(conn)
+
+    async def _run_peer(self, conn):
+        state = PeerState(conn)
+        key = id(state)
+        self.peers[key] = state
+        try:
+            if any(self.picker.have):
+                conn.send_bitfield(set_to_bitfield(self.picker.have, self.metainfo.num_pieces))
+                await conn.drain()
+            while True:
+                message_id, payload = await conn.read_message()
+                if message_id is None:
+                    continue
+                await self._handle(state, key, message_id, payload)
+        except (OSError, asyncio.IncompleteReadError, PeerError):
+            pass
+        finally:
+            self.peers.pop(key, None)
+            self.picker.remove_peer_pieces(state.pieces)
+            self.picker.peer_gone(key)
+            conn.close()
+
+    async def _handle(self, state, key, message_id, payload):
+        conn = state.conn
+        if message_id == PIECE:
+            index, begin, block = parse_piece(payload)
+            await self._on_block(state, key, index, begin, block)
+        elif message_id == REQUEST:
+            index, begin, length = parse_request(payload)
+            if (not state.peer_interested or length > MAX_REQUEST_LENGTH or index >= self.metainfo.num_pieces
+                    or not self.picker.have[index] or begin + length > self.metainfo.piece_size(index)):
+                return
+            conn.send_piece(index, begin, self.storage.read(index, begin, length))
+            self.uploaded += length
+            await conn.drain()
+        elif message_id == BITFIELD:
+            pieces = bitfield_to_set(payload, self.metainfo.num_pieces)
+            self.picker.add_peer_pieces(pieces - state.pieces)
+            state.pieces |= pieces
+            await self._update_interest(state, key)
+        elif message_id == HAVE:
+            index = parse_have(payload)
+            if index < self.metainfo.num_pieces and index not in state.pieces:
+                state.pieces.add(index)
+                self.picker.add_peer_pieces((index,))
+                await self._update_interest(state, key)
+        elif message_id == UNCHOKE:
+            state.peer_choking = False
+            await self._fill(state, key)
+        elif message_id == CHOKE:
+            state.peer_choking = True
+            state.outstanding.clear()
+            self.picker.peer_gone(key)
+        elif message_id == INTERESTED:
+            # Раздаем всем заинтересованным (без tit-for-tat)
+            state.peer_interested = True
+            conn.send_simple(UNCHOKE)
+            await conn.drain()
+        elif message_id == NOT_INTERESTED:
+            state.peer_interested = False
+        elif message_id == CANCEL:
+            pass # Запросы обслуживаются сразу, отменять нечего
+
+    async def _update_interest(self, state, key):
+        wants = not self.picker.complete and any(not self.picker.have[i] for i in state.pieces)
+        if wants and not state.am_interested:
+            state.am_interested = True
+            state.conn.send_simple(INTERESTED)
+            await state.conn.drain()
+        elif wants and not state.peer_choking:
+            await self._fill(state, key)
+        elif not wants and state.am_interested:
+            state.am_interested = False
+            state.conn.send_simple(NOT_INTERESTED)
+            await state.conn.drain()
+
+    async def _fill(self, state, key):
+        """Дополняет конвейер запросов пира до self.pipeline."""
+        if state.peer_choking or not state.am_interested:
+            return
+        requests = self.picker.next_requests(state.pieces, self.pipeline - len(state.outstanding), key)
+        if not requests:
+            return
+        for request in requests:
+            state.outstanding.add(request)
+            state.conn.send_request(*request)
+        await state.conn.drain()
+
+    async def _on_block(self, state, key, index, begin, block):
+        request = (index, begin, len(block))
+        if request in state.outstanding:
+            state.outstanding.discard(request)
+        elif request != self.picker.block_request(index, begin):
+            # Блок не по границе или длиннее запрошенного записался бы поверх соседних (и уже проверенных) кусков.
+            # Блок по границе без запроса - опоздавший ответ после CHOKE или CANCEL: block_received отсеет повтор
+            raise PeerError(f"Пир прислал незапрошенный блок {request[:2]} длиной {request[2]}")
+        if self.rate_limiter is not None:
+            # Пока соединение спит, его сокет не читается - скорость ограничивает TCP
+            delay = self.rate_limiter.reserve(len(block))
+            if delay > 0:
+                await asyncio.sleep(delay)
+        is_new, piece_done, others = self.picker.block_received(index, begin, key)
+        if is_new:
+            self.storage.write(index, begin, block)
+            # Эндшпиль: отменяем тот же блок у остальных пиров
+            for other_key in others:
+                other = self.peers.get(other_key)
+                if other is not None and request in other.outstanding:
+                    other.outstanding.discard(request)
+                    other.conn.send_cancel(*request)
+        if piece_done:
+            if self.storage.verify_piece(index):
+                self.picker.piece_verified(index)
+                self.downloaded += self.metainfo.piece_size(index)
+                for other in self.peers.values():
+                    other.conn.send_have(index)
+                self.report_progress()
+                if self.picker.complete:
+                    self.done.set()
+                    return
+            else:
+                print(f"Python: Кусок {index} не прошел проверку SHA-1, качаем заново.")
+                self.picker.piece_failed(index)
+        await self._fill(state, key)
+
+    def report_progress(self, force=False):
+        if self.on_progress is None:
+            return
+        now = time.monotonic()
+        if not force and now - self.last_progress < PROGRESS_INTERVAL:
+            return
+        self.last_progress = now
+        verified = self.metainfo.total_length - self.left()
+        mark_time, mark_bytes = self.speed_mark
+        if now > mark_time:
+            self.speed = (verified - mark_bytes) / (now - mark_time)
+            self.speed_mark = (now, verified)
+        self.on_progress(verified, self.metainfo.total_length, self.speed)
+
+
+def load_torrent_bytes(source):
+    """Читает .torrent по http(s)-ссылке или из локального пути."""
+    if source.lower().startswith(("http://", "https://")):
+        with urllib.request.urlopen(source, timeout=30) as response:
+            return response.read()
+    with open(source, "rb") as f:
+        return f.read()
+
+
+class TorrentJob:
+    """Синхронная обертка над TorrentSession с интерфейсом SegmentedDownload:
+    run() в рабочем потоке, cancel() из любого потока."""
+
+    def __init__(self, torrent_source, dest_dir, on_progress=None, peers=(), rate_limiter=None):
+        self.torrent_source = torrent_source
+        self.dest_dir = dest_dir
+        self.on_progress = on_progress
+        self.rate_limiter = rate_limiter
+        self.peers = peers
+        self.loop = None
+        self.task = None
+        self.cancelled = threading.Event()
+
+    def run(self):
+        metainfo = parse_metainfo(load_torrent_bytes(self.torrent_source))
+        asyncio.run(self._run(metainfo))
+        return os.path.join(self.dest_dir, metainfo.name)
+
+    async def _run(self, metainfo):
+        self.loop = asyncio.get_running_loop()
+        session = TorrentSession(metainfo, self.dest_dir, on_progress=self.on_progress,
+                                 rate_limiter=self.rate_limiter)
+        try:
+            await session.listen("0.0.0.0")
+            self.task = asyncio.current_task()
+            if self.cancelled.is_set():
+                raise DownloadCancelled(self.dest_dir)
+            await session.download(self.peers)
+        except asyncio.CancelledError:
+            raise DownloadCancelled(self.dest_dir)
+        finally:
+            await session.close()
+
+    def cancel(self):
+        self.cancelled.set()
+        if self.loop is not None and self.task is not None:
+            self.loop.call_soon_threadsafe(self.task.cancel)
@@ -0,0 +1,148 @@
+import os # Стандартная библиотека
+import ntpath # Стандартная библиотека
+import hashlib # Стандартная библиотека
+
+from .bencode import decode, encode, BencodeError
+
+DEFAULT_PIECE_LENGTH = 256 * 1024
+
+
+class FileEntry:
+    """Файл раздачи: путь относительно корня, длина и смещение в общем потоке байт."""
+
+    def __init__(self, path, length, offset):
+        self.path = path
+        self.length = length
+        self.offset = offset
+
+    def __repr__(self):
+        return f"FileEntry({self.path!r}, {self.length}, {self.offset})"
+
+
+def is_safe_part(part):
+    """Один компонент пути раздачи (name или элемент path): без разделителей, не "."/".."
+    и не пустой, не абсолютный и без буквы диска (C:) - иначе файл окажется вне каталога загрузки."""
+    return (part not in ("", ".", "..") and "/" not in part and "\\" not in part
+            and not os.path.isabs(part) and not ntpath.splitdrive(part)[0])
+
+
+def _field(mapping, key, kind, where="info"):
+    """Поле словаря .torrent нужного типа; длины (int) - неотрицательные."""
+    value = mapping.get(key) if isinstance(mapping, dict) else None
+    if not isinstance(value, kind) or (kind is int and value < 0):
+        raise BencodeError(f"Нет или неверно поле {key.decode()!r} в {where}: {value!r}")
+    return value
+
+
+class Metainfo:
+    """Разобранный .torrent (однофайловый или многофайловый)."""
+
+    def __init__(self, info, info_hash, announce=None):
+        self.info = info
+        self.info_hash = info_hash
+        self.announce = announce
+        self.name = _field(info, b"name", bytes).decode("utf-8", "replace")
+        if not is_safe_part(self.name):
+            raise BencodeError(f"Недопустимое имя раздачи: {self.name!r}")
+        self.piece_length = _field(info, b"piece length", int)
+        if not self.piece_length:
+            raise BencodeError("Нулевая длина куска")
+
+        pieces = _field(info, b"pieces", bytes)
+        if len(pieces) % 20:
+            raise BencodeError("Длина поля pieces не кратна 20")
+        self.piece_hashes = [pieces[i:i + 20] for i in range(0, len(pieces), 20)]
+
+        self.files = []
+        if b"files" in info:
+            offset = 0
+            for item in _field(info, b"files", list):
+                path = _field(item, b"path", list, "files")
+                if not all(isinstance(p, bytes) for p in path):
+                    raise BencodeError(f"Недопустимый путь в раздаче: {path!r}")
+                parts = [p.decode("utf-8", "replace") for p in path]
+                if not parts or not all(is_safe_part(p) for p in parts):
+                    raise BencodeError(f"Недопустимый путь в раздаче: {parts}")
+                length = _field(item, b"length", int, "files")
+                self.files.append(FileEntry(os.path.join(self.name, *parts), length, offset))
+                offset += length
+            self.total_length = offset
+        else:
+            self.total_length = _field(info, b"length", int)
+            self.files.append(FileEntry(self.name, self.total_length, 0))
+
+        expected = (self.total_length + self.piece_length - 1) // self.piece_length
+        if expected != len(self.piece_hashes):
+            raise BencodeError(f"Ожидалось {expected} хешей кусков, получено {len(self.piece_hashes)}")
+
+    @property
+    def num_pieces(self):
+        return len(self.piece_hashes)
+
+    def piece_size(self, index):
+        if index == self.num_pieces - 1:
+            return self.total_length - index * self.piece_length
+        return self.piece_length
+
+
+def parse_metainfo(data):
+    """bytes .torrent -> Metainfo. info_hash считается по исходным байтам словаря info."""
+    spans = {}
+    root = decode(data, spans)
+    if not isinstance(root, dict) or not isinstance(root.get(b"info"), dict):
+        raise BencodeError("В .torrent нет словаря info")
+    start, end = spans["info"]
+    info_hash = hashlib.sha1(bytes(data[start:end])).digest()
+    announce = root.get(b"announce")
+    if announce is not None and not isinstance(announce, bytes):
+        raise BencodeError(f"Неверное поле announce: {announce!r}")
+    return Metainfo(root[b"info"], info_hash, announce.decode("utf-8") if announce else None)
+
+
+def load_metainfo(path):
+    with open(path, "rb") as f:
+        return parse_metainfo(f.read())
+
+
+def build_metainfo(source_path, announce=None, piece_length=DEFAULT_PIECE_LENGTH):
+    """Создает .torrent (bytes) для файла или каталога source_path."""
+    source_path = os.path.abspath(source_path)
+    name = os.path.basename(source_path)
+    if os.path.isdir(source_path):
+        paths = []
+        for root, dirs, files in os.walk(source_path):
+            dirs.sort()
+            for file_name in sorted(files):
+                full = os.path.join(root, file_name)
+                paths.append((full, os.path.relpath(full, source_path).split(os.sep)))
+    else:
+        paths = [(source_path, None)]
+
+    hashes = bytearray()
+    buffer = bytearray()
+    files = []
+    for full, parts in paths:
+        if parts is not None:
+            files.append({b"length": os.path.getsize(full), b"path": [p.encode("utf-8") for p in parts]})
+        with open(full, "rb") as f:
+            while True:
+                chunk = f.read(piece_length - len(buffer))
+                if not chunk:
+                    break
+                buffer += chunk
+                if len(buffer) == piece_length:
+                    hashes += hashlib.sha1(buffer).digest()
+                    buffer.clear()
+    if buffer:
+        hashes += hashlib.sha1(buffer).digest()
+
+    info = {b"name": name.encode("utf-8"), b"piece length": piece_length, b"pieces": bytes(hashes)}
+    if files:
+        info[b"files"] = files
+    else:
+        info[b"length"] = os.path.getsize(source_path)
+
+    root = {b"info": info}
+    if announce:
+        root[b"announce"] = announce.encode("utf-8")
+    return encode(root)
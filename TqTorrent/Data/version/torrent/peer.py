@@ -0,0 +1,143 @@
+import struct # Стандартная библиотека
+import asyncio # Стандартная библиотека
+
+PROTOCOL = b"BitTorrent protocol"
+HANDSHAKE_LENGTH = 1 + len(PROTOCOL) + 8 + 20 + 20
+
+# Идентификаторы сообщений peer wire protocol (BEP 3)
+CHOKE = 0
+UNCHOKE = 1
+INTERESTED = 2
+NOT_INTERESTED = 3
+HAVE = 4
+BITFIELD = 5
+REQUEST = 6
+PIECE = 7
+CANCEL = 8
+
+_HEADER = struct.Struct(">IB")
+_REQUEST = struct.Struct(">IBIII")
+_PIECE_HEADER = struct.Struct(">IBII")
+_HAVE = struct.Struct(">IBI")
+
+MAX_MESSAGE = 1 << 21 # Больше не бывает: блок 16 КБ или bitfield
+
+
+class PeerError(Exception):
+    pass
+
+
+def bitfield_to_set(payload, num_pieces):
+    pieces = set()
+    for byte_index, byte in enumerate(payload):
+        if not byte:
+            continue
+        base = byte_index * 8
+        for bit in range(8):
+            if byte & (0x80 >> bit):
+                index = base + bit
+                if index < num_pieces:
+                    pieces.add(index)
+    return pieces
+
+
+def set_to_bitfield(have, num_pieces):
+    """have - последовательность флагов 0/1 длиной num_pieces."""
+    payload = bytearray((num_pieces + 7) // 8)
+    for index in range(num_pieces):
+        if have[index]:
+            payload[index >> 3] |= 0x80 >> (index & 7)
+    return bytes(payload)
+
+
+class PeerConnection:
+    """Соединение peer wire protocol поверх asyncio-потоков."""
+
+    def __init__(self, reader, writer, info_hash, peer_id):
+        self.reader = reader
+        self.writer = writer
+        self.info_hash = info_hash
+        self.peer_id = peer_id
+        self.remote_peer_id = None
+
+    @classmethod
+    async def connect(cls, host, port, info_hash, peer_id, timeout=10):
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        return cls(reader, writer, info_hash, peer_id)
+
+    def handshake_bytes(self):
+        return bytes([len(PROTOCOL)]) + PROTOCOL + bytes(8) + self.info_hash + self.peer_id
+
+    async def send_handshake(self):
+        self.writer.write(self.handshake_bytes())
+        await self.writer.drain()
+
+    async def receive_handshake(self):
+        data = await self.reader.readexactly(HANDSHAKE_LENGTH)
+        if data[0] != len(PROTOCOL) or data[1:20] != PROTOCOL:
+            raise PeerError("Чужой протокол в рукопожатии")
+        if data[28:48] != self.info_hash:
+            raise PeerError("info_hash пира не совпадает")
+        self.remote_peer_id = data[48:68]
+
+    async def read_message(self):
+        """Возвращает (id, payload); для keep-alive - (None, b"")."""
+        length = struct.unpack(">I", await self.reader.readexactly(4))[0]
+        if length == 0:
+            return None, b""
+        if length > MAX_MESSAGE:
+            raise PeerError(f"Слишком длинное сообщение: {length} байт")
+        data = await self.reader.readexactly(length)
+        return data[0], data[1:]
+
+    # Отправка буферизуется в writer; drain() вызывается один раз на пачку сообщений
+
+    def send_simple(self, message_id):
+        self.writer.write(_HEADER.pack(1, message_id))
+
+    def send_have(self, index):
+        self.writer.write(_HAVE.pack(5, HAVE, index))
+
+    def send_bitfield(self, payload):
+        self.writer.write(_HEADER.pack(1 + len(payload), BITFIELD) + payload)
+
+    def send_request(self, index, begin, length):
+        self.writer.write(_REQUEST.pack(13, REQUEST, index, begin, length))
+
+    def send_cancel(self, index, begin, length):
+        self.writer.write(_REQUEST.pack(13, CANCEL, index, begin, length))
+
+    def send_piece(self, index, begin, block):
+        self.writer.write(_PIECE_HEADER.pack(9 + len(block), PIECE, index, begin))
+        self.writer.write(block)
+
+    async def drain(self):
+        await self.writer.drain()
+
+    def close(self):
+        try:
+            self.writer.close()
+        except Exception:
+            pass
+
+
+def _check_length(payload, name, length, exact=True):
+    """Короткое (или длинное) сообщение - ошибка пира, а не struct.error в задаче соединения."""
+    if len(payload) < length or (exact and len(payload) != length):
+        raise PeerError(f"Сообщение {name} неверной длины: {len(payload)} байт")
+
+
+def parse_request(payload):
+    _check_length(payload, "REQUEST", 12)
+    return struct.unpack(">III", payload)
+
+
+def parse_piece(payload):
+    _check_length(payload, "PIECE", 8, exact=False)
+    index, begin = struct.unpack_from(">II", payload)
+    return index, begin, payload[8:]
+
+
+def parse_have(payload):
+    _check_length(payload, "HAVE", 4)
+    return struct.unpack(">I", payload)[0]
@@ -0,0 +1,204 @@
+import random # Стандартная библиотека
+
+BLOCK_SIZE = 16 * 1024
+
+# Состояния блока
+MISSING = 0
+REQUESTED = 1
+RECEIVED = 2
+
+
+class ActivePiece:
+    """Кусок, который сейчас качается: состояние каждого блока и кто его запросил."""
+
+    def __init__(self, index, size, block_size):
+        self.index = index
+        self.size = size
+        self.block_count = (size + block_size - 1) // block_size
+        self.state = bytearray(self.block_count)
+        self.requesters = [set() for _ in range(self.block_count)]
+        self.received = 0
+
+    def has_missing(self):
+        return MISSING in self.state
+
+
+class PiecePicker:
+    """Выбор кусков по принципу «сначала редкие» (rarest-first) с режимом эндшпиля.
+
+    Сначала дозапрашиваются уже начатые куски (чтобы быстрее их проверить и
+    раздавать), затем выбирается самый редкий среди пиров кусок, который есть
+    у данного пира. Когда все недостающие блоки уже запрошены, включается
+    эндшпиль: оставшиеся блоки запрашиваются у нескольких пиров сразу,
+    а лишние запросы отменяются при получении блока.
+    """
+
+    def __init__(self, num_pieces, piece_length, total_length, block_size=BLOCK_SIZE):
+        self.num_pieces = num_pieces
+        self.piece_length = piece_length
+        self.total_length = total_length
+        self.block_size = block_size
+        self.have = bytearray(num_pieces)
+        self.availability = [0] * num_pieces
+        # Нужные и еще не начатые куски, разложенные по доступности:
+        # доступность -> множество индексов. Выбор редкого куска не требует обхода всех кусков.
+        self.buckets = {0: set(range(num_pieces))}
+        self.active = {} # index -> ActivePiece
+        self.remaining = num_pieces
+        self.endgame = False
+
+    # ----------------- ДОСТУПНОСТЬ -----------------
+
+    def piece_size(self, index):
+        if index == self.num_pieces - 1:
+            return self.total_length - index * self.piece_length
+        return self.piece_length
+
+    def _is_pending(self, index):
+        return not self.have[index] and index not in self.active
+
+    def _move(self, index, delta):
+        count = self.availability[index]
+        self.availability[index] = count + delta
+        if self._is_pending(index):
+            self.buckets[count].discard(index)
+            self.buckets.setdefault(count + delta, set()).add(index)
+
+    def add_peer_pieces(self, pieces):
+        for index in pieces:
+            self._move(index, 1)
+
+    def remove_peer_pieces(self, pieces):
+        for index in pieces:
+            self._move(index, -1)
+
+    def mark_have(self, index):
+        """Кусок уже есть на диске (докачка)."""
+        if not self.have[index]:
+            # Начатый кусок (piece_verified) в корзинах не лежит, а корзины его доступности может не быть
+            bucket = self.buckets.get(self.availability[index])
+            if bucket is not None:
+                bucket.discard(index)
+            self.have[index] = 1
+            self.remaining -= 1
+
+    @property
+    def complete(self):
+        return self.remaining == 0
+
+    # ----------------- ВЫБОР -----------------
+
+    def _pick_new_piece(self, peer_pieces):
+        index = None
+        for count in sorted(self.buckets):
+            bucket = self.buckets[count]
+            if not bucket or count == 0:
+                continue
+            if len(peer_pieces) == self.num_pieces:
+                # Сид: подходит любой кусок из самой редкой корзины
+                index = random.choice(tuple(bucket)) if len(bucket) <= 64 else next(iter(bucket))
+            else:
+                candidates = bucket & peer_pieces if len(bucket) < len(peer_pieces) else peer_pieces & bucket
+                if not candidates:
+                    continue
+                index = next(iter(candidates))
+            break
+        if index is None:
+            return None
+        self.buckets[self.availability[index]].discard(index)
+        piece = ActivePiece(index, self.piece_size(index), self.block_size)
+        self.active[index] = piece
+        return piece
+
+    def _block_request(self, piece, block):
+        begin = block * self.block_size
+        return (piece.index, begin, min(self.block_size, piece.size - begin))
+
+    def block_request(self, index, begin):
+        """Запрос (index, begin, length) блока с этим смещением или None, если смещение не на
+        границе блока или вне куска."""
+        if not 0 <= index < self.num_pieces or begin % self.block_size:
+            return None
+        size = self.piece_size(index)
+        if begin >= size:
+            return None
+        return (index, begin, min(self.block_size, size - begin))
+
+    def next_requests(self, peer_pieces, count, peer_key):
+        """До count запросов (index, begin, length) для пира с набором кусков peer_pieces."""
+        requests = []
+        if count <= 0:
+            return requests
+
+        # 1. Недостающие блоки уже начатых кусков
+        for piece in self.active.values():
+            if piece.index not in peer_pieces or not piece.has_missing():
+                continue
+            for block, state in enumerate(piece.state):
+                if state == MISSING:
+                    piece.state[block] = REQUESTED
+                    piece.requesters[block].add(peer_key)
+                    requests.append(self._block_request(piece, block))
+                    if len(requests) == count:
+                        return requests
+
+        # 2. Новые куски, сначала редкие
+        while len(requests) < count:
+            piece = self._pick_new_piece(peer_pieces)
+            if piece is None:
+                break
+            for block in range(piece.block_count):
+                piece.state[block] = REQUESTED
+                piece.requesters[block].add(peer_key)
+                requests.append(self._block_request(piece, block))
+                if len(requests) == count:
+                    return requests
+
+        # 3. Эндшпиль: все блоки запрошены - дублируем запросы у этого пира
+        if not requests and self.remaining <= len(self.active) and not any(
+                p.has_missing() for p in self.active.values()):
+            self.endgame = True
+            for piece in self.active.values():
+                if piece.index not in peer_pieces:
+                    continue
+                for block, state in enumerate(piece.state):
+                    if state == REQUESTED and peer_key not in piece.requesters[block]:
+                        piece.requesters[block].add(peer_key)
+                        requests.append(self._block_request(piece, block))
+                        if len(requests) == count:
+                            return requests
+        return requests
+
+    # ----------------- РЕЗУЛЬТАТЫ -----------------
+
+    def block_received(self, index, begin, peer_key):
+        """Отмечает полученный блок. Возвращает (новый_ли_блок, кусок_собран, другие_запросившие)."""
+        piece = self.active.get(index)
+        if piece is None:
+            return False, False, set()
+        block = begin // self.block_size
+        if block >= piece.block_count or piece.state[block] == RECEIVED:
+            return False, False, set()
+        piece.state[block] = RECEIVED
+        piece.received += 1
+        others = piece.requesters[block] - {peer_key}
+        piece.requesters[block] = set()
+        return True, piece.received == piece.block_count, others
+
+    def piece_verified(self, index):
+        self.active.pop(index, None)
+        self.mark_have(index)
+
+    def piece_failed(self, index):
+        """Хеш не совпал - кусок качается заново."""
+        if self.active.pop(index, None) is not None:
+            self.buckets.setdefault(self.availability[index], set()).add(index)
+
+    def peer_gone(self, peer_key):
+        """Возвращает в очередь блоки, запрошенные ушедшим (или задушившим нас) пиром."""
+        for piece in self.active.values():
+            for block, requesters in enumerate(piece.requesters):
+                if peer_key in requesters:
+                    requesters.discard(peer_key)
+                    if piece.state[block] == REQUESTED and not requesters:
+                        piece.state[block] = MISSING
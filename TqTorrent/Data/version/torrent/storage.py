@@ -0,0 +1,93 @@
+import os # Стандартная библиотека
+import mmap # Стандартная библиотека
+import bisect # Стандартная библиотека
+import hashlib # Стандартная библиотека
+
+
+class MappedStorage:
+    """Хранилище раздачи на отображенных в память файлах (mmap).
+
+    Блоки пишутся прямо на свое место в файлах раздачи без промежуточных
+    буферов; кусок, попадающий на границу файлов, раскладывается по нескольким
+    отображениям.
+    """
+
+    def __init__(self, metainfo, root_dir):
+        self.metainfo = metainfo
+        self.root_dir = root_dir
+        self.files = metainfo.files
+        self.offsets = [entry.offset for entry in self.files]
+        self.handles = []
+        self.maps = []
+        self.fresh = False # Все файлы только что созданы - проверять нечего
+
+    def open(self):
+        """Создает файлы нужной длины (если их нет) и отображает их в память."""
+        self.fresh = True
+        for entry in self.files:
+            path = os.path.join(self.root_dir, entry.path)
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            exists = os.path.exists(path)
+            self.fresh = self.fresh and not exists
+            mode = "r+b" if exists else "w+b"
+            handle = open(path, mode)
+            if os.fstat(handle.fileno()).st_size != entry.length:
+                handle.truncate(entry.length)
+            self.handles.append(handle)
+            # Файл нулевой длины отобразить нельзя
+            self.maps.append(mmap.mmap(handle.fileno(), entry.length) if entry.length else None)
+        return self
+
+    def close(self):
+        for mapped in self.maps:
+            if mapped is not None:
+                mapped.flush()
+                mapped.close()
+        for handle in self.handles:
+            handle.close()
+        self.maps = []
+        self.handles = []
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _spans(self, offset, length):
+        """Разбивает диапазон общего потока байт на (номер_файла, смещение_в_файле, длина)."""
+        file_index = bisect.bisect_right(self.offsets, offset) - 1
+        while length > 0 and file_index < len(self.files):
+            entry = self.files[file_index]
+            inner = offset - entry.offset
+            take = min(length, entry.length - inner)
+            if take > 0:
+                yield file_index, inner, take
+                offset += take
+                length -= take
+            file_index += 1
+
+    def write(self, index, begin, data):
+        offset = index * self.metainfo.piece_length + begin
+        view = memoryview(data)
+        pos = 0
+        for file_index, inner, take in self._spans(offset, len(data)):
+            self.maps[file_index][inner:inner + take] = view[pos:pos + take]
+            pos += take
+
+    def read(self, index, begin, length):
+        offset = index * self.metainfo.piece_length + begin
+        parts = [self.maps[file_index][inner:inner + take]
+                 for file_index, inner, take in self._spans(offset, length)]
+        return parts[0] if len(parts) == 1 else b"".join(parts)
+
+    def verify_piece(self, index):
+        digest = hashlib.sha1()
+        offset = index * self.metainfo.piece_length
+        for file_index, inner, take in self._spans(offset, self.metainfo.piece_size(index)):
+            digest.update(memoryview(self.maps[file_index])[inner:inner + take])
+        return digest.digest() == self.metainfo.piece_hashes[index]
+
+    def verify_all(self):
+        """Проверяет все куски (для докачки и раздачи). Возвращает bytearray флагов."""
+        return bytearray(1 if self.verify_piece(i) else 0 for i in range(self.metainfo.num_pieces))
@@ -0,0 +1,106 @@
+import socket # Стандартная библиотека
+import struct # Стандартная библиотека
+import asyncio # Стандартная библиотека
+import urllib.parse # Стандартная библиотека
+import urllib.request # Стандартная библиотека
+
+from .bencode import decode, encode
+
+ANNOUNCE_TIMEOUT = 15
+
+
+def parse_peers(peers):
+    """Компактный (6 байт на пир) или словарный список пиров -> [(host, port)]."""
+    if isinstance(peers, (bytes, bytearray)):
+        result = []
+        for i in range(0, len(peers) - len(peers) % 6, 6):
+            host = socket.inet_ntoa(peers[i:i + 4])
+            port = struct.unpack(">H", peers[i + 4:i + 6])[0]
+            result.append((host, port))
+        return result
+    return [(p[b"ip"].decode(), p[b"port"]) for p in peers]
+
+
+def announce(announce_url, info_hash, peer_id, port, uploaded=0, downloaded=0, left=0, event=None):
+    """HTTP-анонс трекеру (блокирующий). Возвращает (интервал, [(host, port)])."""
+    params = {
+        "info_hash": info_hash,
+        "peer_id": peer_id,
+        "port": port,
+        "uploaded": uploaded,
+        "downloaded": downloaded,
+        "left": left,
+        "compact": 1
+    }
+    if event:
+        params["event"] = event
+    separator = "&" if "?" in announce_url else "?"
+    url = announce_url + separator + urllib.parse.urlencode(params)
+    with urllib.request.urlopen(url, timeout=ANNOUNCE_TIMEOUT) as response:
+        reply = decode(response.read())
+    if b"failure reason" in reply:
+        raise IOError(reply[b"failure reason"].decode("utf-8", "replace"))
+    return reply.get(b"interval", 1800), parse_peers(reply.get(b"peers", b""))
+
+
+class TrackerServer:
+    """Минимальный HTTP-трекер (только /announce, компактный ответ).
+
+    Подходит для локальной сети и проверки раздачи на одной машине.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, interval=60):
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.swarms = {} # info_hash -> {peer_id: (ip, port)}
+        self.server = None
+
+    @property
+    def announce_url(self):
+        return f"http://{self.host}:{self.port}/announce"
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.split()
+            if len(parts) < 2:
+                return
+            target = urllib.parse.urlsplit(parts[1].decode("latin-1"))
+            query = urllib.parse.parse_qs(target.query, encoding="latin-1")
+            body = self.announce_reply(query, writer.get_extra_info("peername")[0])
+            writer.write(b"HTTP/1.0 200 OK\r\nContent-Type: text/plain\r\n"
+                         b"Content-Length: %d\r\n\r\n" % len(body) + body)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    def announce_reply(self, query, remote_ip):
+        try:
+            info_hash = query["info_hash"][0].encode("latin-1")
+            peer_id = query["peer_id"][0].encode("latin-1")
+            port = int(query["port"][0])
+        except (KeyError, ValueError):
+            return encode({b"failure reason": b"bad announce"})
+
+        swarm = self.swarms.setdefault(info_hash, {})
+        if query.get("event", [""])[0] == "stopped":
+            swarm.pop(peer_id, None)
+        else:
+            swarm[peer_id] = (remote_ip, port)
+
+        peers = b"".join(socket.inet_aton(ip) + struct.pack(">H", p)
+                         for pid, (ip, p) in swarm.items() if pid != peer_id)
+        return encode({b"interval": self.interval, b"peers": peers})
@@ -0,0 +1,5 @@
+@echo off
+:: Каталог без окна: tqtorrent status | refresh | list | scan | launch ID | daemon
+chcp 65001 > nul
+cd /d "%~dp0"
+python -m tqtorrent %*
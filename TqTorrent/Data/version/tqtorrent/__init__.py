@@ -0,0 +1,13 @@
+"""Ядро каталога TqG без Qt: пути конфигурации, чтение каталога, состояние запуска,
+сканы процессов и файлов, проверка путей и запуск игр, занятое место, снимки сохранений,
+моды. Его используют и окно (main_app), и CLI (python -m tqtorrent)."""
+
+from .config import ConfigPaths, default_config_dir, DEFAULT_CONFIG_PATH
+from .catalog import CatalogStore
+from .launcher import launch_game, clean_launch_path
+from .scan import scan_running, scan_installed
+from .steam import SteamLibraryScanner, parse_vdf, detect_installed, match_steam_games
+from .targets import LaunchResolver, normalize_launch_path, broken_targets
+from .usage import DiskUsage, game_directory, sort_usage
+from .saves import SnapshotStore, SaveBackup, snapshot_saves
+from .mods import ModManager, resolve as resolve_mods
@@ -0,0 +1,6 @@
+import sys # Стандартная библиотека
+
+from .cli import main
+
+# python -m tqtorrent status | refresh | list | scan | launch ID | daemon
+sys.exit(main())
@@ -0,0 +1,179 @@
+import os # Стандартная библиотека
+import json # Стандартная библиотека
+
+import catalog_db
+import metrics
+from cache_parser import iter_games_from_file
+from catalog_cache import load_or_build
+from .config import ConfigPaths
+
+# Вкладка из plus_file.txt -> data-view в index.html
+PLUS_FILE_VIEWS = {
+    "установленные": "installed",
+    "загрузки": "downloads",
+    "моды": "mods",
+    "настройки": "settings"
+}
+
+
+class CatalogStore:
+    """Каталог без Qt: чтение CNF_DATA/GAME_DATA и запись состояния запуска.
+
+    Если есть catalog.db, данные и состояние берутся из него. Иначе каталог
+    собирается из data.json, cache.txt и plus_file.txt (через снимок
+    catalog_cache.bin), а состояние пишется в data.json.
+    cnf_overrides дописываются в CNF_DATA после загрузки (возможности GUI,
+    например image_scheme), поэтому снимок одинаков для GUI и CLI.
+    """
+
+    def __init__(self, paths=None, cnf_overrides=None):
+        self.paths = paths or ConfigPaths()
+        self.cnf_overrides = dict(cnf_overrides or {})
+
+    def uses_db(self):
+        return os.path.exists(self.paths.db)
+
+    # ----------------- ЧТЕНИЕ -----------------
+
+    def read_plus_file(self):
+        """Читает plus_file.txt для определения начальной вкладки."""
+        if not os.path.exists(self.paths.plus):
+            return "catalog"
+        try:
+            with open(self.paths.plus, 'r', encoding='utf-8') as f:
+                view_name = f.readline().strip().lower()
+            return PLUS_FILE_VIEWS.get(view_name, "catalog")
+        except Exception as e:
+            print(f"ОШИБКА при чтении plus_file.txt: {e}")
+            return "catalog"
+
+    def default_cnf_data(self):
+        """CNF_DATA по умолчанию (до применения data.json или catalog.db)."""
+        return {
+            "progr_name": "TqG",
+            "steam_nickname": "Drswa",
+            "installed_game_ids": [],
+            "running_game_ids": [],
+            "download_status": "",
+            "initial_view": self.read_plus_file()
+        }
+
+    def parse_cache_txt(self):
+        """Читает и парсит cache.txt за один построчный проход (см. cache_parser)."""
+        if not os.path.exists(self.paths.cache):
+            return []
+        try:
+            with metrics.timer("catalog.parse") as span:
+                games = list(iter_games_from_file(self.paths.cache))
+                span["games"] = len(games)
+            return games
+        except Exception as e:
+            print(f"ОШИБКА при чтении cache.txt: {e}")
+            return []
+
+    def build_config_data(self):
+        """Читает CNF_DATA из data.json и объединяет с GAME_DATA из cache.txt."""
+        with metrics.timer("catalog.merge"):
+            cnf_data = self.default_cnf_data()
+            if os.path.exists(self.paths.data):
+                try:
+                    with open(self.paths.data, 'r', encoding='utf-8') as f:
+                        cnf_data.update(json.load(f).get("CNF_DATA", {}))
+                except Exception as e:
+                    print(f"ОШИБКА при чтении data.json: {e}")
+        return {"CNF_DATA": cnf_data, "GAME_DATA": self.parse_cache_txt()}
+
+    def load_config_data(self):
+        """Отдает объединенные CNF_DATA/GAME_DATA.
+
+        Полный разбор data.json, cache.txt и plus_file.txt выполняется,
+        только если один из этих файлов изменился со времени снимка.
+        """
+        with metrics.timer("catalog.load") as span:
+            data = None
+            if self.uses_db():
+                span["source"] = "db"
+                try:
+                    conn = catalog_db.connect(self.paths.db)
+                    try:
+                        data = catalog_db.read_config_data(conn, self.default_cnf_data())
+                    finally:
+                        conn.close()
+                except Exception as e:
+                    print(f"ОШИБКА при чтении {catalog_db.DB_FILE_NAME}: {e}")
+            if data is None:
+                span["source"] = "files"
+                data = load_or_build(self.paths.snapshot, self.paths.sources(), self.build_config_data)
+            span["games"] = len(data["GAME_DATA"])
+
+        if self.cnf_overrides:
+            data = {"CNF_DATA": {**data["CNF_DATA"], **self.cnf_overrides}, "GAME_DATA": data["GAME_DATA"]}
+        return data
+
+    # ----------------- СОСТОЯНИЕ -----------------
+
+    def update_data_json(self, update):
+        """Читает data.json, вызывает update(cnf_data) и атомарно записывает результат."""
+        data = {}
+        if os.path.exists(self.paths.data):
+            with open(self.paths.data, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        result = update(data.setdefault("CNF_DATA", {}))
+
+        tmp_path = self.paths.data + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4, ensure_ascii=False)
+        os.replace(tmp_path, self.paths.data)
+        return result
+
+    def set_game_run_state(self, game_id, running, pid=None):
+        """Записывает состояние запуска игры в catalog.db или running_game_ids в data.json."""
+        try:
+            if self.uses_db():
+                conn = catalog_db.connect(self.paths.db)
+                try:
+                    if running:
+                        catalog_db.set_game_running(conn, game_id, pid)
+                    else:
+                        catalog_db.clear_game_running(conn, game_id)
+                finally:
+                    conn.close()
+                return
+
+            def update(cnf_data):
+                running_ids = set(cnf_data.get("running_game_ids", []))
+                if running:
+                    running_ids.add(game_id)
+                else:
+                    running_ids.discard(game_id)
+                cnf_data["running_game_ids"] = sorted(running_ids)
+            self.update_data_json(update)
+        except Exception as e:
+            print(f"ОШИБКА при записи состояния запуска игры {game_id}: {e}")
+
+    def set_id_set(self, key, ids):
+        """Приводит installed_game_ids или running_game_ids к набору ids.
+        Возвращает (добавленные, удаленные); файлы не трогаются, если набор не изменился."""
+        ids = set(ids)
+        if self.uses_db():
+            conn = catalog_db.connect(self.paths.db)
+            try:
+                if key == "installed_game_ids":
+                    return catalog_db.set_installed_ids(conn, ids)
+                return catalog_db.set_running_ids(conn, ids)
+            finally:
+                conn.close()
+
+        current = set(self.load_config_data()["CNF_DATA"].get(key, []))
+        added, removed = ids - current, current - ids
+        if added or removed:
+            def update(cnf_data):
+                cnf_data[key] = sorted(ids)
+            self.update_data_json(update)
+        return added, removed
+
+    def set_running_ids(self, ids):
+        return self.set_id_set("running_game_ids", ids)
+
+    def set_installed_ids(self, ids):
+        return self.set_id_set("installed_game_ids", ids)
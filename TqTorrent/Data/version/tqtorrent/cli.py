@@ -0,0 +1,378 @@
+import os # Стандартная библиотека
+import json # Стандартная библиотека
+import time # Стандартная библиотека
+import argparse # Стандартная библиотека
+
+import metrics
+from metrics import MetricsFlusher, Profiler, read_summaries, merge_summaries
+from catalog_cache import source_stat
+from search_index import SearchIndex
+from .config import ConfigPaths
+from .catalog import CatalogStore
+from .launcher import launch_game
+from .scan import scan_running, scan_installed
+from .steam import SteamLibraryScanner
+from .targets import LaunchResolver, broken_targets
+from .usage import DiskUsage, sort_usage
+from .saves import SnapshotStore, SAVES_SET, snapshot_saves
+from .mods import ModManager, DEPLOY_METHODS
+from .launcher import clean_launch_path
+
+# --- НАСТРОЙКИ CLI ---
+DAEMON_INTERVAL = 5.0 # Секунд между проверками в режиме демона
+LIST_LIMIT = 50
+# --------------------
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="tqtorrent",
+        description="Каталог TqG без графического интерфейса: обновление, сканы и запуск игр."
+    )
+    parser.add_argument("--config", metavar="DIR", help="каталог конфигурации (по умолчанию TQ_CONFIG_PATH или путь из tqtorrent.config)")
+    parser.add_argument("--json", action="store_true", help="вывод в JSON (для скриптов)")
+    parser.add_argument("--profile", action="store_true", help="выполнить команду под cProfile (файлы в log/profile)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("status", help="сводка каталога: игр, установлено, запущено")
+    commands.add_parser("refresh", help="перечитать каталог и обновить снимок catalog_cache.bin")
+
+    list_parser = commands.add_parser("list", help="список игр")
+    list_parser.add_argument("query", nargs="?", default="", help="поиск по названию и описанию")
+    list_parser.add_argument("--status", help="только игры с этим статусом (установлено, не скачено, ...)")
+    list_parser.add_argument("--limit", type=int, default=LIST_LIMIT)
+
+    scan_parser = commands.add_parser("scan", help="найти запущенные игры и записать running_game_ids")
+    scan_parser.add_argument("--installed", action="store_true", help="также найти установленные игры (библиотеки Steam и файлы запуска)")
+    scan_parser.add_argument("--apply", action="store_true", help="записать найденные игры в installed_game_ids")
+    scan_parser.add_argument("--launch", action="store_true", help="проверить пути запуска (exe, steam://, ярлыки .url)")
+    scan_parser.add_argument("--steam", action="append", metavar="DIR",
+                             help="каталог Steam (можно несколько; по умолчанию TQ_STEAM_PATH или стандартные пути)")
+
+    launch_parser = commands.add_parser("launch", help="запустить игру по id")
+    launch_parser.add_argument("game_id", type=int)
+    launch_parser.add_argument("--wait", action="store_true", help="дождаться выхода из игры и снять отметку запуска")
+
+    daemon_parser = commands.add_parser("daemon", help="следить за файлами каталога и процессами игр")
+    daemon_parser.add_argument("--interval", type=float, default=DAEMON_INTERVAL)
+
+    metrics_parser = commands.add_parser("metrics", help="сводка замеров из log/metrics.jsonl (окно и CLI)")
+    metrics_parser.add_argument("--hours", type=float, default=24, help="за сколько последних часов (0 - весь файл)")
+    metrics_parser.add_argument("--app", choices=["gui", "cli"], help="только замеры окна или CLI")
+
+    saves_parser = commands.add_parser("saves", help="снимки сохранений (Localsaves_by_TqTorrent/saves и save_dirs.json)")
+    saves_commands = saves_parser.add_subparsers(dest="saves_command", required=True)
+    snapshot_parser = saves_commands.add_parser("snapshot", help="снять снимок (только измененные файлы)")
+    snapshot_parser.add_argument("--game", type=int, help="только общий каталог и каталоги этой игры")
+    snapshot_parser.add_argument("--codec", choices=["zlib", "lzma"], default="zlib")
+    list_saves_parser = saves_commands.add_parser("list", help="снимки набора")
+    list_saves_parser.add_argument("--set", default=SAVES_SET, help=f"набор ({SAVES_SET} или game-<id>)")
+    restore_parser = saves_commands.add_parser("restore", help="восстановить файл или весь снимок")
+    restore_parser.add_argument("snapshot", help="id снимка (latest - последний)")
+    restore_parser.add_argument("path", nargs="?", help="файл внутри снимка (без него - весь снимок)")
+    restore_parser.add_argument("--set", default=SAVES_SET)
+    restore_parser.add_argument("--to", help="куда восстановить (по умолчанию - на место)")
+    saves_commands.add_parser("prune", help="удалить снимки вне политики хранения и ненужные чанки")
+
+    mods_parser = commands.add_parser("mods", help="моды игры из mods/<id игры>: порядок, конфликты, раскладка")
+    mods_parser.add_argument("game_id", type=int)
+    mods_parser.add_argument("--target", metavar="DIR", help="каталог игры (по умолчанию - каталог файла из starting(...))")
+    mods_parser.add_argument("--method", choices=DEPLOY_METHODS, action="append",
+                             help="способ раскладки (можно несколько, по порядку попыток)")
+    mods_commands = mods_parser.add_subparsers(dest="mods_command", required=True)
+    mods_commands.add_parser("list", help="моды в порядке загрузки")
+    for name, help_text in (("enable", "включить мод и разложить"), ("disable", "выключить мод и убрать его файлы")):
+        toggle_parser = mods_commands.add_parser(name, help=help_text)
+        toggle_parser.add_argument("mods", nargs="+")
+    order_parser = mods_commands.add_parser("order", help="задать порядок загрузки (последний - главнее) и разложить")
+    order_parser.add_argument("mods", nargs="+")
+    mods_commands.add_parser("conflicts", help="файлы, которые дают несколько включенных модов")
+    mods_commands.add_parser("deploy", help="разложить включенные моды (только изменившиеся файлы)")
+    mods_commands.add_parser("undeploy", help="убрать все файлы модов из каталога игры")
+
+    usage_parser = commands.add_parser("usage", help="место на диске, занятое каталогами установленных игр")
+    usage_parser.add_argument("query", nargs="?", default="", help="только игры, найденные поиском")
+    usage_parser.add_argument("--sort", choices=["size", "files", "title"], default="size")
+    usage_parser.add_argument("--asc", action="store_true", help="по возрастанию")
+    usage_parser.add_argument("--min-mb", type=float, default=0, help="только игры больше N МБ")
+    usage_parser.add_argument("--all", action="store_true", help="все игры каталога, а не только installed_game_ids")
+    usage_parser.add_argument("--limit", type=int, default=LIST_LIMIT)
+    return parser
+
+
+def format_ids(ids, limit=20):
+    ids = sorted(ids)
+    if len(ids) <= limit:
+        return str(ids)
+    return f"{len(ids)} (первые: {ids[:limit]})"
+
+
+def summary(data):
+    cnf_data = data["CNF_DATA"]
+    return {
+        "games": len(data["GAME_DATA"]),
+        "installed": len(cnf_data.get("installed_game_ids", [])),
+        "running_game_ids": sorted(cnf_data.get("running_game_ids", []))
+    }
+
+
+def cmd_status(store, args):
+    result = summary(store.load_config_data())
+    result["source"] = "catalog.db" if store.uses_db() else "cache.txt + data.json"
+    result["config_dir"] = store.paths.config_dir
+    return result, (f"{result['games']} игр, установлено {result['installed']}, "
+                    f"запущено {len(result['running_game_ids'])} ({result['source']})")
+
+
+def cmd_refresh(store, args):
+    result = summary(store.load_config_data())
+    return result, f"Каталог обновлен: {result['games']} игр."
+
+
+def cmd_list(store, args):
+    data = store.load_config_data()
+    index = SearchIndex(data["GAME_DATA"])
+    filters = {"status": args.status} if args.status else None
+    ids, total = index.search(args.query, filters, args.limit)
+    games = [index.get(game_id) for game_id in ids]
+    lines = [f"{game['id']:>6}  {game['action']:<14} {game['title']}" for game in games]
+    lines.append(f"Показано {len(games)} из {total}.")
+    return {"total": total, "games": games}, "\n".join(lines)
+
+
+def cmd_scan(store, args):
+    data = store.load_config_data()
+    running_ids, added, removed = scan_running(store, data=data)
+    result = {"running_game_ids": sorted(running_ids), "started": sorted(added), "stopped": sorted(removed)}
+    text = f"Запущено игр: {len(running_ids)} (+{len(added)} -{len(removed)})."
+    if args.installed or args.apply:
+        installed = scan_installed(store, apply=args.apply, data=data, steam_roots=args.steam)
+        result["installed"] = {key: sorted(ids) for key, ids in installed.items() if key != "steam"}
+        result["installed"]["steam"] = {str(game_id): appid for game_id, appid in sorted(installed["steam"].items())}
+        text += (f"\nБиблиотек Steam: {len(installed['libraries'])}, игр из Steam в каталоге: {len(installed['steam'])}."
+                 f"\nУстановлено: {len(installed['found'])} игр; не найдены: {format_ids(installed['missing'])}; "
+                 f"не отмечены установленными: {format_ids(installed['unmarked'])}")
+        if args.apply:
+            text += "\ninstalled_game_ids обновлен."
+    if args.launch:
+        broken = broken_targets(make_resolver(store, args.steam).resolve_all(data["GAME_DATA"]))
+        result["launch_broken"] = {str(game_id): info for game_id, info in sorted(broken.items())}
+        text += f"\nНедоступных путей запуска: {len(broken)} из {len(data['GAME_DATA'])}."
+        text += "".join(f"\n{game_id:>6}  {info['message']}" for game_id, info in sorted(broken.items())[:LIST_LIMIT])
+    return result, text
+
+
+def make_resolver(store, steam_roots=None):
+    return LaunchResolver(store.paths.launch_cache, SteamLibraryScanner(store.paths.steam_cache), steam_roots)
+
+
+def cmd_launch(store, args):
+    game = next((g for g in store.load_config_data()["GAME_DATA"] if g["id"] == args.game_id), None)
+    if game is None:
+        raise LookupError(f"игра {args.game_id} не найдена в каталоге")
+    if not game.get("launch_path"):
+        raise LookupError(f"у игры '{game['title']}' нет пути запуска")
+
+    # steam:// и ярлыки .url запускаются через найденный exe (tqtorrent.targets)
+    path = make_resolver(store).launch_target(game["launch_path"], game.get("process_name"))
+    process = launch_game(path)
+    store.set_game_run_state(game["id"], True, process.pid)
+    result = {"game_id": game["id"], "pid": process.pid}
+    text = f"Запущена '{game['title']}' (pid {process.pid})."
+    if args.wait:
+        started = time.monotonic()
+        result["returncode"] = process.wait()
+        result["play_seconds"] = round(time.monotonic() - started, 1)
+        store.set_game_run_state(game["id"], False)
+        text += f"\nИгра завершена (код {result['returncode']}), сессия {result['play_seconds']:.0f} сек."
+    return result, text
+
+
+def cmd_metrics(store, args):
+    since = time.time() - args.hours * 3600 if args.hours else None
+    summaries = [s for s in read_summaries(store.paths.log, since) if not args.app or s.get("app") == args.app]
+    result = merge_summaries(summaries)
+    result["windows"] = len(summaries)
+    lines = [f"{'замер':<28}{'число':>8}{'p50 мс':>10}{'p90 мс':>10}{'p99 мс':>10}{'макс мс':>10}{'всего мс':>12}"]
+    for name, timer in result["timers"].items():
+        lines.append(f"{name:<28}{timer['count']:>8}{timer['p50_ms']:>10.1f}{timer['p90_ms']:>10.1f}"
+                     f"{timer['p99_ms']:>10.1f}{timer['max_ms']:>10.1f}{timer['sum_ms']:>12.1f}")
+    for name, value in sorted(result["counters"].items()):
+        lines.append(f"{name:<28}{value:>8}")
+    lines.append(f"Окон журнала: {len(summaries)} ({store.paths.log})")
+    return result, "\n".join(lines)
+
+
+def cmd_saves(store, args):
+    paths = store.paths
+    snapshots = SnapshotStore(paths.save_store, getattr(args, "codec", "zlib"))
+    if args.saves_command == "snapshot":
+        reports = snapshot_saves(snapshots, paths, args.game, reason="cli")
+        lines = [f"{r['set']:<16} {r['id'] or 'без изменений':<22} файлов {r['files']}, изменено {r['changed']}, "
+                 f"записано {r['written'] / 1024:.0f} КБ из {r['bytes'] / 1024:.0f} КБ" for r in reports]
+        for report in reports:
+            lines += [f"  ОШИБКА {rel_path}: {error}" for rel_path, error in report["errors"].items()]
+        return {"snapshots": reports}, "\n".join(lines) or f"Нет каталогов сохранений ({paths.saves})."
+    if args.saves_command == "list":
+        items = []
+        for snapshot_id, _ in snapshots.list_snapshots(args.set):
+            snapshot = snapshots.load_snapshot(args.set, snapshot_id)
+            items.append({"id": snapshot_id, "files": len(snapshot["files"]), "reason": snapshot.get("reason", ""),
+                          "bytes": sum(entry["size"] for entry in snapshot["files"].values())})
+        usage = snapshots.usage()
+        lines = [f"{item['id']:<22} {item['files']:>6} файлов {item['bytes'] / 1024:>10.0f} КБ  {item['reason']}" for item in items]
+        lines.append(f"Снимков {len(items)}; хранилище {usage['bytes'] / 1048576:.1f} МБ в {usage['chunks']} чанках.")
+        return {"set": args.set, "snapshots": items, "usage": usage}, "\n".join(lines)
+    if args.saves_command == "restore":
+        snapshot = snapshots.load_snapshot(args.set, None if args.snapshot == "latest" else args.snapshot)
+        if snapshot is None:
+            raise LookupError(f"нет снимка {args.set}/{args.snapshot}")
+        if args.path:
+            rel_path = args.path.replace("\\", "/")
+            dest = args.to or os.path.join(snapshot["source"], *rel_path.split("/"))
+            size = snapshots.restore_file(args.set, snapshot["id"], rel_path, dest)
+            return {"id": snapshot["id"], "path": dest, "bytes": size}, f"Восстановлен {dest} ({size} байт) из {snapshot['id']}."
+        dest = args.to or snapshot["source"]
+        count = snapshots.restore(args.set, snapshot["id"], dest)
+        return {"id": snapshot["id"], "path": dest, "files": count}, f"Восстановлено {count} файлов в {dest} из {snapshot['id']}."
+    result = snapshots.prune()
+    return result, f"Удалено снимков {result['snapshots']}, чанков {result['chunks']} ({result['bytes'] / 1048576:.1f} МБ)."
+
+
+def format_deploy(report):
+    placed = report["hardlink"] + report["reflink"] + report["copy"]
+    text = (f"Разложено {placed} (ссылки {report['hardlink']}, reflink {report['reflink']}, копии {report['copy']}), "
+            f"без изменений {report['unchanged']}, убрано {report['removed']}, возвращено файлов игры {report['restored']}, "
+            f"конфликтов {report['conflicts']}.")
+    if report["kept"]:
+        text += f"\nИзменены после раскладки, оставлены: {format_ids(report['kept'])}"
+    return text
+
+
+def cmd_mods(store, args):
+    target = args.target
+    if not target:
+        game = next((g for g in store.load_config_data()["GAME_DATA"] if g["id"] == args.game_id), None)
+        if game is None:
+            raise LookupError(f"игра {args.game_id} не найдена в каталоге")
+        path = clean_launch_path(game.get("launch_path"))
+        if not path or "://" in path:
+            raise LookupError(f"у игры '{game['title']}' нет пути к файлу игры - укажите --target")
+        target = os.path.dirname(path)
+    manager = ModManager(store.paths.mods, args.game_id, target, args.method or DEPLOY_METHODS)
+
+    if args.mods_command == "list":
+        enabled = set(manager.enabled_order())
+        order = manager.load_order()
+        lines = [f"{n + 1:>4}. [{'x' if mod in enabled else ' '}] {mod}" for n, mod in enumerate(order)]
+        lines.append(f"Модов {len(order)}, включено {len(enabled)}; каталог игры {target}")
+        return {"order": order, "enabled": [mod for mod in order if mod in enabled], "target": target}, "\n".join(lines)
+    if args.mods_command == "conflicts":
+        conflicts = manager.conflicts()
+        lines = [f"{rel_path}: {' < '.join(mods)}" for rel_path, mods in sorted(conflicts.items())[:LIST_LIMIT]]
+        lines.append(f"Конфликтующих файлов: {len(conflicts)} (побеждает последний мод в порядке загрузки).")
+        return {"conflicts": conflicts}, "\n".join(lines)
+    if args.mods_command == "undeploy":
+        report = manager.undeploy()
+        return report, f"Убрано {report['removed']} файлов модов, возвращено файлов игры {report['restored']}."
+    if args.mods_command in ("enable", "disable"):
+        for mod in args.mods:
+            manager.set_enabled(mod, args.mods_command == "enable")
+    elif args.mods_command == "order":
+        manager.set_order(args.mods)
+    report = manager.deploy()
+    text = format_deploy(report)
+    if args.mods_command == "order":
+        text = "Порядок загрузки: " + ", ".join(manager.load_order()) + "\n" + text
+    return report, text
+
+
+def run_daemon(store, interval, emit):
+    """Цикл демона: пересобирает снимок при изменении файлов каталога и обновляет
+    running_game_ids по процессам. Отпечатки снимаются после своих записей, чтобы
+    собственное обновление data.json не считалось внешним изменением."""
+    stats = None
+    data = store.load_config_data()
+    emit({"event": "start", **summary(data)}, f"Демон запущен: {len(data['GAME_DATA'])} игр, проверка каждые {interval:g} с.")
+    while True:
+        current = [source_stat(path) for path in store.paths.watched()]
+        if stats is not None and current != stats:
+            data = store.load_config_data()
+            emit({"event": "refresh", **summary(data)}, f"Каталог изменился: {len(data['GAME_DATA'])} игр.")
+        running_ids, added, removed = scan_running(store, data=data)
+        if added or removed:
+            emit({"event": "running", "running_game_ids": sorted(running_ids),
+                  "started": sorted(added), "stopped": sorted(removed)},
+                 f"Запущенные игры: {sorted(running_ids)} (+{sorted(added)} -{sorted(removed)})")
+            data = store.load_config_data()
+        stats = [source_stat(path) for path in store.paths.watched()]
+        time.sleep(interval)
+
+
+def cmd_usage(store, args):
+    data = store.load_config_data()
+    installed_ids = set(data["CNF_DATA"].get("installed_game_ids", []))
+    games = [game for game in data["GAME_DATA"] if args.all or game["id"] in installed_ids]
+    usage = DiskUsage(store.paths.usage_cache).scan_games(games, make_resolver(store), prune=not args.all)
+    index = SearchIndex(data["GAME_DATA"])
+    ids = set(index.search(args.query, None, len(data["GAME_DATA"]) or 1)[0]) if args.query else None
+    rows = sort_usage(usage, index.games, args.sort, not args.asc, int(args.min_mb * 1048576), ids)
+    total_bytes = sum(row["bytes"] for row in rows)
+    lines = [f"{row['id']:>6}  {row['bytes'] / 1073741824:8.2f} ГБ {row['files']:>8} файлов  {row['title']}  ({row['path']})"
+             for row in rows[:args.limit]]
+    lines.append(f"Показано {min(len(rows), args.limit)} из {len(rows)}; всего {total_bytes / 1073741824:.2f} ГБ "
+                 f"(каталоги найдены у {len(usage)} из {len(games)} игр).")
+    return {"total": len(rows), "total_bytes": total_bytes, "games": rows[:args.limit]}, "\n".join(lines)
+
+
+COMMANDS = {
+    "status": cmd_status,
+    "refresh": cmd_refresh,
+    "list": cmd_list,
+    "scan": cmd_scan,
+    "launch": cmd_launch,
+    "metrics": cmd_metrics,
+    "saves": cmd_saves,
+    "mods": cmd_mods,
+    "usage": cmd_usage
+}
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    store = CatalogStore(ConfigPaths(args.config))
+    profiler = Profiler(store.paths.log, args.profile)
+    flusher = MetricsFlusher(store.paths.log, "cli")
+
+    def emit(result, text):
+        if args.json:
+            print(json.dumps(result, ensure_ascii=False), flush=True)
+        else:
+            print(text, flush=True)
+
+    if args.command == "daemon":
+        flusher.start()
+        try:
+            run_daemon(store, args.interval, emit)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            flusher.stop()
+        return 0
+
+    start = time.perf_counter()
+    try:
+        with profiler.section("cli-" + args.command), metrics.timer("cli." + args.command):
+            result, text = COMMANDS[args.command](store, args)
+    except Exception as e:
+        if args.json:
+            print(json.dumps({"ok": False, "error": str(e)}, ensure_ascii=False))
+        else:
+            print(f"ОШИБКА: {e}")
+        return 1
+    finally:
+        if args.command != "metrics":
+            flusher.stop() # Одна запись в журнал на команду
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    emit({"ok": True, **result, "elapsed_ms": round(elapsed_ms, 2)}, f"{text}\n({elapsed_ms:.1f} мс)")
+    return 0
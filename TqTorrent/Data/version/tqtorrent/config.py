@@ -0,0 +1,60 @@
+import os # Стандартная библиотека
+
+from catalog_db import DB_FILE_NAME
+
+# --- КОНФИГУРАЦИЯ (Проверьте пути!) ---
+DEFAULT_CONFIG_PATH = r"C:\Users\drswa\OneDrive\Documents\TqTorrent\Data\config"
+DATA_DIR_NAME = "Data" # Штатная раскладка: <корень TqTorrent>\Data\config
+# --------------------
+
+
+def default_config_dir():
+    """Каталог конфигурации: TQ_CONFIG_PATH (другой набор файлов, bench.py, CI) или путь по умолчанию."""
+    return os.environ.get("TQ_CONFIG_PATH") or DEFAULT_CONFIG_PATH
+
+
+def default_base_dir(config_dir):
+    """Корень данных (downloads, mods, log, сохранения): TQ_BASE_PATH; при штатной раскладке
+    <корень>/Data/config - два уровня выше каталога конфигурации; иначе (TQ_CONFIG_PATH или
+    --config на другой каталог) - сам каталог конфигурации, а не то, что окажется выше него."""
+    base_dir = os.environ.get("TQ_BASE_PATH")
+    if base_dir:
+        return base_dir
+    parent = os.path.dirname(os.path.normpath(config_dir))
+    if os.path.basename(parent).lower() == DATA_DIR_NAME.lower():
+        return os.path.dirname(parent)
+    return config_dir
+
+
+class ConfigPaths:
+    """Пути файлов каталога внутри одного каталога конфигурации (одни и те же для GUI, CLI и check_install).
+    Каталоги данных лежат в base_dir (см. default_base_dir), журнал - в log_dir, TQ_LOG_PATH или base_dir/log."""
+
+    def __init__(self, config_dir=None, base_dir=None, log_dir=None):
+        self.config_dir = config_dir or default_config_dir()
+        self.data = os.path.join(self.config_dir, "data.json")
+        self.cache = os.path.join(self.config_dir, "cache.txt")
+        self.plus = os.path.join(self.config_dir, "plus_file.txt")
+        self.snapshot = os.path.join(self.config_dir, "catalog_cache.bin") # Снимок разобранного каталога
+        self.db = os.path.join(self.config_dir, DB_FILE_NAME) # Хранилище SQLite (если импортировано)
+        self.steam_cache = os.path.join(self.config_dir, "steam_libraries.bin") # Кэш библиотек Steam (tqtorrent.steam)
+        self.launch_cache = os.path.join(self.config_dir, "launch_targets.bin") # Проверенные пути запуска (tqtorrent.targets)
+        self.usage_cache = os.path.join(self.config_dir, "disk_usage.bin") # Размеры каталогов игр (tqtorrent.usage)
+        base_dir = self.base_dir = base_dir or default_base_dir(self.config_dir) # Documents\TqTorrent
+        self.downloads = os.path.join(base_dir, "downloads")
+        self.mods = os.path.join(base_dir, "mods") # mods/<id игры>/<мод>/... (tqtorrent.mods)
+        self.covers = os.path.join(base_dir, "covers") # Локальные обложки (кроме каталога конфигурации)
+        # metrics.jsonl и профили --profile
+        self.log = log_dir or os.environ.get("TQ_LOG_PATH") or os.path.join(base_dir, "log")
+        local_saves = os.path.join(base_dir, "Localsaves_by_TqTorrent")
+        self.saves = os.path.join(local_saves, "saves") # Общий каталог сохранений (создает setup.py)
+        self.save_store = os.path.join(local_saves, "snapshots") # Снимки сохранений (tqtorrent.saves)
+        self.save_dirs = os.path.join(local_saves, "save_dirs.json") # {"<id игры>": [каталоги сохранений]}
+
+    def sources(self):
+        """Файлы, из которых собирается каталог без catalog.db (отпечаток снимка)."""
+        return [self.data, self.cache, self.plus]
+
+    def watched(self):
+        """Файлы, изменение которых меняет каталог (для наблюдателя и демона)."""
+        return [self.cache, self.data, self.plus, self.db, self.db + "-wal"]
@@ -0,0 +1,20 @@
+import os # Стандартная библиотека
+import subprocess # Стандартная библиотека
+
+import metrics
+
+
+def clean_launch_path(launch_path):
+    """Путь из starting(...) без пробелов и кавычек по краям."""
+    return (launch_path or "").strip().strip('"')
+
+
+def launch_game(launch_path):
+    """Запускает исполняемый файл игры с ее каталогом в качестве рабочего (без shell=True).
+    Возвращает Popen - его можно передать ProcessTracker или дождаться wait()."""
+    path = clean_launch_path(launch_path)
+    if not path:
+        raise ValueError("пустой путь запуска")
+    # Рабочий каталог - каталог исполняемого файла: игры ищут ресурсы относительно него
+    with metrics.timer("game.launch"):
+        return subprocess.Popen([path], cwd=os.path.dirname(path) or None)
@@ -0,0 +1,382 @@
+import os # Стандартная библиотека
+import sys # Стандартная библиотека
+import json # Стандартная библиотека
+import errno # Стандартная библиотека
+import pickle # Стандартная библиотека
+import shutil # Стандартная библиотека
+
+import metrics
+
+# --- НАСТРОЙКИ МОДОВ ---
+# Способы раскладки файлов мода в каталог игры, по порядку попыток
+DEPLOY_METHODS = ("hardlink", "reflink", "copy")
+STATE_FILE_NAME = "tq_mods.json" # Порядок загрузки и включенные моды игры
+DEPLOYED_FILE_NAME = "tq_deployed.json" # Что сейчас разложено в каталог игры
+INDEX_FILE_NAME = "tq_mods_index.bin" # Кэш файлов модов по mtime каталогов
+BACKUP_DIR_NAME = ".tq_backup" # Файлы игры, замененные модами
+INDEX_VERSION = 1
+# --------------------
+
+FICLONE = 0x40049409 # ioctl клонирования файла (Linux: btrfs, XFS)
+
+
+class ModError(Exception):
+    pass
+
+
+def _reflink(src, dst):
+    """Копия-клон: общие блоки с src до первой записи (copy-on-write)."""
+    if not sys.platform.startswith("linux"):
+        raise OSError(errno.EOPNOTSUPP, "reflink поддерживается только в Linux")
+    import fcntl # Стандартная библиотека (только POSIX)
+    with open(src, 'rb') as s, open(dst, 'wb') as d:
+        try:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        except OSError:
+            d.close()
+            os.remove(dst)
+            raise
+
+
+_PLACERS = {
+    "hardlink": os.link,
+    "reflink": _reflink,
+    "copy": shutil.copyfile
+}
+
+
+def walk_mod(root, cached=None):
+    """Файлы мода {rel_path: (size, mtime_ns)} и mtime его каталогов {rel_dir: mtime_ns}.
+
+    cached - (files, dirs) прошлого обхода: каталог с тем же mtime (файлы не добавлялись,
+    не удалялись и не переименовывались) не читается заново - его файлы из кэша только
+    проверяются stat (перезапись файла на месте mtime каталога не меняет).
+    Возвращает (files, dirs, прочитано каталогов)."""
+    old_files, old_dirs = cached or ({}, {})
+    by_dir = {}
+    children = {}
+    if old_dirs:
+        for rel_path, info in old_files.items():
+            by_dir.setdefault(rel_path.rpartition("/")[0], {})[rel_path] = info
+        for rel_dir in old_dirs:
+            if rel_dir:
+                children.setdefault(rel_dir.rpartition("/")[0], []).append(rel_dir)
+    files = {}
+    dirs = {}
+    scanned = 0
+    stack = [""]
+    while stack:
+        rel_dir = stack.pop()
+        path = os.path.join(root, *rel_dir.split("/")) if rel_dir else root
+        mtime_ns = os.stat(path).st_mtime_ns
+        dirs[rel_dir] = mtime_ns
+        if old_dirs.get(rel_dir) == mtime_ns:
+            try:
+                for rel_path in by_dir.get(rel_dir, ()):
+                    st = os.stat(os.path.join(root, *rel_path.split("/")))
+                    files[rel_path] = (st.st_size, st.st_mtime_ns)
+            except FileNotFoundError:
+                pass # Файл удалили после stat каталога: читаем каталог заново
+            else:
+                # Состав каталога тот же - подкаталоги берутся из кэша (их mtime проверяется отдельно)
+                stack.extend(children.get(rel_dir, ()))
+                continue
+        scanned += 1
+        with os.scandir(path) as entries:
+            for entry in entries:
+                rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(rel_path)
+                elif entry.is_file(follow_symlinks=False):
+                    st = entry.stat()
+                    files[rel_path] = (st.st_size, st.st_mtime_ns)
+    return files, dirs, scanned
+
+
+def resolve(order, index):
+    """Итоговый набор файлов по порядку загрузки (order - от низшего приоритета к высшему):
+    файл берется из последнего мода, который его содержит. Один проход по всем файлам.
+    Возвращает (winners {rel_path: мод}, conflicts {rel_path: [моды по порядку]})."""
+    winners = {}
+    conflicts = {}
+    for mod in order:
+        for rel_path in index.get(mod, ()):
+            previous = winners.get(rel_path)
+            if previous is not None:
+                providers = conflicts.get(rel_path)
+                if providers is None:
+                    conflicts[rel_path] = [previous, mod]
+                else:
+                    providers.append(mod)
+            winners[rel_path] = mod
+    return winners, conflicts
+
+
+class ModManager:
+    """Моды одной игры: mods/<id игры>/<мод>/... повторяет структуру каталога игры.
+
+    Файлы включенных модов раскладываются в каталог игры жесткими ссылками
+    (или reflink-клонами, или копиями, если ссылки между томами невозможны) без
+    копирования содержимого. Файлы игры, которые мод заменяет, переносятся в
+    .tq_backup и возвращаются при выключении мода. tq_deployed.json помнит, что и
+    откуда разложено, поэтому включение, выключение и смена порядка трогают
+    только файлы, у которых поменялся мод-источник или которые изменились на диске.
+    Жесткая ссылка - тот же файл, что и в папке мода: если игра перезапишет его
+    на месте, изменится и файл мода.
+    """
+
+    def __init__(self, mods_root, game_id, game_dir, methods=DEPLOY_METHODS):
+        self.game_id = game_id
+        self.root = os.path.join(mods_root, str(game_id))
+        self.game_dir = game_dir
+        self.methods = [method for method in methods if method in _PLACERS]
+        if not self.methods:
+            raise ValueError(f"Неизвестные способы раскладки: {methods}")
+        self.state_path = os.path.join(self.root, STATE_FILE_NAME)
+        self.deployed_path = os.path.join(self.root, DEPLOYED_FILE_NAME)
+        self.index_path = os.path.join(self.root, INDEX_FILE_NAME)
+        self.backup_dir = os.path.join(self.root, BACKUP_DIR_NAME)
+        self.index = {} # мод -> {rel_path: (size, mtime_ns)}
+        self.index_dirs = {} # мод -> {rel_dir: mtime_ns}
+        self.state = self._load_json(self.state_path, {"order": [], "enabled": []})
+        # rel_path -> {"mod", "source": [size, mtime_ns] файла мода, "size", "mtime_ns" в каталоге игры, "backup"}
+        self.deployed = self._load_json(self.deployed_path, {})
+
+    # ----------------- СОСТОЯНИЕ -----------------
+
+    @staticmethod
+    def _load_json(path, default):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return default
+        except (OSError, ValueError) as e:
+            print(f"ОШИБКА чтения {path}: {e}")
+            return default
+
+    @staticmethod
+    def _save_json(path, data):
+        tmp_path = path + ".tmp"
+        # dumps целиком (C-кодировщик) в разы быстрее потоковой записи dump на 100k файлов
+        text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    def save_state(self):
+        os.makedirs(self.root, exist_ok=True)
+        self._save_json(self.state_path, self.state)
+
+    def available(self):
+        """Каталоги модов (все подкаталоги mods/<id игры>, кроме служебных)."""
+        try:
+            with os.scandir(self.root) as entries:
+                return sorted(entry.name for entry in entries
+                              if entry.is_dir(follow_symlinks=False) and entry.name != BACKUP_DIR_NAME)
+        except FileNotFoundError:
+            return []
+
+    def load_order(self):
+        """Порядок загрузки: сохраненный, затем новые моды по имени; удаленные выпадают."""
+        present = self.available()
+        present_set = set(present)
+        order = [mod for mod in dict.fromkeys(self.state["order"]) if mod in present_set]
+        placed = set(order)
+        return order + [mod for mod in present if mod not in placed]
+
+    def enabled_order(self):
+        enabled = set(self.state["enabled"])
+        return [mod for mod in self.load_order() if mod in enabled]
+
+    def set_enabled(self, mod, enabled=True):
+        if mod not in self.available():
+            raise ModError(f"Нет мода {mod} в {self.root}")
+        names = [name for name in self.state["enabled"] if name != mod]
+        if enabled:
+            names.append(mod)
+        self.state["enabled"] = names
+        self.state["order"] = self.load_order()
+        self.save_state()
+
+    def set_order(self, mods):
+        """Новый порядок загрузки; не перечисленные моды остаются после них в прежнем порядке."""
+        present = set(self.available())
+        unknown = [mod for mod in mods if mod not in present]
+        if unknown:
+            raise ModError(f"Нет модов: {', '.join(unknown)}")
+        listed = set(mods)
+        self.state["order"] = list(mods) + [mod for mod in self.load_order() if mod not in listed]
+        self.save_state()
+
+    # ----------------- ИНДЕКС -----------------
+
+    def refresh_index(self, mods=None):
+        """Обновляет индекс файлов модов (по умолчанию - включенных). Каталоги модов с
+        прежним mtime не перечитываются (их файлы проверяются stat). Возвращает число
+        прочитанных каталогов."""
+        with metrics.timer("mods.index") as span:
+            if not self.index:
+                self._load_index()
+            scanned = 0
+            changed = False
+            for mod in (self.enabled_order() if mods is None else mods):
+                cached = (self.index.get(mod, {}), self.index_dirs.get(mod, {}))
+                files, dirs, mod_scanned = walk_mod(os.path.join(self.root, mod), cached)
+                changed = changed or mod_scanned or files != cached[0]
+                self.index[mod], self.index_dirs[mod] = files, dirs
+                scanned += mod_scanned
+            for mod in [mod for mod in self.index if mod not in self.available()]:
+                del self.index[mod]
+                self.index_dirs.pop(mod, None)
+                changed = True
+            if changed:
+                self._save_index()
+            span.update(scanned=scanned)
+        return scanned
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'rb') as f:
+                cache = pickle.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"ОШИБКА чтения индекса модов: {e}")
+            return
+        if isinstance(cache, dict) and cache.get("version") == INDEX_VERSION:
+            self.index = cache["files"]
+            self.index_dirs = cache["dirs"]
+
+    def _save_index(self):
+        tmp_path = self.index_path + ".tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({"version": INDEX_VERSION, "files": self.index, "dirs": self.index_dirs}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"ОШИБКА записи индекса модов: {e}")
+
+    def conflicts(self):
+        """{rel_path: [моды по порядку]} для файлов, которые дают несколько включенных модов."""
+        self.refresh_index()
+        return resolve(self.enabled_order(), self.index)[1]
+
+    # ----------------- РАСКЛАДКА -----------------
+
+    def _game_path(self, rel_path):
+        return os.path.join(self.game_dir, *rel_path.split("/"))
+
+    def _is_ours(self, rel_path, record):
+        """Файл в каталоге игры - тот, что мы разложили: размер и mtime не менялись или это
+        жесткая ссылка на файл мода (его переписали на месте через любой из двух путей)."""
+        try:
+            st = os.stat(self._game_path(rel_path))
+        except OSError:
+            return False
+        if st.st_size == record["size"] and st.st_mtime_ns == record["mtime_ns"]:
+            return True
+        try:
+            return os.path.samestat(st, os.stat(os.path.join(self.root, record["mod"], *rel_path.split("/"))))
+        except OSError:
+            return False
+
+    def _place(self, src, dst, report, failed):
+        tmp_path = dst + ".tqmod"
+        for method in self.methods:
+            if method in failed:
+                continue
+            try:
+                if os.path.lexists(tmp_path):
+                    os.remove(tmp_path)
+                _PLACERS[method](src, tmp_path)
+            except OSError:
+                # Между томами ссылки невозможны, reflink не везде есть: больше не пробуем
+                failed.add(method)
+                continue
+            os.replace(tmp_path, dst)
+            report[method] += 1
+            return
+        raise ModError(f"Не удалось разложить {src} ни одним способом: {self.methods}")
+
+    def _remove(self, rel_path, record, report):
+        """Убирает разложенный файл и возвращает файл игры из .tq_backup."""
+        path = self._game_path(rel_path)
+        if self._is_ours(rel_path, record):
+            os.remove(path)
+        elif os.path.exists(path):
+            # Файл изменили после раскладки (игра, обновление): не трогаем
+            report["kept"].append(rel_path)
+        if record.get("backup"):
+            backup = os.path.join(self.backup_dir, *rel_path.split("/"))
+            if os.path.exists(backup) and not os.path.exists(path):
+                shutil.move(backup, path)
+                report["restored"] += 1
+        report["removed"] += 1
+
+    def deploy(self):
+        """Приводит каталог игры к включенным модам в порядке загрузки.
+
+        Ставятся только файлы, у которых сменился мод-источник или которые изменились
+        (в моде или в каталоге игры) после прошлой раскладки; файлы выключенных модов
+        убираются. Возвращает отчет: {"hardlink", "reflink", "copy", "unchanged",
+        "removed", "restored", "backed_up", "conflicts", "kept"}."""
+        with metrics.timer("mods.deploy") as span:
+            self.refresh_index()
+            winners, conflicts = resolve(self.enabled_order(), self.index)
+            report = {"hardlink": 0, "reflink": 0, "copy": 0, "unchanged": 0, "removed": 0,
+                      "restored": 0, "backed_up": 0, "conflicts": len(conflicts), "kept": []}
+            failed = set()
+            try:
+                for rel_path in [path for path in self.deployed if path not in winners]:
+                    self._remove(rel_path, self.deployed.pop(rel_path), report)
+
+                created_dirs = set()
+                for rel_path, mod in winners.items():
+                    size, mtime_ns = self.index[mod][rel_path]
+                    record = self.deployed.get(rel_path)
+                    ours = record is not None and self._is_ours(rel_path, record)
+                    if ours and record["mod"] == mod and record["source"] == [size, mtime_ns]:
+                        report["unchanged"] += 1
+                        continue
+                    dst = self._game_path(rel_path)
+                    if record is not None and not ours and os.path.lexists(dst):
+                        # Файл изменили после раскладки (игра, обновление): не перезаписываем, как и в _remove
+                        report["kept"].append(rel_path)
+                        continue
+                    parent = os.path.dirname(dst)
+                    if parent not in created_dirs:
+                        os.makedirs(parent, exist_ok=True)
+                        created_dirs.add(parent)
+                    backup = bool(record and record.get("backup"))
+                    if record is None and os.path.exists(dst):
+                        # Файл самой игры: сохраняем, чтобы вернуть при выключении мода
+                        backup_path = os.path.join(self.backup_dir, *rel_path.split("/"))
+                        os.makedirs(os.path.dirname(backup_path), exist_ok=True)
+                        shutil.move(dst, backup_path)
+                        report["backed_up"] += 1
+                        backup = True
+                    self._place(os.path.join(self.root, mod, *rel_path.split("/")), dst, report, failed)
+                    st = os.stat(dst)
+                    self.deployed[rel_path] = {"mod": mod, "source": [size, mtime_ns], "size": st.st_size,
+                                               "mtime_ns": st.st_mtime_ns, "backup": backup}
+            finally:
+                # Сохраняется и при ошибке на середине: уже разложенные файлы учтены
+                if report["removed"] or report["unchanged"] != len(winners):
+                    os.makedirs(self.root, exist_ok=True)
+                    self._save_json(self.deployed_path, self.deployed)
+            span.update(files=len(winners), placed=report["hardlink"] + report["reflink"] + report["copy"],
+                        removed=report["removed"])
+        return report
+
+    def undeploy(self):
+        """Убирает из каталога игры все файлы модов и возвращает замененные файлы игры."""
+        report = {"removed": 0, "restored": 0, "kept": []}
+        try:
+            for rel_path in list(self.deployed):
+                self._remove(rel_path, self.deployed.pop(rel_path), report)
+        finally:
+            os.makedirs(self.root, exist_ok=True)
+            self._save_json(self.deployed_path, self.deployed)
+        return report
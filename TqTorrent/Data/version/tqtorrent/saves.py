@@ -0,0 +1,434 @@
+import os # Стандартная библиотека
+import json # Стандартная библиотека
+import lzma # Стандартная библиотека
+import mmap # Стандартная библиотека
+import time # Стандартная библиотека
+import zlib # Стандартная библиотека
+import queue # Стандартная библиотека
+import hashlib # Стандартная библиотека
+import datetime # Стандартная библиотека
+import threading # Стандартная библиотека
+from concurrent.futures import ThreadPoolExecutor # Стандартная библиотека
+
+import metrics
+from delta_update import chunk_boundaries, MAX_CHUNK
+
+# --- НАСТРОЙКИ СНИМКОВ СОХРАНЕНИЙ ---
+SAVES_SET = "saves" # Набор Localsaves_by_TqTorrent/saves; наборы каталогов игр - game-<id>
+CODEC = "zlib" # zlib (быстрее) или lzma (плотнее)
+ZLIB_LEVEL = 6
+LZMA_PRESET = 6
+KEEP_LAST = 10 # Последние снимки набора
+KEEP_DAILY = 7 # Последний снимок каждого из стольких дней
+KEEP_WEEKLY = 4 # Последний снимок каждой из стольких недель
+GC_GRACE = 3600 # Чанки моложе этого (сек) сборка мусора не трогает: их снимок еще пишется
+PROBE_BYTES = 4096 # Пробное сжатие начала чанка: несжимаемые данные не сжимаются целиком
+PROBE_RATIO = 0.9
+SNAPSHOT_WORKERS = 4 # Потоков на чтение, хеширование и сжатие файлов (zlib/lzma/sha256 отпускают GIL)
+# --------------------
+
+# Первый байт файла чанка - способ хранения
+_RAW, _ZLIB, _LZMA = b"-", b"z", b"x"
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def game_set(game_id):
+    return f"game-{game_id}"
+
+
+def _compress(data, codec):
+    if len(data) > PROBE_BYTES * 2 and len(zlib.compress(data[:PROBE_BYTES], 1)) > PROBE_BYTES * PROBE_RATIO:
+        return _RAW + data # Уже сжатые или зашифрованные сохранения
+    if codec == "lzma":
+        packed, header = lzma.compress(data, preset=LZMA_PRESET), _LZMA
+    else:
+        packed, header = zlib.compress(data, ZLIB_LEVEL), _ZLIB
+    # Несжимаемые данные (уже упакованные сохранения) хранятся как есть
+    return header + packed if len(packed) < len(data) else _RAW + data
+
+
+def _decompress(blob):
+    header, body = blob[:1], blob[1:]
+    if header == _ZLIB:
+        return zlib.decompress(body)
+    if header == _LZMA:
+        return lzma.decompress(body)
+    if header == _RAW:
+        return body
+    raise SnapshotError(f"Неизвестный формат чанка: {header!r}")
+
+
+def iter_files(root):
+    """(относительный путь через "/", stat) всех файлов каталога."""
+    stack = [""]
+    while stack:
+        rel_dir = stack.pop()
+        try:
+            entries = os.scandir(os.path.join(root, rel_dir))
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(rel_path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield rel_path, entry.stat()
+
+
+def select_retained(snapshots, keep_last=KEEP_LAST, keep_daily=KEEP_DAILY, keep_weekly=KEEP_WEEKLY):
+    """id снимков, которые оставляет политика хранения. snapshots - [(id, created)],
+    created - время time.time(). Для дня и недели остается самый новый их снимок."""
+    ordered = sorted(snapshots, key=lambda item: item[1], reverse=True)
+    keep = {snapshot_id for snapshot_id, _ in ordered[:keep_last]}
+    days = {}
+    weeks = {}
+    for snapshot_id, created in ordered:
+        moment = datetime.datetime.fromtimestamp(created)
+        day = moment.date()
+        week = moment.isocalendar()[:2]
+        if day not in days and len(days) < keep_daily:
+            days[day] = snapshot_id
+        if week not in weeks and len(weeks) < keep_weekly:
+            weeks[week] = snapshot_id
+    return keep | set(days.values()) | set(weeks.values())
+
+
+class SnapshotStore:
+    """Снимки каталогов сохранений с дедупликацией по содержимому.
+
+    Файлы режутся на чанки (delta_update.chunk_boundaries: правка в большом файле
+    меняет только соседние чанки), каждый чанк хранится один раз на все снимки и
+    наборы в chunks/<xx>/<sha256>, сжатым zlib или lzma. Снимок - JSON со списком
+    файлов и их чанков в sets/<набор>/<id>.json, поэтому один файл восстанавливается
+    чтением только его чанков. Файлы, чьи размер и mtime совпадают с последним
+    снимком набора, не перечитываются - их чанки берутся из него.
+    Снимки одного хранилища в процессе идут по очереди (lock); сборка мусора
+    в другом процессе не удаляет чанки моложе GC_GRACE.
+    """
+
+    def __init__(self, root, codec=CODEC, workers=SNAPSHOT_WORKERS):
+        if codec not in ("zlib", "lzma"):
+            raise ValueError(f"Неизвестный способ сжатия: {codec}")
+        self.root = root
+        self.codec = codec
+        self.workers = workers
+        self.chunks_dir = os.path.join(root, "chunks")
+        self.sets_dir = os.path.join(root, "sets")
+        self.lock = threading.Lock()
+        self.known_dirs = set() # Уже созданные chunks/<xx>: makedirs на каждый чанк - лишний системный вызов
+
+    # ----------------- ЧАНКИ -----------------
+
+    def chunk_path(self, digest):
+        return os.path.join(self.chunks_dir, digest[:2], digest)
+
+    def put_chunk(self, digest, data):
+        """Записывает чанк, если его еще нет. Возвращает записанный (сжатый) объем."""
+        path = self.chunk_path(digest)
+        try:
+            # Чанк уже есть: свежий mtime - как у записанного, чтобы сборка мусора в другом
+            # процессе не удалила его до того, как на него сошлется пишущийся снимок
+            os.utime(path)
+            return 0
+        except FileNotFoundError:
+            pass
+        blob = _compress(data, self.codec)
+        chunk_dir = os.path.dirname(path)
+        if chunk_dir not in self.known_dirs:
+            os.makedirs(chunk_dir, exist_ok=True)
+            self.known_dirs.add(chunk_dir)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(blob)
+        os.replace(tmp_path, path)
+        return len(blob)
+
+    def read_chunk(self, digest):
+        with open(self.chunk_path(digest), 'rb') as f:
+            data = _decompress(f.read())
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise SnapshotError(f"Чанк {digest} поврежден")
+        return data
+
+    def store_file(self, path):
+        """Режет файл на чанки и сохраняет новые. Возвращает ([sha256], записано байт)."""
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return [], 0
+            if size <= MAX_CHUNK:
+                data = f.read()
+                digest = hashlib.sha256(data).hexdigest()
+                return [digest], self.put_chunk(digest, data)
+            digests = []
+            written = 0
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                start = 0
+                for end in chunk_boundaries(mapped):
+                    data = mapped[start:end]
+                    digest = hashlib.sha256(data).hexdigest()
+                    written += self.put_chunk(digest, data)
+                    digests.append(digest)
+                    start = end
+            return digests, written
+
+    # ----------------- СНИМКИ -----------------
+
+    def set_dir(self, set_name):
+        return os.path.join(self.sets_dir, set_name)
+
+    def list_snapshots(self, set_name):
+        """[(id, created)] снимков набора, от старых к новым (id - время в имени файла)."""
+        try:
+            names = os.listdir(self.set_dir(set_name))
+        except FileNotFoundError:
+            return []
+        snapshots = []
+        for name in names:
+            if name.endswith(".json"):
+                snapshot_id = name[:-5]
+                snapshots.append((snapshot_id, self._created(snapshot_id)))
+        return sorted(snapshots, key=lambda item: item[0])
+
+    def list_sets(self):
+        try:
+            return sorted(os.listdir(self.sets_dir))
+        except FileNotFoundError:
+            return []
+
+    @staticmethod
+    def _created(snapshot_id):
+        return time.mktime(time.strptime(snapshot_id[:15], "%Y%m%d-%H%M%S"))
+
+    def load_snapshot(self, set_name, snapshot_id=None):
+        """Снимок набора (последний, если snapshot_id не задан) или None."""
+        if snapshot_id is None:
+            snapshots = self.list_snapshots(set_name)
+            if not snapshots:
+                return None
+            snapshot_id = snapshots[-1][0]
+        try:
+            with open(os.path.join(self.set_dir(set_name), snapshot_id + ".json"), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _new_snapshot_id(self, set_name):
+        base = time.strftime("%Y%m%d-%H%M%S")
+        snapshot_id, n = base, 1
+        while os.path.exists(os.path.join(self.set_dir(set_name), snapshot_id + ".json")):
+            n += 1
+            snapshot_id = f"{base}-{n}"
+        return snapshot_id
+
+    def snapshot(self, set_name, source_dir, reason=""):
+        """Снимок каталога source_dir в набор set_name. Если ни один файл не изменился
+        с прошлого снимка, новый не пишется. Возвращает отчет:
+        {"set", "id" (None - без изменений), "files", "changed", "bytes", "written", "errors"}."""
+        with self.lock, metrics.timer("saves.snapshot", set=set_name) as span:
+            previous = self.load_snapshot(set_name)
+            old_files = previous["files"] if previous else {}
+            files = {}
+            to_store = []
+            for rel_path, st in iter_files(source_dir):
+                old = old_files.get(rel_path)
+                if old is not None and old["size"] == st.st_size and old["mtime_ns"] == st.st_mtime_ns:
+                    files[rel_path] = old
+                else:
+                    to_store.append((rel_path, st))
+
+            report = {"set": set_name, "id": None, "files": 0, "changed": len(to_store), "bytes": 0,
+                      "written": 0, "errors": {}}
+
+            def store(item):
+                rel_path, st = item
+                try:
+                    return item, self.store_file(os.path.join(source_dir, *rel_path.split("/"))), None
+                except OSError as e:
+                    return item, None, str(e)
+
+            with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(to_store) or 1))) as pool:
+                for (rel_path, st), stored, error in pool.map(store, to_store):
+                    if error:
+                        # Файл занят или исчез: в снимке остается его прошлая версия
+                        report["errors"][rel_path] = error
+                        if rel_path in old_files:
+                            files[rel_path] = old_files[rel_path]
+                        continue
+                    digests, written = stored
+                    files[rel_path] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "chunks": digests}
+                    report["written"] += written
+
+            report["files"] = len(files)
+            report["bytes"] = sum(entry["size"] for entry in files.values())
+            if previous is not None and files == old_files:
+                report["changed"] = 0
+                span.update(files=report["files"], changed=0)
+                return report
+
+            snapshot_id = self._new_snapshot_id(set_name)
+            snapshot = {"set": set_name, "id": snapshot_id, "created": time.time(), "source": source_dir,
+                        "reason": reason, "codec": self.codec, "files": files}
+            os.makedirs(self.set_dir(set_name), exist_ok=True)
+            path = os.path.join(self.set_dir(set_name), snapshot_id + ".json")
+            with open(path + ".tmp", 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(path + ".tmp", path)
+            report["id"] = snapshot_id
+            span.update(files=report["files"], changed=report["changed"], written=report["written"])
+            return report
+
+    # ----------------- ВОССТАНОВЛЕНИЕ -----------------
+
+    def restore_file(self, set_name, snapshot_id, rel_path, dest):
+        """Восстанавливает один файл снимка в dest (читаются только его чанки); mtime - как в снимке."""
+        snapshot = self.load_snapshot(set_name, snapshot_id)
+        if snapshot is None:
+            raise SnapshotError(f"Нет снимка {set_name}/{snapshot_id}")
+        entry = snapshot["files"].get(rel_path)
+        if entry is None:
+            raise SnapshotError(f"В снимке {set_name}/{snapshot['id']} нет файла {rel_path}")
+        self._write_entry(entry, dest)
+        return entry["size"]
+
+    def restore(self, set_name, snapshot_id, dest_dir):
+        """Восстанавливает весь снимок в dest_dir (файлы, которых нет в снимке, не удаляются).
+        Возвращает число файлов."""
+        snapshot = self.load_snapshot(set_name, snapshot_id)
+        if snapshot is None:
+            raise SnapshotError(f"Нет снимка {set_name}/{snapshot_id}")
+        for rel_path, entry in snapshot["files"].items():
+            self._write_entry(entry, os.path.join(dest_dir, *rel_path.split("/")))
+        return len(snapshot["files"])
+
+    def _write_entry(self, entry, dest):
+        os.makedirs(os.path.dirname(os.path.abspath(dest)), exist_ok=True)
+        tmp_path = dest + ".tqrestore"
+        with open(tmp_path, 'wb') as f:
+            for digest in entry["chunks"]:
+                f.write(self.read_chunk(digest))
+        os.replace(tmp_path, dest)
+        os.utime(dest, ns=(entry["mtime_ns"], entry["mtime_ns"]))
+
+    # ----------------- ХРАНЕНИЕ И СБОРКА МУСОРА -----------------
+
+    def prune(self, keep_last=KEEP_LAST, keep_daily=KEEP_DAILY, keep_weekly=KEEP_WEEKLY):
+        """Удаляет снимки вне политики хранения во всех наборах, затем чанки, на которые
+        не ссылается ни один оставшийся снимок. Возвращает {"snapshots", "chunks", "bytes"}."""
+        with self.lock, metrics.timer("saves.prune") as span:
+            removed = 0
+            referenced = set()
+            for set_name in self.list_sets():
+                snapshots = self.list_snapshots(set_name)
+                keep = select_retained(snapshots, keep_last, keep_daily, keep_weekly)
+                for snapshot_id, _ in snapshots:
+                    if snapshot_id not in keep:
+                        os.remove(os.path.join(self.set_dir(set_name), snapshot_id + ".json"))
+                        removed += 1
+                        continue
+                    for entry in self.load_snapshot(set_name, snapshot_id)["files"].values():
+                        referenced.update(entry["chunks"])
+
+            chunks = freed = 0
+            now = time.time()
+            for prefix in (os.listdir(self.chunks_dir) if os.path.isdir(self.chunks_dir) else []):
+                with os.scandir(os.path.join(self.chunks_dir, prefix)) as entries:
+                    for entry in entries:
+                        if entry.name in referenced:
+                            continue
+                        st = entry.stat()
+                        if now - st.st_mtime < GC_GRACE:
+                            continue
+                        os.remove(entry.path)
+                        chunks += 1
+                        freed += st.st_size
+            span.update(snapshots=removed, chunks=chunks)
+            return {"snapshots": removed, "chunks": chunks, "bytes": freed}
+
+    def usage(self):
+        """Объем хранилища: {"chunks", "bytes"} (сжатые чанки без учета JSON снимков)."""
+        chunks = size = 0
+        for prefix in (os.listdir(self.chunks_dir) if os.path.isdir(self.chunks_dir) else []):
+            with os.scandir(os.path.join(self.chunks_dir, prefix)) as entries:
+                for entry in entries:
+                    chunks += 1
+                    size += entry.stat().st_size
+        return {"chunks": chunks, "bytes": size}
+
+
+def load_save_dirs(path):
+    """{game_id: [каталоги сохранений]} из save_dirs.json ({"<id>": ["путь", ...]})."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            raw = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"ОШИБКА чтения {path}: {e}")
+        return {}
+    return {int(game_id): [os.path.expandvars(os.path.expanduser(p)) for p in dirs] for game_id, dirs in raw.items()}
+
+
+def snapshot_sets(paths, game_id=None):
+    """[(набор, каталог)] для снимка: общий каталог saves и каталоги игры из save_dirs.json
+    (каталоги всех игр, если game_id не задан). Несуществующие каталоги пропускаются."""
+    sets = [(SAVES_SET, paths.saves)]
+    for save_game_id, dirs in sorted(load_save_dirs(paths.save_dirs).items()):
+        if game_id is not None and save_game_id != game_id:
+            continue
+        for n, save_dir in enumerate(dirs):
+            sets.append((game_set(save_game_id) + (f"-{n}" if n else ""), save_dir))
+    return [(set_name, source) for set_name, source in sets if os.path.isdir(source)]
+
+
+def snapshot_saves(store, paths, game_id=None, reason=""):
+    """Снимки всех наборов snapshot_sets. Возвращает список отчетов SnapshotStore.snapshot."""
+    return [store.snapshot(set_name, source, reason) for set_name, source in snapshot_sets(paths, game_id)]
+
+
+class SaveBackup:
+    """Фоновые снимки сохранений после выхода из игры.
+
+    request(game_id) ставит снимок в очередь и сразу возвращается; один поток
+    выполняет снимки по очереди (повторные запросы одной игры, пришедшие пока
+    снимок ждет, схлопываются), после снимка применяется политика хранения.
+    on_done(game_id, reports) вызывается из фонового потока.
+    """
+
+    def __init__(self, paths, on_done=None, codec=CODEC):
+        self.paths = paths
+        self.store = SnapshotStore(paths.save_store, codec)
+        self.on_done = on_done
+        self.queue = queue.Queue()
+        self.pending = set()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def request(self, game_id, reason="exit"):
+        with self.lock:
+            if game_id in self.pending:
+                return
+            self.pending.add(game_id)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="save-backup", daemon=True)
+                self.thread.start()
+        self.queue.put((game_id, reason))
+
+    def _run(self):
+        while True:
+            game_id, reason = self.queue.get()
+            with self.lock:
+                self.pending.discard(game_id)
+            try:
+                reports = snapshot_saves(self.store, self.paths, game_id, reason)
+                if any(report["id"] for report in reports):
+                    self.store.prune()
+            except Exception as e:
+                print(f"ОШИБКА снимка сохранений игры {game_id}: {e}")
+                reports = None
+            if self.on_done is not None:
+                self.on_done(game_id, reports)
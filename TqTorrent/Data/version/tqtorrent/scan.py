@@ -0,0 +1,38 @@
+import metrics
+from process_scan import ProcessSnapshot
+from .steam import SteamLibraryScanner, detect_installed
+
+
+def scan_running(store, snapshot=None, data=None):
+    """Сверяет снимок процессов с установленными играми и записывает running_game_ids.
+    Возвращает (running_ids, добавленные, удаленные)."""
+    data = data or store.load_config_data()
+    installed_ids = set(data["CNF_DATA"].get("installed_game_ids", []))
+    with metrics.timer("scan.running") as span:
+        if snapshot is None:
+            snapshot = ProcessSnapshot.take()
+        running_ids = snapshot.running_game_ids(data["GAME_DATA"], installed_ids)
+        span["running"] = len(running_ids)
+    added, removed = store.set_running_ids(running_ids)
+    return running_ids, added, removed
+
+
+def scan_installed(store, apply=False, data=None, steam_roots=None, merge=False):
+    """Ищет установленные игры: приложения из библиотек Steam (appmanifest, по steam_app_id
+    или каталогу steamapps/common) и игры, у которых файл из starting(...) есть на диске.
+
+    Возвращает {"found": найденные id, "steam": {id: appid}, "missing": отмеченные установленными,
+    но не найденные, "unmarked": найденные, но не отмеченные}. apply=True записывает found
+    в installed_game_ids; с merge=True только добавляет найденные (ручные отметки сохраняются).
+    """
+    data = data or store.load_config_data()
+    installed_ids = set(data["CNF_DATA"].get("installed_game_ids", []))
+    with metrics.timer("scan.installed") as span:
+        scanner = SteamLibraryScanner(store.paths.steam_cache)
+        detected = detect_installed(data["GAME_DATA"], scanner, steam_roots)
+        found = detected["found"]
+        span.update(found=len(found), steam=len(detected["steam"]))
+    if apply:
+        store.set_installed_ids(found | installed_ids if merge else found)
+    return {"found": found, "steam": detected["steam"], "missing": installed_ids - found,
+            "unmarked": found - installed_ids, "libraries": detected["libraries"]}
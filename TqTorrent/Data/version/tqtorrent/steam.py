@@ -0,0 +1,340 @@
+import os # Стандартная библиотека
+import re # Стандартная библиотека
+import sys # Стандартная библиотека
+import pickle # Стандартная библиотека
+import time # Стандартная библиотека
+from concurrent.futures import ThreadPoolExecutor # Стандартная библиотека
+
+import metrics
+from .launcher import clean_launch_path
+
+# --- НАСТРОЙКИ STEAM ---
+# Каталоги Steam по умолчанию; TQ_STEAM_PATH (через os.pathsep) задает свои, например набор для проверок
+STEAM_ROOTS_WINDOWS = [r"C:\Program Files (x86)\Steam", r"C:\Program Files\Steam"]
+STEAM_ROOTS_POSIX = ["~/.steam/steam", "~/.local/share/Steam"]
+SCAN_WORKERS = 8 # Потоков на обход библиотек и проверку путей запуска
+STAT_BATCH = 256 # Путей запуска на одну задачу пула (накладные расходы пула на путь)
+CACHE_VERSION = 1
+# --------------------
+
+# StateFlags из appmanifest: бит 4 - игра полностью установлена
+STATE_FULLY_INSTALLED = 4
+
+# Токены VDF: "строка" | скобка | комментарий | условие [$WIN32] | слово без кавычек
+_VDF_TOKEN_RE = re.compile(r'"((?:[^"\\]|\\.)*)"|([{}])|//[^\n]*|\[[!$][^\]]*\]|([^\s{}"]+)')
+_VDF_ESCAPE_RE = re.compile(r'\\(.)')
+_VDF_ESCAPES = {"n": "\n", "t": "\t"}
+_STEAM_URL_RE = re.compile(r'steam://(?:rungameid|run|launch)/(\d+)', re.IGNORECASE)
+_MANIFEST_RE = re.compile(r'appmanifest_(\d+)\.acf$', re.IGNORECASE)
+
+
+def parse_vdf(text):
+    """Разбирает текстовый VDF (KeyValues) Steam в словари за один проход регулярным выражением.
+    Ключи приводятся к нижнему регистру (Steam сравнивает их без учета регистра)."""
+    root = {}
+    stack = [root]
+    key = None
+    for match in _VDF_TOKEN_RE.finditer(text):
+        quoted, brace, bare = match.groups()
+        if brace == "{":
+            if key is None:
+                raise ValueError(f"VDF: блок без ключа (позиция {match.start()})")
+            block = {}
+            stack[-1][key] = block
+            stack.append(block)
+            key = None
+        elif brace == "}":
+            if len(stack) > 1:
+                stack.pop()
+            key = None
+        else:
+            token = quoted if quoted is not None else bare
+            if token is None:
+                continue # комментарий или условие платформы
+            if quoted is not None and "\\" in token:
+                token = _VDF_ESCAPE_RE.sub(lambda m: _VDF_ESCAPES.get(m.group(1), m.group(1)), token)
+            if key is None:
+                key = token.lower()
+            else:
+                stack[-1][key] = token
+                key = None
+    return root
+
+
+def read_vdf(path):
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        return parse_vdf(f.read())
+
+
+def default_steam_roots():
+    """Каталоги установки Steam: TQ_STEAM_PATH, путь из реестра (Windows) и стандартные пути."""
+    if os.environ.get("TQ_STEAM_PATH"):
+        return [path for path in os.environ["TQ_STEAM_PATH"].split(os.pathsep) if path]
+    roots = []
+    if sys.platform == "win32":
+        try:
+            import winreg # Стандартная библиотека (только Windows)
+            with winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Software\Valve\Steam") as key:
+                roots.append(os.path.normpath(winreg.QueryValueEx(key, "SteamPath")[0]))
+        except OSError:
+            pass
+        roots += STEAM_ROOTS_WINDOWS
+    else:
+        roots += [os.path.expanduser(path) for path in STEAM_ROOTS_POSIX]
+    return [root for root in roots if os.path.isdir(root)]
+
+
+def library_folders(steam_root):
+    """Корни библиотек из steamapps/libraryfolders.vdf (новый формат с "path" и старый "1" "D:\\..."),
+    включая сам каталог Steam."""
+    roots = [steam_root]
+    for path in (os.path.join(steam_root, "steamapps", "libraryfolders.vdf"),
+                 os.path.join(steam_root, "config", "libraryfolders.vdf")):
+        try:
+            folders = read_vdf(path).get("libraryfolders", {})
+        except OSError:
+            continue
+        for key, value in folders.items():
+            if not key.isdigit():
+                continue # contentstatsid и другие служебные поля
+            library = value.get("path") if isinstance(value, dict) else value
+            if library:
+                roots.append(library)
+        break
+    return roots
+
+
+def read_manifest(path):
+    """appmanifest_<appid>.acf -> {"appid", "name", "installdir", "state_flags", "size_on_disk"}."""
+    state = read_vdf(path).get("appstate", {})
+    try:
+        state_flags = int(state.get("stateflags", 0))
+    except ValueError:
+        state_flags = 0
+    try:
+        size_on_disk = int(state.get("sizeondisk", 0))
+    except ValueError:
+        size_on_disk = 0
+    appid = state.get("appid") or _MANIFEST_RE.search(os.path.basename(path)).group(1)
+    return {
+        "appid": appid,
+        "name": state.get("name", ""),
+        "installdir": state.get("installdir", ""),
+        "state_flags": state_flags,
+        "size_on_disk": size_on_disk
+    }
+
+
+class SteamLibraryScanner:
+    """Поиск установленных игр Steam по всем библиотекам.
+
+    Библиотеки обходятся параллельно в пуле потоков. Для каждого каталога
+    steamapps кэшируется mtime: если он не изменился (manifest не добавлялся,
+    не удалялся и не перезаписывался через временный файл), каталог не читается,
+    а проверяется только stat известных manifest - правка файла на месте mtime
+    каталога не меняет. Заново читаются только manifest с другим размером или
+    mtime; библиотека без таких берется из кэша целиком. Кэш хранится в pickle
+    (ConfigPaths.steam_cache, как снимок catalog_cache) и переживает перезапуск.
+    """
+
+    def __init__(self, cache_path=None, workers=SCAN_WORKERS):
+        self.cache_path = cache_path
+        self.workers = workers
+        self.libraries = {} # steamapps -> {"mtime_ns", "manifests": {имя: {"stat", "app"}}}
+        self.dirty = False
+        self.load_cache()
+
+    def load_cache(self):
+        if not self.cache_path:
+            return
+        try:
+            with open(self.cache_path, 'rb') as f:
+                cache = pickle.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"ОШИБКА чтения кэша библиотек Steam: {e}")
+            return
+        if isinstance(cache, dict) and cache.get("version") == CACHE_VERSION:
+            self.libraries = cache.get("libraries", {})
+
+    def save_cache(self):
+        if not self.cache_path or not self.dirty:
+            return
+        tmp_path = self.cache_path + ".tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({"version": CACHE_VERSION, "libraries": self.libraries}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.cache_path)
+            self.dirty = False
+        except OSError as e:
+            print(f"ОШИБКА записи кэша библиотек Steam: {e}")
+
+    def scan_library(self, library):
+        """(steamapps, запись кэша или None, библиотека прочитана заново)."""
+        steamapps = os.path.join(library, "steamapps")
+        try:
+            mtime_ns = os.stat(steamapps).st_mtime_ns
+        except OSError:
+            return steamapps, None, False
+        cached = self.libraries.get(steamapps)
+        old_manifests = cached["manifests"] if cached else {}
+        changed = cached is None or cached["mtime_ns"] != mtime_ns
+        if not changed:
+            # Набор файлов прежний, но Steam правит manifest и на месте (StateFlags, SizeOnDisk),
+            # а это mtime каталога не меняет: stat известных manifest без чтения каталога
+            candidates = [(name, os.path.join(steamapps, name), None) for name in old_manifests]
+        else:
+            with os.scandir(steamapps) as entries:
+                candidates = [(entry.name, entry.path, entry) for entry in entries if _MANIFEST_RE.match(entry.name)]
+
+        manifests = {}
+        for name, path, entry in candidates:
+            try:
+                st = entry.stat() if entry is not None else os.stat(path)
+            except OSError:
+                changed = True
+                continue
+            stat = (st.st_size, st.st_mtime_ns)
+            old = old_manifests.get(name)
+            if old is not None and old["stat"] == stat:
+                manifests[name] = old
+                continue
+            changed = True
+            try:
+                app = read_manifest(path)
+            except (OSError, ValueError) as e:
+                print(f"ОШИБКА чтения {path}: {e}")
+                continue
+            app["path"] = os.path.join(steamapps, "common", app["installdir"]) if app["installdir"] else ""
+            manifests[name] = {"stat": stat, "app": app}
+        if not changed:
+            return steamapps, cached, False
+        return steamapps, {"mtime_ns": mtime_ns, "manifests": manifests}, True
+
+    def scan(self, steam_roots=None):
+        """Возвращает {"apps": {appid: app}, "libraries": [...], "rescanned": [...]}.
+        В apps попадают только полностью установленные игры (StateFlags & 4)."""
+        with metrics.timer("steam.scan") as span:
+            roots = default_steam_roots() if steam_roots is None else steam_roots
+            libraries = []
+            seen = set()
+            for root in roots:
+                for library in library_folders(root):
+                    key = os.path.normcase(os.path.normpath(library))
+                    if key not in seen:
+                        seen.add(key)
+                        libraries.append(library)
+
+            apps = {}
+            rescanned = []
+            current = {os.path.join(library, "steamapps") for library in libraries}
+            for steamapps in [path for path in self.libraries if path not in current]:
+                del self.libraries[steamapps] # Библиотека убрана из libraryfolders.vdf
+                self.dirty = True
+            with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(libraries)))) as pool:
+                for steamapps, entry, changed in pool.map(self.scan_library, libraries):
+                    if entry is None:
+                        if self.libraries.pop(steamapps, None) is not None:
+                            self.dirty = True
+                        continue
+                    if changed:
+                        self.libraries[steamapps] = entry
+                        rescanned.append(steamapps)
+                        self.dirty = True
+                    for manifest in entry["manifests"].values():
+                        app = manifest["app"]
+                        if app["state_flags"] & STATE_FULLY_INSTALLED:
+                            apps[app["appid"]] = app
+            self.save_cache()
+            span.update(libraries=len(libraries), rescanned=len(rescanned), apps=len(apps))
+        return {"apps": apps, "libraries": libraries, "rescanned": rescanned}
+
+
+def steam_app_id(game):
+    """steam_app_id игры (config_gm.json / catalog.db) или appid из ссылки steam://rungameid/N."""
+    if game.get("steam_app_id"):
+        return str(game["steam_app_id"])
+    match = _STEAM_URL_RE.search(game.get("launch_path") or "")
+    return match.group(1) if match else None
+
+
+def _install_dir_key(path):
+    """'C:\\...\\steamapps\\common\\Dota 2\\game\\dota2.exe' -> 'dota 2' (регистр и разделители не важны)."""
+    parts = path.replace("\\", "/").lower().split("/")
+    for i in range(len(parts) - 2):
+        if parts[i] == "steamapps" and parts[i + 1] == "common":
+            return parts[i + 2]
+    return None
+
+
+def match_steam_games(games, apps):
+    """Сопоставляет игры каталога установленным приложениям Steam: по steam_app_id
+    (или steam://), иначе по каталогу steamapps/common/<installdir> в пути запуска.
+    Возвращает {game_id: appid}."""
+    by_install_dir = {app["installdir"].lower(): appid for appid, app in apps.items() if app["installdir"]}
+    matched = {}
+    for game in games:
+        appid = steam_app_id(game)
+        if appid is not None:
+            if appid in apps:
+                matched[game["id"]] = appid
+            continue
+        install_dir = _install_dir_key(clean_launch_path(game.get("launch_path")))
+        if install_dir is not None and install_dir in by_install_dir:
+            matched[game["id"]] = by_install_dir[install_dir]
+    return matched
+
+
+def _existing_files(batch):
+    found = []
+    for game_id, path in batch:
+        try:
+            if os.path.isfile(path):
+                found.append(game_id)
+        except OSError:
+            pass
+    return found
+
+
+def stat_launch_paths(games, workers=SCAN_WORKERS):
+    """id игр, у которых файл из starting(...) (exe или .url) есть на диске.
+    Пути проверяются пачками по STAT_BATCH в пуле потоков (медленные и сетевые диски)."""
+    with metrics.timer("steam.stat_paths") as span:
+        items = []
+        for game in games:
+            path = clean_launch_path(game.get("launch_path"))
+            if path and "://" not in path:
+                items.append((game["id"], path))
+        batches = [items[i:i + STAT_BATCH] for i in range(0, len(items), STAT_BATCH)]
+        found = set()
+        if len(batches) <= 1:
+            for batch in batches:
+                found.update(_existing_files(batch))
+        else:
+            with ThreadPoolExecutor(max_workers=min(workers, len(batches))) as pool:
+                for ids in pool.map(_existing_files, batches):
+                    found.update(ids)
+        span.update(paths=len(items), found=len(found))
+    return found
+
+
+def detect_installed(games, scanner=None, steam_roots=None, workers=SCAN_WORKERS):
+    """Установленные игры каталога: по библиотекам Steam и по файлам путей запуска.
+    Возвращает {"found": ids, "steam": {id: appid}, "files": ids, "libraries": [...], "rescanned": [...]}."""
+    start = time.perf_counter()
+    scanner = scanner or SteamLibraryScanner(workers=workers)
+    # Библиотеки Steam и пути запуска проверяются одновременно
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        steam_future = pool.submit(scanner.scan, steam_roots)
+        files = stat_launch_paths(games, workers)
+        steam = steam_future.result()
+    matched = match_steam_games(games, steam["apps"])
+    return {
+        "found": files | set(matched),
+        "steam": matched,
+        "files": files,
+        "libraries": steam["libraries"],
+        "rescanned": steam["rescanned"],
+        "elapsed_ms": (time.perf_counter() - start) * 1000
+    }
@@ -0,0 +1,359 @@
+import os # Стандартная библиотека
+import re # Стандартная библиотека
+import stat # Стандартная библиотека
+import pickle # Стандартная библиотека
+import threading # Стандартная библиотека
+from urllib.parse import urlsplit # Стандартная библиотека
+from urllib.request import url2pathname # Стандартная библиотека
+from concurrent.futures import ThreadPoolExecutor # Стандартная библиотека
+
+import metrics
+from .launcher import clean_launch_path
+from .steam import SteamLibraryScanner, SCAN_WORKERS, STAT_BATCH, _STEAM_URL_RE
+
+# --- НАСТРОЙКИ ПУТЕЙ ЗАПУСКА ---
+EXE_SEARCH_DEPTH = 4 # Уровней каталога игры Steam, где ищется exe (Dota 2: game\bin\win64\dota2.exe)
+EXE_SUFFIXES = (".exe",)
+# Вспомогательные программы в каталогах игр Steam, которые не запускают саму игру
+HELPER_PREFIXES = ("unins", "setup", "vcredist", "dxsetup", "dxwebsetup", "crashhandler", "crashreport",
+                   "ue4prereq", "ueprereq", "steamerrorreporter", "redist")
+CACHE_VERSION = 1
+# --------------------
+
+# Итог проверки цели запуска
+OK = "ok"
+EMPTY = "empty"
+MISSING = "missing"
+BAD_SHORTCUT = "bad_shortcut"
+NOT_INSTALLED = "not_installed"
+NO_EXECUTABLE = "no_executable"
+
+MESSAGES = {
+    OK: "",
+    EMPTY: "пустой путь запуска",
+    MISSING: "файл не найден",
+    BAD_SHORTCUT: "ярлык .url без ссылки на игру",
+    NOT_INSTALLED: "игра не установлена в библиотеках Steam",
+    NO_EXECUTABLE: "в каталоге игры Steam нет исполняемого файла"
+}
+
+_STARTING_RE = re.compile(r'^starting\((.*)\)$', re.IGNORECASE | re.DOTALL)
+
+
+def normalize_launch_path(launch_path):
+    """Путь из starting(...) к одному виду: без обертки starting("..."), кавычек и %ПЕРЕМЕННЫХ%.
+    Ссылки (steam://, file://) возвращаются как есть."""
+    path = clean_launch_path(launch_path)
+    match = _STARTING_RE.match(path)
+    if match:
+        path = clean_launch_path(match.group(1))
+    if not path or "://" in path:
+        return path
+    return os.path.normpath(os.path.expandvars(path))
+
+
+def parse_url_file(path):
+    """URL= из секции [InternetShortcut] ярлыка .url (None - ссылки нет)."""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    try:
+        text = raw.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        text = raw.decode('cp1251', errors='replace') # Ярлыки, сохраненные старым Проводником
+    section = None
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("[") and line.endswith("]"):
+            section = line[1:-1].strip().lower()
+        elif section == "internetshortcut" and line.lower().startswith("url="):
+            return line[4:].strip() or None
+    return None
+
+
+def _is_helper(name):
+    return name.lower().startswith(HELPER_PREFIXES)
+
+
+def find_executable(install_dir, process_name=None, depth=EXE_SEARCH_DEPTH):
+    """Исполняемый файл игры в каталоге Steam. Каталоги обходятся по уровням: файл
+    с именем process_name (dowanloadin) берется сразу, иначе - самый большой exe
+    на верхнем уровне, где есть exe кроме установщиков и отчетов о сбоях."""
+    wanted = (process_name or "").lower()
+    level = [install_dir]
+    for _ in range(depth):
+        candidates = []
+        next_level = []
+        for directory in level:
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        next_level.append(entry.path)
+                        continue
+                except OSError:
+                    continue
+                name = entry.name.lower()
+                if name == wanted:
+                    return entry.path
+                if name.endswith(EXE_SUFFIXES) and not _is_helper(name):
+                    candidates.append(entry)
+        if candidates and not wanted:
+            return max(candidates, key=_entry_size).path
+        if candidates and not next_level:
+            break
+        level = next_level
+        if not level:
+            break
+    # process_name не нашелся - самый большой exe на верхнем уровне с exe
+    if wanted:
+        return find_executable(install_dir, None, depth)
+    return None
+
+
+def _entry_size(entry):
+    try:
+        return entry.stat().st_size
+    except OSError:
+        return 0
+
+
+def _stat(path):
+    try:
+        return os.stat(path)
+    except (OSError, ValueError):
+        return None
+
+
+def _mtime(path):
+    st = _stat(path)
+    return st.st_mtime_ns if st is not None else None
+
+
+def _target(status, kind, exe=None, appid=None, url=None, stamps=()):
+    """Итог проверки. stamps - [(путь, mtime_ns или None, если пути нет)]: пока все
+    они на диске не изменились, итог берется из кэша без разбора .url и поиска exe."""
+    return {"status": status, "kind": kind, "exe": exe, "appid": appid, "url": url, "stamps": list(stamps)}
+
+
+def is_ok(target):
+    return target["status"] == OK
+
+
+def describe(target):
+    """Текст для окна и CLI: 'файл не найден: C:\\Games\\...\\game.exe'."""
+    message = MESSAGES[target["status"]]
+    detail = target["exe"] or target["url"]
+    if target["status"] == NOT_INSTALLED and target["appid"]:
+        detail = f"appid {target['appid']}"
+    return f"{message}: {detail}" if detail and target["status"] != OK else message
+
+
+class LaunchResolver:
+    """Проверка и разрешение путей запуска всего каталога.
+
+    Цели бывают четырех видов: путь к exe, тот же путь в кавычках или starting("..."),
+    steam://rungameid/N и ярлык .url (внутри - steam:// или file://). Ярлыки
+    разбираются, steam:// сопоставляется установленной игре из библиотек Steam
+    (SteamLibraryScanner) и ее exe, итоговый файл проверяется stat. Итог хранится
+    в кэше по пути запуска вместе с mtime всех файлов и каталогов, от которых он
+    зависит (см. _target); повторная проверка - это только stat этих путей.
+    Кэш хранится в pickle (ConfigPaths.launch_cache, как кэш библиотек Steam).
+    Один экземпляр используют GUI-поток (запуск), поток проверки каталога и поток
+    подсчета места: targets и _steam читаются и меняются только под self.lock.
+    """
+
+    def __init__(self, cache_path=None, scanner=None, steam_roots=None, workers=SCAN_WORKERS):
+        self.cache_path = cache_path
+        self.scanner = scanner
+        self.steam_roots = steam_roots
+        self.workers = workers
+        self.targets = {} # (путь запуска, process_name) -> итог проверки
+        self.dirty = False
+        self.lock = threading.Lock() # targets, dirty и _steam
+        self.scan_lock = threading.Lock() # Одно сканирование Steam на все потоки; GUI-поток его не ждет
+        self.save_lock = threading.Lock() # Один писатель файла кэша
+        self._steam = None # (apps, {steamapps: mtime_ns}) на время одной проверки
+        self.load_cache()
+
+    def load_cache(self):
+        if not self.cache_path:
+            return
+        try:
+            with open(self.cache_path, 'rb') as f:
+                cache = pickle.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"ОШИБКА чтения кэша путей запуска: {e}")
+            return
+        if isinstance(cache, dict) and cache.get("version") == CACHE_VERSION:
+            with self.lock:
+                self.targets = cache.get("targets", {})
+
+    def save_cache(self):
+        if not self.cache_path:
+            return
+        tmp_path = self.cache_path + ".tmp"
+        with self.save_lock:
+            # pickle - копии: другой поток может добавлять записи, пока файл пишется
+            with self.lock:
+                if not self.dirty:
+                    return
+                targets = dict(self.targets)
+                self.dirty = False
+            try:
+                with open(tmp_path, 'wb') as f:
+                    pickle.dump({"version": CACHE_VERSION, "targets": targets}, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, self.cache_path)
+            except OSError as e:
+                print(f"ОШИБКА записи кэша путей запуска: {e}")
+                with self.lock:
+                    self.dirty = True
+
+    # ----------------- РАЗРЕШЕНИЕ -----------------
+
+    def steam_state(self):
+        """Установленные игры Steam и mtime каталогов steamapps (сканируются один раз за проверку)."""
+        with self.scan_lock:
+            with self.lock:
+                steam = self._steam
+            if steam is None:
+                if self.scanner is None:
+                    self.scanner = SteamLibraryScanner(workers=self.workers)
+                apps = self.scanner.scan(self.steam_roots)["apps"]
+                libraries = {steamapps: entry["mtime_ns"] for steamapps, entry in self.scanner.libraries.items()}
+                steam = (apps, libraries)
+                with self.lock:
+                    self._steam = steam
+            return steam
+
+    def resolve_steam(self, appid, process_name, kind, url, stamps):
+        apps, libraries = self.steam_state()
+        app = apps.get(appid)
+        if app is None or not app["path"]:
+            # Установка игры добавляет appmanifest - меняется mtime steamapps
+            return _target(NOT_INSTALLED, kind, appid=appid, url=url, stamps=stamps + list(libraries.items()))
+        install_dir = app["path"]
+        stamps = stamps + [(install_dir, _mtime(install_dir))]
+        exe = find_executable(install_dir, process_name)
+        if exe is None:
+            return _target(NO_EXECUTABLE, kind, appid=appid, url=url, stamps=stamps)
+        return _target(OK, kind, exe=exe, appid=appid, url=url, stamps=stamps + [(exe, _mtime(exe))])
+
+    def resolve_url(self, url, process_name, kind, stamps):
+        match = _STEAM_URL_RE.match(url or "")
+        if match:
+            return self.resolve_steam(match.group(1), process_name, kind, url, stamps)
+        if url and url.lower().startswith("file:"):
+            path = url2pathname(urlsplit(url).path)
+            st = _stat(path)
+            if st is None or not stat.S_ISREG(st.st_mode):
+                return _target(MISSING, kind, exe=path, url=url, stamps=stamps + [(path, None)])
+            return _target(OK, kind, exe=path, url=url, stamps=stamps + [(path, st.st_mtime_ns)])
+        return _target(BAD_SHORTCUT, kind, url=url, stamps=stamps)
+
+    def resolve(self, launch_path, process_name=None):
+        """Разбирает цель запуска заново (без кэша)."""
+        path = normalize_launch_path(launch_path)
+        if not path:
+            return _target(EMPTY, "file")
+        if "://" in path:
+            return self.resolve_url(path, process_name, "steam", [])
+        st = _stat(path)
+        if st is None or not stat.S_ISREG(st.st_mode):
+            return _target(MISSING, "file", exe=path, stamps=[(path, None)])
+        stamps = [(path, st.st_mtime_ns)]
+        if path.lower().endswith(".url"):
+            try:
+                url = parse_url_file(path)
+            except OSError:
+                url = None
+            return self.resolve_url(url, process_name, "shortcut", stamps)
+        return _target(OK, "file", exe=path, stamps=stamps)
+
+    def cached(self, launch_path, process_name=None):
+        """Итог из кэша, если ни один путь из его stamps не менялся, иначе None."""
+        with self.lock:
+            target = self.targets.get((launch_path or "", process_name or ""))
+        if target is None:
+            return None
+        for path, mtime_ns in target["stamps"]:
+            if _mtime(path) != mtime_ns:
+                return None
+        return target
+
+    def target(self, launch_path, process_name=None):
+        """Итог проверки одной цели: из кэша или разобранный заново (и записанный в кэш)."""
+        target = self.cached(launch_path, process_name)
+        if target is None:
+            with self.lock:
+                self._steam = None # Игру могли установить после общей проверки
+            target = self.resolve(launch_path, process_name)
+            with self.lock:
+                self.targets[(launch_path or "", process_name or "")] = target
+                self.dirty = True
+        return target
+
+    def launch_target(self, launch_path, process_name=None):
+        """Исполняемый файл для запуска. ValueError с описанием, если цель недоступна."""
+        target = self.target(launch_path, process_name)
+        self.save_cache()
+        if not is_ok(target):
+            raise ValueError(describe(target))
+        return target["exe"]
+
+    def _check_batch(self, batch):
+        checked = []
+        for game_id, key in batch:
+            target = self.cached(*key)
+            fresh = target is None
+            if fresh:
+                target = self.resolve(*key)
+            checked.append((game_id, key, target, fresh))
+        return checked
+
+    def resolve_all(self, games, prune=True):
+        """Проверяет пути запуска игр пачками по STAT_BATCH в пуле потоков.
+        Возвращает {game_id: итог}; кэш сохраняется. prune - games это весь каталог:
+        записи вне него удаляются; при проверке части каталога (дельта) итоги
+        добавляются к кэшу, остальные записи не трогаются."""
+        with metrics.timer("launch.resolve") as span:
+            with self.lock:
+                self._steam = None # Библиотеки Steam могли измениться с прошлой проверки
+            items = [(game["id"], (game.get("launch_path") or "", game.get("process_name") or "")) for game in games]
+            batches = [items[i:i + STAT_BATCH] for i in range(0, len(items), STAT_BATCH)]
+            if len(batches) <= 1:
+                checked = [self._check_batch(batch) for batch in batches]
+            else:
+                with ThreadPoolExecutor(max_workers=min(self.workers, len(batches))) as pool:
+                    checked = list(pool.map(self._check_batch, batches))
+
+            results = {}
+            targets = {}
+            fresh_count = 0
+            for batch in checked:
+                for game_id, key, target, fresh in batch:
+                    results[game_id] = target
+                    targets[key] = target
+                    fresh_count += fresh
+            with self.lock:
+                if not prune:
+                    if fresh_count or not targets.keys() <= self.targets.keys():
+                        self.targets = {**self.targets, **targets}
+                        self.dirty = True
+                elif fresh_count or len(targets) != len(self.targets):
+                    self.targets = targets
+                    self.dirty = True
+            self.save_cache()
+            broken = sum(1 for target in results.values() if not is_ok(target))
+            span.update(games=len(results), resolved=fresh_count, broken=broken)
+        return results
+
+
+def broken_targets(results):
+    """{game_id: {"status", "message"}} недоступных целей - для окна и CLI."""
+    return {game_id: {"status": target["status"], "message": describe(target)}
+            for game_id, target in results.items() if not is_ok(target)}
@@ -0,0 +1,253 @@
+import os # Стандартная библиотека
+import time # Стандартная библиотека
+import pickle # Стандартная библиотека
+import threading # Стандартная библиотека
+from concurrent.futures import ThreadPoolExecutor # Стандартная библиотека
+
+import metrics
+from .targets import normalize_launch_path
+
+# --- НАСТРОЙКИ ЗАНЯТОГО МЕСТА ---
+SIZE_WORKERS = 8 # Потоков на обход каталогов игр (медленные и сетевые диски)
+DIR_BATCH = 64 # Каталогов на одну задачу пула
+# Подкаталоги с exe внутри каталога игры: каталог игры - выше них (Dota 2\game\bin\win64\dota2.exe)
+BINARY_DIRS = {"bin", "bin32", "bin64", "binaries", "win32", "win64", "win_x64", "win_x86", "x86", "x64", "x86_64",
+               "game", "retail", "system"}
+CACHE_VERSION = 1
+# --------------------
+
+
+def game_directory(exe_path):
+    """Каталог игры по пути запуска: steamapps/common/<installdir> для игр Steam, иначе каталог
+    exe без подкаталогов вроде bin\\win64. Корень диска не считается каталогом игры (None)."""
+    path = os.path.normpath(exe_path)
+    parts = path.split(os.sep)
+    for i in range(len(parts) - 3):
+        if parts[i].lower() == "steamapps" and parts[i + 1].lower() == "common":
+            return os.sep.join(parts[:i + 3])
+    directory = os.path.dirname(path)
+    while os.path.basename(directory).lower() in BINARY_DIRS:
+        parent = os.path.dirname(directory)
+        if os.path.dirname(parent) == parent:
+            break # Выше - корень диска
+        directory = parent
+    if not directory or os.path.dirname(directory) == directory:
+        return None
+    return directory
+
+
+def _list_dirs(batch, cached_dirs):
+    """Обходит пачку каталогов. Каталог с прежним mtime берется из кэша без чтения;
+    измененный читается через os.scandir (размер файлов без перехода по ссылкам).
+    Возвращает [(каталог, (mtime_ns, байт, файлов, подкаталоги) или None, прочитан заново)]."""
+    out = []
+    for path in batch:
+        try:
+            # mtime - до чтения: изменение во время чтения заставит перечитать каталог в следующий раз
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            out.append((path, None, False))
+            continue
+        cached = cached_dirs.get(path)
+        if cached is not None and cached[0] == mtime_ns:
+            out.append((path, cached, False))
+            continue
+        size = files = 0
+        subdirs = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+                        elif entry.is_file(follow_symlinks=False):
+                            size += entry.stat(follow_symlinks=False).st_size
+                            files += 1
+                    except OSError:
+                        continue
+        except OSError:
+            out.append((path, None, False))
+            continue
+        out.append((path, (mtime_ns, size, files, tuple(subdirs)), True))
+    return out
+
+
+class DiskUsage:
+    """Место на диске, занятое каталогами игр.
+
+    Каталоги обходятся по уровням в пуле потоков (os.scandir). Для каждого
+    каталога кэшируются mtime, размер и число его собственных файлов и список
+    подкаталогов: каталог с прежним mtime не читается заново (файлы в нем не
+    добавлялись, не удалялись и не переименовывались), проверяется только stat
+    его подкаталогов. Поэтому повторный подсчет - это один stat на каталог, а
+    scandir и stat файлов - только в изменившихся каталогах. Перезапись файла
+    на месте без изменения каталога не видна до следующего изменения каталога
+    (так же обновляет SizeOnDisk и сам Steam). Кэш и последние итоги по
+    каталогам игр хранятся в pickle (ConfigPaths.usage_cache), так что окно
+    показывает размеры сразу при запуске, до повторного подсчета.
+    """
+
+    def __init__(self, cache_path=None, workers=SIZE_WORKERS):
+        self.cache_path = cache_path
+        self.workers = workers
+        self.dirs = {} # каталог -> (mtime_ns, байт своих файлов, файлов, подкаталоги)
+        self.totals = {} # каталог игры -> {"bytes", "files", "dirs", "scanned_at"}
+        self.dirty = False
+        self.lock = threading.Lock()
+        self.load_cache()
+
+    def load_cache(self):
+        if not self.cache_path:
+            return
+        try:
+            with open(self.cache_path, 'rb') as f:
+                cache = pickle.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"ОШИБКА чтения кэша занятого места: {e}")
+            return
+        if isinstance(cache, dict) and cache.get("version") == CACHE_VERSION:
+            self.dirs = cache.get("dirs", {})
+            self.totals = cache.get("totals", {})
+
+    def save_cache(self):
+        if not self.cache_path or not self.dirty:
+            return
+        tmp_path = self.cache_path + ".tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({"version": CACHE_VERSION, "dirs": self.dirs, "totals": self.totals}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.cache_path)
+            self.dirty = False
+        except OSError as e:
+            print(f"ОШИБКА записи кэша занятого места: {e}")
+
+    def measure(self, roots, prune=False):
+        """Размеры каталогов roots: {каталог: {"bytes", "files", "dirs", "scanned_at"}}.
+        Отсутствующие каталоги в ответ не попадают. prune=True убирает из кэша
+        каталоги вне roots (полный подсчет всех игр)."""
+        with self.lock, metrics.timer("usage.measure") as span:
+            cached_dirs = self.dirs
+            visited = {} # каталог -> запись кэша (в порядке обхода)
+            children = {} # каталог -> пути подкаталогов (склеиваются один раз)
+            listed = 0
+            # Каталог игры внутри каталога другой игры обходится один раз (seen)
+            level = sorted(set(roots))
+            seen = set(level)
+            with ThreadPoolExecutor(max_workers=max(1, self.workers)) as pool:
+                while level:
+                    batches = [level[i:i + DIR_BATCH] for i in range(0, len(level), DIR_BATCH)]
+                    if len(batches) == 1 or self.workers <= 1:
+                        results = [_list_dirs(batch, cached_dirs) for batch in batches]
+                    else:
+                        results = pool.map(_list_dirs, batches, [cached_dirs] * len(batches))
+                    next_level = []
+                    for batch in results:
+                        for path, entry, fresh in batch:
+                            if entry is None:
+                                continue
+                            visited[path] = entry
+                            listed += fresh
+                            # Корень диска не бывает каталогом игры: разделитель в конце пути не нужен
+                            prefix = path + os.sep
+                            paths = children[path] = [prefix + name for name in entry[3]]
+                            for child in paths:
+                                if child not in seen:
+                                    seen.add(child)
+                                    next_level.append(child)
+                    level = next_level
+
+            # Итоги снизу вверх, от глубоких путей к мелким: путь подкаталога всегда на один
+            # разделитель длиннее. Порядок обхода для этого не годится - корень A/x/y
+            # обходится в первом уровне, раньше своего родителя A/x из второго уровня корня A
+            sums = {}
+            for path in sorted(visited, key=lambda path: path.count(os.sep), reverse=True):
+                _, size, files, _ = visited[path]
+                dirs = 0
+                for child_path in children[path]:
+                    child = sums.get(child_path)
+                    if child is not None:
+                        size += child[0]
+                        files += child[1]
+                        dirs += child[2] + 1
+                sums[path] = (size, files, dirs)
+
+            now = time.time()
+            totals = {}
+            changed = 0
+            for root in roots:
+                if root in sums:
+                    size, files, dirs = sums[root]
+                    totals[root] = {"bytes": size, "files": files, "dirs": dirs, "scanned_at": now}
+                    old = self.totals.get(root)
+                    changed += old is None or (old["bytes"], old["files"], old["dirs"]) != sums[root]
+
+            if prune:
+                removed = len(cached_dirs.keys() - visited.keys())
+                self.dirs = visited
+                self.totals = totals
+            else:
+                removed = 0
+                self.dirs = {**cached_dirs, **visited}
+                self.totals = {**self.totals, **totals}
+                for root in roots:
+                    if root not in totals:
+                        self.totals.pop(root, None)
+            # Одно лишь новое время подсчета не повод перезаписывать кэш
+            if listed or removed or changed:
+                self.dirty = True
+            self.save_cache()
+            span.update(roots=len(roots), dirs=len(visited), listed=listed, removed=removed)
+        return totals
+
+    def game_dirs(self, games, resolver=None):
+        """{game_id: каталог игры}. steam:// и ярлыки .url разрешаются через LaunchResolver (если задан)."""
+        dirs = {}
+        for game in games:
+            launch_path = game.get("launch_path") or ""
+            path = normalize_launch_path(launch_path)
+            if resolver is not None and ("://" in path or path.lower().endswith(".url")):
+                target = resolver.target(launch_path, game.get("process_name"))
+                path = target["exe"] or ""
+            if not path or "://" in path:
+                continue
+            directory = game_directory(path)
+            if directory is not None:
+                dirs[game["id"]] = directory
+        return dirs
+
+    def scan_games(self, games, resolver=None, prune=True):
+        """Считает место, занятое каталогами игр. Возвращает {game_id: {"path", "bytes", "files", "dirs", "scanned_at"}}."""
+        dirs = self.game_dirs(games, resolver)
+        totals = self.measure(sorted(set(dirs.values())), prune)
+        return {game_id: dict(totals[path], path=path) for game_id, path in dirs.items() if path in totals}
+
+    def cached_games(self, games, resolver=None):
+        """Последние итоги из кэша без обхода (для показа до завершения подсчета)."""
+        dirs = self.game_dirs(games, resolver)
+        return {game_id: dict(self.totals[path], path=path) for game_id, path in dirs.items() if path in self.totals}
+
+
+def sort_usage(usage, games_by_id, sort="size", descending=True, min_bytes=0, ids=None):
+    """Строки для окна и CLI: [{"id", "title", "path", "bytes", "files"}], отсортированные по
+    size | files | title. ids - только эти игры (например, найденные поиском)."""
+    rows = []
+    for game_id, info in usage.items():
+        if ids is not None and game_id not in ids:
+            continue
+        if info["bytes"] < min_bytes:
+            continue
+        game = games_by_id.get(game_id)
+        if game is None:
+            continue
+        rows.append({"id": game_id, "title": game["title"], "path": info["path"],
+                     "bytes": info["bytes"], "files": info["files"]})
+    if sort == "title":
+        rows.sort(key=lambda row: row["title"].lower(), reverse=descending)
+    elif sort == "files":
+        rows.sort(key=lambda row: row["files"], reverse=descending)
+    else:
+        rows.sort(key=lambda row: row["bytes"], reverse=descending)
+    return rows
@@ -0,0 +1,219 @@
+import os # Стандартная библиотека
+import sys # Стандартная библиотека
+import json # Стандартная библиотека
+import mmap # Стандартная библиотека
+import hashlib # Стандартная библиотека
+from concurrent.futures import ProcessPoolExecutor
+
+# --- НАСТРОЙКИ ПРОВЕРКИ ---
+PIECE_SIZE = 4 * 1024 * 1024 # Размер куска для хешей по кускам
+TASK_PIECES = 16 # Кусков в одной задаче пула процессов (64 МБ)
+MANIFEST_FILE_NAME = "tq_manifest.json"
+STATE_FILE_NAME = "tq_verified.json"
+# --------------------
+
+
+def game_root(launch_path):
+    """Каталог игры по starting(...): папка, в которой лежит исполняемый файл."""
+    return os.path.dirname(launch_path.strip().strip('"'))
+
+
+def hash_pieces(path, first_piece, piece_count, piece_size=PIECE_SIZE):
+    """SHA-256 кусков [first_piece, first_piece + piece_count) файла через mmap-чтение."""
+    hashes = []
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return [hashlib.sha256(b"").hexdigest()]
+        start = first_piece * piece_size
+        length = min(size, start + piece_count * piece_size) - start
+        if length <= 0:
+            return hashes
+        # Смещение mmap должно быть кратно гранулярности выделения памяти, а piece_size
+        # из чужого манифеста - не обязательно: отображение начинается раньше, лишнее срезается
+        skew = start % mmap.ALLOCATIONGRANULARITY
+        with mmap.mmap(f.fileno(), skew + length, offset=start - skew, access=mmap.ACCESS_READ) as mapped:
+            for offset in range(skew, skew + length, piece_size):
+                with memoryview(mapped)[offset:offset + piece_size] as view:
+                    hashes.append(hashlib.sha256(view).hexdigest())
+    return hashes
+
+
+def _hash_task(args):
+    root, rel_path, first_piece, piece_count, piece_size = args
+    try:
+        return hash_pieces(os.path.join(root, rel_path), first_piece, piece_count, piece_size), None
+    except OSError as e:
+        return None, str(e)
+
+
+def hash_files(root, rel_paths, piece_size=PIECE_SIZE, workers=None):
+    """Хеширует файлы в пуле процессов. Большие файлы делятся на задачи по
+    TASK_PIECES кусков, чтобы один многогигабайтный файл тоже считался параллельно.
+    Возвращает {rel_path: (hashes или None, ошибка)}."""
+    tasks = []
+    owners = []
+    for rel_path in rel_paths:
+        try:
+            size = os.path.getsize(os.path.join(root, rel_path))
+        except OSError:
+            size = 0
+        pieces = max(1, (size + piece_size - 1) // piece_size)
+        for first in range(0, pieces, TASK_PIECES):
+            tasks.append((root, rel_path, first, min(TASK_PIECES, pieces - first), piece_size))
+            owners.append(rel_path)
+
+    results = {rel_path: ([], None) for rel_path in rel_paths}
+    if not tasks:
+        return results
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for rel_path, (hashes, error) in zip(owners, pool.map(_hash_task, tasks, chunksize=2)):
+            done, previous_error = results[rel_path]
+            if error or previous_error or done is None:
+                results[rel_path] = (None, previous_error or error)
+            else:
+                done.extend(hashes)
+    return results
+
+
+def iter_tree(root, skip=(MANIFEST_FILE_NAME, STATE_FILE_NAME)):
+    """Относительные пути всех файлов дерева (через os.scandir)."""
+    stack = [""]
+    while stack:
+        rel_dir = stack.pop()
+        with os.scandir(os.path.join(root, rel_dir)) as entries:
+            for entry in entries:
+                rel_path = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(rel_path)
+                elif entry.is_file(follow_symlinks=False) and not (rel_dir == "" and entry.name in skip):
+                    yield rel_path
+
+
+def build_manifest(root, piece_size=PIECE_SIZE, workers=None):
+    """Манифест каталога игры: для каждого файла - размер и SHA-256 кусков."""
+    rel_paths = sorted(iter_tree(root))
+    files = {}
+    for rel_path, (hashes, error) in hash_files(root, rel_paths, piece_size, workers).items():
+        if error:
+            raise OSError(f"Не удалось прочитать {rel_path}: {error}")
+        files[rel_path.replace(os.sep, "/")] = {
+            "size": os.path.getsize(os.path.join(root, rel_path)),
+            "pieces": hashes
+        }
+    return {"piece_size": piece_size, "files": files}
+
+
+def load_json(path, default):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def save_json(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+
+def verify_tree(root, manifest, state=None, workers=None):
+    """Сверяет дерево игры с манифестом.
+
+    Файлы, чьи размер и mtime совпадают с последней успешной проверкой (state),
+    не перечитываются. Возвращает (report, new_state), где report:
+    {"missing": [файлы], "size_mismatch": [файлы], "bad_pieces": {файл: [номера кусков]},
+     "checked": N, "skipped": N}
+    """
+    piece_size = manifest["piece_size"]
+    state = dict(state or {})
+    report = {"missing": [], "size_mismatch": [], "bad_pieces": {}, "checked": 0, "skipped": 0}
+    to_hash = []
+
+    for rel_path, expected in manifest["files"].items():
+        full = os.path.join(root, *rel_path.split("/"))
+        try:
+            st = os.stat(full)
+        except OSError:
+            report["missing"].append(rel_path)
+            state.pop(rel_path, None)
+            continue
+        if st.st_size != expected["size"]:
+            report["size_mismatch"].append(rel_path)
+            state.pop(rel_path, None)
+            continue
+        if state.get(rel_path) == [st.st_size, st.st_mtime_ns]:
+            report["skipped"] += 1
+            continue
+        to_hash.append((rel_path, st))
+
+    hashed = hash_files(root, [rel_path.replace("/", os.sep) for rel_path, _ in to_hash], piece_size, workers)
+    for rel_path, st in to_hash:
+        hashes, error = hashed[rel_path.replace("/", os.sep)]
+        report["checked"] += 1
+        if error:
+            report["missing"].append(rel_path)
+            state.pop(rel_path, None)
+            continue
+        expected = manifest["files"][rel_path]["pieces"]
+        bad = [i for i, (got, want) in enumerate(zip(hashes, expected)) if got != want]
+        if bad or len(hashes) != len(expected):
+            report["bad_pieces"][rel_path] = bad
+            state.pop(rel_path, None)
+        else:
+            state[rel_path] = [st.st_size, st.st_mtime_ns]
+    return report, state
+
+
+def verify_game(launch_path, workers=None):
+    """Проверяет установленную игру по манифесту tq_manifest.json в ее каталоге."""
+    return verify_game_dir(game_root(launch_path), workers)
+
+
+def verify_game_dir(root, workers=None):
+    manifest_path = os.path.join(root, MANIFEST_FILE_NAME)
+    state_path = os.path.join(root, STATE_FILE_NAME)
+    manifest = load_json(manifest_path, None)
+    if manifest is None:
+        raise FileNotFoundError(f"Нет манифеста {manifest_path}")
+    report, state = verify_tree(root, manifest, load_json(state_path, {}), workers)
+    save_json(state_path, state)
+    return report
+
+
+def report_ok(report):
+    return not (report["missing"] or report["size_mismatch"] or report["bad_pieces"])
+
+
+def format_report(report):
+    if report_ok(report):
+        return f"Файлы целы (проверено {report['checked']}, пропущено без изменений {report['skipped']})."
+    lines = []
+    for rel_path in report["missing"]:
+        lines.append(f"  нет файла: {rel_path}")
+    for rel_path in report["size_mismatch"]:
+        lines.append(f"  другой размер: {rel_path}")
+    for rel_path, pieces in report["bad_pieces"].items():
+        lines.append(f"  поврежденные куски {rel_path}: {pieces}")
+    return "Найдены повреждения:\n" + "\n".join(lines)
+
+
+if __name__ == "__main__":
+    # python verify_files.py manifest <каталог_игры>  - создать манифест
+    # python verify_files.py verify <путь_к_exe_или_каталогу> - проверить
+    if len(sys.argv) != 3 or sys.argv[1] not in ("manifest", "verify"):
+        print("Использование: python verify_files.py manifest|verify <путь>")
+        sys.exit(1)
+
+    command, target = sys.argv[1], sys.argv[2]
+    root = target if os.path.isdir(target) else game_root(target)
+    if command == "manifest":
+        manifest = build_manifest(root)
+        save_json(os.path.join(root, MANIFEST_FILE_NAME), manifest)
+        print(f"[МАНИФЕСТ] {len(manifest['files'])} файлов -> {MANIFEST_FILE_NAME}")
+    else:
+        result = verify_game_dir(root)
+        print(format_report(result))
+        sys.exit(0 if report_ok(result) else 2)